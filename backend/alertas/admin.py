@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Alerta
+
+@admin.register(Alerta)
+class AlertaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tipo', 'mensaje', 'fecha_referencia', 'leida', 'fecha_creacion')
+    list_filter = ('tipo', 'leida')
+    raw_id_fields = ('dispositivo', 'mantenimiento')
@@ -0,0 +1,19 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from alertas.motor import generar_alertas
+
+
+class Command(BaseCommand):
+    help = "Genera las alertas de garantías por vencer y mantenimientos vencidos (pensado para ejecutarse periódicamente)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.ALERTAS_DIAS_GARANTIA, help="Días de anticipación para las garantías.")
+        parser.add_argument('--fecha', type=date.fromisoformat, help="Fecha de referencia AAAA-MM-DD (por defecto hoy).")
+        parser.add_argument('--completo', action='store_true', help="Revisa los rangos completos, ignorando la marca de agua.")
+
+    def handle(self, *args, **options):
+        nuevas = generar_alertas(options['dias'], hoy=options['fecha'], completo=options['completo'])
+        self.stdout.write(self.style.SUCCESS(f"{nuevas} alerta(s) nueva(s)."))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-01-31 09:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventario', '0004_indice_garantia'),
+        ('mantenimiento', '0004_indice_fecha_programada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('GARANTIA', 'Garantía por vencer'), ('MANTENIMIENTO_VENCIDO', 'Mantenimiento vencido')], max_length=30)),
+                ('fecha_referencia', models.DateField(help_text='Fin de la garantía o fecha programada del mantenimiento')),
+                ('mensaje', models.CharField(max_length=255)),
+                ('leida', models.BooleanField(default=False)),
+                ('fecha_lectura', models.DateTimeField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('dispositivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='inventario.dispositivo')),
+                ('mantenimiento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='mantenimiento.mantenimiento')),
+            ],
+            options={
+                'verbose_name': 'Alerta',
+                'verbose_name_plural': 'Alertas',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['leida', '-id'], name='alerta_leida_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('tipo', 'GARANTIA')), fields=('dispositivo', 'fecha_referencia'), name='alerta_garantia_unica'), models.UniqueConstraint(condition=models.Q(('tipo', 'MANTENIMIENTO_VENCIDO')), fields=('mantenimiento', 'fecha_referencia'), name='alerta_mantenimiento_unica')],
+            },
+        ),
+    ]
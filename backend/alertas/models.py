@@ -0,0 +1,50 @@
+from django.db import models
+
+from inventario.models import Dispositivo
+from mantenimiento.models import Mantenimiento
+
+
+class Alerta(models.Model):
+    """
+    Aviso generado por el motor de alertas (alertas.motor): garantía por vencer o
+    mantenimiento pendiente con la fecha programada vencida. Cada condición genera
+    una sola alerta, identificada por el dispositivo o el mantenimiento y la fecha
+    que la originó (si la fecha cambia, es una alerta nueva).
+    """
+    TIPOS = [
+        ('GARANTIA', 'Garantía por vencer'),
+        ('MANTENIMIENTO_VENCIDO', 'Mantenimiento vencido'),
+    ]
+
+    tipo = models.CharField(max_length=30, choices=TIPOS)
+    dispositivo = models.ForeignKey(Dispositivo, on_delete=models.CASCADE, related_name='alertas')
+    mantenimiento = models.ForeignKey(Mantenimiento, on_delete=models.CASCADE, related_name='alertas', blank=True, null=True)
+    fecha_referencia = models.DateField(help_text="Fin de la garantía o fecha programada del mantenimiento")
+    mensaje = models.CharField(max_length=255)
+
+    leida = models.BooleanField(default=False)
+    fecha_lectura = models.DateTimeField(blank=True, null=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.tipo} - {self.mensaje}"
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = "Alerta"
+        verbose_name_plural = "Alertas"
+        constraints = [
+            # Claves de deduplicación: el motor inserta con ignore_conflicts
+            models.UniqueConstraint(
+                fields=['dispositivo', 'fecha_referencia'], condition=models.Q(tipo='GARANTIA'),
+                name='alerta_garantia_unica',
+            ),
+            models.UniqueConstraint(
+                fields=['mantenimiento', 'fecha_referencia'], condition=models.Q(tipo='MANTENIMIENTO_VENCIDO'),
+                name='alerta_mantenimiento_unica',
+            ),
+        ]
+        indexes = [
+            # Listado de no leídas y su conteo
+            models.Index(fields=['leida', '-id'], name='alerta_leida_idx'),
+        ]
@@ -0,0 +1,100 @@
+"""
+Motor de alertas: garantías que vencen dentro de N días y mantenimientos
+PENDIENTE con la fecha programada vencida.
+
+Cada ejecución revisa solo la ventana de fechas que se agregó desde la ejecución
+anterior (marca de agua en reportes.MarcaAgua, el inicio del día de esa ejecución):
+
+- garantías: las que entraron al horizonte, fin de garantía en (anterior + N, hoy + N],
+- mantenimientos: los que vencieron desde entonces, fecha programada en [anterior, hoy),
+
+más las filas creadas o editadas desde la marca (fecha_actualizacion) cuya fecha
+cae en una ventana ya revisada. Las búsquedas por rango usan los índices
+dispositivo_garantia_idx y mantenimiento_estado_idx, y se excluyen las condiciones
+que ya tienen alerta, así el costo depende de las alertas nuevas y no de la
+cantidad de dispositivos. La primera ejecución, o con `completo`, revisa los
+rangos completos; con `completo` también se recuperan las fechas cambiadas con
+update() masivos, que no actualizan fecha_actualizacion.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from inventario.models import Dispositivo
+from mantenimiento.models import Mantenimiento
+from reportes.models import MarcaAgua
+
+from .models import Alerta
+
+PROCESO = 'alertas'
+
+
+def _garantias(hoy, dias, marca):
+    hasta = hoy + timedelta(days=dias)
+    rango = Q(garantia_hasta__gte=hoy, garantia_hasta__lte=hasta)
+    if marca is not None:
+        desde = max(hoy, timezone.localdate(marca.fecha) + timedelta(days=dias + 1))
+        rango &= Q(garantia_hasta__gte=desde) | Q(fecha_actualizacion__gte=marca.fecha)
+    existente = Alerta.objects.filter(
+        tipo='GARANTIA', dispositivo=OuterRef('pk'), fecha_referencia=OuterRef('garantia_hasta'),
+    )
+    dispositivos = (
+        Dispositivo.objects
+        .filter(rango)
+        .exclude(estado='BAJA')
+        .filter(~Exists(existente))
+        .values_list('pk', 'codigo_inventario', 'garantia_hasta')
+        .order_by()
+    )
+    return [
+        Alerta(
+            tipo='GARANTIA', dispositivo_id=pk, fecha_referencia=garantia_hasta,
+            mensaje=f"La garantía de {codigo} vence el {garantia_hasta:%d/%m/%Y}.",
+        )
+        for pk, codigo, garantia_hasta in dispositivos
+    ]
+
+
+def _mantenimientos_vencidos(hoy, marca):
+    existente = Alerta.objects.filter(
+        tipo='MANTENIMIENTO_VENCIDO', mantenimiento=OuterRef('pk'), fecha_referencia=OuterRef('fecha_programada'),
+    )
+    mantenimientos = Mantenimiento.objects.filter(estado='PENDIENTE', fecha_programada__lt=hoy)
+    if marca is not None:
+        mantenimientos = mantenimientos.filter(
+            Q(fecha_programada__gte=timezone.localdate(marca.fecha)) | Q(fecha_actualizacion__gte=marca.fecha)
+        )
+    filas = (
+        mantenimientos
+        .filter(~Exists(existente))
+        .values_list('pk', 'dispositivo_id', 'dispositivo__codigo_inventario', 'tipo', 'fecha_programada')
+        .order_by()
+    )
+    return [
+        Alerta(
+            tipo='MANTENIMIENTO_VENCIDO', dispositivo_id=dispositivo_id, mantenimiento_id=pk, fecha_referencia=fecha,
+            mensaje=f"Mantenimiento {tipo.lower()} de {codigo} vencido desde el {fecha:%d/%m/%Y}.",
+        )
+        for pk, dispositivo_id, codigo, tipo, fecha in filas
+    ]
+
+
+def generar_alertas(dias=None, hoy=None, completo=False):
+    """
+    Crea las alertas nuevas y retorna cuántas se generaron. `dias` es el horizonte
+    de las garantías (por defecto settings.ALERTAS_DIAS_GARANTIA).
+    """
+    if dias is None:
+        dias = settings.ALERTAS_DIAS_GARANTIA
+    hoy = hoy or timezone.localdate()
+    marca = None if completo else MarcaAgua.objects.filter(proceso=PROCESO).first()
+
+    nuevas = _garantias(hoy, dias, marca) + _mantenimientos_vencidos(hoy, marca)
+    with transaction.atomic():
+        # ignore_conflicts: dos ejecuciones simultáneas no duplican alertas
+        Alerta.objects.bulk_create(nuevas, batch_size=500, ignore_conflicts=True)
+        MarcaAgua.objects.update_or_create(proceso=PROCESO, defaults={'fecha': timezone.make_aware(datetime.combine(hoy, time.min))})
+    return len(nuevas)
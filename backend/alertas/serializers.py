@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from .models import Alerta
+
+class AlertaSerializer(serializers.ModelSerializer):
+    dispositivo_codigo = serializers.CharField(source='dispositivo.codigo_inventario', read_only=True)
+
+    class Meta:
+        model = Alerta
+        fields = [
+            'id', 'tipo', 'dispositivo', 'dispositivo_codigo', 'mantenimiento',
+            'fecha_referencia', 'mensaje', 'leida', 'fecha_lectura', 'fecha_creacion'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,131 @@
+from datetime import date, datetime, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from inventario.models import Categoria, Dispositivo
+from mantenimiento.models import Mantenimiento
+
+from .models import Alerta
+from .motor import generar_alertas
+
+
+class MotorAlertasTests(TestCase):
+    """
+    Cada condición genera una sola alerta y las ejecuciones siguientes solo revisan
+    la ventana de fechas nueva.
+    """
+    hoy = date(2026, 3, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+
+        def dispositivo(codigo, garantia_hasta, estado='ACTIVO'):
+            return Dispositivo.objects.create(
+                codigo_inventario=codigo, marca="Dell", modelo="Latitude", categoria=categoria,
+                ubicacion="Bodega", garantia_hasta=garantia_hasta, estado=estado,
+            )
+
+        cls.por_vencer = dispositivo("LAP-1", date(2026, 3, 20))
+        cls.vencida = dispositivo("LAP-2", date(2026, 2, 1))
+        cls.lejana = dispositivo("LAP-3", date(2026, 4, 5))
+        dispositivo("LAP-4", date(2026, 3, 10), estado='BAJA')
+        cls.atrasado = Mantenimiento.objects.create(dispositivo=cls.vencida, fecha_programada=date(2026, 2, 20), estado='PENDIENTE')
+        Mantenimiento.objects.create(dispositivo=cls.vencida, fecha_programada=date(2026, 2, 10), estado='FINALIZADO')
+        Mantenimiento.objects.create(dispositivo=cls.vencida, fecha_programada=date(2026, 3, 5), estado='PENDIENTE')
+        # Los datos iniciales se cargaron antes de la primera ejecución
+        cargados = timezone.make_aware(datetime(2026, 1, 1))
+        Dispositivo.objects.update(fecha_actualizacion=cargados)
+        Mantenimiento.objects.update(fecha_actualizacion=cargados)
+
+    def alertas(self):
+        return sorted(Alerta.objects.values_list('tipo', 'dispositivo__codigo_inventario', 'fecha_referencia'))
+
+    def test_primera_ejecucion(self):
+        self.assertEqual(generar_alertas(30, hoy=self.hoy), 2)
+        self.assertEqual(self.alertas(), [
+            ('GARANTIA', "LAP-1", date(2026, 3, 20)),
+            ('MANTENIMIENTO_VENCIDO', "LAP-2", date(2026, 2, 20)),
+        ])
+        self.assertEqual(Alerta.objects.get(tipo='MANTENIMIENTO_VENCIDO').mantenimiento, self.atrasado)
+
+    def test_deduplicacion_y_ventanas(self):
+        generar_alertas(30, hoy=self.hoy)
+        self.assertEqual(generar_alertas(30, hoy=self.hoy), 0)
+        self.assertEqual(generar_alertas(30, hoy=self.hoy, completo=True), 0)
+
+        # Días después entran la garantía de LAP-3 y el mantenimiento del 5/3
+        self.assertEqual(generar_alertas(30, hoy=date(2026, 3, 8)), 2)
+        self.assertIn(('GARANTIA', "LAP-3", date(2026, 4, 5)), self.alertas())
+        self.assertIn(('MANTENIMIENTO_VENCIDO', "LAP-2", date(2026, 3, 5)), self.alertas())
+
+        # Una fecha cambiada con update() masivo hacia una ventana ya revisada solo se recupera con `completo`
+        Dispositivo.objects.filter(pk=self.por_vencer.pk).update(garantia_hasta=date(2026, 4, 6))
+        self.assertEqual(generar_alertas(30, hoy=date(2026, 3, 9)), 0)
+        self.assertEqual(generar_alertas(30, hoy=date(2026, 3, 9), completo=True), 1)
+
+    def test_filas_nuevas_en_ventanas_revisadas(self):
+        generar_alertas(30, hoy=self.hoy)
+        siguiente = self.hoy + timedelta(days=1)
+
+        # Un dispositivo cargado después, con la garantía dentro del horizonte ya revisado,
+        # y un mantenimiento pendiente registrado con una fecha pasada
+        nuevo = Dispositivo.objects.create(
+            codigo_inventario="LAP-5", marca="Dell", modelo="Latitude", categoria_id=self.por_vencer.categoria_id,
+            ubicacion="Bodega", garantia_hasta=siguiente + timedelta(days=10),
+        )
+        Mantenimiento.objects.create(dispositivo=nuevo, fecha_programada=date(2026, 2, 15), estado='PENDIENTE')
+        self.assertEqual(generar_alertas(30, hoy=siguiente), 2)
+        self.assertIn(('GARANTIA', "LAP-5", date(2026, 3, 12)), self.alertas())
+        self.assertIn(('MANTENIMIENTO_VENCIDO', "LAP-5", date(2026, 2, 15)), self.alertas())
+
+        # Una fecha editada con save() hacia una ventana ya revisada
+        self.lejana.garantia_hasta = date(2026, 3, 25)
+        self.lejana.save()
+        self.assertEqual(generar_alertas(30, hoy=siguiente), 1)
+        self.assertIn(('GARANTIA', "LAP-3", date(2026, 3, 25)), self.alertas())
+        self.assertEqual(generar_alertas(30, hoy=siguiente), 0)
+
+    def test_consultas_independientes_de_los_dispositivos(self):
+        generar_alertas(30, hoy=self.hoy)
+        with CaptureQueriesContext(connection) as antes:
+            generar_alertas(30, hoy=self.hoy + timedelta(days=1))
+        Dispositivo.objects.bulk_create(
+            Dispositivo(codigo_inventario=f"EQ-{i}", marca="HP", modelo="X", categoria_id=self.por_vencer.categoria_id,
+                        ubicacion="Bodega", garantia_hasta=date(2027, 1, 1))
+            for i in range(50)
+        )
+        with CaptureQueriesContext(connection) as despues:
+            generar_alertas(30, hoy=self.hoy + timedelta(days=2))
+        self.assertEqual(len(antes.captured_queries), len(despues.captured_queries))
+
+
+class AlertasApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        dispositivo = Dispositivo.objects.create(codigo_inventario="LAP-1", marca="Dell", modelo="Latitude", categoria=categoria, ubicacion="Bodega")
+        cls.garantia = Alerta.objects.create(tipo='GARANTIA', dispositivo=dispositivo, fecha_referencia=date(2026, 3, 20), mensaje="Garantía")
+        for dia in (1, 2):
+            Alerta.objects.create(tipo='MANTENIMIENTO_VENCIDO', dispositivo=dispositivo, fecha_referencia=date(2026, 2, dia), mensaje="Vencido")
+
+    def test_listado_con_no_leidas(self):
+        with self.assertNumQueries(2):
+            datos = self.client.get('/api/alertas/').json()
+        self.assertEqual(len(datos['results']), 3)
+        self.assertEqual(datos['results'][0]['dispositivo_codigo'], "LAP-1")
+        self.assertEqual(datos['no_leidas'], {'total': 3, 'por_tipo': {'GARANTIA': 1, 'MANTENIMIENTO_VENCIDO': 2}})
+
+    def test_marcar_leidas(self):
+        self.assertEqual(self.client.post(f'/api/alertas/{self.garantia.pk}/leer/').status_code, 204)
+        self.assertEqual(self.client.get('/api/alertas/no-leidas/').json()['total'], 2)
+        self.assertEqual(len(self.client.get('/api/alertas/?leida=false').json()['results']), 2)
+
+        datos = self.client.post('/api/alertas/leer-todas/', {'tipo': 'MANTENIMIENTO_VENCIDO'}, content_type='application/json').json()
+        self.assertEqual(datos['marcadas'], 2)
+        self.assertEqual(datos['no_leidas']['total'], 0)
+        self.assertIsNotNone(Alerta.objects.get(pk=self.garantia.pk).fecha_lectura)
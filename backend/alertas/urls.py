@@ -0,0 +1,11 @@
+from rest_framework.routers import SimpleRouter
+from django.urls import path, include
+from .views import AlertaViewSet
+
+# Sin vista raíz (DefaultRouter): el listado ocupa la raíz de /api/alertas/
+router = SimpleRouter()
+router.register(r'', AlertaViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
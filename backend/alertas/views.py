@@ -0,0 +1,68 @@
+from django.db.models import Count, Q
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .models import Alerta
+from .serializers import AlertaSerializer
+
+
+def conteo_no_leidas():
+    """
+    No leídas en total y por tipo, en una sola consulta.
+    """
+    conteos = Alerta.objects.filter(leida=False).aggregate(
+        total=Count('pk'),
+        **{tipo: Count('pk', filter=Q(tipo=tipo)) for tipo, _ in Alerta.TIPOS}
+    )
+    total = conteos.pop('total')
+    return {'total': total, 'por_tipo': conteos}
+
+
+class AlertaViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Alertas generadas por el comando `generar_alertas`. El listado incluye
+    `no_leidas` (total y por tipo); filtros: `tipo`, `leida` y `dispositivo`.
+    """
+    queryset = Alerta.objects.select_related('dispositivo')
+    serializer_class = AlertaSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['tipo', 'leida', 'dispositivo']
+    ordering = ['-id']
+    # Alertas y conteo de no leídas; el filtro por dispositivo valida el ID con una consulta extra
+    presupuesto_consultas = {'list': 3, 'retrieve': 1, 'leer': 2, 'leer_todas': 2, 'no_leidas': 1}
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.data['no_leidas'] = conteo_no_leidas()
+        return response
+
+    @action(detail=False, methods=['get'], url_path='no-leidas')
+    def no_leidas(self, request):
+        """
+        Solo los conteos, para el indicador de la barra superior.
+        URL: /api/alertas/no-leidas/
+        """
+        return Response(conteo_no_leidas())
+
+    @action(detail=True, methods=['post'])
+    def leer(self, request, pk=None):
+        alerta = self.get_object()
+        if not alerta.leida:
+            Alerta.objects.filter(pk=alerta.pk).update(leida=True, fecha_lectura=timezone.now())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], url_path='leer-todas')
+    def leer_todas(self, request):
+        """
+        Marca como leídas todas las alertas (o las de `tipo`) con un solo UPDATE.
+        URL: /api/alertas/leer-todas/
+        """
+        alertas = Alerta.objects.filter(leida=False)
+        tipo = request.data.get('tipo') if isinstance(request.data, dict) else None
+        if tipo:
+            alertas = alertas.filter(tipo=tipo)
+        marcadas = alertas.update(leida=True, fecha_lectura=timezone.now())
+        return Response({'marcadas': marcadas, 'no_leidas': conteo_no_leidas()})
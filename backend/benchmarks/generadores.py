@@ -0,0 +1,180 @@
+"""
+Generadores de datos sintéticos para los benchmarks.
+
+Los datos son deterministas (semilla fija) para que dos corridas con la misma
+escala midan lo mismo. Las filas se insertan con bulk_create por lotes y los
+agregados desnormalizados (uso de los discos, reportes) se recalculan al final,
+como después de una importación.
+"""
+import os
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.utils import timezone
+
+from discos.models import ContenidoDisco, Disco
+from gestor_areas_project.excel import TAMANIO_LOTE, en_lotes
+from gestor_areas_project.exportacion import Hoja, respuesta_exportacion
+from inventario.models import Categoria, Dispositivo, Movimiento
+from mantenimiento.models import Mantenimiento
+
+SEMILLA = 20240601
+
+TIPOS_DISCO = ['HDD', 'SSD', 'CD/DVD']
+# Palabras con las que se arman los nombres, para que las búsquedas tengan aciertos
+PALABRAS = [
+    'informe', 'backup', 'fotos', 'nomina', 'facturas', 'proyecto', 'contratos', 'videos',
+    'musica', 'planos', 'auditoria', 'presupuesto', 'clientes', 'inventario', 'manuales',
+]
+CATEGORIAS = ['Portátil', 'Monitor', 'Impresora', 'Servidor', 'Switch', 'Teléfono']
+UBICACIONES = [f'Oficina {i}' for i in range(40)] + ['Bodega', 'Taller', 'Gerencia']
+
+
+def _nombre(azar, i):
+    return f"{azar.choice(PALABRAS)}_{azar.choice(PALABRAS)}_{i}"
+
+
+def filas_discos(discos, contenidos_por_disco, prefijo='Disco', semilla=SEMILLA):
+    """
+    Filas (hoja Disco, hoja Contenidos) con el formato de la plantilla de importación.
+    """
+    azar = random.Random(semilla)
+    filas_disco = []
+    filas_contenido = []
+    inicio = date(2015, 1, 1)
+    for d in range(discos):
+        nombre = f"{prefijo} {d:05d}"
+        tamanio = azar.choice([250, 500, 1000, 2000, 4000])
+        filas_disco.append((nombre, azar.choice(TIPOS_DISCO), Decimal(tamanio), f"{azar.choice(PALABRAS)} {d}", 'BUENO'))
+        # Ocupación variada, de casi vacío a casi lleno
+        peso_medio = tamanio * azar.uniform(0.05, 0.95) / max(contenidos_por_disco, 1)
+        for c in range(contenidos_por_disco):
+            filas_contenido.append((
+                nombre,
+                _nombre(azar, c),
+                inicio + timedelta(days=azar.randrange(3650)),
+                Decimal(str(round(peso_medio * azar.uniform(0.5, 1.5), 2))),
+            ))
+    return filas_disco, filas_contenido
+
+
+def generar_discos(discos, contenidos_por_disco):
+    filas_disco, filas_contenido = filas_discos(discos, contenidos_por_disco)
+    por_nombre = {
+        disco.nombre: disco
+        for disco in Disco.objects.bulk_create(
+            Disco(nombre=nombre, tipo=tipo, tamanio_gb=tamanio, descripcion=descripcion, estado=estado)
+            for nombre, tipo, tamanio, descripcion, estado in filas_disco
+        )
+    }
+    for lote in en_lotes(filas_contenido, TAMANIO_LOTE * 5):
+        ContenidoDisco.objects.bulk_create(
+            ContenidoDisco(disco=por_nombre[disco], nombre=nombre, fecha_modificacion=fecha, peso_gb=peso)
+            for disco, nombre, fecha, peso in lote
+        )
+    Disco.objects.recalcular_uso()
+
+
+def filas_inventario(dispositivos, prefijo='INV', semilla=SEMILLA):
+    """
+    Filas de la hoja Inventario con el formato de la plantilla de importación.
+    """
+    azar = random.Random(semilla)
+    estados = [estado for estado, _ in Dispositivo.ESTADOS]
+    return [
+        (
+            f"{prefijo}-{i:06d}", azar.choice(CATEGORIAS), azar.choice(['Dell', 'HP', 'Lenovo', 'Cisco']),
+            f"Modelo {azar.randrange(50)}", f"SN{prefijo}{i:08d}", azar.choice(UBICACIONES),
+            f"Persona {azar.randrange(500)}", azar.choice(estados), date(2020, 1, 1) + timedelta(days=azar.randrange(1500)),
+            None, f"ram: {azar.choice([8, 16, 32])}gb",
+        )
+        for i in range(dispositivos)
+    ]
+
+
+def generar_inventario(dispositivos, movimientos_por_dispositivo, mantenimientos_por_dispositivo):
+    azar = random.Random(SEMILLA)
+    categorias = {nombre: Categoria.objects.create(nombre=nombre) for nombre in CATEGORIAS}
+    for lote in en_lotes(filas_inventario(dispositivos), TAMANIO_LOTE):
+        Dispositivo.objects.bulk_create(
+            Dispositivo(
+                codigo_inventario=codigo, categoria=categorias[categoria], marca=marca, modelo=modelo, serial=serial,
+                ubicacion=ubicacion, responsable=responsable, estado=estado, fecha_compra=fecha_compra,
+                especificaciones=especificaciones,
+            )
+            for codigo, categoria, marca, modelo, serial, ubicacion, responsable, estado, fecha_compra, _, especificaciones in lote
+        )
+
+    ids = list(Dispositivo.objects.values_list('pk', flat=True))
+    ahora = timezone.now()
+    tipos = [tipo for tipo, _ in Movimiento.TIPOS_MOVIMIENTO]
+
+    def movimientos():
+        for pk in ids:
+            for _ in range(movimientos_por_dispositivo):
+                yield Movimiento(
+                    dispositivo_id=pk, tipo_movimiento=azar.choice(tipos), origen=azar.choice(UBICACIONES),
+                    destino=azar.choice(UBICACIONES), responsable=f"Persona {azar.randrange(500)}",
+                    fecha_movimiento=ahora - timedelta(minutes=azar.randrange(3 * 365 * 24 * 60)),
+                )
+
+    def mantenimientos():
+        estados = [estado for estado, _ in Mantenimiento.ESTADOS]
+        for pk in ids:
+            for _ in range(mantenimientos_por_dispositivo):
+                yield Mantenimiento(
+                    dispositivo_id=pk, tipo=azar.choice(['PREVENTIVO', 'CORRECTIVO']), estado=azar.choice(estados),
+                    fecha_programada=ahora.date() - timedelta(days=azar.randrange(-90, 3 * 365)),
+                    costo=Decimal(azar.randrange(0, 50000)) / 100,
+                )
+
+    for lote in en_lotes(movimientos(), TAMANIO_LOTE * 5):
+        Movimiento.objects.bulk_create(lote)
+    for lote in en_lotes(mantenimientos(), TAMANIO_LOTE * 5):
+        Mantenimiento.objects.bulk_create(lote)
+
+
+def excel(hojas):
+    """
+    Arma un .xlsx en memoria con el mismo escritor que las exportaciones.
+    """
+    response = respuesta_exportacion(hojas, 'benchmark', 'xlsx')
+    try:
+        return BytesIO(b''.join(response.streaming_content))
+    finally:
+        response.close()
+
+
+def excel_discos(discos, contenidos_por_disco):
+    # Otro prefijo para no chocar con los discos ya sembrados
+    filas_disco, filas_contenido = filas_discos(discos, contenidos_por_disco, prefijo='Importado', semilla=SEMILLA + 1)
+    return excel([
+        Hoja('Disco', ['nombre', 'tipo', 'tamanio_gb', 'descripcion', 'estado'], lambda: filas_disco),
+        Hoja('Contenidos', ['disco_nombre', 'nombre', 'fecha_modificacion', 'peso_gb'], lambda: filas_contenido),
+    ])
+
+
+def excel_inventario(dispositivos):
+    from inventario.utils import INVENTORY_SHEET, TEMPLATE_HEADERS
+    filas = filas_inventario(dispositivos, prefijo='IMP', semilla=SEMILLA + 1)
+    return excel([Hoja(INVENTORY_SHEET, TEMPLATE_HEADERS, lambda: filas)])
+
+
+def generar_arbol(raiz, carpetas, subcarpetas, archivos_por_carpeta):
+    """
+    Árbol de directorios con archivos dispersos (tamaño declarado sin ocupar disco).
+    Retorna la cantidad de archivos creados.
+    """
+    azar = random.Random(SEMILLA)
+    total = 0
+    for c in range(carpetas):
+        for s in range(subcarpetas):
+            ruta = os.path.join(raiz, f"{PALABRAS[c % len(PALABRAS)]}_{c}", f"sub_{s}")
+            os.makedirs(ruta, exist_ok=True)
+            for a in range(archivos_por_carpeta):
+                with open(os.path.join(ruta, f"archivo_{a}.bin"), 'wb') as archivo:
+                    archivo.truncate(azar.randrange(1, 50 * 1024 * 1024))
+                total += 1
+    return total
@@ -0,0 +1,304 @@
+"""
+Benchmarks de los endpoints y procesos pesados del backend.
+
+Crea una base de datos temporal (como los tests) con el motor configurado en
+settings, la llena con datos sintéticos, mide cada escenario y guarda el
+resultado como JSON en benchmarks/resultados/ para comparar entre commits.
+
+    python -m benchmarks.run --escala chica
+    python -m benchmarks.run --escala mediana --solo discos
+    python -m benchmarks.run --comparar resultados/base.json resultados/nuevo.json
+
+Cada escenario se ejecuta una vez de calentamiento (en la que además se cuentan
+las consultas SQL) y luego `--repeticiones` veces; se informan mínimo, mediana,
+media, p95 y máximo en milisegundos. Las importaciones se ejecutan dentro de una
+transacción que se revierte, para que todas las repeticiones partan del mismo estado.
+Un escenario que falla queda registrado como {'error': ...} y la corrida sigue con
+los demás; el proceso termina con código 1 si alguno falló.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestor_areas_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+from benchmarks import generadores  # noqa: E402
+from discos.models import ContenidoDisco, Disco  # noqa: E402
+from discos.utils import import_discos  # noqa: E402
+from inventario.models import Dispositivo, Movimiento  # noqa: E402
+from inventario.utils import import_inventory  # noqa: E402
+from mantenimiento.models import Mantenimiento  # noqa: E402
+
+DIRECTORIO_RESULTADOS = Path(__file__).resolve().parent / 'resultados'
+
+ESCALAS = {
+    'chica': {
+        'discos': 200, 'contenidos': 50,
+        'dispositivos': 1000, 'movimientos': 5, 'mantenimientos': 5,
+        'importar_discos': 50, 'importar_contenidos': 20, 'importar_dispositivos': 1000,
+        'carpetas': 10, 'subcarpetas': 5, 'archivos': 20,
+    },
+    'mediana': {
+        'discos': 2000, 'contenidos': 200,
+        'dispositivos': 20000, 'movimientos': 5, 'mantenimientos': 5,
+        'importar_discos': 200, 'importar_contenidos': 100, 'importar_dispositivos': 10000,
+        'carpetas': 30, 'subcarpetas': 10, 'archivos': 50,
+    },
+}
+
+
+class _Contador:
+    def __init__(self):
+        self.consultas = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.consultas += 1
+        return execute(sql, params, many, context)
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """
+    Ejecuta `funcion` una vez de calentamiento y `repeticiones` veces medidas.
+    `preparar` se llama antes de cada ejecución, fuera de la medición.
+    """
+    if preparar:
+        preparar()
+    contador = _Contador()
+    with connection.execute_wrapper(contador):
+        funcion()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        'repeticiones': repeticiones,
+        'consultas': contador.consultas,
+        'min_ms': round(tiempos[0], 3),
+        'mediana_ms': round(statistics.median(tiempos), 3),
+        'media_ms': round(statistics.fmean(tiempos), 3),
+        'p95_ms': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 3),
+        'max_ms': round(tiempos[-1], 3),
+    }
+
+
+def _get(client, url):
+    def funcion():
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url}: {response.status_code} {response.content[:300]!r}")
+    return funcion
+
+
+def _revertido(funcion):
+    def envoltura():
+        with transaction.atomic():
+            resultado = funcion()
+            transaction.set_rollback(True)
+        if resultado.get('errors'):
+            raise RuntimeError(f"Importación con errores: {resultado['errors'][:3]}")
+    return envoltura
+
+
+def _importacion(importar, archivo):
+    def funcion():
+        archivo.seek(0)
+        return importar(archivo)
+    return _revertido(funcion)
+
+
+def escenarios(escala, arbol):
+    """
+    Escenarios por grupo: (grupo, nombre, funcion, preparar).
+    """
+    client = Client()
+    disco = Disco.objects.order_by('pk').first()
+    dispositivo = Dispositivo.objects.order_by('pk').first()
+
+    yield 'discos', 'discos_listado', _get(client, '/api/discos/'), None
+    yield 'discos', 'discos_filtro_nombre_tipo', _get(client, '/api/discos/?nombre=disco&tipo=SSD'), None
+    yield 'discos', 'discos_filtro_contenido', _get(client, '/api/discos/?contenido_nombre=backup'), None
+    yield 'discos', 'discos_espacio_libre', _get(client, '/api/discos/?espacio_libre_min=100&espacio_libre_max=1000'), None
+    yield 'discos', 'discos_detalle', _get(client, f'/api/discos/{disco.pk}/'), None
+    yield 'discos', 'discos_contenidos', _get(client, f'/api/discos/{disco.pk}/contenidos/'), None
+    yield 'discos', 'discos_busqueda', _get(client, '/api/discos/search/?q=informe'), None
+    yield 'discos', 'discos_busqueda_sin_aciertos', _get(client, '/api/discos/search/?q=zzzz'), None
+
+    # En frío se limpia la caché antes de cada ejecución; en caliente se reutiliza
+    yield 'dashboard', 'dashboard_stats_frio', _get(client, '/api/dashboard/stats/'), cache.clear
+    yield 'dashboard', 'dashboard_stats_caliente', _get(client, '/api/dashboard/stats/'), None
+
+    yield 'inventario', 'dispositivos_listado', _get(client, '/api/inventario/dispositivos/'), None
+    yield 'inventario', 'dispositivos_busqueda', _get(client, '/api/inventario/dispositivos/?search=oficina'), None
+    yield 'inventario', 'dispositivos_historial', _get(client, f'/api/inventario/dispositivos/{dispositivo.pk}/historial/'), None
+    yield 'inventario', 'movimientos_listado', _get(client, '/api/inventario/movimientos/'), None
+    yield 'inventario', 'mantenimientos_listado', _get(client, '/api/mantenimiento/mantenimientos/'), None
+
+    archivo_discos = generadores.excel_discos(escala['importar_discos'], escala['importar_contenidos'])
+    archivo_inventario = generadores.excel_inventario(escala['importar_dispositivos'])
+    yield 'importacion', 'importar_discos', _importacion(import_discos, archivo_discos), None
+    yield 'importacion', 'importar_inventario', _importacion(import_inventory, archivo_inventario), None
+
+    yield 'escaneo', 'escaneo_arbol', _get(client, f'/api/discos/scan/?path={arbol}'), None
+
+
+def sembrar(escala, arbol):
+    inicio = time.perf_counter()
+    generadores.generar_discos(escala['discos'], escala['contenidos'])
+    generadores.generar_inventario(escala['dispositivos'], escala['movimientos'], escala['mantenimientos'])
+    archivos = generadores.generar_arbol(arbol, escala['carpetas'], escala['subcarpetas'], escala['archivos'])
+    if connection.vendor in ('postgresql', 'sqlite'):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    return {
+        'segundos': round(time.perf_counter() - inicio, 2),
+        'discos': Disco.objects.count(),
+        'contenidos': ContenidoDisco.objects.count(),
+        'dispositivos': Dispositivo.objects.count(),
+        'movimientos': Movimiento.objects.count(),
+        'mantenimientos': Mantenimiento.objects.count(),
+        'archivos_arbol': archivos,
+    }
+
+
+def _commit_git():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(nombre_escala, escala, repeticiones, grupos):
+    trabajo = tempfile.mkdtemp(prefix='benchmark_')
+    arbol = os.path.join(trabajo, 'arbol')
+    setup_test_environment(debug=False)
+    # La base temporal se crea como en los tests; en SQLite se usa un archivo para
+    # que las mediciones incluyan la E/S real
+    if connection.vendor == 'sqlite':
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = os.path.join(trabajo, 'benchmark.sqlite3')
+    nombre_original = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    # Los eventos INFO (ej: escaneo.completado) se omiten para no mezclarlos con el reporte
+    logging.disable(logging.INFO)
+    try:
+        print(f"Sembrando datos ({nombre_escala})...", file=sys.stderr)
+        datos = sembrar(escala, arbol)
+        print(f"  {datos}", file=sys.stderr)
+
+        resultados = {}
+        for grupo, nombre, funcion, preparar in escenarios(escala, arbol):
+            if grupos and grupo not in grupos:
+                continue
+            try:
+                r = resultados[nombre] = medir(funcion, repeticiones, preparar)
+            except Exception as e:
+                resultados[nombre] = {'error': f"{type(e).__name__}: {e}"}
+                print(f"  {nombre:<32} ERROR {resultados[nombre]['error']}", file=sys.stderr)
+                continue
+            print(f"  {nombre:<32} mediana {r['mediana_ms']:>10.2f} ms  p95 {r['p95_ms']:>10.2f} ms  {r['consultas']:>5} consultas", file=sys.stderr)
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+        logging.disable(logging.NOTSET)
+        teardown_test_environment()
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': _commit_git(),
+        'motor': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'escala': nombre_escala,
+        'parametros': escala,
+        'datos': datos,
+        'resultados': resultados,
+    }
+
+
+def _mediana(resultado):
+    if not resultado:
+        return '-'
+    return 'error' if 'error' in resultado else resultado['mediana_ms']
+
+
+def comparar(base, nuevo):
+    """
+    Imprime la variación de la mediana de cada escenario entre dos corridas.
+    """
+    base = json.loads(Path(base).read_text(encoding='utf-8'))
+    nuevo = json.loads(Path(nuevo).read_text(encoding='utf-8'))
+    print(f"{'escenario':<32} {base.get('commit') or 'base':>12} {nuevo.get('commit') or 'nuevo':>12}   variación  consultas")
+    for nombre in sorted(set(base['resultados']) | set(nuevo['resultados'])):
+        a = base['resultados'].get(nombre)
+        b = nuevo['resultados'].get(nombre)
+        if not a or not b or 'error' in a or 'error' in b:
+            print(f"{nombre:<32} {_mediana(a):>12} {_mediana(b):>12}")
+            continue
+        variacion = (b['mediana_ms'] / a['mediana_ms'] - 1) * 100 if a['mediana_ms'] else 0.0
+        print(f"{nombre:<32} {a['mediana_ms']:>12.2f} {b['mediana_ms']:>12.2f} {variacion:>+10.1f}%  {a['consultas']:>4} → {b['consultas']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='chica')
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--solo', action='append', choices=['discos', 'dashboard', 'inventario', 'importacion', 'escaneo'],
+                        help="Grupo de escenarios a ejecutar (se puede repetir).")
+    parser.add_argument('--param', action='append', default=[], metavar='CLAVE=VALOR',
+                        help="Sobrescribe un parámetro de la escala (ej: --param discos=5000).")
+    parser.add_argument('--salida', help="Archivo JSON de salida (por defecto benchmarks/resultados/<fecha>_<commit>.json).")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVO'), help="Compara dos resultados y termina.")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    escala = dict(ESCALAS[args.escala])
+    for param in args.param:
+        clave, _, valor = param.partition('=')
+        if clave not in escala:
+            parser.error(f"Parámetro desconocido: {clave}")
+        escala[clave] = int(valor)
+
+    resultado = ejecutar(args.escala, escala, args.repeticiones, args.solo)
+
+    salida = Path(args.salida) if args.salida else (
+        DIRECTORIO_RESULTADOS / f"{time.strftime('%Y%m%dT%H%M%S')}_{resultado['commit'] or 'sin_commit'}_{args.escala}.json"
+    )
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(salida)
+    fallidos = [nombre for nombre, r in resultado['resultados'].items() if 'error' in r]
+    if fallidos:
+        print(f"Escenarios con error: {', '.join(fallidos)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
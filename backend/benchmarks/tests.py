@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+# Escala mínima: solo se comprueba que todos los escenarios siguen funcionando
+ESCALA_MINIMA = {
+    'discos': 5, 'contenidos': 3,
+    'dispositivos': 10, 'movimientos': 1, 'mantenimientos': 1,
+    'importar_discos': 3, 'importar_contenidos': 2, 'importar_dispositivos': 5,
+    'carpetas': 2, 'subcarpetas': 1, 'archivos': 2,
+}
+
+
+class BenchmarksTests(SimpleTestCase):
+    """
+    Corrida completa de benchmarks.run a escala mínima, en un proceso aparte porque
+    crea y destruye su propia base temporal.
+    """
+
+    def test_corrida_minima(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            salida = Path(directorio) / 'resultado.json'
+            parametros = [argumento for clave, valor in ESCALA_MINIMA.items() for argumento in ('--param', f'{clave}={valor}')]
+            proceso = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.run', '--repeticiones', '1', '--salida', str(salida), *parametros],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=300,
+            )
+            self.assertEqual(proceso.returncode, 0, proceso.stderr)
+            resultado = json.loads(salida.read_text(encoding='utf-8'))
+
+        self.assertEqual(resultado['datos']['discos'], 5)
+        self.assertIn('escaneo_arbol', resultado['resultados'])
+        for nombre, medicion in resultado['resultados'].items():
+            self.assertNotIn('error', medicion, nombre)
+            self.assertEqual(medicion['repeticiones'], 1)
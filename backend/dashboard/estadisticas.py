@@ -0,0 +1,92 @@
+"""
+Estadísticas del dashboard con caché.
+
+Cada app aporta una sola consulta agregada y el resultado se guarda en la caché
+junto con su ETag. Los cambios en discos, dispositivos y mantenimientos (señales
+de modelo y señales de las escrituras masivas) invalidan la caché avanzando un
+número de generación, de modo que un cálculo que estaba en curso durante la
+invalidación queda guardado bajo una generación vieja y nunca se vuelve a leer.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Q, Window
+
+from discos.models import Disco
+from inventario.models import Dispositivo
+from mantenimiento.models import Mantenimiento
+
+CLAVE_GENERACION = 'dashboard:generacion'
+CLAVE_ESTADISTICAS = 'dashboard:estadisticas:{}'
+
+
+def calcular_estadisticas():
+    # Discos
+    discos = Disco.objects.aggregate(total=Count('pk'))
+
+    # Inventario: total y conteo por estado en una sola pasada
+    inventario = Dispositivo.objects.aggregate(
+        total=Count('pk'),
+        **{estado: Count('pk', filter=Q(estado=estado)) for estado, _ in Dispositivo.ESTADOS}
+    )
+    total_dispositivos = inventario.pop('total')
+
+    # Mantenimiento: los próximos pendientes traen el total de pendientes en cada fila
+    proximos = list(
+        Mantenimiento.objects
+        .filter(estado='PENDIENTE')
+        .select_related('dispositivo')
+        .only('id', 'fecha_programada', 'tipo', 'prioridad', 'dispositivo__codigo_inventario', 'dispositivo__marca')
+        .annotate(pendientes=Window(Count('pk')))
+        .order_by('fecha_programada')[:5]
+    )
+
+    return {
+        'discos': {
+            'total': discos['total']
+        },
+        'inventario': {
+            'total': total_dispositivos,
+            'estados': {estado: cantidad for estado, cantidad in inventario.items() if cantidad}
+        },
+        'mantenimiento': {
+            'pendientes': proximos[0].pendientes if proximos else 0,
+            'proximos': [{
+                'id': m.id,
+                'equipo': f"{m.dispositivo.codigo_inventario} - {m.dispositivo.marca}",
+                'fecha': m.fecha_programada,
+                'tipo': m.tipo,
+                'prioridad': m.prioridad
+            } for m in proximos],
+        }
+    }
+
+
+def obtener_estadisticas():
+    """
+    Retorna (datos, etag) desde la caché, calculándolos si la generación actual no los tiene.
+    """
+    clave = CLAVE_ESTADISTICAS.format(cache.get_or_set(CLAVE_GENERACION, 0, None))
+    cacheado = cache.get(clave)
+    if cacheado is None:
+        datos = calcular_estadisticas()
+        contenido = json.dumps(datos, cls=DjangoJSONEncoder, sort_keys=True)
+        cacheado = {'datos': datos, 'etag': f'"{hashlib.md5(contenido.encode()).hexdigest()}"'}
+        cache.set(clave, cacheado, settings.DASHBOARD_CACHE_TIMEOUT)
+    return cacheado['datos'], cacheado['etag']
+
+
+def _avanzar_generacion():
+    try:
+        cache.incr(CLAVE_GENERACION)
+    except ValueError:
+        cache.set(CLAVE_GENERACION, 1, None)
+
+
+def invalidar_estadisticas(**kwargs):
+    # Se invalida al confirmar la transacción, para no recalcular con datos aún no visibles
+    transaction.on_commit(_avanzar_generacion)
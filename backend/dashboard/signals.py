@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from discos.models import Disco
+from discos.signals import discos_actualizados
+from inventario.models import Dispositivo
+from inventario.signals import dispositivos_actualizados
+from mantenimiento.models import Mantenimiento
+from mantenimiento.signals import mantenimientos_programados
+
+from .estadisticas import invalidar_estadisticas
+
+
+@receiver(post_save, sender=Disco)
+@receiver(post_delete, sender=Disco)
+@receiver(post_save, sender=Dispositivo)
+@receiver(post_delete, sender=Dispositivo)
+@receiver(post_save, sender=Mantenimiento)
+@receiver(post_delete, sender=Mantenimiento)
+@receiver(discos_actualizados)
+@receiver(dispositivos_actualizados)
+@receiver(mantenimientos_programados)
+def invalidar_dashboard(sender, **kwargs):
+    invalidar_estadisticas()
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from discos.models import Disco
+from discos.signals import discos_actualizados
+
+
+class EstadisticasCacheTests(TestCase):
+    """
+    Las estadísticas se sirven desde la caché con ETag: el cliente que ya tiene la
+    versión actual recibe 304 sin recalcular, y las escrituras confirmadas la invalidan.
+    """
+
+    url = '/api/dashboard/stats/'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.disco = Disco.objects.create(nombre="Backup", tamanio_gb=Decimal('500.00'))
+
+    def consultar(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(self.url, **headers)
+
+    def test_etag_y_304(self):
+        response = self.consultar()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['discos']['total'], 1)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        # La versión vigente sale de la caché: ni se recalcula ni se envía el cuerpo
+        with self.assertNumQueries(0):
+            response = self.consultar(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        with self.assertNumQueries(0):
+            response = self.consultar('"otra-version"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_escrituras_invalidan_la_cache(self):
+        etag = self.consultar()['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Disco.objects.create(nombre="Archivo", tamanio_gb=Decimal('100.00'))
+        response = self.consultar(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['discos']['total'], 2)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+
+        # Las escrituras masivas se notifican con su propia señal
+        with self.captureOnCommitCallbacks(execute=True):
+            Disco.objects.bulk_create([Disco(nombre="Masivo", tamanio_gb=Decimal('100.00'))])
+            discos_actualizados.send(sender=Disco, discos_ids=[])
+        response = self.consultar(etag)
+        self.assertEqual((response.status_code, response.json()['discos']['total']), (200, 3))
+        etag = response['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.disco.delete()
+        self.assertEqual(self.consultar(etag).json()['discos']['total'], 2)
+
+    def test_sin_confirmar_no_invalida(self):
+        etag = self.consultar()['ETag']
+        # Hasta que la transacción se confirma se sigue sirviendo la versión anterior
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Disco.objects.create(nombre="Pendiente", tamanio_gb=Decimal('100.00'))
+            self.assertEqual(self.consultar(etag).status_code, 304)
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.consultar(etag).status_code, 200)
@@ -1,44 +1,21 @@
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from discos.models import Disco
-from inventario.models import Dispositivo
-from mantenimiento.models import Mantenimiento
-from django.db.models import Count, Sum
+
+from .estadisticas import obtener_estadisticas
+
+
+def _etag_estadisticas(request):
+    return obtener_estadisticas()[1]
+
 
 @api_view(['GET'])
+@condition(etag_func=_etag_estadisticas)
 def dashboard_stats(request):
-    # Discos
-    discos_count = Disco.objects.count()
-    
-    # Inventario
-    dispositivos_total = Dispositivo.objects.count()
-    dispositivos_por_estado = Dispositivo.objects.values('estado').annotate(count=Count('estado'))
-    
-    # Mantenimiento
-    mantenimientos_pendientes = Mantenimiento.objects.filter(estado='PENDIENTE').count()
-    mantenimientos_proximos = Mantenimiento.objects.filter(estado='PENDIENTE').order_by('fecha_programada')[:5]
-    
-    # Serialize pending maintenance simply
-    proximos_data = [{
-        'id': m.id,
-        'equipo': f"{m.dispositivo.codigo_inventario} - {m.dispositivo.marca}",
-        'fecha': m.fecha_programada,
-        'tipo': m.tipo,
-        'prioridad': m.prioridad
-    } for m in mantenimientos_proximos]
-
-    data = {
-        'discos': {
-            'total': discos_count
-        },
-        'inventario': {
-            'total': dispositivos_total,
-            'estados': {item['estado']: item['count'] for item in dispositivos_por_estado}
-        },
-        'mantenimiento': {
-            'pendientes': mantenimientos_pendientes,
-            'proximos': proximos_data,
-        }
-    }
-    
-    return Response(data)
+    # Si el cliente ya tiene la versión actual, `condition` responde 304 sin llegar aquí
+    data, _ = obtener_estadisticas()
+    response = Response(data)
+    # El navegador guarda la respuesta pero la revalida (If-None-Match) en cada consulta
+    patch_cache_control(response, no_cache=True, private=True)
+    return response
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DiscosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'discos'
+
+    def ready(self):
+        import discos.signals
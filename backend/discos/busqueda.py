@@ -0,0 +1,175 @@
+"""
+Búsqueda de texto sobre discos (nombre y descripción) y sus contenidos (nombre).
+
+- PostgreSQL: índices trigram (pg_trgm) sobre UPPER(campo), que aceleran los
+  `icontains` que genera el ORM.
+- SQLite: tabla FTS5 `discos_busqueda` con tokenizador trigram, mantenida por
+  triggers (ver migraciones 0005_indices_busqueda y 0008_triggers_busqueda_contenidos).
+
+El índice entrega a lo sumo CANDIDATOS coincidencias (las más recientes) y el
+orden por relevancia se calcula sobre ellas; ordenar todas las coincidencias de
+un término frecuente costaría un recorrido completo. Con menos de LARGO_MINIMO
+caracteres ningún índice trigram aplica, por eso la API exige ese largo mínimo
+y el filtro de contenidos recurre a icontains.
+"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from .models import Disco, ContenidoDisco
+
+LARGO_MINIMO = 3
+LIMITE_POR_DEFECTO = 20
+LIMITE_MAXIMO = 100
+CANDIDATOS = 2000
+
+
+def _consulta_fts(texto):
+    # Frase entre comillas: el tokenizador trigram la busca como subcadena
+    return '"' + texto.replace('"', '""') + '"'
+
+
+def resaltar(valor, texto):
+    """
+    Escapa `valor` y marca con <mark> cada aparición de `texto` (sin distinguir mayúsculas).
+    """
+    if not valor:
+        return ''
+    minusculas = valor.lower()
+    buscado = texto.lower()
+    partes = []
+    inicio = 0
+    posicion = minusculas.find(buscado)
+    while posicion != -1:
+        fin = posicion + len(buscado)
+        partes.append(escape(valor[inicio:posicion]))
+        partes.append(f'<mark>{escape(valor[posicion:fin])}</mark>')
+        inicio = fin
+        posicion = minusculas.find(buscado, inicio)
+    partes.append(escape(valor[inicio:]))
+    return ''.join(partes)
+
+
+def filtro_contenidos(texto):
+    """
+    Q sobre Disco que selecciona los discos con algún contenido cuyo nombre contiene `texto`.
+    Se resuelve como subconsulta (sin join ni DISTINCT) apoyada en el índice de búsqueda.
+    """
+    if connection.vendor == 'sqlite' and len(texto) >= LARGO_MINIMO:
+        return Q(pk__in=RawSQL(
+            'SELECT disco_id FROM discos_busqueda WHERE discos_busqueda MATCH %s AND rowid %% 2 = 0',
+            [f'nombre : {_consulta_fts(texto)}'],
+        ))
+    return Q(pk__in=ContenidoDisco.objects.filter(nombre__icontains=texto).values('disco_id'))
+
+
+def puntuar(texto, valor):
+    """
+    Relevancia de una coincidencia: cuánto del valor cubre el texto buscado, con
+    bonificación si coincide completo, al inicio o al inicio de una palabra.
+    """
+    if not valor:
+        return 0.0
+    minusculas = valor.lower()
+    buscado = texto.lower()
+    posicion = minusculas.find(buscado)
+    if posicion == -1:
+        return 0.0
+    puntaje = len(buscado) / len(minusculas)
+    if minusculas == buscado:
+        puntaje += 1.0
+    elif posicion == 0:
+        puntaje += 0.5
+    elif not minusculas[posicion - 1].isalnum():
+        puntaje += 0.25
+    return puntaje
+
+
+def buscar(texto, limite=LIMITE_POR_DEFECTO):
+    """
+    Retorna hasta `limite` coincidencias ordenadas por relevancia, cada una con el disco,
+    el contenido (si la coincidencia es un contenido) y los campos resaltados.
+    """
+    if connection.vendor == 'sqlite':
+        candidatos = _candidatos_sqlite(texto)
+    else:
+        candidatos = _candidatos_orm(texto)
+
+    # La descripción pesa la mitad que el nombre
+    puntuados = sorted(
+        (
+            (max(puntuar(texto, nombre), puntuar(texto, descripcion) / 2), tipo, objeto_id, disco_id)
+            for tipo, objeto_id, disco_id, nombre, descripcion in candidatos
+        ),
+        key=lambda fila: fila[0],
+        reverse=True,
+    )[:limite]
+
+    discos_ids = {disco_id for _, _, _, disco_id in puntuados}
+    contenidos_ids = {objeto_id for _, tipo, objeto_id, _ in puntuados if tipo == 'contenido'}
+    discos = Disco.objects.only('id', 'nombre', 'descripcion').in_bulk(discos_ids)
+    contenidos = ContenidoDisco.objects.only('id', 'disco_id', 'nombre', 'fecha_modificacion', 'peso_gb').in_bulk(contenidos_ids)
+
+    resultados = []
+    for puntaje, tipo, objeto_id, disco_id in puntuados:
+        disco = discos.get(disco_id)
+        if disco is None:
+            continue
+        resultado = {
+            'tipo': tipo,
+            'puntaje': round(puntaje, 4),
+            'disco': {'id': disco.id, 'nombre': disco.nombre},
+            'contenido': None,
+            'resaltado': {},
+        }
+        if tipo == 'contenido':
+            contenido = contenidos.get(objeto_id)
+            if contenido is None:
+                continue
+            resultado['contenido'] = {
+                'id': contenido.id,
+                'nombre': contenido.nombre,
+                'fecha_modificacion': contenido.fecha_modificacion,
+                'peso_gb': contenido.peso_gb,
+            }
+            resultado['resaltado']['nombre'] = resaltar(contenido.nombre, texto)
+        else:
+            for campo in ('nombre', 'descripcion'):
+                if texto.lower() in getattr(disco, campo).lower():
+                    resultado['resaltado'][campo] = resaltar(getattr(disco, campo), texto)
+        resultados.append(resultado)
+    return resultados
+
+
+def _candidatos_sqlite(texto):
+    # rowid par = contenido, impar = disco (ver migración 0005_indices_busqueda)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT rowid, disco_id, nombre, descripcion FROM discos_busqueda '
+            'WHERE discos_busqueda MATCH %s ORDER BY rowid DESC LIMIT %s',
+            [_consulta_fts(texto), CANDIDATOS],
+        )
+        return [
+            ('disco' if rowid % 2 else 'contenido', rowid // 2, disco_id, nombre, descripcion)
+            for rowid, disco_id, nombre, descripcion in cursor.fetchall()
+        ]
+
+
+def _candidatos_orm(texto):
+    # En PostgreSQL los icontains se resuelven con los índices trigram sobre UPPER(campo)
+    contenidos = (
+        ContenidoDisco.objects
+        .filter(nombre__icontains=texto)
+        .order_by()
+        .values_list('pk', 'disco_id', 'nombre')[:CANDIDATOS]
+    )
+    discos = (
+        Disco.objects
+        .filter(Q(nombre__icontains=texto) | Q(descripcion__icontains=texto))
+        .order_by()
+        .values_list('pk', 'nombre', 'descripcion')[:CANDIDATOS]
+    )
+    candidatos = [('contenido', pk, disco_id, nombre, '') for pk, disco_id, nombre in contenidos]
+    candidatos += [('disco', pk, pk, nombre, descripcion) for pk, nombre, descripcion in discos]
+    return candidatos
@@ -0,0 +1,316 @@
+"""
+Catálogo de archivos por disco.
+
+Cada disco indexado tiene un archivo SQLite propio (CATALOGOS_ROOT/disco_<id>.sqlite3)
+con una fila por archivo: ruta relativa, tamaño, fecha de modificación y hash
+opcional, más las carpetas de primer nivel (así las vacías también se registran,
+igual que en el escaneo de la API). El catálogo queda fuera de la base principal porque un disco de backup
+puede tener millones de archivos que no se consultan desde la API.
+
+Un reindexado vuelca el escaneo en una tabla temporal y la compara contra el
+catálogo con joins sobre la clave primaria; solo se escriben los archivos
+agregados, eliminados o modificados. A partir de esas diferencias se recalculan
+únicamente las entradas de primer nivel afectadas y se sincronizan con
+ContenidoDisco, de modo que un disco que cambió un 1% toca cerca del 1% de las filas.
+
+El hash es lo más costoso de un reindexado: con `tiempo_max` o `max_hashes` se
+calcula hasta agotar el límite y el resto queda pendiente (hash NULL) para el
+siguiente reindexado, que continúa donde quedó este.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from gestor_areas_project.excel import en_lotes
+
+from .models import Disco, ContenidoDisco
+from .scanner import BYTES_POR_GB, Recorrido
+from .signals import discos_actualizados
+
+# Filas del escaneo que se insertan juntas en la tabla temporal
+TAMANIO_LOTE_CATALOGO = 5000
+# Archivos hasheados entre cada control de los límites de tiempo y cantidad
+TAMANIO_LOTE_HASH = 256
+
+ESQUEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS archivos (
+        ruta TEXT PRIMARY KEY,
+        tamanio INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        hash TEXT
+    ) WITHOUT ROWID
+    """,
+    'CREATE TABLE IF NOT EXISTS carpetas (nombre TEXT PRIMARY KEY, mtime REAL NOT NULL) WITHOUT ROWID',
+]
+
+# Primer segmento de la ruta: nombre de la entrada de primer nivel que se registra como ContenidoDisco
+PRIMER_NIVEL = "CASE WHEN instr(ruta, '/') > 0 THEN substr(ruta, 1, instr(ruta, '/') - 1) ELSE ruta END"
+
+
+def ruta_catalogo(disco_id):
+    return os.path.join(settings.CATALOGOS_ROOT, f'disco_{disco_id}.sqlite3')
+
+
+def abrir_catalogo(disco_id):
+    os.makedirs(settings.CATALOGOS_ROOT, exist_ok=True)
+    conexion = sqlite3.connect(ruta_catalogo(disco_id))
+    conexion.execute('PRAGMA journal_mode=WAL')
+    conexion.execute('PRAGMA synchronous=NORMAL')
+    for sentencia in ESQUEMA:
+        conexion.execute(sentencia)
+    return conexion
+
+
+def eliminar_catalogo(disco_id):
+    ruta = ruta_catalogo(disco_id)
+    for archivo in (ruta, f'{ruta}-wal', f'{ruta}-shm'):
+        try:
+            os.remove(archivo)
+        except FileNotFoundError:
+            pass
+
+
+def _filas_escaneo(recorrido, carpetas):
+    """
+    Archivos del recorrido como filas del catálogo; las carpetas de primer nivel se
+    agregan a `carpetas` como (nombre, mtime).
+    """
+    for carpeta in recorrido:
+        if not carpeta.relativa:
+            carpetas.extend(carpeta.subcarpetas)
+        for nombre, tamanio, mtime in carpeta.archivos:
+            yield carpeta.ruta_de(nombre), tamanio, mtime
+
+
+def _hash_archivo(ruta):
+    with open(ruta, 'rb') as archivo:
+        return hashlib.file_digest(archivo, 'sha256').hexdigest()
+
+
+def _hash_o_nada(ruta):
+    try:
+        return _hash_archivo(ruta)
+    except OSError:
+        return None
+
+
+def _calcular_hashes(conexion, ruta, workers, limite_tiempo=None, max_hashes=None):
+    """
+    Calcula en paralelo el hash de los archivos que no lo tienen (nuevos, modificados
+    o indexados antes sin hash), hasta `limite_tiempo` (time.monotonic) o `max_hashes`
+    archivos. Los archivos que no estaban entre los cambios se registran como tipo 'H'
+    para recalcular la huella de su entrada de primer nivel.
+    Retorna la cantidad de archivos hasheados.
+    """
+    hasheados = 0
+    consulta = 'SELECT ruta FROM archivos WHERE hash IS NULL ORDER BY ruta'
+    pendientes = [fila[0] for fila in (
+        conexion.execute(f'{consulta} LIMIT ?', [max_hashes]) if max_hashes else conexion.execute(consulta)
+    )]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hash') as executor:
+        for lote in en_lotes(pendientes, TAMANIO_LOTE_HASH):
+            if limite_tiempo is not None and time.monotonic() >= limite_tiempo:
+                break
+            hashes = executor.map(_hash_o_nada, [os.path.join(ruta, relativa) for relativa in lote])
+            calculados = [(valor, relativa) for valor, relativa in zip(hashes, lote) if valor is not None]
+            conexion.executemany('UPDATE archivos SET hash = ? WHERE ruta = ?', calculados)
+            conexion.executemany(
+                "INSERT OR IGNORE INTO cambios VALUES (?, 'H')", [(relativa,) for _, relativa in calculados]
+            )
+            hasheados += len(calculados)
+    return hasheados
+
+
+def _huella(conexion, nombre):
+    """
+    Hash de una entrada de primer nivel a partir de las rutas y hashes de sus archivos,
+    o '' si alguno no tiene hash. Las rutas son relativas a la entrada, de modo que la
+    misma carpeta en discos distintos produce la misma huella.
+    """
+    huella = hashlib.sha256()
+    filas = conexion.execute(
+        "SELECT ruta, hash FROM archivos WHERE ruta = ?1 OR (ruta > ?1 || '/' AND ruta < ?1 || '0') ORDER BY ruta",
+        [nombre],
+    )
+    for relativa, valor in filas:
+        if valor is None:
+            return ''
+        huella.update(f"{relativa[len(nombre):]}\0{valor}\n".encode())
+    return huella.hexdigest()
+
+
+def indexar_disco(disco, ruta, calcular_hash=False, max_archivos=None, tiempo_max=None, workers=8, max_hashes=None):
+    """
+    Escanea `ruta` (el punto de montaje del disco), actualiza su catálogo y sincroniza
+    los ContenidoDisco de primer nivel afectados. Retorna un resumen de los cambios.
+    Con `calcular_hash` se calcula en paralelo el hash de los archivos pendientes y la
+    huella de cada entrada de primer nivel (ContenidoDisco.hash_contenido).
+
+    `tiempo_max` limita todo el reindexado (escaneo y hash) y `max_hashes` la cantidad
+    de archivos hasheados; lo que queda sin hash se informa en `hash_pendientes`.
+
+    Si el escaneo se trunca por algún límite no se eliminan archivos del catálogo,
+    ya que los que faltan pueden simplemente no haberse recorrido.
+    """
+    limite_tiempo = time.monotonic() + tiempo_max if tiempo_max else None
+    recorrido = Recorrido(ruta, max_archivos=max_archivos, tiempo_max=tiempo_max, workers=workers)
+    carpetas = []
+
+    with closing(abrir_catalogo(disco.pk)) as conexion:
+        conexion.execute(
+            'CREATE TEMP TABLE escaneo (ruta TEXT PRIMARY KEY, tamanio INTEGER NOT NULL, mtime REAL NOT NULL) WITHOUT ROWID'
+        )
+        conexion.execute('CREATE TEMP TABLE escaneo_carpetas (nombre TEXT PRIMARY KEY, mtime REAL NOT NULL) WITHOUT ROWID')
+        conexion.execute('CREATE TEMP TABLE cambios (ruta TEXT PRIMARY KEY, tipo TEXT NOT NULL) WITHOUT ROWID')
+        for lote in en_lotes(_filas_escaneo(recorrido, carpetas), TAMANIO_LOTE_CATALOGO):
+            conexion.executemany('INSERT INTO escaneo VALUES (?, ?, ?)', lote)
+        conexion.executemany('INSERT INTO escaneo_carpetas VALUES (?, ?)', carpetas)
+
+        # Diferencias: A = agregado, M = modificado, R = eliminado, H = solo se calculó su hash,
+        # C = carpeta de primer nivel nueva, modificada o eliminada
+        conexion.execute("""
+            INSERT INTO cambios
+            SELECT e.ruta, CASE WHEN a.ruta IS NULL THEN 'A' ELSE 'M' END
+            FROM escaneo e LEFT JOIN archivos a ON a.ruta = e.ruta
+            WHERE a.ruta IS NULL OR a.tamanio != e.tamanio OR a.mtime != e.mtime
+        """)
+        conexion.execute("""
+            INSERT OR IGNORE INTO cambios
+            SELECT e.nombre, 'C' FROM escaneo_carpetas e LEFT JOIN carpetas c ON c.nombre = e.nombre
+            WHERE c.nombre IS NULL OR c.mtime != e.mtime
+        """)
+        if not recorrido.truncado:
+            conexion.execute("""
+                INSERT INTO cambios
+                SELECT a.ruta, 'R' FROM archivos a
+                WHERE NOT EXISTS (SELECT 1 FROM escaneo e WHERE e.ruta = a.ruta)
+            """)
+            conexion.execute("""
+                INSERT OR IGNORE INTO cambios
+                SELECT c.nombre, 'C' FROM carpetas c
+                WHERE NOT EXISTS (SELECT 1 FROM escaneo_carpetas e WHERE e.nombre = c.nombre)
+            """)
+            conexion.execute('DELETE FROM carpetas WHERE nombre NOT IN (SELECT nombre FROM escaneo_carpetas)')
+        conexion.execute('INSERT OR REPLACE INTO carpetas SELECT nombre, mtime FROM escaneo_carpetas')
+
+        conexion.execute("DELETE FROM archivos WHERE ruta IN (SELECT ruta FROM cambios WHERE tipo = 'R')")
+        conexion.execute("""
+            INSERT OR REPLACE INTO archivos (ruta, tamanio, mtime, hash)
+            SELECT e.ruta, e.tamanio, e.mtime, NULL
+            FROM cambios c JOIN escaneo e ON e.ruta = c.ruta
+            WHERE c.tipo IN ('A', 'M')
+        """)
+
+        hasheados = _calcular_hashes(conexion, ruta, workers, limite_tiempo, max_hashes) if calcular_hash else 0
+        hash_pendientes = conexion.execute('SELECT COUNT(*) FROM archivos WHERE hash IS NULL').fetchone()[0] if calcular_hash else None
+
+        resumen = dict(conexion.execute('SELECT tipo, COUNT(*) FROM cambios GROUP BY tipo').fetchall())
+        afectadas = [fila[0] for fila in conexion.execute(f'SELECT DISTINCT {PRIMER_NIVEL} FROM cambios')]
+        totales = _totales_primer_nivel(conexion, afectadas)
+
+        try:
+            with transaction.atomic():
+                contenidos = _sincronizar_contenidos(disco, afectadas, totales)
+        except Exception:
+            conexion.rollback()
+            raise
+        conexion.commit()
+
+        total_catalogo = conexion.execute('SELECT COUNT(*) FROM archivos').fetchone()[0]
+
+    return {
+        'archivos_escaneados': recorrido.archivos,
+        'truncado': recorrido.truncado,
+        'agregados': resumen.get('A', 0),
+        'modificados': resumen.get('M', 0),
+        'eliminados': resumen.get('R', 0),
+        'hasheados': hasheados,
+        'hash_pendientes': hash_pendientes,
+        'archivos_catalogo': total_catalogo,
+        'contenidos_actualizados': contenidos,
+    }
+
+
+def _totales_primer_nivel(conexion, nombres):
+    """
+    Suma bytes, fecha más reciente y huella por entrada de primer nivel, recorriendo
+    solo el rango de la clave primaria de cada una ('nombre' y 'nombre/...'). Como en
+    escanear_directorio, la fecha de una carpeta incluye la de la propia carpeta y las
+    carpetas vacías se registran con 0 bytes.
+    """
+    totales = {}
+    for lote in en_lotes(nombres, 500):
+        conexion.execute('CREATE TEMP TABLE IF NOT EXISTS primer_nivel (nombre TEXT PRIMARY KEY) WITHOUT ROWID')
+        conexion.execute('DELETE FROM primer_nivel')
+        conexion.executemany('INSERT INTO primer_nivel VALUES (?)', [(nombre,) for nombre in lote])
+        filas = conexion.execute("""
+            SELECT nombre, SUM(tamanio), MAX(mtime), COUNT(*) = COUNT(hash) FROM (
+                SELECT p.nombre, a.tamanio, a.mtime, a.hash
+                FROM primer_nivel p JOIN archivos a ON a.ruta = p.nombre
+                UNION ALL
+                SELECT p.nombre, a.tamanio, a.mtime, a.hash
+                FROM primer_nivel p JOIN archivos a ON a.ruta > p.nombre || '/' AND a.ruta < p.nombre || '0'
+            )
+            GROUP BY nombre
+        """).fetchall()
+        carpetas = dict(conexion.execute('SELECT c.nombre, c.mtime FROM primer_nivel p JOIN carpetas c ON c.nombre = p.nombre'))
+        for nombre, total, mtime, completo in filas:
+            mtime = max(mtime, carpetas.pop(nombre, mtime))
+            totales[nombre] = (total, mtime, _huella(conexion, nombre) if completo else '')
+        for nombre, mtime in carpetas.items():
+            totales[nombre] = (0, mtime, '')
+    return totales
+
+
+def _sincronizar_contenidos(disco, nombres, totales):
+    """
+    Crea, actualiza o elimina los ContenidoDisco de las entradas de primer nivel
+    indicadas según los totales del catálogo. Las entradas cargadas a mano con otros
+    nombres no se tocan. Retorna la cantidad de filas escritas.
+    """
+    escritos = 0
+    for lote in en_lotes(nombres, 500):
+        existentes = {c.nombre: c for c in ContenidoDisco.objects.filter(disco=disco, nombre__in=lote)}
+        nuevos = []
+        modificados = []
+        eliminados = []
+
+        for nombre in lote:
+            contenido = existentes.get(nombre)
+            if nombre not in totales:
+                if contenido is not None:
+                    eliminados.append(contenido.pk)
+                continue
+
+            total, mtime, huella = totales[nombre]
+            valores = {
+                'peso_gb': (Decimal(total) / BYTES_POR_GB).quantize(Decimal('0.01')),
+                'fecha_modificacion': datetime.fromtimestamp(mtime).date(),
+                'hash_contenido': huella,
+            }
+            if contenido is None:
+                nuevos.append(ContenidoDisco(disco=disco, nombre=nombre[:255], **valores))
+            elif any(getattr(contenido, campo) != valor for campo, valor in valores.items()):
+                for campo, valor in valores.items():
+                    setattr(contenido, campo, valor)
+                modificados.append(contenido)
+
+        ContenidoDisco.objects.bulk_create(nuevos)
+        ContenidoDisco.objects.bulk_update(modificados, ['peso_gb', 'fecha_modificacion', 'hash_contenido'])
+        if eliminados:
+            ContenidoDisco.objects.filter(pk__in=eliminados).delete()
+        escritos += len(nuevos) + len(modificados) + len(eliminados)
+
+    if escritos:
+        Disco.objects.filter(pk=disco.pk).recalcular_uso()
+        discos_actualizados.send(sender=Disco, discos_ids=[disco.pk])
+    return escritos
@@ -0,0 +1,256 @@
+"""
+Detección de contenidos duplicados entre discos.
+
+Dos contenidos son candidatos a duplicado si comparten nombre normalizado
+(minúsculas, sin espacios al borde), peso y fecha de modificación; la búsqueda
+se apoya en el índice funcional `contenido_clave_dup_idx`. Cuando ambos tienen
+huella (hash_contenido, calculada desde el catálogo de archivos) la huella
+decide: huellas distintas no son duplicados.
+
+Los grupos se guardan en GrupoDuplicado y los GB recuperables por par de discos
+en ParDuplicado, así el reporte se pagina desde esas tablas sin releer los
+contenidos. Las señales de discos programan `actualizar_duplicados` con las
+claves (nombre, peso, fecha) que cambiaron en la transacción: solo se releen
+los contenidos de esas claves y los pares se ajustan con la diferencia. El
+comando `recalcular_duplicados` los reconstruye desde cero.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum, Value
+from django.db.models.functions import Lower, Trim
+
+from .models import Disco, ContenidoDisco, GrupoDuplicado, ParDuplicado
+
+# Claves por consulta al releer los contenidos
+TAMANIO_LOTE = 200
+
+
+def _con_clave(queryset):
+    return queryset.annotate(clave=Lower(Trim('nombre')))
+
+
+def _gemelos(**filtros):
+    """
+    Subconsulta de contenidos con la misma clave que el contenido externo, en otro disco.
+    """
+    return _con_clave(ContenidoDisco.objects.all()).filter(
+        clave=OuterRef('clave'),
+        peso_gb=OuterRef('peso_gb'),
+        fecha_modificacion=OuterRef('fecha_modificacion'),
+        **filtros,
+    ).exclude(disco_id=OuterRef('disco_id'))
+
+
+def _subgrupos(miembros):
+    """
+    Separa un grupo de candidatos por huella. Los contenidos sin huella se suman al
+    único subgrupo con huella si lo hay; si hay varios quedan en un subgrupo aparte.
+    Retorna tuplas (huella, miembros, verificado), con huella vacía para los sin huella.
+    """
+    por_huella = defaultdict(list)
+    sin_huella = []
+    for miembro in miembros:
+        if miembro['hash_contenido']:
+            por_huella[miembro['hash_contenido']].append(miembro)
+        else:
+            sin_huella.append(miembro)
+
+    if len(por_huella) == 1:
+        huella, grupo = por_huella.popitem()
+        return [(huella, grupo + sin_huella, not sin_huella)]
+    subgrupos = [(huella, grupo, True) for huella, grupo in por_huella.items()]
+    if sin_huella:
+        subgrupos.append(('', sin_huella, False))
+    return subgrupos
+
+
+def _armar_grupos(contenidos):
+    """
+    Grupos (en al menos dos discos distintos) de los contenidos anotados con `clave`,
+    indexados por (clave, peso, fecha, huella).
+    """
+    candidatos = defaultdict(list)
+    for fila in contenidos.order_by('id').values('id', 'disco_id', 'nombre', 'clave', 'peso_gb', 'fecha_modificacion', 'hash_contenido'):
+        candidatos[(fila['clave'], fila['peso_gb'], fila['fecha_modificacion'])].append(fila)
+
+    grupos = {}
+    for (clave, peso_gb, fecha), miembros in candidatos.items():
+        for huella, grupo, verificado in _subgrupos(miembros):
+            discos = sorted({miembro['disco_id'] for miembro in grupo})
+            if len(discos) < 2:
+                continue
+            grupos[(clave, peso_gb, fecha, huella)] = GrupoDuplicado(
+                clave=clave,
+                peso_gb=peso_gb,
+                fecha_modificacion=fecha,
+                huella=huella,
+                nombre=grupo[0]['nombre'],
+                verificado=verificado,
+                discos_ids=discos,
+                contenidos_ids=[miembro['id'] for miembro in grupo],
+                recuperable_gb=peso_gb * (len(discos) - 1),
+            )
+    return grupos
+
+
+def _clave_grupo(grupo):
+    return (grupo.clave, grupo.peso_gb, grupo.fecha_modificacion, grupo.huella)
+
+
+def _sumar_pares(variaciones, grupo, signo):
+    for par in combinations(grupo.discos_ids, 2):
+        variaciones[par][0] += signo * grupo.peso_gb
+        variaciones[par][1] += signo
+
+
+def _guardar_grupos(nuevos, existentes):
+    """
+    Reemplaza los grupos `existentes` (por clave) por los `nuevos` y ajusta los pares.
+    """
+    variaciones = defaultdict(lambda: [Decimal('0.00'), 0])
+    campos = ['nombre', 'verificado', 'discos_ids', 'contenidos_ids', 'recuperable_gb']
+    eliminados, modificados, creados = [], [], []
+
+    for clave, anterior in existentes.items():
+        if clave not in nuevos:
+            eliminados.append(anterior.pk)
+            _sumar_pares(variaciones, anterior, -1)
+    for clave, grupo in nuevos.items():
+        anterior = existentes.get(clave)
+        if anterior is None:
+            creados.append(grupo)
+        elif any(getattr(anterior, campo) != getattr(grupo, campo) for campo in campos):
+            grupo.pk = anterior.pk
+            modificados.append(grupo)
+            _sumar_pares(variaciones, anterior, -1)
+        else:
+            continue
+        _sumar_pares(variaciones, grupo, 1)
+
+    Relacion = GrupoDuplicado.discos.through
+    if eliminados:
+        GrupoDuplicado.objects.filter(pk__in=eliminados).delete()
+    if modificados:
+        GrupoDuplicado.objects.bulk_update(modificados, campos, batch_size=500)
+        Relacion.objects.filter(grupoduplicado_id__in=[grupo.pk for grupo in modificados]).delete()
+    if creados:
+        GrupoDuplicado.objects.bulk_create(creados, batch_size=500)
+    if modificados or creados:
+        # Los discos eliminados en la misma transacción ya no tienen relaciones ni pares
+        vigentes = set(Disco.objects.filter(
+            pk__in={disco for grupo in modificados + creados for disco in grupo.discos_ids}
+        ).values_list('pk', flat=True))
+        Relacion.objects.bulk_create(
+            [
+                Relacion(grupoduplicado_id=grupo.pk, disco_id=disco)
+                for grupo in modificados + creados for disco in grupo.discos_ids if disco in vigentes
+            ],
+            batch_size=1000,
+        )
+    _ajustar_pares(variaciones)
+
+
+def _ajustar_pares(variaciones):
+    variaciones = {par: valores for par, valores in variaciones.items() if valores[1] or valores[0]}
+    if not variaciones:
+        return
+    discos = {disco for par in variaciones for disco in par}
+    existentes = {
+        (par.disco_a_id, par.disco_b_id): par
+        for par in ParDuplicado.objects.filter(disco_a_id__in=discos, disco_b_id__in=discos)
+    }
+    vigentes = set(Disco.objects.filter(pk__in=discos).values_list('pk', flat=True))
+
+    nuevos = []
+    for (a, b), (gb, grupos) in variaciones.items():
+        if (a, b) in existentes:
+            ParDuplicado.objects.filter(disco_a_id=a, disco_b_id=b).update(
+                recuperable_gb=F('recuperable_gb') + gb,
+                grupos=F('grupos') + grupos,
+            )
+        elif grupos > 0 and a in vigentes and b in vigentes:
+            nuevos.append(ParDuplicado(disco_a_id=a, disco_b_id=b, recuperable_gb=gb, grupos=grupos))
+    ParDuplicado.objects.bulk_create(nuevos, batch_size=500)
+    ParDuplicado.objects.filter(disco_a_id__in=discos, disco_b_id__in=discos, grupos__lte=0).delete()
+
+
+def actualizar_duplicados(claves):
+    """
+    Recalcula los grupos de las claves (nombre, peso, fecha) indicadas; el nombre
+    se normaliza en la BD igual que en el índice. Lo programan las señales de discos.
+    """
+    claves = list(claves)
+    for inicio in range(0, len(claves), TAMANIO_LOTE):
+        filtro = Q()
+        for nombre, peso_gb, fecha in claves[inicio:inicio + TAMANIO_LOTE]:
+            filtro |= Q(clave=Lower(Trim(Value(nombre))), peso_gb=peso_gb, fecha_modificacion=fecha)
+        with transaction.atomic():
+            existentes = {
+                _clave_grupo(grupo): grupo
+                for grupo in GrupoDuplicado.objects.select_for_update().filter(filtro)
+            }
+            nuevos = _armar_grupos(_con_clave(ContenidoDisco.objects.order_by()).filter(filtro))
+            _guardar_grupos(nuevos, existentes)
+
+
+def claves_de_discos(discos_ids):
+    """
+    Claves a revisar tras una escritura masiva en `discos_ids`: las de sus contenidos
+    que coinciden con otro disco y las de los grupos que ya los incluyen.
+    """
+    claves = set(
+        _con_clave(ContenidoDisco.objects.order_by())
+        .filter(Exists(_gemelos()), disco_id__in=discos_ids)
+        .values_list('nombre', 'peso_gb', 'fecha_modificacion')
+    )
+    claves.update(
+        GrupoDuplicado.objects.filter(discos__in=discos_ids)
+        .values_list('clave', 'peso_gb', 'fecha_modificacion')
+    )
+    return claves
+
+
+def actualizar_duplicados_de_discos(discos_ids):
+    actualizar_duplicados(claves_de_discos(discos_ids))
+
+
+@transaction.atomic
+def reconstruir_duplicados():
+    """
+    Reconstruye desde cero los grupos y pares de duplicados. Retorna la cantidad de grupos.
+    """
+    GrupoDuplicado.objects.all().delete()
+    ParDuplicado.objects.all().delete()
+    nuevos = _armar_grupos(_con_clave(ContenidoDisco.objects.order_by()).filter(Exists(_gemelos())))
+    _guardar_grupos(nuevos, {})
+    return len(nuevos)
+
+
+def resumen_duplicados(grupos, discos_ids=None):
+    """
+    Total de grupos y GB recuperables de `grupos` y, por cada par de discos, los GB
+    recuperables eliminando la copia de uno de ellos. Con `discos_ids` solo se
+    reportan los pares que involucran a esos discos.
+    """
+    totales = grupos.order_by().aggregate(total_grupos=Count('pk'), total_recuperable_gb=Sum('recuperable_gb'))
+    pares = ParDuplicado.objects.select_related('disco_a', 'disco_b').only(
+        'recuperable_gb', 'grupos', 'disco_a__nombre', 'disco_b__nombre',
+    )
+    if discos_ids:
+        pares = pares.filter(Q(disco_a_id__in=discos_ids) | Q(disco_b_id__in=discos_ids))
+    return {
+        'total_grupos': totales['total_grupos'],
+        'total_recuperable_gb': totales['total_recuperable_gb'] or Decimal('0.00'),
+        'pares': [
+            {
+                'disco_a': {'id': par.disco_a_id, 'nombre': par.disco_a.nombre},
+                'disco_b': {'id': par.disco_b_id, 'nombre': par.disco_b.nombre},
+                'recuperable_gb': par.recuperable_gb,
+                'grupos': par.grupos,
+            }
+            for par in pares
+        ],
+    }
@@ -1,6 +1,12 @@
+from functools import reduce
+from operator import or_
+
 import django_filters
+from django.db.models import Q
+from rest_framework.filters import SearchFilter
+
+from .busqueda import filtro_contenidos
 from .models import Disco, ContenidoDisco
-from django.db.models import Sum, F # Import F for database expressions
 
 class DiscoFilter(django_filters.FilterSet):
     """
@@ -13,8 +19,7 @@ class DiscoFilter(django_filters.FilterSet):
 
     # Filtrar por nombre de contenido (de los ContenidoDisco relacionados)
     contenido_nombre = django_filters.CharFilter(
-        field_name='contenidos__nombre',
-        lookup_expr='icontains',
+        method='filtrar_contenido_nombre',
         help_text="Filtrar por nombre de contenido dentro del disco (contiene)."
     )
     # Filtrar por fecha de modificación de contenido (rango)
@@ -41,32 +46,28 @@ class DiscoFilter(django_filters.FilterSet):
         help_text="Filtrar discos con tamaño máximo en GB."
     )
 
-    # Filtros por espacio libre
+    # Filtros por espacio libre (columna generada e indexada Disco.espacio_libre_gb)
     espacio_libre_min = django_filters.NumberFilter(
-        method='filter_espacio_libre',
+        field_name='espacio_libre_gb',
         lookup_expr='gte',
         help_text="Filtrar discos con espacio libre mínimo en GB."
     )
     espacio_libre_max = django_filters.NumberFilter(
-        method='filter_espacio_libre',
+        field_name='espacio_libre_gb',
         lookup_expr='lte',
         help_text="Filtrar discos con espacio libre máximo en GB."
     )
 
-    def filter_espacio_libre(self, queryset, name, value):
-        # Anotar el queryset con el espacio usado y luego calcular el espacio libre
-        queryset = queryset.annotate(
-            espacio_usado=Sum('contenidos__peso_gb'),
-            espacio_libre=F('tamanio_gb') - F('espacio_usado')
-        ).filter(**{f'espacio_libre__{self.filters[name].lookup_expr}': value})
-        return queryset
-    
     # Filtro por estado
     estado = django_filters.CharFilter(
         lookup_expr='iexact',
         help_text="Filtrar por estado del disco (BUENO, EN_RIESGO, DANADO)."
     )
 
+    def filtrar_contenido_nombre(self, queryset, name, value):
+        # Subconsulta sobre el índice de búsqueda en lugar de un join con los contenidos
+        return queryset.filter(filtro_contenidos(value))
+
     class Meta:
         model = Disco
         fields = [
@@ -75,3 +76,20 @@ class DiscoFilter(django_filters.FilterSet):
             'tamanio_gb_min', 'tamanio_gb_max',
             'espacio_libre_min', 'espacio_libre_max'
         ]
+
+
+class DiscoSearchFilter(SearchFilter):
+    """
+    SearchFilter sobre los `search_fields` de la vista que además busca en los nombres
+    de los contenidos a través del índice de búsqueda (ver discos.busqueda), sin el
+    join ni el DISTINCT que genera buscar por 'contenidos__nombre'.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terminos = self.get_search_terms(request)
+        campos = self.get_search_fields(view, request) or []
+        for termino in terminos:
+            condiciones = [Q(**{f'{campo}__icontains': termino}) for campo in campos]
+            condiciones.append(filtro_contenidos(termino))
+            queryset = queryset.filter(reduce(or_, condiciones))
+        return queryset
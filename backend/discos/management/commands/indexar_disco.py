@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from discos.catalogo import indexar_disco
+from discos.models import Disco
+
+
+class Command(BaseCommand):
+    help = "Reescanea un disco montado contra su catálogo de archivos y sincroniza solo los contenidos que cambiaron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('disco', type=int, help="ID del disco a indexar.")
+        parser.add_argument('ruta', help="Ruta donde está montado el disco (ej: E:\\).")
+        parser.add_argument('--hash', action='store_true', help="Calcula el hash de los archivos nuevos o modificados.")
+        parser.add_argument('--workers', type=int, default=settings.ESCANEO_WORKERS, help="Hilos de escaneo.")
+
+    def handle(self, *args, **options):
+        try:
+            disco = Disco.objects.get(pk=options['disco'])
+        except Disco.DoesNotExist:
+            raise CommandError(f"No existe el disco {options['disco']}.")
+
+        # Desde la consola no se aplica el límite de tiempo de la API
+        resultado = indexar_disco(disco, options['ruta'], calcular_hash=options['hash'], workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Disco '{disco.nombre}': {resultado['archivos_escaneados']} archivos escaneados, "
+            f"{resultado['agregados']} agregados, {resultado['modificados']} modificados, "
+            f"{resultado['eliminados']} eliminados, {resultado['contenidos_actualizados']} contenidos actualizados."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from discos.duplicados import reconstruir_duplicados
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero los grupos de contenidos duplicados y los GB recuperables por par de discos."
+
+    def handle(self, *args, **options):
+        grupos = reconstruir_duplicados()
+        self.stdout.write(self.style.SUCCESS(f"Duplicados recalculados: {grupos} grupo(s)."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from discos.models import Disco
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero el espacio usado y la cantidad de contenidos persistidos en cada disco."
+
+    def add_arguments(self, parser):
+        parser.add_argument('discos', nargs='*', type=int, help="IDs de discos a recalcular (por defecto todos).")
+
+    def handle(self, *args, **options):
+        discos = Disco.objects.all()
+        if options['discos']:
+            discos = discos.filter(pk__in=options['discos'])
+        actualizados = discos.recalcular_uso()
+        self.stdout.write(self.style.SUCCESS(f"Agregados recalculados para {actualizados} disco(s)."))
@@ -0,0 +1,154 @@
+"""
+Migración de contenidos entre discos.
+
+- `planificar_consolidacion` calcula cómo evacuar un conjunto de discos hacia
+  otros con espacio, usando best-fit decreasing sobre Disco.espacio_libre_gb:
+  los contenidos se ubican de mayor a menor en el disco donde dejan menos
+  espacio sobrante.
+- `mover_contenidos` aplica un conjunto de reasignaciones en una sola
+  transacción, con los discos bloqueados y un UPDATE por disco destino.
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Disco, ContenidoDisco
+from .signals import discos_actualizados
+
+ESTADOS_A_EVACUAR = [Disco.EstadoDisco.EN_RIESGO, Disco.EstadoDisco.DANADO]
+
+
+class ConflictoMigracion(Exception):
+    """
+    La migración no se puede aplicar con el estado actual de los discos
+    (espacio insuficiente o contenidos que cambiaron de disco).
+    """
+
+
+def planificar_consolidacion(origenes, destinos=None, reserva_gb=Decimal('0.00')):
+    """
+    Arma un plan para mover todos los contenidos de los discos `origenes` a discos
+    en estado BUENO (o a `destinos` si se indican), dejando `reserva_gb` libres en cada uno.
+
+    Retorna un diccionario con los movimientos, el total por destino y los contenidos
+    que no entran en ningún disco.
+    """
+    origenes = set(origenes)
+    candidatos = Disco.objects.exclude(pk__in=origenes)
+    if destinos:
+        candidatos = candidatos.filter(pk__in=destinos)
+    else:
+        candidatos = candidatos.filter(estado=Disco.EstadoDisco.BUENO)
+
+    # Lista ordenada de (espacio libre, id) para ubicar cada contenido con bisect
+    libres = sorted(
+        (libre - reserva_gb, pk)
+        for pk, libre in candidatos.values_list('pk', 'espacio_libre_gb')
+        if libre - reserva_gb > 0
+    )
+    nombres = dict(Disco.objects.filter(pk__in=origenes | {pk for _, pk in libres}).values_list('pk', 'nombre'))
+
+    contenidos = (
+        ContenidoDisco.objects
+        .filter(disco_id__in=origenes)
+        .order_by('-peso_gb', 'pk')
+        .values_list('pk', 'nombre', 'disco_id', 'peso_gb')
+    )
+
+    movimientos = []
+    sin_ubicar = []
+    por_destino = defaultdict(lambda: {'cantidad': 0, 'peso_gb': Decimal('0.00')})
+    for pk, nombre, origen, peso_gb in contenidos:
+        # Best fit: el disco con menos espacio libre que igual alcance para el contenido
+        posicion = bisect_left(libres, (peso_gb, 0))
+        if posicion == len(libres):
+            sin_ubicar.append({'contenido_id': pk, 'nombre': nombre, 'peso_gb': peso_gb, 'origen': origen})
+            continue
+
+        libre, destino = libres.pop(posicion)
+        insort(libres, (libre - peso_gb, destino))
+        movimientos.append({
+            'contenido_id': pk,
+            'nombre': nombre,
+            'peso_gb': peso_gb,
+            'origen': origen,
+            'destino': destino,
+        })
+        por_destino[destino]['cantidad'] += 1
+        por_destino[destino]['peso_gb'] += peso_gb
+
+    return {
+        'movimientos': movimientos,
+        'por_destino': [
+            {'disco': {'id': destino, 'nombre': nombres.get(destino)}, **datos}
+            for destino, datos in sorted(por_destino.items(), key=lambda item: item[1]['peso_gb'], reverse=True)
+        ],
+        'sin_ubicar': sin_ubicar,
+        'total_gb': sum((movimiento['peso_gb'] for movimiento in movimientos), Decimal('0.00')),
+        'total_sin_ubicar_gb': sum((item['peso_gb'] for item in sin_ubicar), Decimal('0.00')),
+    }
+
+
+def mover_contenidos(asignaciones, origenes=None):
+    """
+    Reasigna contenidos a otros discos. `asignaciones` es {destino_id: [contenido_id, ...]}
+    y `origenes` (opcional) es {contenido_id: disco_id esperado}, para detectar contenidos
+    que otro proceso movió mientras tanto.
+
+    Todo ocurre en una transacción: se bloquean los discos involucrados (en orden de id
+    para evitar deadlocks), se verifica el espacio de cada destino con una agregación en
+    la BD y se hace un UPDATE por destino. Lanza ConflictoMigracion si algo no cuadra.
+    Retorna la cantidad de contenidos movidos.
+    """
+    ids = [pk for contenidos in asignaciones.values() for pk in contenidos]
+    if not ids:
+        return 0
+
+    with transaction.atomic():
+        actuales = dict(
+            ContenidoDisco.objects.select_for_update().filter(pk__in=ids).values_list('pk', 'disco_id')
+        )
+        faltantes = set(ids) - set(actuales)
+        if faltantes:
+            raise ConflictoMigracion(f"Contenidos inexistentes: {sorted(faltantes)}.")
+        if origenes:
+            movidos = [pk for pk, disco_id in origenes.items() if actuales.get(pk) != disco_id]
+            if movidos:
+                raise ConflictoMigracion(f"Los contenidos {sorted(movidos)} cambiaron de disco mientras se planificaba.")
+
+        discos_ids = set(asignaciones) | set(actuales.values())
+        discos = Disco.objects.select_for_update().filter(pk__in=discos_ids).order_by('pk').in_bulk()
+        inexistentes = set(asignaciones) - set(discos)
+        if inexistentes:
+            raise ConflictoMigracion(f"Discos destino inexistentes: {sorted(inexistentes)}.")
+
+        movidos = 0
+        for destino_id, contenidos in asignaciones.items():
+            a_mover = ContenidoDisco.objects.filter(pk__in=contenidos).exclude(disco_id=destino_id)
+            requerido = a_mover.aggregate(total=Sum('peso_gb'))['total'] or Decimal('0.00')
+            libre = discos[destino_id].espacio_libre_gb
+            if requerido > libre:
+                raise ConflictoMigracion(
+                    f"Espacio insuficiente en '{discos[destino_id].nombre}': "
+                    f"tiene {libre:.2f} GB libres y se requieren {requerido:.2f} GB."
+                )
+            movidos += a_mover.update(disco_id=destino_id)
+
+        Disco.objects.filter(pk__in=discos_ids).recalcular_uso()
+        discos_actualizados.send(sender=Disco, discos_ids=sorted(discos_ids))
+    return movidos
+
+
+def aplicar_plan(plan):
+    """
+    Aplica los movimientos de un plan de `planificar_consolidacion`.
+    """
+    asignaciones = defaultdict(list)
+    origenes = {}
+    for movimiento in plan['movimientos']:
+        asignaciones[movimiento['destino']].append(movimiento['contenido_id'])
+        origenes[movimiento['contenido_id']] = movimiento['origen']
+    return mover_contenidos(asignaciones, origenes)
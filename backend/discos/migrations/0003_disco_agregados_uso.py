@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-01-12 10:24
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def calcular_agregados(apps, schema_editor):
+    Disco = apps.get_model('discos', 'Disco')
+    ContenidoDisco = apps.get_model('discos', 'ContenidoDisco')
+    contenidos = ContenidoDisco.objects.filter(disco=OuterRef('pk')).order_by().values('disco')
+    Disco.objects.update(
+        espacio_usado_gb=Coalesce(
+            Subquery(contenidos.annotate(total=Sum('peso_gb')).values('total'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        contenidos_count=Coalesce(Subquery(contenidos.annotate(total=Count('pk')).values('total')), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discos', '0002_disco_estado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disco',
+            name='contenidos_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Cantidad de contenidos registrados en el disco.'),
+        ),
+        migrations.AddField(
+            model_name='disco',
+            name='espacio_usado_gb',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Suma del peso de los contenidos del disco en GB.', max_digits=12),
+        ),
+        migrations.RunPython(calcular_agregados, migrations.RunPython.noop),
+    ]
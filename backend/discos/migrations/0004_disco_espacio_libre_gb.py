@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-01-12 11:02
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discos', '0003_disco_agregados_uso'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disco',
+            name='espacio_libre_gb',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('tamanio_gb'), '-', models.F('espacio_usado_gb')), output_field=models.DecimalField(decimal_places=2, max_digits=12)),
+        ),
+    ]
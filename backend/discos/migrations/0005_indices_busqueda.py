@@ -0,0 +1,95 @@
+# Generated by Django 5.2.8 on 2026-01-14 09:37
+
+from django.db import migrations
+
+# PostgreSQL: índices trigram sobre las mismas expresiones que genera icontains (UPPER(campo) LIKE ...)
+POSTGRES_CREAR = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS discos_contenido_nombre_trgm ON discos_contenidodisco USING gin (UPPER(nombre) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS discos_disco_nombre_trgm ON discos_disco USING gin (UPPER(nombre) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS discos_disco_descripcion_trgm ON discos_disco USING gin (UPPER(descripcion) gin_trgm_ops)",
+]
+POSTGRES_ELIMINAR = [
+    "DROP INDEX IF EXISTS discos_contenido_nombre_trgm",
+    "DROP INDEX IF EXISTS discos_disco_nombre_trgm",
+    "DROP INDEX IF EXISTS discos_disco_descripcion_trgm",
+]
+
+# SQLite: tabla FTS5 con tokenizador trigram mantenida por triggers.
+# rowid = id * 2 para contenidos e id * 2 + 1 para discos, así cada fila se ubica por clave.
+SQLITE_CREAR = [
+    """
+    CREATE VIRTUAL TABLE discos_busqueda USING fts5(
+        disco_id UNINDEXED, nombre, descripcion, tokenize = 'trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_contenido_ai AFTER INSERT ON discos_contenidodisco BEGIN
+        INSERT INTO discos_busqueda (rowid, disco_id, nombre, descripcion) VALUES (new.id * 2, new.disco_id, new.nombre, '');
+    END
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_contenido_au AFTER UPDATE OF nombre, disco_id ON discos_contenidodisco BEGIN
+        UPDATE discos_busqueda SET disco_id = new.disco_id, nombre = new.nombre WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_contenido_ad AFTER DELETE ON discos_contenidodisco BEGIN
+        DELETE FROM discos_busqueda WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_disco_ai AFTER INSERT ON discos_disco BEGIN
+        INSERT INTO discos_busqueda (rowid, disco_id, nombre, descripcion) VALUES (new.id * 2 + 1, new.id, new.nombre, new.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_disco_au AFTER UPDATE OF nombre, descripcion ON discos_disco BEGIN
+        UPDATE discos_busqueda SET nombre = new.nombre, descripcion = new.descripcion WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_disco_ad AFTER DELETE ON discos_disco BEGIN
+        DELETE FROM discos_busqueda WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO discos_busqueda (rowid, disco_id, nombre, descripcion)
+    SELECT id * 2, disco_id, nombre, '' FROM discos_contenidodisco
+    UNION ALL
+    SELECT id * 2 + 1, id, nombre, descripcion FROM discos_disco
+    """,
+]
+SQLITE_ELIMINAR = [
+    "DROP TRIGGER IF EXISTS discos_busqueda_contenido_ai",
+    "DROP TRIGGER IF EXISTS discos_busqueda_contenido_au",
+    "DROP TRIGGER IF EXISTS discos_busqueda_contenido_ad",
+    "DROP TRIGGER IF EXISTS discos_busqueda_disco_ai",
+    "DROP TRIGGER IF EXISTS discos_busqueda_disco_au",
+    "DROP TRIGGER IF EXISTS discos_busqueda_disco_ad",
+    "DROP TABLE IF EXISTS discos_busqueda",
+]
+
+
+def _ejecutar(schema_editor, sentencias):
+    for sentencia in sentencias.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sentencia)
+
+
+def crear_indices(apps, schema_editor):
+    _ejecutar(schema_editor, {'postgresql': POSTGRES_CREAR, 'sqlite': SQLITE_CREAR})
+
+
+def eliminar_indices(apps, schema_editor):
+    _ejecutar(schema_editor, {'postgresql': POSTGRES_ELIMINAR, 'sqlite': SQLITE_ELIMINAR})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discos', '0004_disco_espacio_libre_gb'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
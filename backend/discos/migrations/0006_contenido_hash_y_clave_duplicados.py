@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-01-15 16:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discos', '0005_indices_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contenidodisco',
+            name='hash_contenido',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Huella SHA-256 del contenido calculada desde el catálogo de archivos (vacía si no se calculó).', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='contenidodisco',
+            index=models.Index(django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('nombre')), models.F('peso_gb'), models.F('fecha_modificacion'), name='contenido_clave_dup_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-01-29 16:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discos', '0006_contenido_hash_y_clave_duplicados'),
+    ]
+
+    # El índice compuesto se crea antes de quitar el índice propio de la FK
+    operations = [
+        migrations.AddIndex(
+            model_name='contenidodisco',
+            index=models.Index(fields=['disco', '-fecha_modificacion', '-id'], name='contenido_disco_fecha_idx'),
+        ),
+        migrations.AlterField(
+            model_name='contenidodisco',
+            name='disco',
+            field=models.ForeignKey(db_index=False, help_text='El disco al que pertenece este contenido.', on_delete=django.db.models.deletion.CASCADE, related_name='contenidos', to='discos.disco'),
+        ),
+    ]
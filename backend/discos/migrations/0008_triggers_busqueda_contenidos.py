@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-01-31 11:05
+
+from django.db import migrations
+
+# En SQLite, las migraciones 0006 y 0007 reconstruyen discos_contenidodisco (tabla nueva,
+# copia y renombre) y con eso se pierden los triggers de la tabla de búsqueda creados
+# en 0005. Se vuelven a crear y se resincronizan las filas de contenidos (rowid par).
+SQLITE_CREAR = [
+    "DROP TRIGGER IF EXISTS discos_busqueda_contenido_ai",
+    "DROP TRIGGER IF EXISTS discos_busqueda_contenido_au",
+    "DROP TRIGGER IF EXISTS discos_busqueda_contenido_ad",
+    """
+    CREATE TRIGGER discos_busqueda_contenido_ai AFTER INSERT ON discos_contenidodisco BEGIN
+        INSERT INTO discos_busqueda (rowid, disco_id, nombre, descripcion) VALUES (new.id * 2, new.disco_id, new.nombre, '');
+    END
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_contenido_au AFTER UPDATE OF nombre, disco_id ON discos_contenidodisco BEGIN
+        UPDATE discos_busqueda SET disco_id = new.disco_id, nombre = new.nombre WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER discos_busqueda_contenido_ad AFTER DELETE ON discos_contenidodisco BEGIN
+        DELETE FROM discos_busqueda WHERE rowid = old.id * 2;
+    END
+    """,
+    "DELETE FROM discos_busqueda WHERE rowid % 2 = 0",
+    """
+    INSERT INTO discos_busqueda (rowid, disco_id, nombre, descripcion)
+    SELECT id * 2, disco_id, nombre, '' FROM discos_contenidodisco
+    """,
+]
+
+
+def recrear_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sentencia in SQLITE_CREAR:
+            schema_editor.execute(sentencia)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discos', '0007_indice_contenidos_por_disco'),
+    ]
+
+    operations = [
+        migrations.RunPython(recrear_triggers, migrations.RunPython.noop),
+    ]
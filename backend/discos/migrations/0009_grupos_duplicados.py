@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-01-31 16:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discos', '0008_triggers_busqueda_contenidos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrupoDuplicado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(help_text='Nombre normalizado (minúsculas, sin espacios al borde).', max_length=255)),
+                ('peso_gb', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('fecha_modificacion', models.DateField()),
+                ('huella', models.CharField(blank=True, default='', help_text='Huella común del grupo (vacía si ningún contenido la tiene).', max_length=64)),
+                ('nombre', models.CharField(help_text='Nombre de uno de los contenidos, para mostrar.', max_length=255)),
+                ('verificado', models.BooleanField(default=False, help_text='Todos los contenidos tienen la misma huella.')),
+                ('discos_ids', models.JSONField(default=list)),
+                ('contenidos_ids', models.JSONField(default=list)),
+                ('recuperable_gb', models.DecimalField(decimal_places=2, help_text='GB liberados dejando una sola copia.', max_digits=12)),
+                ('discos', models.ManyToManyField(related_name='grupos_duplicados', to='discos.disco')),
+            ],
+            options={
+                'verbose_name': 'Grupo de Duplicados',
+                'verbose_name_plural': 'Grupos de Duplicados',
+                'ordering': ['-recuperable_gb', '-id'],
+                'indexes': [models.Index(fields=['-recuperable_gb', '-id'], name='duplicado_recuperable_idx')],
+                'constraints': [models.UniqueConstraint(fields=('clave', 'peso_gb', 'fecha_modificacion', 'huella'), name='grupo_duplicado_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ParDuplicado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recuperable_gb', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('grupos', models.PositiveIntegerField(default=0)),
+                ('disco_a', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='discos.disco')),
+                ('disco_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='discos.disco')),
+            ],
+            options={
+                'verbose_name': 'Par de Discos con Duplicados',
+                'verbose_name_plural': 'Pares de Discos con Duplicados',
+                'ordering': ['-recuperable_gb'],
+                'constraints': [models.UniqueConstraint(fields=('disco_a', 'disco_b'), name='par_duplicado_unico')],
+            },
+        ),
+    ]
@@ -1,4 +1,28 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Lower, Trim
+
+
+class DiscoQuerySet(models.QuerySet):
+    def recalcular_uso(self):
+        """
+        Recalcula los agregados persistidos (espacio usado y cantidad de contenidos)
+        de los discos del queryset con un único UPDATE basado en subconsultas.
+        """
+        contenidos = ContenidoDisco.objects.filter(disco=OuterRef('pk')).order_by().values('disco')
+        total_gb = contenidos.annotate(total=Sum('peso_gb')).values('total')
+        total_items = contenidos.annotate(total=Count('pk')).values('total')
+        return self.update(
+            espacio_usado_gb=Coalesce(
+                Subquery(total_gb, output_field=DecimalField(max_digits=12, decimal_places=2)),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            contenidos_count=Coalesce(Subquery(total_items), Value(0)),
+        )
+
 
 class Disco(models.Model):
     """
@@ -45,6 +69,42 @@ class Disco(models.Model):
         help_text="Estado físico/operativo del disco."
     )
 
+    # Agregados desnormalizados de los contenidos (ver discos.signals y recalcular_uso)
+    espacio_usado_gb = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        help_text="Suma del peso de los contenidos del disco en GB."
+    )
+    contenidos_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Cantidad de contenidos registrados en el disco."
+    )
+    # Columna generada e indexada para que los filtros por espacio libre sean escaneos de rango
+    espacio_libre_gb = models.GeneratedField(
+        expression=F('tamanio_gb') - F('espacio_usado_gb'),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+        db_index=True,
+    )
+
+    objects = DiscoQuerySet.as_manager()
+
+    # Columnas que mantienen las señales de los contenidos con UPDATE ... F()
+    CAMPOS_AGREGADOS = ('espacio_usado_gb', 'contenidos_count')
+
+    def save(self, *args, **kwargs):
+        # Un guardado completo de un disco existente (serializador, admin) no escribe los
+        # agregados: los valores en memoria pueden pisar incrementos ya confirmados
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and not campo.generated and campo.name not in self.CAMPOS_AGREGADOS
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.nombre
 
@@ -61,6 +121,8 @@ class ContenidoDisco(models.Model):
         Disco,
         on_delete=models.CASCADE,
         related_name='contenidos',
+        # Cubierto por contenido_disco_fecha_idx, que empieza por el disco
+        db_index=False,
         help_text="El disco al que pertenece este contenido."
     )
     nombre = models.CharField(
@@ -75,6 +137,30 @@ class ContenidoDisco(models.Model):
         decimal_places=2,
         help_text="Peso del contenido en Gigabytes (GB)."
     )
+    hash_contenido = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Huella SHA-256 del contenido calculada desde el catálogo de archivos (vacía si no se calculó)."
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Se recuerda el disco original para recalcular ambos discos si el contenido cambia de disco
+        instance._disco_id_cargado = instance.__dict__.get('disco_id')
+        # y la clave de duplicados original, para actualizar el grupo que deja (ver discos.duplicados)
+        instance._clave_cargada = instance.clave_duplicado()
+        return instance
+
+    def clave_duplicado(self):
+        """
+        (nombre, peso, fecha) que agrupa a los candidatos a duplicado; el nombre se
+        normaliza en la BD (ver discos.duplicados). None si algún campo no está cargado.
+        """
+        valores = tuple(self.__dict__.get(campo) for campo in ('nombre', 'peso_gb', 'fecha_modificacion'))
+        return None if None in valores else valores
 
     def __str__(self):
         return f"{self.nombre} (en {self.disco.nombre})"
@@ -82,4 +168,67 @@ class ContenidoDisco(models.Model):
     class Meta:
         verbose_name = "Contenido de Disco"
         verbose_name_plural = "Contenidos de Discos"
-        ordering = ['-fecha_modificacion']
\ No newline at end of file
+        ordering = ['-fecha_modificacion']
+        indexes = [
+            # Contenidos de un disco en el orden del listado anidado (fecha, pk)
+            models.Index(fields=['disco', '-fecha_modificacion', '-id'], name='contenido_disco_fecha_idx'),
+            # Clave de candidatos a duplicado (ver discos.duplicados)
+            models.Index(Lower(Trim('nombre')), F('peso_gb'), F('fecha_modificacion'), name='contenido_clave_dup_idx'),
+        ]
+
+
+class GrupoDuplicado(models.Model):
+    """
+    Contenidos duplicados en al menos dos discos: misma clave (nombre normalizado,
+    peso y fecha) y, si tienen, la misma huella. Lo mantiene discos.duplicados a
+    partir de las escrituras de contenidos.
+    """
+    clave = models.CharField(max_length=255, help_text="Nombre normalizado (minúsculas, sin espacios al borde).")
+    peso_gb = models.DecimalField(max_digits=7, decimal_places=2)
+    fecha_modificacion = models.DateField()
+    huella = models.CharField(max_length=64, blank=True, default='', help_text="Huella común del grupo (vacía si ningún contenido la tiene).")
+    nombre = models.CharField(max_length=255, help_text="Nombre de uno de los contenidos, para mostrar.")
+    verificado = models.BooleanField(default=False, help_text="Todos los contenidos tienen la misma huella.")
+    discos_ids = models.JSONField(default=list)
+    contenidos_ids = models.JSONField(default=list)
+    recuperable_gb = models.DecimalField(max_digits=12, decimal_places=2, help_text="GB liberados dejando una sola copia.")
+    # Para filtrar los grupos de uno o más discos
+    discos = models.ManyToManyField(Disco, related_name='grupos_duplicados')
+
+    def __str__(self):
+        return f"{self.nombre} ({len(self.discos_ids)} discos)"
+
+    class Meta:
+        verbose_name = "Grupo de Duplicados"
+        verbose_name_plural = "Grupos de Duplicados"
+        ordering = ['-recuperable_gb', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['clave', 'peso_gb', 'fecha_modificacion', 'huella'], name='grupo_duplicado_unico'),
+        ]
+        indexes = [
+            # Reporte paginado por GB recuperables
+            models.Index(fields=['-recuperable_gb', '-id'], name='duplicado_recuperable_idx'),
+        ]
+
+
+class ParDuplicado(models.Model):
+    """
+    GB recuperables entre dos discos (disco_a < disco_b) eliminando la copia de uno
+    de ellos, sumados sobre los grupos de duplicados que los incluyen a ambos.
+    """
+    disco_a = models.ForeignKey(Disco, on_delete=models.CASCADE, related_name='+', db_index=False)
+    disco_b = models.ForeignKey(Disco, on_delete=models.CASCADE, related_name='+')
+    recuperable_gb = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    grupos = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.disco_a_id} - {self.disco_b_id}: {self.recuperable_gb} GB"
+
+    class Meta:
+        verbose_name = "Par de Discos con Duplicados"
+        verbose_name_plural = "Pares de Discos con Duplicados"
+        ordering = ['-recuperable_gb']
+        constraints = [
+            # También resuelve las búsquedas por disco_a
+            models.UniqueConstraint(fields=['disco_a', 'disco_b'], name='par_duplicado_unico'),
+        ]
@@ -0,0 +1,181 @@
+"""
+Motor de escaneo de directorios para registrar el contenido de un disco.
+
+Cada carpeta se lee con `os.scandir`, reutilizando la información de `DirEntry`
+(en Windows el tamaño y la fecha vienen en el mismo listado, sin stat extra).
+Las carpetas se procesan en paralelo en un pool de hilos: cada tarea lee una
+sola carpeta y devuelve sus subcarpetas, que se encolan como tareas nuevas, de
+modo que un subárbol enorme no queda atado a un único hilo.
+
+`Recorrido` entrega las carpetas a medida que se leen (lo usa el catálogo de
+archivos) y `escanear_directorio` acumula los tamaños de abajo hacia arriba en
+cada entrada de primer nivel.
+
+Las carpetas en la profundidad máxima se leen pero no se desciende en ellas; el
+presupuesto de archivos y el tiempo máximo detienen todo el recorrido. En ambos
+casos el resultado se marca como truncado.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+
+BYTES_POR_GB = 1024 ** 3
+
+
+@dataclass
+class CarpetaLeida:
+    # Ruta relativa a la raíz del escaneo con separador '/', '' para la raíz
+    relativa: str
+    profundidad: int
+    # (nombre, tamaño en bytes, mtime) de cada archivo directo
+    archivos: list = field(default_factory=list)
+    # (nombre, mtime) de cada subcarpeta directa
+    subcarpetas: list = field(default_factory=list)
+
+    def ruta_de(self, nombre):
+        return f"{self.relativa}/{nombre}" if self.relativa else nombre
+
+
+@dataclass
+class EntradaEscaneada:
+    nombre: str
+    es_carpeta: bool
+    bytes: int = 0
+    mtime: float = 0.0
+
+    def como_contenido(self):
+        return {
+            "nombre": self.nombre,
+            "fecha_modificacion": datetime.fromtimestamp(self.mtime).strftime('%Y-%m-%d'),
+            "peso_gb": round(self.bytes / BYTES_POR_GB, 2),
+        }
+
+
+def ignorar(nombre):
+    # Archivos ocultos y de sistema (ej: $RECYCLE.BIN) no se registran como contenido
+    return nombre.startswith('.') or nombre.startswith('$')
+
+
+def _leer_carpeta(ruta, relativa, profundidad):
+    """
+    Lee una carpeta sin descender. Los errores de acceso (permisos, carpetas que
+    desaparecen durante el escaneo) dejan la carpeta vacía en lugar de abortar.
+    """
+    carpeta = CarpetaLeida(relativa, profundidad)
+    try:
+        with os.scandir(ruta) as entradas:
+            for entrada in entradas:
+                if profundidad == 1 and ignorar(entrada.name):
+                    continue
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        stat = entrada.stat(follow_symlinks=False)
+                        carpeta.subcarpetas.append((entrada.name, stat.st_mtime))
+                    elif entrada.is_file(follow_symlinks=False):
+                        stat = entrada.stat(follow_symlinks=False)
+                        carpeta.archivos.append((entrada.name, stat.st_size, stat.st_mtime))
+                except OSError:
+                    continue
+    except OSError:
+        if profundidad == 1:
+            raise
+    return carpeta
+
+
+class Recorrido:
+    """
+    Recorre `ruta` en paralelo y genera una `CarpetaLeida` por cada carpeta leída,
+    empezando por la raíz (profundidad 1). Al terminar de iterar, `archivos` y
+    `truncado` indican cuántos archivos se contabilizaron y si se cortó por algún límite
+    (`detenido` distingue el corte por presupuesto o tiempo del de profundidad).
+
+    - max_profundidad: niveles a recorrer (1 = solo la raíz).
+    - max_archivos: presupuesto de archivos a contabilizar.
+    - tiempo_max: segundos máximos de recorrido.
+    """
+
+    def __init__(self, ruta, max_profundidad=None, max_archivos=None, tiempo_max=None, workers=8):
+        self.ruta = ruta
+        self.max_profundidad = max_profundidad
+        self.max_archivos = max_archivos
+        self.tiempo_max = tiempo_max
+        self.workers = workers
+        self.archivos = 0
+        self.truncado = False
+        # Presupuesto de archivos o tiempo agotado: no se programan más carpetas
+        self.detenido = False
+
+    def __iter__(self):
+        limite_tiempo = time.monotonic() + self.tiempo_max if self.tiempo_max else None
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='escaneo') as executor:
+            en_curso = set()
+
+            def programar(carpeta):
+                # Solo se poda esta carpeta; las demás ramas siguen su propio límite
+                if self.max_profundidad is not None and carpeta.profundidad >= self.max_profundidad:
+                    if carpeta.subcarpetas:
+                        self.truncado = True
+                    return
+                for nombre, _ in carpeta.subcarpetas:
+                    relativa = carpeta.ruta_de(nombre)
+                    en_curso.add(executor.submit(
+                        _leer_carpeta, os.path.join(self.ruta, relativa), relativa, carpeta.profundidad + 1
+                    ))
+
+            raiz = _leer_carpeta(self.ruta, '', 1)
+            self.archivos += len(raiz.archivos)
+            programar(raiz)
+            yield raiz
+
+            while en_curso:
+                listos, _ = wait(en_curso, timeout=1.0, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    en_curso.discard(futuro)
+                    carpeta = futuro.result()
+                    self.archivos += len(carpeta.archivos)
+                    if not self.detenido:
+                        programar(carpeta)
+                    yield carpeta
+
+                presupuesto_agotado = self.max_archivos is not None and self.archivos >= self.max_archivos
+                tiempo_agotado = limite_tiempo is not None and time.monotonic() >= limite_tiempo
+                if presupuesto_agotado or tiempo_agotado:
+                    # No se programan más carpetas y se descarta lo que aún no empezó
+                    self.detenido = True
+                    self.truncado = True
+                    for futuro in list(en_curso):
+                        if futuro.cancel():
+                            en_curso.discard(futuro)
+
+
+def escanear_directorio(ruta, max_profundidad=None, max_archivos=None, tiempo_max=None, workers=8):
+    """
+    Escanea `ruta` y retorna un diccionario con los contenidos de primer nivel
+    (con el tamaño real de cada carpeta), la cantidad de archivos recorridos y
+    si el escaneo quedó truncado. `max_profundidad` cuenta los niveles debajo de
+    cada entrada de primer nivel además de la raíz.
+    """
+    recorrido = Recorrido(ruta, max_profundidad, max_archivos, tiempo_max, workers)
+    entradas = {}
+
+    for carpeta in recorrido:
+        if not carpeta.relativa:
+            for nombre, tamanio, mtime in carpeta.archivos:
+                entradas[nombre] = EntradaEscaneada(nombre, False, tamanio, mtime)
+            for nombre, mtime in carpeta.subcarpetas:
+                entradas[nombre] = EntradaEscaneada(nombre, True, mtime=mtime)
+            continue
+
+        item = entradas[carpeta.relativa.split('/', 1)[0]]
+        for _, tamanio, mtime in carpeta.archivos:
+            item.bytes += tamanio
+            item.mtime = max(item.mtime, mtime)
+
+    return {
+        "contenidos": [item.como_contenido() for item in entradas.values()],
+        "archivos_escaneados": recorrido.archivos,
+        "truncado": recorrido.truncado,
+    }
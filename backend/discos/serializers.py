@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Disco, ContenidoDisco
+from gestor_areas_project.serializers import CamposDinamicosMixin
+from .models import Disco, ContenidoDisco, GrupoDuplicado
+from .signals import discos_actualizados
 
 
 class ContenidoDiscoSerializer(serializers.ModelSerializer):
@@ -11,10 +13,23 @@ class ContenidoDiscoSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'fecha_modificacion', 'peso_gb']
 
 
-class DiscoSerializer(serializers.ModelSerializer):
+class GrupoDuplicadoSerializer(serializers.ModelSerializer):
+    """
+    Grupo de contenidos duplicados para el reporte de duplicados.
+    """
+    discos = serializers.ListField(source='discos_ids', read_only=True)
+    contenidos = serializers.ListField(source='contenidos_ids', read_only=True)
+
+    class Meta:
+        model = GrupoDuplicado
+        fields = ['id', 'nombre', 'peso_gb', 'fecha_modificacion', 'verificado', 'discos', 'contenidos', 'recuperable_gb']
+
+
+class DiscoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Disco.
     Maneja la creación y actualización de Discos con sus Contenidos anidados.
+    En los listados los contenidos solo se incluyen con ?expand=contenidos.
     """
     contenidos = ContenidoDiscoSerializer(many=True, required=False)
     espacio_usado = serializers.SerializerMethodField()
@@ -23,11 +38,13 @@ class DiscoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Disco
-        fields = ['id', 'nombre', 'tipo', 'tamanio_gb', 'descripcion', 'estado', 'contenidos', 'espacio_usado', 'espacio_libre', 'porcentaje_ocupado']
+        fields = ['id', 'nombre', 'tipo', 'tamanio_gb', 'descripcion', 'estado', 'contenidos', 'contenidos_count', 'espacio_usado', 'espacio_libre', 'porcentaje_ocupado']
+        read_only_fields = ['contenidos_count']
+        expandable_fields = ['contenidos']
 
     def get_espacio_usado(self, obj):
-        # Sumar el peso_gb de todos los contenidos asociados
-        return sum(contenido.peso_gb for contenido in obj.contenidos.all())
+        # Agregado persistido en el disco (ver Disco.espacio_usado_gb)
+        return obj.espacio_usado_gb
 
     def get_espacio_libre(self, obj):
         usado = self.get_espacio_usado(obj)
@@ -46,8 +63,13 @@ class DiscoSerializer(serializers.ModelSerializer):
         """
         contenidos_data = validated_data.pop('contenidos', [])
         disco = Disco.objects.create(**validated_data)
-        for contenido_data in contenidos_data:
-            ContenidoDisco.objects.create(disco=disco, **contenido_data)
+        if contenidos_data:
+            ContenidoDisco.objects.bulk_create(
+                ContenidoDisco(disco=disco, **contenido_data) for contenido_data in contenidos_data
+            )
+            Disco.objects.filter(pk=disco.pk).recalcular_uso()
+            discos_actualizados.send(sender=Disco, discos_ids=[disco.pk])
+            disco.refresh_from_db(fields=['espacio_usado_gb', 'contenidos_count'])
         return disco
 
     def update(self, instance, validated_data):
@@ -62,10 +84,47 @@ class DiscoSerializer(serializers.ModelSerializer):
         instance.estado = validated_data.get('estado', instance.estado)
         instance.save()
 
-        # Eliminar contenidos antiguos y crear los nuevos solo si se enviaron
+        # Solo se escriben los contenidos que cambiaron respecto a los enviados (comparando por nombre)
         if contenidos_data is not None:
-            instance.contenidos.all().delete()
-            for contenido_data in contenidos_data:
-                ContenidoDisco.objects.create(disco=instance, **contenido_data)
-        
-        return instance
\ No newline at end of file
+            if self._sincronizar_contenidos(instance, contenidos_data):
+                Disco.objects.filter(pk=instance.pk).recalcular_uso()
+                discos_actualizados.send(sender=Disco, discos_ids=[instance.pk])
+                instance.refresh_from_db(fields=['espacio_usado_gb', 'contenidos_count'])
+
+        return instance
+
+    def _sincronizar_contenidos(self, disco, contenidos_data):
+        """
+        Aplica la lista de contenidos enviada como diferencia contra la actual:
+        crea los nuevos, actualiza los modificados y elimina los que ya no están.
+        Retorna True si hubo cambios.
+        """
+        existentes = {}
+        for contenido in disco.contenidos.all():
+            existentes.setdefault(contenido.nombre, []).append(contenido)
+
+        nuevos = []
+        modificados = []
+        for contenido_data in contenidos_data:
+            candidatos = existentes.get(contenido_data['nombre'])
+            if not candidatos:
+                nuevos.append(ContenidoDisco(disco=disco, **contenido_data))
+                continue
+            contenido = candidatos.pop(0)
+            cambios = {campo: valor for campo, valor in contenido_data.items() if getattr(contenido, campo) != valor}
+            if cambios:
+                for campo, valor in cambios.items():
+                    setattr(contenido, campo, valor)
+                # La huella del catálogo deja de corresponder a un contenido editado a mano
+                contenido.hash_contenido = ''
+                modificados.append(contenido)
+
+        eliminados = [contenido.pk for candidatos in existentes.values() for contenido in candidatos]
+
+        if eliminados:
+            ContenidoDisco.objects.filter(pk__in=eliminados).delete()
+        if modificados:
+            ContenidoDisco.objects.bulk_update(modificados, ['fecha_modificacion', 'peso_gb', 'hash_contenido'])
+        if nuevos:
+            ContenidoDisco.objects.bulk_create(nuevos)
+        return bool(nuevos or modificados or eliminados)
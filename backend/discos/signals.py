@@ -0,0 +1,83 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import Signal, receiver
+
+from gestor_areas_project.recalculos import programar
+
+from .models import Disco, ContenidoDisco
+
+# Escrituras masivas de discos o contenidos (bulk_create/update) que no disparan
+# post_save/post_delete. Argumentos: discos_ids.
+discos_actualizados = Signal()
+
+@receiver(post_save, sender=ContenidoDisco)
+def actualizar_uso_al_guardar(sender, instance, created, **kwargs):
+    if created:
+        # Alta simple: se ajustan los agregados sin volver a sumar los contenidos
+        Disco.objects.filter(pk=instance.disco_id).update(
+            espacio_usado_gb=F('espacio_usado_gb') + instance.peso_gb,
+            contenidos_count=F('contenidos_count') + 1,
+        )
+        return
+
+    # En una edición el peso o el disco pudieron cambiar, se recalculan los discos afectados
+    discos_ids = {instance.disco_id, getattr(instance, '_disco_id_cargado', None)} - {None}
+    Disco.objects.filter(pk__in=discos_ids).recalcular_uso()
+    instance._disco_id_cargado = instance.disco_id
+
+@receiver(post_delete, sender=ContenidoDisco)
+def actualizar_uso_al_eliminar(sender, instance, origin=None, **kwargs):
+    # Si el borrado viene en cascada desde el propio disco (instancia o queryset) no hay nada que actualizar
+    if isinstance(origin, Disco) or getattr(origin, 'model', None) is Disco:
+        return
+    Disco.objects.filter(pk=instance.disco_id).update(
+        espacio_usado_gb=F('espacio_usado_gb') - instance.peso_gb,
+        contenidos_count=F('contenidos_count') - 1,
+    )
+
+
+@receiver(post_save, sender=ContenidoDisco)
+def actualizar_duplicados_al_guardar(sender, instance, **kwargs):
+    from .duplicados import actualizar_duplicados
+
+    # Se revisan el grupo al que entra y, si cambió la clave, el que deja
+    claves = {instance.clave_duplicado(), getattr(instance, '_clave_cargada', None)} - {None}
+    programar(actualizar_duplicados, claves)
+    instance._clave_cargada = instance.clave_duplicado()
+
+
+@receiver(post_delete, sender=ContenidoDisco)
+def actualizar_duplicados_al_eliminar(sender, instance, origin=None, **kwargs):
+    from .duplicados import actualizar_duplicados
+
+    # Los borrados en cascada desde el disco se cubren con los grupos del disco (ver abajo)
+    if isinstance(origin, Disco) or getattr(origin, 'model', None) is Disco:
+        return
+    clave = instance.clave_duplicado() or getattr(instance, '_clave_cargada', None)
+    if clave is not None:
+        programar(actualizar_duplicados, {clave})
+
+
+@receiver(pre_delete, sender=Disco)
+def actualizar_duplicados_al_eliminar_disco(sender, instance, **kwargs):
+    from .duplicados import actualizar_duplicados
+
+    # Antes del borrado, mientras el disco sigue relacionado con sus grupos
+    claves = set(instance.grupos_duplicados.values_list('clave', 'peso_gb', 'fecha_modificacion'))
+    if claves:
+        programar(actualizar_duplicados, claves)
+
+
+@receiver(discos_actualizados)
+def actualizar_duplicados_de_discos(sender, discos_ids, **kwargs):
+    from .duplicados import actualizar_duplicados_de_discos
+
+    programar(actualizar_duplicados_de_discos, discos_ids)
+
+
+@receiver(post_delete, sender=Disco)
+def eliminar_catalogo_del_disco(sender, instance, **kwargs):
+    from .catalogo import eliminar_catalogo
+
+    # El catálogo de archivos vive fuera de la BD, se borra junto con el disco
+    eliminar_catalogo(instance.pk)
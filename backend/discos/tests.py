@@ -1,3 +1,779 @@
-from django.test import TestCase
+import json
+import logging
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from gestor_areas_project.logs import ColaLogHandler
+from gestor_areas_project.pruebas import PlanesConsultaMixin, analizar_tablas
+from importaciones.models import TrabajoImportacion
+from importaciones.worker import ejecutar
+
+from .busqueda import buscar
+from .catalogo import indexar_disco
+from .duplicados import reconstruir_duplicados
+from .filters import DiscoFilter
+from .migracion import ConflictoMigracion, aplicar_plan, mover_contenidos, planificar_consolidacion
+from .models import Disco, ContenidoDisco, GrupoDuplicado, ParDuplicado
+from .scanner import Recorrido, escanear_directorio
+from .signals import discos_actualizados
+from .utils import import_discos
+
+
+class FiltroEspacioLibreTests(TestCase):
+    """
+    El filtro por espacio libre debe resolverse sobre la columna indexada
+    Disco.espacio_libre_gb, sin joins ni agregaciones sobre los contenidos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(20):
+            disco = Disco.objects.create(nombre=f"Disco {i:02d}", tamanio_gb=Decimal('100.00'))
+            ContenidoDisco.objects.bulk_create(
+                ContenidoDisco(disco=disco, nombre=f"Carpeta {j}", fecha_modificacion='2024-01-01', peso_gb=Decimal(i))
+                for j in range(5)
+            )
+        Disco.objects.recalcular_uso()
+
+    def filtrar(self, **params):
+        return DiscoFilter(data=params, queryset=Disco.objects.all()).qs
+
+    def test_rango_min_max(self):
+        # Espacio libre = 100 - 5*i, el rango [40, 70] corresponde a i = 6..12
+        with self.assertNumQueries(1):
+            nombres = list(self.filtrar(espacio_libre_min=40, espacio_libre_max=70).values_list('nombre', flat=True))
+        self.assertEqual(nombres, [f"Disco {i:02d}" for i in range(6, 13)])
+
+    def test_incluye_discos_sin_contenidos(self):
+        Disco.objects.create(nombre="Vacío", tamanio_gb=Decimal('500.00'))
+        self.assertEqual(list(self.filtrar(espacio_libre_min=450).values_list('nombre', flat=True)), ["Vacío"])
+
+    def test_sin_join_ni_agregacion(self):
+        sql = str(self.filtrar(espacio_libre_min=40, espacio_libre_max=70).query).upper()
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('GROUP BY', sql)
+        self.assertIn('ESPACIO_LIBRE_GB', sql)
+
+    def test_plan_usa_indice(self):
+        queryset = self.filtrar(espacio_libre_min=40, espacio_libre_max=70).order_by()
+        if connection.vendor == 'postgresql':
+            # Con tablas pequeñas el planificador prefiere un seq scan, se desactiva para ver el plan indexado
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest("Plan de consulta verificado solo en PostgreSQL y SQLite.")
+        plan = queryset.explain()
+        self.assertIn('espacio_libre_gb', plan)
+
+
+class ExportacionTests(TestCase):
+    """
+    La exportación se envía en streaming y el Excel resultante se puede volver a importar.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            disco = Disco.objects.create(nombre=f"Backup {i}", tamanio_gb=Decimal('500.00'), descripcion=f"Respaldo {i}")
+            ContenidoDisco.objects.bulk_create(
+                ContenidoDisco(disco=disco, nombre=f"Carpeta {j}", fecha_modificacion='2024-06-30', peso_gb=Decimal('8.20'))
+                for j in range(4)
+            )
+        Disco.objects.recalcular_uso()
+
+    def foto(self):
+        return (
+            sorted(Disco.objects.values_list('nombre', 'tipo', 'tamanio_gb', 'descripcion', 'estado', 'espacio_usado_gb')),
+            sorted(ContenidoDisco.objects.values_list('disco__nombre', 'nombre', 'fecha_modificacion', 'peso_gb')),
+        )
+
+    def test_excel_ida_y_vuelta(self):
+        esperado = self.foto()
+        response = self.client.get('/api/discos/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        archivo = BytesIO(b''.join(response.streaming_content))
+
+        Disco.objects.all().delete()
+        resultado = import_discos(archivo)
+        self.assertEqual(resultado['errors'], [])
+        self.assertEqual(self.foto(), esperado)
+
+    def test_csv_en_streaming_respeta_filtros(self):
+        response = self.client.get('/api/discos/export/', {'formato': 'csv', 'hoja': 'contenidos', 'nombre': 'Backup 1'})
+        self.assertEqual(response.status_code, 200)
+        lineas = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lineas[0], 'disco_nombre,nombre,fecha_modificacion,peso_gb')
+        self.assertEqual(len(lineas), 5)
+        self.assertTrue(all(linea.startswith('Backup 1,') for linea in lineas[1:]))
+
+    def test_formato_invalido(self):
+        self.assertEqual(self.client.get('/api/discos/export/', {'formato': 'pdf'}).status_code, 400)
+
+
+class LogsImportacionTests(TestCase):
+    """
+    Las importaciones registran un evento de resumen con sus contadores, y los
+    eventos se escriben como JSON desde el hilo de la cola.
+    """
+
+    def test_resumen_de_importacion(self):
+        disco = Disco.objects.create(nombre="Backup", tamanio_gb=Decimal('500.00'))
+        ContenidoDisco.objects.create(disco=disco, nombre="Fotos", fecha_modificacion='2024-06-30', peso_gb=Decimal('1.00'))
+        archivo = b''.join(self.client.get('/api/discos/export/').streaming_content)
+        Disco.objects.all().delete()
+
+        trabajo = TrabajoImportacion.objects.create(tipo='DISCOS', nombre_archivo='discos.xlsx')
+        trabajo.archivo.save('discos.xlsx', ContentFile(archivo))
+        with self.assertLogs('importaciones.worker', 'INFO') as logs:
+            ejecutar(trabajo.pk)
+
+        resumen = logs.records[-1]
+        self.assertEqual(resumen.getMessage(), 'importacion.completada')
+        self.assertEqual((resumen.trabajo, resumen.tipo, resumen.filas, resumen.creados, resumen.errores), (trabajo.pk, 'DISCOS', 2, 1, 0))
+
+    def test_eventos_json_en_cola(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = Path(directorio) / 'eventos.log'
+            handler = ColaLogHandler(archivo=ruta)
+            logger = logging.getLogger('discos.tests.cola')
+            logger.addHandler(handler)
+            logger.propagate = False
+            try:
+                logger.warning('escaneo.ruta_inexistente', extra={'ruta': 'D:\\', 'unidades': ['C:\\']})
+                try:
+                    raise OSError("sin acceso")
+                except OSError:
+                    logger.exception('escaneo.fallido', extra={'ruta': 'X:'})
+            finally:
+                logger.removeHandler(handler)
+                logger.propagate = True
+                handler.close()
+            eventos = [json.loads(linea) for linea in ruta.read_text(encoding='utf-8').splitlines()]
+
+        self.assertEqual([e['mensaje'] for e in eventos], ['escaneo.ruta_inexistente', 'escaneo.fallido'])
+        self.assertEqual((eventos[0]['nivel'], eventos[0]['ruta'], eventos[0]['unidades']), ('WARNING', 'D:\\', ['C:\\']))
+        self.assertIn('OSError: sin acceso', eventos[1]['excepcion'])
+
+
+class PlanesConsultaTests(PlanesConsultaMixin, TestCase):
+    """
+    Los contenidos de un disco se listan recorriendo contenido_disco_fecha_idx,
+    sin ordenar en memoria ni repetir consultas por fila.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.discos = Disco.objects.bulk_create(Disco(nombre=f"Disco {i}", tamanio_gb=Decimal('1000.00')) for i in range(10))
+        ContenidoDisco.objects.bulk_create(
+            ContenidoDisco(
+                disco=cls.discos[i % 10], nombre=f"Archivo {i}", peso_gb=Decimal('0.50'),
+                fecha_modificacion=date(2020, 1, 1) + timedelta(days=i % 1500),
+            )
+            for i in range(5000)
+        )
+        analizar_tablas(Disco, ContenidoDisco)
+
+    def test_contenidos_de_un_disco(self):
+        url = f'/api/discos/{self.discos[3].pk}/contenidos/'
+        sql = self.consulta_de(url, 'discos_contenidodisco')
+        self.assertUsaIndice(sql, 'contenido_disco_fecha_idx')
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+
+class BusquedaTests(TestCase):
+    """
+    Los contenidos creados, editados o eliminados después de las migraciones deben
+    reflejarse en la búsqueda (en SQLite, la tabla FTS la mantienen triggers).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.origen = Disco.objects.create(nombre="Respaldo Contable", tamanio_gb=Decimal('500.00'))
+        cls.destino = Disco.objects.create(nombre="Archivo Histórico", tamanio_gb=Decimal('500.00'))
+        cls.facturas = ContenidoDisco.objects.create(
+            disco=cls.origen, nombre="Facturas 2024", peso_gb=Decimal('1.00'), fecha_modificacion=date(2024, 12, 31),
+        )
+        ContenidoDisco.objects.bulk_create([
+            ContenidoDisco(disco=cls.destino, nombre="Nóminas", peso_gb=Decimal('2.00'), fecha_modificacion=date(2024, 6, 30)),
+        ])
+
+    def discos_por(self, parametro, texto):
+        response = self.client.get(f'/api/discos/?{parametro}={texto}')
+        self.assertEqual(response.status_code, 200)
+        return {fila['id'] for fila in response.json()['results']}
+
+    def contenidos_encontrados(self, texto):
+        return {resultado['contenido']['id'] for resultado in buscar(texto) if resultado['tipo'] == 'contenido'}
+
+    def test_contenido_nuevo_se_encuentra(self):
+        self.assertEqual(self.contenidos_encontrados('Facturas'), {self.facturas.pk})
+        self.assertEqual(self.contenidos_encontrados('nómina'), set(ContenidoDisco.objects.filter(disco=self.destino).values_list('pk', flat=True)))
+        self.assertEqual(self.discos_por('contenido_nombre', 'Facturas'), {self.origen.pk})
+        self.assertEqual(self.discos_por('search', 'Facturas'), {self.origen.pk})
+        datos = self.client.get('/api/discos/search/?q=facturas').json()
+        self.assertEqual(datos['results'][0]['resaltado']['nombre'], "<mark>Facturas</mark> 2024")
+
+    def test_cambios_y_eliminaciones(self):
+        self.facturas.nombre = "Recibos 2024"
+        self.facturas.disco = self.destino
+        self.facturas.save()
+        self.assertEqual(self.contenidos_encontrados('Facturas'), set())
+        self.assertEqual(self.discos_por('contenido_nombre', 'Recibos'), {self.destino.pk})
+
+        self.facturas.delete()
+        self.assertEqual(self.contenidos_encontrados('Recibos'), set())
+        self.assertEqual(self.discos_por('search', 'Recibos'), set())
+
+
+class EscaneoTests(TestCase):
+    """
+    La profundidad máxima poda cada rama por separado: alcanzarla en una carpeta no
+    detiene el recorrido de las demás.
+    """
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.raiz = Path(directorio.name)
+        for ruta, tamanio in [
+            ("A/a1/a2/a3/profundo.bin", 10),
+            ("A/a1/a2/medio.bin", 20),
+            ("A/a1/arriba.bin", 30),
+            ("B/b1/big", 1000),
+            ("B/b1/b2/otro.bin", 40),
+            ("raiz.txt", 5),
+        ]:
+            archivo = self.raiz / ruta
+            archivo.parent.mkdir(parents=True, exist_ok=True)
+            archivo.write_bytes(b"x" * tamanio)
+
+    def test_profundidad_por_rama(self):
+        # Hasta 3 niveles se leen raiz.txt, A/a1/arriba.bin y B/b1/big, en cualquier orden de los hilos
+        for _ in range(20):
+            resultado = escanear_directorio(str(self.raiz), max_profundidad=3, workers=4)
+            self.assertEqual(resultado["archivos_escaneados"], 3)
+            self.assertTrue(resultado["truncado"])
+
+    def test_sin_limites(self):
+        resultado = escanear_directorio(str(self.raiz), workers=4)
+        self.assertEqual(resultado["archivos_escaneados"], 6)
+        self.assertFalse(resultado["truncado"])
+        self.assertEqual(
+            sorted(contenido["nombre"] for contenido in resultado["contenidos"]),
+            ["A", "B", "raiz.txt"],
+        )
+
+    def test_presupuesto_de_archivos(self):
+        recorrido = Recorrido(str(self.raiz), max_archivos=1, workers=1)
+        list(recorrido)
+        self.assertTrue(recorrido.detenido)
+        self.assertTrue(recorrido.truncado)
+
+    def test_endpoint(self):
+        response = self.client.get('/api/discos/scan/', {'path': str(self.raiz), 'max_profundidad': 3})
+        self.assertEqual(response.status_code, 200)
+        datos = response.json()
+        self.assertEqual((datos["archivos_escaneados"], datos["truncado"]), (3, True))
+        self.assertEqual(sorted(contenido["nombre"] for contenido in datos["contenidos"]), ["A", "B", "raiz.txt"])
+        self.assertEqual(datos["nombre_sugerido"], self.raiz.name)
+
+        response = self.client.get('/api/discos/scan/', {'path': str(self.raiz / "no-existe")})
+        self.assertEqual(response.status_code, 400)
+
+
+class CatalogoTests(TestCase):
+    """
+    El reindexado contra el catálogo registra los mismos contenidos de primer nivel que
+    el escaneo de la API (incluidas las carpetas vacías) y retoma el hash pendiente.
+    """
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.raiz = Path(directorio.name) / "montaje"
+        for ruta in ["Fotos/2023/a.jpg", "Fotos/2024/b.jpg", "Videos/c.mp4", "Videos/d.mp4", "notas.txt"]:
+            archivo = self.raiz / ruta
+            archivo.parent.mkdir(parents=True, exist_ok=True)
+            archivo.write_bytes(ruta.encode())
+        (self.raiz / "Vacía").mkdir()
+        configuracion = override_settings(CATALOGOS_ROOT=Path(directorio.name) / "catalogos")
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.disco = Disco.objects.create(nombre="Backup", tamanio_gb=Decimal('100.00'))
+
+    def contenidos(self):
+        return sorted(
+            (c.nombre, str(c.fecha_modificacion), float(c.peso_gb))
+            for c in ContenidoDisco.objects.filter(disco=self.disco)
+        )
+
+    def test_mismos_contenidos_que_el_escaneo(self):
+        indexar_disco(self.disco, str(self.raiz), workers=2)
+        escaneados = escanear_directorio(str(self.raiz), workers=2)["contenidos"]
+        self.assertEqual(
+            self.contenidos(),
+            sorted((c["nombre"], c["fecha_modificacion"], c["peso_gb"]) for c in escaneados),
+        )
+        self.assertIn("Vacía", [nombre for nombre, _, _ in self.contenidos()])
+
+        (self.raiz / "Vacía").rmdir()
+        resultado = indexar_disco(self.disco, str(self.raiz), workers=2)
+        self.assertEqual(resultado["contenidos_actualizados"], 1)
+        self.assertEqual([nombre for nombre, _, _ in self.contenidos()], ["Fotos", "Videos", "notas.txt"])
+
+    def test_hash_acotado_se_retoma(self):
+        resultado = indexar_disco(self.disco, str(self.raiz), calcular_hash=True, workers=2, max_hashes=2)
+        self.assertEqual((resultado["hasheados"], resultado["hash_pendientes"]), (2, 3))
+        # Los archivos se hashean en orden de ruta: Fotos queda completa y Videos pendiente
+        huellas = dict(ContenidoDisco.objects.filter(disco=self.disco).values_list('nombre', 'hash_contenido'))
+        self.assertEqual((len(huellas["Fotos"]), huellas["Videos"]), (64, ''))
+
+        resultado = indexar_disco(self.disco, str(self.raiz), calcular_hash=True, workers=2)
+        self.assertEqual((resultado["agregados"], resultado["hasheados"], resultado["hash_pendientes"]), (0, 3, 0))
+        huellas = dict(ContenidoDisco.objects.filter(disco=self.disco).values_list('nombre', 'hash_contenido'))
+        self.assertEqual(len(huellas["Videos"]), 64)
+        self.assertEqual(huellas["Vacía"], '')
+
+        # Sin tiempo disponible no se hashea nada, pero el reindexado responde
+        (self.raiz / "Videos" / "e.mp4").write_bytes(b"nuevo")
+        resultado = indexar_disco(self.disco, str(self.raiz), calcular_hash=True, workers=2, tiempo_max=1e-9)
+        self.assertEqual(resultado["hasheados"], 0)
+
+
+class AgregadosUsoTests(TestCase):
+    """
+    espacio_usado_gb y contenidos_count deben coincidir con la suma de los contenidos
+    después de cada tipo de escritura, y un guardado del disco no debe pisarlos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.origen = Disco.objects.create(nombre="Origen", tamanio_gb=Decimal('100.00'))
+        cls.destino = Disco.objects.create(nombre="Destino", tamanio_gb=Decimal('100.00'))
+
+    def agregados(self, disco):
+        disco.refresh_from_db()
+        return disco.espacio_usado_gb, disco.contenidos_count
+
+    def crear(self, disco, nombre, peso):
+        return ContenidoDisco.objects.create(disco=disco, nombre=nombre, peso_gb=Decimal(peso), fecha_modificacion=date(2024, 1, 1))
+
+    def assertCoincideConRecalculo(self):
+        persistidos = sorted(Disco.objects.values_list('pk', 'espacio_usado_gb', 'contenidos_count'))
+        Disco.objects.recalcular_uso()
+        self.assertEqual(persistidos, sorted(Disco.objects.values_list('pk', 'espacio_usado_gb', 'contenidos_count')))
+
+    def test_alta_edicion_movimiento_y_baja(self):
+        fotos = self.crear(self.origen, "Fotos", '10.50')
+        self.crear(self.origen, "Videos", '20.00')
+        self.assertEqual(self.agregados(self.origen), (Decimal('30.50'), 2))
+
+        fotos = ContenidoDisco.objects.get(pk=fotos.pk)
+        fotos.peso_gb = Decimal('12.50')
+        fotos.save()
+        self.assertEqual(self.agregados(self.origen), (Decimal('32.50'), 2))
+
+        fotos.disco = self.destino
+        fotos.save()
+        self.assertEqual(self.agregados(self.origen), (Decimal('20.00'), 1))
+        self.assertEqual(self.agregados(self.destino), (Decimal('12.50'), 1))
+
+        fotos.delete()
+        self.assertEqual(self.agregados(self.destino), (Decimal('0.00'), 0))
+        self.assertCoincideConRecalculo()
+
+    def test_guardar_el_disco_no_pisa_los_agregados(self):
+        disco = Disco.objects.get(pk=self.origen.pk)
+        # Contenido agregado después de leer el disco (ej: otra solicitud concurrente)
+        self.crear(self.origen, "Fotos", '5.00')
+        disco.descripcion = "Editado"
+        disco.save()
+        self.assertEqual(self.agregados(disco), (Decimal('5.00'), 1))
+
+        response = self.client.patch(f'/api/discos/{self.origen.pk}/', {'estado': 'EN_RIESGO'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.agregados(self.origen), (Decimal('5.00'), 1))
+        self.assertEqual(self.origen.estado, 'EN_RIESGO')
+
+    def test_api_con_contenidos_anidados(self):
+        datos = {
+            'nombre': "Nuevo", 'tamanio_gb': '50.00',
+            'contenidos': [{'nombre': "A", 'fecha_modificacion': '2024-01-01', 'peso_gb': '1.00'},
+                           {'nombre': "B", 'fecha_modificacion': '2024-01-01', 'peso_gb': '2.00'}],
+        }
+        response = self.client.post('/api/discos/', datos, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['espacio_usado'], response.json()['contenidos_count']), (3.0, 2))
+
+        datos['contenidos'] = [{'nombre': "B", 'fecha_modificacion': '2024-01-01', 'peso_gb': '4.00'}]
+        response = self.client.put(f"/api/discos/{response.json()['id']}/", datos, content_type='application/json')
+        self.assertEqual((response.json()['espacio_usado'], response.json()['contenidos_count']), (4.0, 1))
+        self.assertCoincideConRecalculo()
+
+    def test_importacion_masiva(self):
+        for i in range(3):
+            self.crear(self.origen, f"Carpeta {i}", '1.25')
+        archivo = BytesIO(b''.join(self.client.get('/api/discos/export/').streaming_content))
+        Disco.objects.all().delete()
+
+        self.assertEqual(import_discos(archivo)['errors'], [])
+        self.assertEqual(self.agregados(Disco.objects.get(nombre="Origen")), (Decimal('3.75'), 3))
+        self.assertEqual(self.agregados(Disco.objects.get(nombre="Destino")), (Decimal('0.00'), 0))
+
+    def test_importacion_fallida_no_deja_discos(self):
+        for i in range(3):
+            self.crear(self.origen, f"Carpeta {i}", '1.25')
+        archivo = BytesIO(b''.join(self.client.get('/api/discos/export/').streaming_content))
+        Disco.objects.all().delete()
+
+        def progress(procesadas, total):
+            # Falla después de confirmar el primer lote de contenidos
+            if procesadas > 3:
+                raise OSError("conexión perdida")
+
+        with self.assertRaises(OSError), self.assertLogs('discos.utils', 'WARNING'):
+            import_discos(archivo, chunk_size=1, progress=progress)
+        self.assertFalse(Disco.objects.exists())
+        self.assertFalse(ContenidoDisco.objects.exists())
+
+    def test_comando_recalcular_uso_discos(self):
+        self.crear(self.origen, "Fotos", '7.00')
+        Disco.objects.update(espacio_usado_gb=Decimal('99.00'), contenidos_count=42)
+        salida = StringIO()
+        call_command('recalcular_uso_discos', self.origen.pk, stdout=salida)
+        self.assertIn("1 disco(s)", salida.getvalue())
+        self.assertEqual(self.agregados(self.origen), (Decimal('7.00'), 1))
+        self.assertEqual(self.agregados(self.destino), (Decimal('99.00'), 42))
+
+        call_command('recalcular_uso_discos', stdout=StringIO())
+        self.assertEqual(self.agregados(self.destino), (Decimal('0.00'), 0))
+
+
+class DuplicadosTests(TestCase):
+    """
+    Los grupos y pares de duplicados se mantienen con cada escritura de contenidos y
+    deben coincidir con una reconstrucción completa; el reporte se pagina desde ellos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.a = Disco.objects.create(nombre="Disco A", tamanio_gb=Decimal('500.00'))
+        cls.b = Disco.objects.create(nombre="Disco B", tamanio_gb=Decimal('500.00'))
+        cls.c = Disco.objects.create(nombre="Disco C", tamanio_gb=Decimal('500.00'))
+
+    def crear(self, disco, nombre, peso='10.00', **campos):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ContenidoDisco.objects.create(
+                disco=disco, nombre=nombre, peso_gb=Decimal(peso), fecha_modificacion=date(2024, 1, 1), **campos,
+            )
+
+    def guardar(self, contenido, **campos):
+        contenido = ContenidoDisco.objects.get(pk=contenido.pk)
+        for campo, valor in campos.items():
+            setattr(contenido, campo, valor)
+        with self.captureOnCommitCallbacks(execute=True):
+            contenido.save()
+        return contenido
+
+    def estado(self):
+        grupos = sorted(
+            (g.clave, g.peso_gb, g.huella, g.discos_ids, sorted(g.contenidos_ids), g.verificado, g.recuperable_gb,
+             sorted(g.discos.values_list('pk', flat=True)))
+            for g in GrupoDuplicado.objects.all()
+        )
+        pares = sorted(ParDuplicado.objects.values_list('disco_a_id', 'disco_b_id', 'recuperable_gb', 'grupos'))
+        return grupos, pares
+
+    def assertCoincideConReconstruccion(self):
+        incremental = self.estado()
+        reconstruir_duplicados()
+        self.assertEqual(incremental, self.estado())
+
+    def test_altas_ediciones_y_bajas(self):
+        fotos = self.crear(self.a, "Fotos")
+        self.assertFalse(GrupoDuplicado.objects.exists())
+        self.crear(self.b, " FOTOS ")
+        videos = self.crear(self.c, "Videos")
+        grupo = GrupoDuplicado.objects.get()
+        self.assertEqual((grupo.clave, grupo.discos_ids, grupo.recuperable_gb), ("fotos", [self.a.pk, self.b.pk], Decimal('10.00')))
+        self.assertEqual(list(ParDuplicado.objects.values_list('disco_a_id', 'disco_b_id', 'grupos')), [(self.a.pk, self.b.pk, 1)])
+
+        # El contenido de C pasa a ser una copia más
+        videos = self.guardar(videos, nombre="fotos")
+        self.assertEqual(GrupoDuplicado.objects.get().discos_ids, [self.a.pk, self.b.pk, self.c.pk])
+        self.assertEqual(ParDuplicado.objects.count(), 3)
+        self.assertCoincideConReconstruccion()
+
+        # Huellas distintas separan el grupo; el contenido sin huella queda con la única huella restante
+        fotos = self.guardar(fotos, hash_contenido='x' * 64)
+        self.assertFalse(GrupoDuplicado.objects.get().verificado)
+        videos = self.guardar(videos, hash_contenido='y' * 64)
+        self.assertFalse(GrupoDuplicado.objects.exists())
+        self.assertFalse(ParDuplicado.objects.exists())
+        videos = self.guardar(videos, hash_contenido='x' * 64)
+        grupo = GrupoDuplicado.objects.get()
+        self.assertEqual((grupo.huella, grupo.discos_ids, grupo.verificado), ('x' * 64, [self.a.pk, self.b.pk, self.c.pk], False))
+        self.assertCoincideConReconstruccion()
+
+        # Mover una copia al disco de otra no la cuenta dos veces
+        videos = self.guardar(videos, disco=self.a)
+        self.assertEqual(GrupoDuplicado.objects.get().discos_ids, [self.a.pk, self.b.pk])
+        self.assertCoincideConReconstruccion()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            videos.delete()
+            fotos.delete()
+        self.assertFalse(GrupoDuplicado.objects.exists())
+        self.assertFalse(ParDuplicado.objects.exists())
+
+    def test_escrituras_masivas_y_baja_de_disco(self):
+        self.crear(self.a, "Backup", '5.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevos = ContenidoDisco.objects.bulk_create([
+                ContenidoDisco(disco=self.b, nombre="backup", peso_gb=Decimal('5.00'), fecha_modificacion=date(2024, 1, 1)),
+                ContenidoDisco(disco=self.b, nombre="Música", peso_gb=Decimal('3.00'), fecha_modificacion=date(2024, 1, 1)),
+            ])
+            discos_actualizados.send(sender=Disco, discos_ids=[self.b.pk])
+        self.assertEqual(GrupoDuplicado.objects.get().discos_ids, [self.a.pk, self.b.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mover_contenidos({self.c.pk: [nuevos[0].pk]})
+        self.assertEqual(GrupoDuplicado.objects.get().discos_ids, [self.a.pk, self.c.pk])
+        self.assertCoincideConReconstruccion()
+
+        # Los contenidos borrados en cascada con su disco también actualizan sus grupos
+        self.crear(self.c, "Música", '3.00')
+        self.crear(self.a, "Música", '3.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            Disco.objects.get(pk=self.c.pk).delete()
+        self.assertEqual(list(GrupoDuplicado.objects.values_list('clave', 'discos_ids')), [("música", [self.a.pk, self.b.pk])])
+        self.assertCoincideConReconstruccion()
+
+    def test_reporte_paginado_y_filtro_por_disco(self):
+        for indice, peso in enumerate(['1.00', '2.00', '3.00']):
+            self.crear(self.a, f"Archivo {indice}", peso)
+            self.crear(self.b if indice else self.c, f"Archivo {indice}", peso)
+
+        response = self.client.get('/api/discos/duplicados/?page_size=2')
+        self.assertEqual(response.status_code, 200)
+        datos = response.json()
+        self.assertEqual([grupo['nombre'] for grupo in datos['results']], ["Archivo 2", "Archivo 1"])
+        self.assertEqual((datos['total_grupos'], Decimal(str(datos['total_recuperable_gb']))), (3, Decimal('6.00')))
+        self.assertEqual([(par['disco_a']['nombre'], par['disco_b']['nombre']) for par in datos['pares']], [("Disco A", "Disco B"), ("Disco A", "Disco C")])
+        siguiente = self.client.get(datos['next']).json()
+        self.assertEqual([grupo['nombre'] for grupo in siguiente['results']], ["Archivo 0"])
+        self.assertIsNone(siguiente['next'])
+
+        datos = self.client.get(f'/api/discos/duplicados/?disco={self.c.pk}').json()
+        self.assertEqual([grupo['discos'] for grupo in datos['results']], [[self.a.pk, self.c.pk]])
+        self.assertEqual((datos['total_grupos'], len(datos['pares'])), (1, 1))
+        self.assertEqual(self.client.get('/api/discos/duplicados/?disco=x').status_code, 400)
+
+
+class MigracionTests(TestCase):
+    """
+    mover_contenidos verifica el espacio de cada destino con los discos bloqueados y
+    aplica todas las reasignaciones o ninguna.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.origen = Disco.objects.create(nombre="Origen", tamanio_gb=Decimal('100.00'), estado='DANADO')
+        cls.grande = Disco.objects.create(nombre="Grande", tamanio_gb=Decimal('50.00'))
+        cls.chico = Disco.objects.create(nombre="Chico", tamanio_gb=Decimal('10.00'))
+        cls.contenidos = [
+            ContenidoDisco.objects.create(disco=cls.origen, nombre=nombre, peso_gb=Decimal(peso), fecha_modificacion=date(2024, 1, 1))
+            for nombre, peso in [("Fotos", '30.00'), ("Videos", '8.00'), ("Música", '4.00')]
+        ]
+
+    def ubicaciones(self):
+        return dict(ContenidoDisco.objects.values_list('nombre', 'disco_id'))
+
+    def usos(self):
+        return dict(Disco.objects.values_list('nombre', 'espacio_usado_gb'))
+
+    def test_mueve_y_recalcula_los_discos(self):
+        fotos, videos, _ = self.contenidos
+        with CaptureQueriesContext(connection) as consultas:
+            movidos = mover_contenidos({self.grande.pk: [fotos.pk], self.chico.pk: [videos.pk]})
+        self.assertEqual(movidos, 2)
+        self.assertEqual(self.usos(), {"Origen": Decimal('4.00'), "Grande": Decimal('30.00'), "Chico": Decimal('8.00')})
+
+        if connection.features.has_select_for_update:
+            # Los discos se bloquean antes de verificar el espacio y mover
+            sentencias = [consulta['sql'] for consulta in consultas.captured_queries]
+            bloqueo = next(i for i, sql in enumerate(sentencias) if 'discos_disco' in sql and 'FOR UPDATE' in sql)
+            primer_update = next(i for i, sql in enumerate(sentencias) if sql.startswith('UPDATE "discos_contenidodisco"'))
+            self.assertLess(bloqueo, primer_update)
+
+    def test_espacio_verificado_al_aplicar(self):
+        fotos = self.contenidos[0]
+        plan = planificar_consolidacion([self.origen.pk], [self.grande.pk])
+        self.assertEqual([m['contenido_id'] for m in plan['movimientos']], [c.pk for c in self.contenidos])
+
+        # Entre el plan y su aplicación otro proceso ocupa espacio en el destino
+        ContenidoDisco.objects.create(disco=self.grande, nombre="Ajeno", peso_gb=Decimal('15.00'), fecha_modificacion=date(2024, 1, 1))
+        antes = self.ubicaciones()
+        with self.assertRaisesMessage(ConflictoMigracion, "Espacio insuficiente en 'Grande'"):
+            aplicar_plan(plan)
+        self.assertEqual(self.ubicaciones(), antes)
+        self.assertEqual(ContenidoDisco.objects.get(pk=fotos.pk).disco_id, self.origen.pk)
+
+    def test_destino_sin_espacio(self):
+        fotos = self.contenidos[0]
+        with self.assertRaisesMessage(ConflictoMigracion, "tiene 10.00 GB libres y se requieren 30.00 GB"):
+            mover_contenidos({self.chico.pk: [fotos.pk]})
+
+        response = self.client.post(
+            '/api/discos/contenidos/migrate/',
+            {'contenido_ids': [fotos.pk], 'disco_destino_id': self.chico.pk},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Espacio insuficiente", response.json()['error'])
+        self.assertEqual(ContenidoDisco.objects.get(pk=fotos.pk).disco_id, self.origen.pk)
+
+    def test_un_destino_fallido_revierte_todo(self):
+        fotos, videos, musica = self.contenidos
+        antes, usos = self.ubicaciones(), self.usos()
+        # El primer destino se mueve dentro de la transacción antes de fallar el segundo
+        with self.assertRaises(ConflictoMigracion):
+            mover_contenidos({self.grande.pk: [videos.pk, musica.pk], self.chico.pk: [fotos.pk]})
+        self.assertEqual(self.ubicaciones(), antes)
+        self.assertEqual(self.usos(), usos)
+
+    def test_contenido_movido_mientras_se_planificaba(self):
+        plan = planificar_consolidacion([self.origen.pk])
+        musica = ContenidoDisco.objects.get(pk=self.contenidos[2].pk)
+        musica.disco = self.chico
+        musica.save()
+        with self.assertRaisesMessage(ConflictoMigracion, "cambiaron de disco"):
+            aplicar_plan(plan)
+        self.assertEqual(ContenidoDisco.objects.filter(disco=self.origen).count(), 2)
+
+
+
+class ConsolidacionTests(TestCase):
+    """
+    El plan de consolidación ubica los contenidos de mayor a menor en el disco donde
+    dejan menos espacio libre, solo en los destinos permitidos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.origen = Disco.objects.create(nombre="En riesgo", tamanio_gb=Decimal('100.00'), estado='EN_RIESGO')
+        # Espacio libre de los destinos: 10, 7 y 5 GB
+        cls.d10 = Disco.objects.create(nombre="Libre 10", tamanio_gb=Decimal('10.00'))
+        cls.d7 = Disco.objects.create(nombre="Libre 7", tamanio_gb=Decimal('7.00'))
+        cls.d5 = Disco.objects.create(nombre="Libre 5", tamanio_gb=Decimal('5.00'))
+        cls.danado = Disco.objects.create(nombre="Dañado", tamanio_gb=Decimal('500.00'), estado='DANADO')
+        cls.contenidos = {
+            peso: ContenidoDisco.objects.create(
+                disco=cls.origen, nombre=f"Carpeta {peso}", peso_gb=Decimal(peso), fecha_modificacion=date(2024, 1, 1),
+            ).pk
+            for peso in ['3.00', '4.00', '5.00', '6.00', '12.00']
+        }
+
+    def destinos(self, plan):
+        return {Decimal(str(m['peso_gb'])): m['destino'] for m in plan['movimientos']}
+
+    def test_best_fit_decreasing(self):
+        plan = planificar_consolidacion([self.origen.pk])
+        # 6 -> el de 7 (sobra 1), 5 -> el de 5 (sobra 0), 4 y 3 -> el de 10; first fit pondría 6 en el de 10
+        self.assertEqual([m['peso_gb'] for m in plan['movimientos']], [Decimal('6.00'), Decimal('5.00'), Decimal('4.00'), Decimal('3.00')])
+        self.assertEqual(self.destinos(plan), {
+            Decimal('6.00'): self.d7.pk, Decimal('5.00'): self.d5.pk, Decimal('4.00'): self.d10.pk, Decimal('3.00'): self.d10.pk,
+        })
+        self.assertEqual(plan['por_destino'][0], {'disco': {'id': self.d10.pk, 'nombre': "Libre 10"}, 'cantidad': 2, 'peso_gb': Decimal('7.00')})
+        self.assertEqual((plan['total_gb'], plan['total_sin_ubicar_gb']), (Decimal('18.00'), Decimal('12.00')))
+
+    def test_contenidos_que_no_entran(self):
+        plan = planificar_consolidacion([self.origen.pk])
+        self.assertEqual(
+            plan['sin_ubicar'],
+            [{'contenido_id': self.contenidos['12.00'], 'nombre': "Carpeta 12.00", 'peso_gb': Decimal('12.00'), 'origen': self.origen.pk}],
+        )
+
+        # Aplicar un plan incompleto requiere 'parcial'
+        response = self.client.post('/api/discos/consolidar/', {'aplicar': True}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(ContenidoDisco.objects.filter(disco=self.origen).count(), 5)
+
+        response = self.client.post('/api/discos/consolidar/', {'aplicar': True, 'parcial': True}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['aplicado'], response.json()['movidos']), (True, 4))
+        self.assertEqual(list(ContenidoDisco.objects.filter(disco=self.origen).values_list('pk', flat=True)), [self.contenidos['12.00']])
+        self.assertEqual(Disco.objects.get(pk=self.d5.pk).espacio_libre_gb, Decimal('0.00'))
+
+    def test_destinos_excluidos(self):
+        # Por defecto ni el origen ni los discos que no están en estado BUENO reciben contenidos
+        plan = planificar_consolidacion([self.origen.pk])
+        self.assertNotIn(self.danado.pk, self.destinos(plan).values())
+
+        # Con destinos explícitos solo se usan esos (aunque no estén en BUENO), nunca el origen
+        plan = planificar_consolidacion([self.origen.pk], [self.d5.pk, self.danado.pk, self.origen.pk])
+        self.assertEqual(set(self.destinos(plan).values()), {self.d5.pk, self.danado.pk})
+        self.assertEqual(plan['sin_ubicar'], [])
+
+        # La reserva descuenta espacio de cada destino: quedan 5 y 2 GB, el de 5 no participa
+        plan = planificar_consolidacion([self.origen.pk], reserva_gb=Decimal('5.00'))
+        self.assertEqual(self.destinos(plan), {Decimal('5.00'): self.d10.pk})
+        self.assertEqual(plan['total_sin_ubicar_gb'], Decimal('25.00'))
+
+        response = self.client.post(
+            '/api/discos/consolidar/', {'origenes': [self.origen.pk], 'destinos': [self.d10.pk]}, content_type='application/json',
+        )
+        self.assertEqual({m['destino'] for m in response.json()['movimientos']}, {self.d10.pk})
+        self.assertFalse(response.json()['aplicado'])
+
+
+class CamposDinamicosTests(TestCase):
+    """
+    `fields` y `expand` recortan o amplían la respuesta; los nombres desconocidos responden 400.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.disco = Disco.objects.create(nombre="Backup", tamanio_gb=Decimal('500.00'))
+        ContenidoDisco.objects.create(disco=cls.disco, nombre="Fotos", peso_gb=Decimal('1.00'), fecha_modificacion=date(2024, 1, 1))
+
+    def primero(self, query=''):
+        response = self.client.get(f'/api/discos/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'][0]
+
+    def test_expandibles_solo_a_pedido_en_listados(self):
+        self.assertNotIn('contenidos', self.primero())
+        self.assertEqual([c['nombre'] for c in self.primero('expand=contenidos')['contenidos']], ["Fotos"])
+        # El detalle siempre los incluye
+        self.assertIn('contenidos', self.client.get(f'/api/discos/{self.disco.pk}/').json())
+
+    def test_fields(self):
+        self.assertEqual(self.primero('fields=id,nombre'), {'id': self.disco.pk, 'nombre': "Backup"})
+        # Pedir un campo expandible en fields equivale a expandirlo
+        self.assertEqual(set(self.primero('fields=nombre,contenidos')), {'nombre', 'contenidos'})
+        self.assertEqual(set(self.primero('fields=nombre&expand=contenidos')), {'nombre'})
+        detalle = self.client.get(f'/api/discos/{self.disco.pk}/?fields=espacio_libre').json()
+        self.assertEqual(detalle, {'espacio_libre': 499.0})
+
+    def test_nombres_invalidos(self):
+        response = self.client.get('/api/discos/?fields=id,tamano')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': ["Campos desconocidos: tamano."]})
+
+        response = self.client.get('/api/discos/?expand=nombre,movimientos')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'expand': ["Campos no expandibles: movimientos, nombre."]})
+        self.assertEqual(self.client.get(f'/api/discos/{self.disco.pk}/?fields=x').status_code, 400)
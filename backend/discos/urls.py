@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DiscoViewSet, ContenidoDiscoViewSet, DiscoScanView, ExportTemplateView, ImportDataView, MigrateContentView
+from .views import DiscoViewSet, ContenidoDiscoViewSet, ConsolidacionView, DiscoScanView, DiscoSearchView, DuplicadosView, ExportTemplateView, ImportDataView, ImportJobView, MigrateContentView
 
 # Se crea un router para registrar las vistas de la API.
 # Se registra el ViewSet de Disco.
@@ -25,8 +25,13 @@ disco_contenidos_detail = ContenidoDiscoViewSet.as_view({
 urlpatterns = [
     # Rutas específicas primero para evitar conflictos con el router
     path('scan/', DiscoScanView.as_view(), name='disco-scan'),
+    path('search/', DiscoSearchView.as_view(), name='disco-search'),
+    path('duplicados/', DuplicadosView.as_view(), name='disco-duplicados'),
+    path('consolidar/', ConsolidacionView.as_view(), name='disco-consolidar'),
     path('export-template/', ExportTemplateView.as_view(), name='disco-export-template'),
     path('import/', ImportDataView.as_view(), name='disco-import'),
+    path('import/<int:pk>/', ImportJobView.as_view(), name='disco-import-job'),
+    path('contenidos/migrate/', MigrateContentView.as_view(), name='contenidos-migrate'),
     path('contenidos/<int:contenido_id>/migrate/', MigrateContentView.as_view(), name='contenido-migrate'),
     
     # Rutas generadas por el router
@@ -1,8 +1,21 @@
+import logging
+
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill
-from datetime import datetime
 from io import BytesIO
 
+from django.db import transaction
+
+from gestor_areas_project.excel import TAMANIO_LOTE, abrir_libro, contar_filas, en_lotes, iterar_filas, limpiar_campos
+from gestor_areas_project.exportacion import Hoja, filas_de
+from .models import Disco, ContenidoDisco
+from .signals import discos_actualizados
+
+logger = logging.getLogger(__name__)
+
+DISCO_FIELDS = ['nombre', 'tipo', 'tamanio_gb', 'descripcion', 'estado']
+CONTENIDO_FIELDS = ['nombre', 'fecha_modificacion', 'peso_gb']
+
 
 def generate_template():
     """
@@ -60,173 +73,229 @@ def generate_template():
     return excel_file
 
 
-def parse_excel_import(file):
+def export_sheets(discos):
     """
-    Lee un archivo Excel y extrae los datos de discos y contenidos.
-    Retorna un diccionario con la estructura validada.
+    Hojas para exportar los discos del queryset y sus contenidos, con el mismo
+    formato que la plantilla de importación.
     """
-    from openpyxl import load_workbook
-    
-    try:
-        wb = load_workbook(file)
-    except Exception as e:
-        raise ValueError(f"Error al leer el archivo Excel: {str(e)}")
-    
-    # Verificar que existan las hojas requeridas
-    if "Disco" not in wb.sheetnames:
-        raise ValueError("El archivo debe contener una hoja llamada 'Disco'")
-    if "Contenidos" not in wb.sheetnames:
-        raise ValueError("El archivo debe contener una hoja llamada 'Contenidos'")
-    
-    ws_disco = wb["Disco"]
-    ws_contenidos = wb["Contenidos"]
-    
-    # Parsear discos
-    discos_data = []
-    headers_disco = [cell.value for cell in ws_disco[1]]
-    
-    for row in ws_disco.iter_rows(min_row=2, values_only=True):
-        if not any(row):  # Saltar filas vacías
-            continue
-        
-        disco = dict(zip(headers_disco, row))
-        # Normalizar el nombre del disco (trim whitespace)
-        if disco.get('nombre'):
-            disco['nombre'] = str(disco['nombre']).strip()
-        disco['contenidos'] = []
-        discos_data.append(disco)
-    
-    # Si no hay discos, retornar lista vacía
-    if not discos_data:
-        return []
-    
-    # Crear un mapa de nombres normalizados para búsqueda más eficiente
-    # Clave: nombre normalizado (lowercase, sin espacios extra), Valor: disco original
-    disco_map = {}
-    for disco in discos_data:
-        nombre_normalizado = disco.get('nombre', '').strip().lower()
-        disco_map[nombre_normalizado] = disco
-    
-    print(f"DEBUG - Discos disponibles para asociar: {list(disco_map.keys())}")
-    
-    # Parsear contenidos y asociarlos a discos
-    headers_contenidos = [cell.value for cell in ws_contenidos[1]]
-    orphaned_contents = []  # Contenidos sin disco asociado
-    
-    for row_idx, row in enumerate(ws_contenidos.iter_rows(min_row=2, values_only=True), start=2):
-        if not any(row):
-            continue
-        
-        contenido = dict(zip(headers_contenidos, row))
-        disco_nombre = contenido.pop('disco_nombre', None)
-        
-        if not disco_nombre:
-            orphaned_contents.append({
-                'row': row_idx,
-                'reason': 'disco_nombre vacío',
-                'data': contenido
-            })
-            continue
-        
-        # Normalizar el nombre del disco para búsqueda (trim + lowercase)
-        disco_nombre_normalizado = str(disco_nombre).strip().lower()
-        
-        print(f"DEBUG - Buscando disco: '{disco_nombre}' (normalizado: '{disco_nombre_normalizado}')")
-        
-        # Buscar el disco usando el nombre normalizado
-        disco_match = disco_map.get(disco_nombre_normalizado)
-        
-        if disco_match:
-            # Convertir fecha a string si es datetime
-            if isinstance(contenido.get('fecha_modificacion'), datetime):
-                contenido['fecha_modificacion'] = contenido['fecha_modificacion'].strftime('%Y-%m-%d')
-            disco_match['contenidos'].append(contenido)
-            print(f"DEBUG - ✓ Contenido asociado al disco '{disco_match.get('nombre')}'")
-        else:
-            orphaned_contents.append({
-                'row': row_idx,
-                'reason': f'Disco "{disco_nombre}" no encontrado en la hoja Disco',
-                'data': contenido
-            })
-            print(f"DEBUG - ✗ No se encontró disco para '{disco_nombre}'")
-    
-    # Si hay contenidos huérfanos, mostrar detalles
-    if orphaned_contents:
-        print(f"\n⚠️  Advertencia: {len(orphaned_contents)} contenido(s) no pudieron asociarse:")
-        for orphan in orphaned_contents:
-            print(f"  - Fila {orphan['row']}: {orphan['reason']}")
-    
-    return discos_data
+    discos = discos.order_by('nombre')
+    contenidos = (
+        ContenidoDisco.objects
+        .filter(disco_id__in=discos.order_by().values('pk'))
+        .order_by('disco__nombre', 'pk')
+    )
+    return [
+        Hoja('Disco', DISCO_FIELDS, lambda: filas_de(discos, *DISCO_FIELDS), color="3699FF"),
+        Hoja(
+            'Contenidos',
+            ['disco_nombre'] + CONTENIDO_FIELDS,
+            lambda: filas_de(contenidos, 'disco__nombre', *CONTENIDO_FIELDS),
+            color="0BB783",
+        ),
+    ]
 
 
-def validate_import_data(discos_data):
+def validate_disco_row(disco, idx):
     """
-    Valida la estructura básica de los datos importados.
+    Valida la estructura básica de una fila de la hoja Disco.
     Retorna lista de errores si los hay.
     """
     errors = []
-    
-    # Validar que haya al menos un disco
-    if not discos_data or len(discos_data) == 0:
+
+    # Validar campos requeridos
+    if not disco.get('nombre'):
         errors.append({
-            'row': 2,
+            'row': idx,
             'sheet': 'Disco',
-            'field': 'general',
-            'message': 'No se encontraron discos para importar. La hoja "Disco" está vacía o solo contiene headers.'
+            'field': 'nombre',
+            'message': 'El nombre es obligatorio'
         })
-        return errors
-    
-    for idx, disco in enumerate(discos_data, start=2):  # start=2 porque row 1 es header
-        # Validar campos requeridos
-        if not disco.get('nombre'):
-            errors.append({
-                'row': idx,
-                'sheet': 'Disco',
-                'field': 'nombre',
-                'message': 'El nombre es obligatorio'
-            })
-        
-        if not disco.get('tipo'):
+
+    if not disco.get('tipo'):
+        errors.append({
+            'row': idx,
+            'sheet': 'Disco',
+            'field': 'tipo',
+            'message': 'El tipo es obligatorio'
+        })
+    elif disco['tipo'] not in ['HDD', 'SSD', 'CD/DVD', 'OTRO']:
+        errors.append({
+            'row': idx,
+            'sheet': 'Disco',
+            'field': 'tipo',
+            'message': f"Tipo inválido. Debe ser: HDD, SSD, CD/DVD o OTRO"
+        })
+
+    if not disco.get('tamanio_gb'):
+        errors.append({
+            'row': idx,
+            'sheet': 'Disco',
+            'field': 'tamanio_gb',
+            'message': 'El tamaño es obligatorio'
+        })
+    elif not isinstance(disco['tamanio_gb'], (int, float)) or disco['tamanio_gb'] <= 0:
+        errors.append({
+            'row': idx,
+            'sheet': 'Disco',
+            'field': 'tamanio_gb',
+            'message': 'El tamaño debe ser un número positivo'
+        })
+
+    # Validar estado (opcional, con valor por defecto)
+    if disco.get('estado'):
+        if disco['estado'] not in ['BUENO', 'EN_RIESGO', 'DANADO']:
             errors.append({
                 'row': idx,
                 'sheet': 'Disco',
-                'field': 'tipo',
-                'message': 'El tipo es obligatorio'
+                'field': 'estado',
+                'message': 'Estado inválido. Debe ser: BUENO, EN_RIESGO o DANADO'
             })
-        elif disco['tipo'] not in ['HDD', 'SSD', 'CD/DVD', 'OTRO']:
-            errors.append({
-                'row': idx,
+    else:
+        # Si no viene en el Excel, asignar valor por defecto
+        disco['estado'] = 'BUENO'
+
+    return errors
+
+
+def import_discos(file, chunk_size=TAMANIO_LOTE, progress=None):
+    """
+    Importa discos y sus contenidos desde un archivo Excel leído en streaming.
+
+    La hoja Disco (pocas filas) se valida completa y se crea con bulk_create.
+    La hoja Contenidos se recorre por lotes: cada contenido se asocia a su disco
+    por nombre normalizado (trim + minúsculas) y se inserta con bulk_create.
+    Al final se recalculan los agregados de uso de los discos creados.
+    `progress(procesadas, total_estimado)` se invoca después de cada lote.
+
+    Cada lote se confirma por separado para que el avance sea visible mientras
+    tanto; si la importación falla a mitad de camino se eliminan los discos
+    creados (y con ellos sus contenidos) antes de propagar el error.
+
+    Retorna un diccionario con los contadores y los errores por fila.
+    """
+    result = {'created': 0, 'total': 0, 'contenidos': 0, 'filas': 0, 'errors': []}
+
+    wb = abrir_libro(file)
+    try:
+        # Verificar que existan las hojas requeridas
+        if "Disco" not in wb.sheetnames:
+            raise ValueError("El archivo debe contener una hoja llamada 'Disco'")
+        if "Contenidos" not in wb.sheetnames:
+            raise ValueError("El archivo debe contener una hoja llamada 'Contenidos'")
+
+        total_estimado = (contar_filas(wb["Disco"]) or 0) + (contar_filas(wb["Contenidos"]) or 0)
+        discos = _import_discos_sheet(wb["Disco"], result)
+        procesadas = result['filas'] = result['total']
+        if result['total'] == 0:
+            result['errors'].append({
+                'row': 2,
                 'sheet': 'Disco',
-                'field': 'tipo',
-                'message': f"Tipo inválido. Debe ser: HDD, SSD, CD/DVD o OTRO"
+                'field': 'general',
+                'message': 'No se encontraron discos para importar. La hoja "Disco" está vacía o solo contiene headers.'
             })
-        
-        if not disco.get('tamanio_gb'):
-            errors.append({
+            return result
+
+        discos_ids = [d.pk for d in discos.values() if d is not None]
+        try:
+            for lote in en_lotes(iterar_filas(wb["Contenidos"]), chunk_size):
+                _import_contenidos_chunk(lote, discos, result)
+                procesadas += len(lote)
+                result['filas'] = procesadas
+                logger.debug('importacion.lote', extra={
+                    'hoja': 'Contenidos', 'procesadas': procesadas, 'contenidos': result['contenidos'], 'errores': len(result['errors'])
+                })
+                if progress:
+                    progress(procesadas, total_estimado or None)
+        except Exception:
+            logger.warning('importacion.revertida', extra={'hoja': 'Contenidos', 'discos': len(discos_ids), 'procesadas': procesadas})
+            Disco.objects.filter(pk__in=discos_ids).delete()
+            raise
+    finally:
+        wb.close()
+
+    Disco.objects.filter(pk__in=discos_ids).recalcular_uso()
+    discos_actualizados.send(sender=Disco, discos_ids=discos_ids)
+    return result
+
+
+def _import_discos_sheet(ws, result):
+    """
+    Crea los discos de la hoja Disco y retorna el mapa nombre normalizado -> Disco
+    (None si la fila del disco tuvo errores).
+    """
+    filas = []
+    for idx, disco in iterar_filas(ws):
+        # Normalizar el nombre del disco (trim whitespace)
+        if disco.get('nombre'):
+            disco['nombre'] = str(disco['nombre']).strip()
+        if disco.get('descripcion') is None:
+            disco['descripcion'] = ''
+        filas.append((idx, disco))
+    result['total'] = len(filas)
+
+    nombres_existentes = set(
+        Disco.objects.filter(nombre__in=[d['nombre'] for _, d in filas if d.get('nombre')])
+        .values_list('nombre', flat=True)
+    )
+
+    discos = {}
+    for idx, disco in filas:
+        row_errors = validate_disco_row(disco, idx)
+        if not row_errors:
+            limpio, row_errors = limpiar_campos(Disco, disco, DISCO_FIELDS, idx, 'Disco')
+        nombre_normalizado = str(disco.get('nombre') or '').lower()
+        if not row_errors and (disco['nombre'] in nombres_existentes or discos.get(nombre_normalizado)):
+            row_errors.append({
                 'row': idx,
                 'sheet': 'Disco',
-                'field': 'tamanio_gb',
-                'message': 'El tamaño es obligatorio'
+                'field': 'nombre',
+                'message': 'Ya existe un disco con este nombre.'
             })
-        elif not isinstance(disco['tamanio_gb'], (int, float)) or disco['tamanio_gb'] <= 0:
-            errors.append({
+
+        if row_errors:
+            result['errors'].extend(row_errors)
+            discos.setdefault(nombre_normalizado, None)
+            continue
+
+        discos[nombre_normalizado] = Disco(**limpio)
+
+    with transaction.atomic():
+        creados = Disco.objects.bulk_create(d for d in discos.values() if d is not None)
+    result['created'] = len(creados)
+    return discos
+
+
+def _import_contenidos_chunk(lote, discos, result):
+    contenidos = []
+    for idx, contenido in lote:
+        disco_nombre = contenido.pop('disco_nombre', None)
+        # Normalizar el nombre del disco para búsqueda (trim + lowercase)
+        nombre_normalizado = str(disco_nombre).strip().lower() if disco_nombre else ''
+
+        if not disco_nombre:
+            message = 'disco_nombre vacío'
+        elif nombre_normalizado not in discos:
+            message = f'Disco "{disco_nombre}" no encontrado en la hoja Disco'
+        elif discos[nombre_normalizado] is None:
+            message = f'El disco "{disco_nombre}" no se importó por errores en la hoja Disco'
+        else:
+            message = None
+
+        if message:
+            result['errors'].append({
                 'row': idx,
-                'sheet': 'Disco',
-                'field': 'tamanio_gb',
-                'message': 'El tamaño debe ser un número positivo'
+                'sheet': 'Contenidos',
+                'field': 'disco_nombre',
+                'message': message
             })
-        
-        # Validar estado (opcional, con valor por defecto)
-        if disco.get('estado'):
-            if disco['estado'] not in ['BUENO', 'EN_RIESGO', 'DANADO']:
-                errors.append({
-                    'row': idx,
-                    'sheet': 'Disco',
-                    'field': 'estado',
-                    'message': 'Estado inválido. Debe ser: BUENO, EN_RIESGO o DANADO'
-                })
-        else:
-            # Si no viene en el Excel, asignar valor por defecto
-            disco['estado'] = 'BUENO'
-    
-    return errors
+            continue
+
+        limpio, row_errors = limpiar_campos(ContenidoDisco, contenido, CONTENIDO_FIELDS, idx, 'Contenidos')
+        if row_errors:
+            result['errors'].extend(row_errors)
+            continue
+        contenidos.append(ContenidoDisco(disco=discos[nombre_normalizado], **limpio))
+
+    with transaction.atomic():
+        ContenidoDisco.objects.bulk_create(contenidos)
+    result['contenidos'] += len(contenidos)
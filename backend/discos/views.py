@@ -1,37 +1,124 @@
+import logging
 import os
 import shutil
-from datetime import datetime
+import time
+from decimal import Decimal, InvalidOperation
 
-from rest_framework import viewsets, filters, status
+from rest_framework import generics, viewsets, filters, status
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 import django_filters.rest_framework
+from django.conf import settings
 
-from .models import Disco, ContenidoDisco
-from .serializers import DiscoSerializer, ContenidoDiscoSerializer
-from .filters import DiscoFilter
+from gestor_areas_project.exportacion import ExportarMixin
+from importaciones.views import CrearTrabajoImportacionView, TrabajoImportacionDetailView
 
+from .models import Disco, ContenidoDisco, GrupoDuplicado
+from .serializers import DiscoSerializer, ContenidoDiscoSerializer, GrupoDuplicadoSerializer
+from .catalogo import indexar_disco
+from .busqueda import LARGO_MINIMO, LIMITE_MAXIMO, LIMITE_POR_DEFECTO, buscar
+from .duplicados import resumen_duplicados
+from .filters import DiscoFilter, DiscoSearchFilter
+from .migracion import ESTADOS_A_EVACUAR, ConflictoMigracion, aplicar_plan, mover_contenidos, planificar_consolidacion
+from .scanner import escanear_directorio
 
-class DiscoViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+
+class DiscoViewSet(ExportarMixin, viewsets.ModelViewSet):
     queryset = Disco.objects.all().order_by('nombre').distinct()
     serializer_class = DiscoSerializer
-    filter_backends = [django_filters.rest_framework.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [django_filters.rest_framework.DjangoFilterBackend, DiscoSearchFilter, filters.OrderingFilter]
     filterset_class = DiscoFilter
-    search_fields = ['nombre', 'descripcion', 'contenidos__nombre']
+    # DiscoSearchFilter agrega la búsqueda en los nombres de los contenidos
+    search_fields = ['nombre', 'descripcion']
     ordering_fields = ['nombre', 'tipo', 'tamanio_gb']
+    ordering = ['nombre']
+    nombre_exportacion = 'discos'
+    # Discos y, si se incluyen, sus contenidos
+    presupuesto_consultas = {'list': 2, 'retrieve': 2}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Los contenidos anidados solo se cargan cuando la respuesta los va a incluir
+        if self.action == 'export':
+            return queryset
+        if self.action != 'list' or DiscoSerializer.campo_expandido(self.request, 'contenidos'):
+            queryset = queryset.prefetch_related('contenidos')
+        return queryset
+
+    def hojas_exportacion(self, queryset):
+        from .utils import export_sheets
+        return export_sheets(queryset)
+
+    @action(detail=True, methods=['post'])
+    def reindexar(self, request, pk=None):
+        """
+        Reescanea el disco montado en `path` contra su catálogo de archivos y actualiza
+        solo los contenidos que cambiaron. Con `hash: true` se calcula el hash de los
+        archivos nuevos o modificados, dentro de ESCANEO_TIEMPO_MAX y ESCANEO_MAX_HASHES:
+        si quedan archivos sin hash (`hash_pendientes`) se retoman en el próximo reindexado.
+        """
+        disco = self.get_object()
+        ruta = (request.data.get('path') or '').strip('"').strip("'")
+        if not ruta:
+            return Response({"error": "Se requiere la 'path' donde está montado el disco."}, status=status.HTTP_400_BAD_REQUEST)
+        if not os.path.isdir(ruta):
+            return Response({"error": f"La ruta '{ruta}' no es un directorio válido."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = indexar_disco(
+                disco,
+                ruta,
+                calcular_hash=bool(request.data.get('hash', False)),
+                tiempo_max=settings.ESCANEO_TIEMPO_MAX,
+                workers=settings.ESCANEO_WORKERS,
+                max_hashes=settings.ESCANEO_MAX_HASHES,
+            )
+        except Exception as e:
+            logger.exception('indexacion.fallida', extra={'disco': disco.pk, 'ruta': ruta})
+            return Response(
+                {"error": f"Error al reindexar el disco: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        disco.refresh_from_db()
+        resultado['disco'] = DiscoSerializer(disco, context={'request': request}).data
+        return Response(resultado, status=status.HTTP_200_OK)
 
 
 class ContenidoDiscoViewSet(viewsets.ModelViewSet):
     serializer_class = ContenidoDiscoSerializer
+    presupuesto_consultas = {'list': 1, 'retrieve': 1}
 
     def get_queryset(self):
         return ContenidoDisco.objects.filter(disco_id=self.kwargs['disco_pk'])
 
 
+def _parametro_entero(request, nombre, defecto):
+    """
+    Lee un parámetro entero positivo de la query string; si falta o es inválido usa el valor por defecto.
+    """
+    try:
+        valor = int(request.query_params.get(nombre, defecto))
+    except (TypeError, ValueError):
+        return defecto
+    return valor if valor > 0 else defecto
+
+
 class DiscoScanView(APIView):
+    """
+    Escanea un directorio del servidor y sugiere los contenidos de primer nivel
+    con el tamaño real de cada carpeta.
+
+    Parámetros: `path` (obligatorio), `max_profundidad` y `max_archivos` para acotar
+    el recorrido. Si se alcanza algún límite la respuesta indica `truncado: true`
+    y los tamaños corresponden a lo recorrido hasta ese punto.
+    """
     def get(self, request, *args, **kwargs):
         path_to_scan = request.query_params.get('path')
-        print(f"DEBUG: Intento de escaneo de ruta: '{path_to_scan}'")
+        logger.debug('escaneo.solicitado', extra={'ruta': path_to_scan})
 
         if not path_to_scan:
             return Response({"error": "Se requiere la 'path' del directorio a escanear."}, status=status.HTTP_400_BAD_REQUEST)
@@ -46,13 +133,13 @@ class DiscoScanView(APIView):
         # Diagnóstico de visibilidad
         try:
             abs_path = os.path.abspath(path_to_scan)
-            print(f"DEBUG: Ruta absoluta calculada: '{abs_path}'")
-            
+            logger.debug('escaneo.ruta_absoluta', extra={'ruta': path_to_scan, 'ruta_absoluta': abs_path})
+
             if not os.path.exists(path_to_scan):
                 import string
                 drives = ['%s:\\' % d for d in string.ascii_uppercase if os.path.exists('%s:\\' % d)]
                 error_msg = f"La ruta '{path_to_scan}' no existe para el servidor. Unidades detectadas: {', '.join(drives)}"
-                print(f"DEBUG ERROR: {error_msg}")
+                logger.warning('escaneo.ruta_inexistente', extra={'ruta': path_to_scan, 'unidades': drives})
                 return Response({"error": error_msg}, status=status.HTTP_400_BAD_REQUEST)
 
             if not os.path.isdir(path_to_scan):
@@ -61,7 +148,7 @@ class DiscoScanView(APIView):
                 
         except Exception as e:
             error_msg = f"Error de acceso a la ruta: {str(e)}"
-            print(f"DEBUG ERROR: {error_msg}")
+            logger.warning('escaneo.error_acceso', extra={'ruta': path_to_scan, 'error': str(e)})
             return Response({"error": error_msg}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -73,50 +160,138 @@ class DiscoScanView(APIView):
             # El tamaño del disco ya no se calcula automáticamente, se establece en 0.
             suggested_size_gb = 0.0
 
-            scanned_contents_data = []
-            # Se mantiene el escaneo del contenido del directorio
-            for item_name in os.listdir(path_to_scan):
-                if item_name.startswith('.') or item_name.startswith('$'):
-                    continue
-
-                try:
-                    item_path = os.path.join(path_to_scan, item_name)
-                    mod_timestamp = os.path.getmtime(item_path)
-                    mod_date = datetime.fromtimestamp(mod_timestamp).date()
-                    
-                    if os.path.isfile(item_path):
-                        size_bytes = os.path.getsize(item_path)
-                        size_gb = round(size_bytes / (1024**3), 2)
-                        
-                        scanned_contents_data.append({
-                            "nombre": item_name,
-                            "fecha_modificacion": mod_date.strftime('%Y-%m-%d'),
-                            "peso_gb": size_gb,
-                        })
-                    elif os.path.isdir(item_path):
-                        scanned_contents_data.append({
-                            "nombre": item_name,
-                            "fecha_modificacion": mod_date.strftime('%Y-%m-%d'),
-                            "peso_gb": 0.0,
-                        })
-                except OSError:
-                    continue
-            
+            inicio = time.monotonic()
+            escaneo = escanear_directorio(
+                path_to_scan,
+                max_profundidad=_parametro_entero(request, 'max_profundidad', settings.ESCANEO_MAX_PROFUNDIDAD),
+                max_archivos=_parametro_entero(request, 'max_archivos', settings.ESCANEO_MAX_ARCHIVOS),
+                tiempo_max=settings.ESCANEO_TIEMPO_MAX,
+                workers=settings.ESCANEO_WORKERS,
+            )
+            logger.info('escaneo.completado', extra={
+                'ruta': path_to_scan,
+                'contenidos': len(escaneo["contenidos"]),
+                'archivos_escaneados': escaneo["archivos_escaneados"],
+                'truncado': escaneo["truncado"],
+                'duracion_s': round(time.monotonic() - inicio, 3),
+            })
+
             response_data = {
-                "contenidos": scanned_contents_data,
+                "contenidos": escaneo["contenidos"],
                 "nombre_sugerido": suggested_name,
-                "tamanio_gb_sugerido": suggested_size_gb
+                "tamanio_gb_sugerido": suggested_size_gb,
+                "archivos_escaneados": escaneo["archivos_escaneados"],
+                "truncado": escaneo["truncado"],
             }
             
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
+            logger.exception('escaneo.fallido', extra={'ruta': path_to_scan})
             return Response(
                 {"error": f"Error al procesar el escaneo: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
+class DiscoSearchView(APIView):
+    """
+    Búsqueda de texto sobre discos y contenidos, con resultados ordenados por relevancia.
+
+    Parámetros: `q` (al menos 3 caracteres) y `limit` (por defecto 20, máximo 100).
+    """
+    def get(self, request):
+        texto = request.query_params.get('q', '').strip()
+        if len(texto) < LARGO_MINIMO:
+            return Response(
+                {"error": f"La búsqueda requiere al menos {LARGO_MINIMO} caracteres."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limite = min(_parametro_entero(request, 'limit', LIMITE_POR_DEFECTO), LIMITE_MAXIMO)
+        resultados = buscar(texto, limite)
+        return Response({"query": texto, "count": len(resultados), "results": resultados}, status=status.HTTP_200_OK)
+
+
+class DuplicadosView(generics.ListAPIView):
+    """
+    Reporte de contenidos duplicados entre discos y GB recuperables por par de discos,
+    leído de los grupos que mantiene discos.duplicados.
+
+    Los grupos se paginan por GB recuperables (`page_size`, por defecto 50); la
+    respuesta agrega `total_grupos`, `total_recuperable_gb` y `pares`. El parámetro
+    `disco` (IDs separados por coma) limita el reporte a los grupos y pares de esos discos.
+    """
+    serializer_class = GrupoDuplicadoSerializer
+    ordering = ['-recuperable_gb', '-id']
+    # Página de grupos, totales y pares con los nombres de sus discos
+    presupuesto_consultas = {'get': 3}
+
+    def get_queryset(self):
+        grupos = GrupoDuplicado.objects.all()
+        if self.discos_ids:
+            grupos = grupos.filter(pk__in=GrupoDuplicado.discos.through.objects.filter(
+                disco_id__in=self.discos_ids,
+            ).values('grupoduplicado_id'))
+        return grupos
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.discos_ids = [int(valor) for valor in request.query_params.get('disco', '').split(',') if valor.strip()]
+        except ValueError:
+            return Response({"error": "'disco' debe ser una lista de IDs separados por coma."}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = super().list(request, *args, **kwargs)
+        response.data.update(resumen_duplicados(self.get_queryset(), self.discos_ids))
+        return response
+
+
+class ConsolidacionView(APIView):
+    """
+    Planifica (y opcionalmente aplica) la evacuación de discos hacia otros con espacio.
+
+    Cuerpo:
+    - `origenes`: IDs de discos a evacuar. Si no se indican se usan los discos en `estados`
+      (por defecto EN_RIESGO y DANADO).
+    - `destinos`: IDs de discos destino (por defecto todos los discos en estado BUENO).
+    - `reserva_gb`: espacio a dejar libre en cada destino.
+    - `aplicar`: si es verdadero se ejecuta el plan en una sola transacción.
+    - `parcial`: permite aplicar el plan aunque haya contenidos que no entran en ningún disco.
+    """
+    def post(self, request):
+        try:
+            origenes = [int(pk) for pk in request.data.get('origenes') or []]
+            destinos = [int(pk) for pk in request.data.get('destinos') or []]
+            reserva_gb = Decimal(str(request.data.get('reserva_gb') or '0'))
+        except (TypeError, ValueError, InvalidOperation):
+            return Response(
+                {"error": "'origenes' y 'destinos' deben ser listas de IDs y 'reserva_gb' un número."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not origenes:
+            estados = request.data.get('estados') or ESTADOS_A_EVACUAR
+            origenes = list(Disco.objects.filter(estado__in=estados).values_list('pk', flat=True))
+        if not origenes:
+            return Response({"error": "No hay discos para evacuar."}, status=status.HTTP_400_BAD_REQUEST)
+
+        plan = planificar_consolidacion(origenes, destinos, reserva_gb)
+        plan['aplicado'] = False
+
+        if request.data.get('aplicar'):
+            if plan['sin_ubicar'] and not request.data.get('parcial'):
+                return Response(
+                    {"error": f"{len(plan['sin_ubicar'])} contenido(s) no entran en ningún disco destino.", **plan},
+                    status=status.HTTP_409_CONFLICT
+                )
+            try:
+                plan['movidos'] = aplicar_plan(plan)
+            except ConflictoMigracion as e:
+                return Response({"error": str(e), **plan}, status=status.HTTP_409_CONFLICT)
+            plan['aplicado'] = True
+
+        return Response(plan, status=status.HTTP_200_OK)
+
+
 class ExportTemplateView(APIView):
     """
     Vista para descargar plantilla Excel vacía para importar discos.
@@ -142,173 +317,95 @@ class ExportTemplateView(APIView):
             )
 
 
-class ImportDataView(APIView):
+class ImportDataView(CrearTrabajoImportacionView):
     """
     Vista para importar datos de discos desde archivo Excel.
+    El archivo se procesa en segundo plano; el avance se consulta en ImportJobView.
     """
-    def post(self, request):
-        from .utils import parse_excel_import, validate_import_data
-        from .models import Disco, ContenidoDisco
-        from .serializers import DiscoSerializer
-        
-        if 'file' not in request.FILES:
-            return Response(
-                {"error": "No se recibió ningún archivo"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        file = request.FILES['file']
-        
-        # Validar extensión
-        if not file.name.endswith('.xlsx'):
-            return Response(
-                {"error": "El archivo debe ser un Excel (.xlsx)"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        try:
-            # Parsear archivo
-            discos_data = parse_excel_import(file)
-            
-            # Validar estructura básica
-            validation_errors = validate_import_data(discos_data)
-            if validation_errors:
-                return Response({
-                    "success": False,
-                    "created": 0,
-                    "errors": validation_errors
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Procesar cada disco
-            created_count = 0
-            errors = []
-            
-            for idx, disco_data in enumerate(discos_data, start=2):
-                try:
-                    # Debug: Verificar si los contenidos están presentes
-                    print(f"DEBUG - Procesando disco: {disco_data.get('nombre')}")
-                    print(f"DEBUG - Contenidos recibidos: {len(disco_data.get('contenidos', []))} items")
-                    
-                    serializer = DiscoSerializer(data=disco_data)
-                    if serializer.is_valid():
-                        disco_instance = serializer.save()
-                        print(f"DEBUG - Disco creado con ID: {disco_instance.id}")
-                        print(f"DEBUG - Contenidos guardados: {disco_instance.contenidos.count()}")
-                        created_count += 1
-                    else:
-                        # Agregar errores de validación del serializer
-                        print(f"DEBUG - Errores de validación: {serializer.errors}")
-                        for field, messages in serializer.errors.items():
-                            errors.append({
-                                'row': idx,
-                                'sheet': 'Disco',
-                                'field': field,
-                                'message': ' '.join(messages) if isinstance(messages, list) else str(messages)
-                            })
-                except Exception as e:
-                    print(f"DEBUG - Excepción al procesar disco: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-                    errors.append({
-                        'row': idx,
-                        'sheet': 'Disco',
-                        'field': 'general',
-                        'message': str(e)
-                    })
-            
-            return Response({
-                "success": len(errors) == 0,
-                "created": created_count,
-                "total": len(discos_data),
-                "errors": errors
-            }, status=status.HTTP_200_OK if len(errors) == 0 else status.HTTP_207_MULTI_STATUS)
-            
-        except ValueError as e:
-            return Response(
-                {"error": str(e)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        except Exception as e:
-            return Response(
-                {"error": f"Error al procesar archivo: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    tipo = 'DISCOS'
 
 
+class ImportJobView(TrabajoImportacionDetailView):
+    """
+    Vista para consultar el avance de una importación de discos.
+    """
+    tipo = 'DISCOS'
+
 class MigrateContentView(APIView):
     """
-    Vista para migrar un contenido de un disco a otro.
+    Vista para migrar contenidos de un disco a otro.
+
+    - `contenidos/<id>/migrate/` migra un contenido.
+    - `contenidos/migrate/` migra varios: {"contenido_ids": [...], "disco_destino_id": ...}.
+
+    Los contenidos conservan su id: se reasigna su disco en una sola transacción, con
+    los discos bloqueados y el espacio del destino verificado en la base de datos.
     """
-    def post(self, request, contenido_id):
+    def post(self, request, contenido_id=None):
         disco_destino_id = request.data.get('disco_destino_id')
-        
+
         if not disco_destino_id:
             return Response(
                 {"error": "Se requiere 'disco_destino_id'."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
+
+        try:
+            ids = [contenido_id] if contenido_id is not None else [int(pk) for pk in request.data.get('contenido_ids') or []]
+        except (TypeError, ValueError):
+            return Response({"error": "'contenido_ids' debe ser una lista de IDs."}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({"error": "Se requiere 'contenido_ids'."}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            # Obtener el contenido a migrar
-            contenido = ContenidoDisco.objects.get(id=contenido_id)
-            disco_origen = contenido.disco
-            
-            # Obtener el disco destino
             disco_destino = Disco.objects.get(id=disco_destino_id)
-            
-            # Validar que no sea el mismo disco
-            if disco_origen.id == disco_destino.id:
+            contenidos = {
+                pk: (disco_id, nombre)
+                for pk, disco_id, nombre in ContenidoDisco.objects.filter(pk__in=ids).values_list('pk', 'disco_id', 'nombre')
+            }
+            if len(contenidos) != len(set(ids)):
                 return Response(
-                    {"error": "No se puede migrar contenido al mismo disco."},
-                    status=status.HTTP_400_BAD_REQUEST
+                    {"error": "El contenido especificado no existe."},
+                    status=status.HTTP_404_NOT_FOUND
                 )
-            
-            # Calcular espacio libre del disco destino
-            espacio_usado_destino = sum(c.peso_gb for c in disco_destino.contenidos.all())
-            espacio_libre_destino = disco_destino.tamanio_gb - espacio_usado_destino
-            
-            # Validar que hay espacio suficiente
-            if contenido.peso_gb > espacio_libre_destino:
+
+            # Validar que no sea el mismo disco
+            origenes = {pk: disco_id for pk, (disco_id, _) in contenidos.items()}
+            if all(disco_id == disco_destino.id for disco_id in origenes.values()):
                 return Response(
-                    {
-                        "error": f"Espacio insuficiente. El disco destino tiene {espacio_libre_destino:.2f} GB libres, pero el contenido requiere {contenido.peso_gb:.2f} GB."
-                    },
+                    {"error": "No se puede migrar contenido al mismo disco."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            # Guardar datos del contenido
-            contenido_data = {
-                'nombre': contenido.nombre,
-                'fecha_modificacion': contenido.fecha_modificacion,
-                'peso_gb': contenido.peso_gb
-            }
-            
-            # Eliminar contenido del disco origen
-            contenido.delete()
-            
-            # Crear contenido en disco destino
-            ContenidoDisco.objects.create(
-                disco=disco_destino,
-                **contenido_data
-            )
-            
-            # Serializar ambos discos actualizados
-            disco_origen_serializer = DiscoSerializer(disco_origen)
-            disco_destino_serializer = DiscoSerializer(disco_destino)
-            
+
+            try:
+                movidos = mover_contenidos({disco_destino.id: ids}, origenes)
+            except ConflictoMigracion as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Serializar los discos actualizados (los agregados de uso cambiaron en la BD)
+            discos = Disco.objects.in_bulk(set(origenes.values()) | {disco_destino.id})
+            discos_origen = [
+                DiscoSerializer(discos[disco_id]).data
+                for disco_id in sorted(set(origenes.values()) - {disco_destino.id})
+            ]
+
+            if contenido_id is not None:
+                return Response({
+                    "success": True,
+                    "message": f"Contenido '{contenidos[contenido_id][1]}' migrado exitosamente.",
+                    "disco_origen": discos_origen[0],
+                    "disco_destino": DiscoSerializer(discos[disco_destino.id]).data
+                }, status=status.HTTP_200_OK)
+
             return Response({
                 "success": True,
-                "message": f"Contenido '{contenido_data['nombre']}' migrado exitosamente.",
-                "disco_origen": disco_origen_serializer.data,
-                "disco_destino": disco_destino_serializer.data
+                "message": f"{movidos} contenido(s) migrados exitosamente.",
+                "movidos": movidos,
+                "discos_origen": discos_origen,
+                "disco_destino": DiscoSerializer(discos[disco_destino.id]).data
             }, status=status.HTTP_200_OK)
-            
-        except ContenidoDisco.DoesNotExist:
-            return Response(
-                {"error": "El contenido especificado no existe."},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        except Disco.DoesNotExist:
+
+        except (Disco.DoesNotExist, ValueError):
             return Response(
                 {"error": "El disco destino especificado no existe."},
                 status=status.HTTP_404_NOT_FOUND
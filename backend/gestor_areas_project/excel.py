@@ -0,0 +1,86 @@
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import models
+
+# Cantidad de filas que se validan y escriben juntas durante una importación
+TAMANIO_LOTE = 1000
+
+
+def abrir_libro(file):
+    """
+    Abre un archivo Excel en modo streaming (read_only), sin cargar la hoja completa en memoria.
+    """
+    from openpyxl import load_workbook
+
+    try:
+        return load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Error al leer el archivo Excel: {str(e)}")
+
+
+def contar_filas(ws):
+    """
+    Estima la cantidad de filas de datos a partir de la dimensión declarada en la hoja,
+    sin recorrerla. Retorna None si el archivo no declara su dimensión.
+    """
+    if ws.max_row is None:
+        return None
+    return max(ws.max_row - 1, 0)
+
+
+def iterar_filas(ws):
+    """
+    Recorre una hoja fila por fila y genera tuplas (número de fila, dict por encabezado).
+    Las filas vacías se omiten.
+    """
+    filas = ws.iter_rows(values_only=True)
+    encabezados = next(filas, None)
+    if encabezados is None:
+        return
+    encabezados = [str(h).strip() if h is not None else None for h in encabezados]
+
+    for idx, row in enumerate(filas, start=2):
+        if not any(row):
+            continue
+        yield idx, dict(zip(encabezados, row))
+
+
+def en_lotes(iterable, tamanio=TAMANIO_LOTE):
+    """
+    Agrupa un iterable en listas de a lo sumo `tamanio` elementos.
+    """
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamanio)):
+        yield lote
+
+
+def limpiar_campos(model, datos, campos, fila, hoja):
+    """
+    Valida y convierte los valores de `datos` con los campos del modelo, sin consultas a la BD.
+    Retorna (valores limpios, lista de errores con el formato de la importación).
+    """
+    limpio = {}
+    errores = []
+    for nombre in campos:
+        if nombre not in datos:
+            continue
+        valor = datos[nombre]
+        campo = model._meta.get_field(nombre)
+        if isinstance(valor, datetime):
+            valor = valor.date()
+        elif isinstance(valor, float) and isinstance(campo, models.DecimalField):
+            # Excel entrega floats, str() evita arrastrar el error binario (8.2 -> 8.199999...)
+            valor = Decimal(str(valor))
+        try:
+            limpio[nombre] = campo.clean(valor, None)
+        except ValidationError as e:
+            errores.append({
+                'row': fila,
+                'sheet': hoja,
+                'field': nombre,
+                'message': ' '.join(e.messages)
+            })
+    return limpio, errores
@@ -0,0 +1,162 @@
+"""
+Exportación de datasets completos a Excel o CSV con memoria constante.
+
+Las filas se leen de la BD con `iterator(chunk_size=...)` (cursor del lado del
+servidor en PostgreSQL) y nunca se arman listas ni BytesIO con el archivo:
+
+- CSV: StreamingHttpResponse, cada fila se envía al cliente apenas se lee.
+- Excel: openpyxl en modo write_only, que vuelca las filas a disco a medida que
+  se agregan; el .xlsx se arma en un archivo temporal y se envía con FileResponse.
+
+Los encabezados de las hojas coinciden con las plantillas de importación, así un
+archivo exportado se puede volver a importar.
+"""
+import csv
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .excel import en_lotes
+
+# Filas que se leen juntas del cursor de la BD
+TAMANIO_LOTE_EXPORTACION = 2000
+
+FORMATOS = ('xlsx', 'csv')
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+@dataclass
+class Hoja:
+    """
+    Hoja del archivo exportado. `filas` es una función que retorna un iterable de
+    tuplas en el orden de `encabezados` (se llama recién al escribir la hoja).
+    """
+    titulo: str
+    encabezados: Sequence[str]
+    filas: Callable
+    color: Optional[str] = None
+
+
+class _Eco:
+    # csv.writer escribe en un "archivo" que solo devuelve la línea, para enviarla en streaming
+    def write(self, valor):
+        return valor
+
+
+def _valor_excel(valor):
+    # Excel no admite zonas horarias, las fechas se exportan en la hora local del servidor
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return timezone.make_naive(valor)
+    return valor
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ''
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return valor
+
+
+def _lineas_csv(hoja):
+    escritor = csv.writer(_Eco())
+    # BOM para que Excel detecte UTF-8 al abrir el CSV
+    yield '\ufeff' + escritor.writerow(hoja.encabezados)
+    # Se envía un bloque por lote en lugar de una escritura por fila
+    for lote in en_lotes(hoja.filas(), TAMANIO_LOTE_EXPORTACION):
+        yield ''.join(escritor.writerow([_valor_csv(valor) for valor in fila]) for fila in lote)
+
+
+def _escribir_xlsx(hojas, archivo):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    wb = Workbook(write_only=True)
+    for hoja in hojas:
+        ws = wb.create_sheet(title=hoja.titulo)
+        encabezados = []
+        for titulo in hoja.encabezados:
+            celda = WriteOnlyCell(ws, value=titulo)
+            celda.font = Font(bold=True, color="FFFFFF")
+            if hoja.color:
+                celda.fill = PatternFill(start_color=hoja.color, end_color=hoja.color, fill_type="solid")
+            encabezados.append(celda)
+        ws.append(encabezados)
+        for fila in hoja.filas():
+            ws.append([_valor_excel(valor) for valor in fila])
+    wb.save(archivo)
+
+
+def respuesta_exportacion(hojas, nombre, formato='xlsx', hoja=None):
+    """
+    Arma la respuesta de descarga. En CSV se exporta una sola hoja: la indicada por
+    `hoja` (título, sin distinguir mayúsculas) o la primera. Lanza ValueError si el
+    formato o la hoja no existen.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido. Debe ser: {', '.join(FORMATOS)}")
+
+    if formato == 'csv':
+        if hoja:
+            elegidas = [h for h in hojas if h.titulo.lower() == hoja.lower()]
+            if not elegidas:
+                raise ValueError(f"Hoja inválida. Debe ser: {', '.join(h.titulo for h in hojas)}")
+            elegida = elegidas[0]
+        else:
+            elegida = hojas[0]
+        response = StreamingHttpResponse(_lineas_csv(elegida), content_type='text/csv; charset=utf-8')
+        sufijo = f'_{elegida.titulo.lower()}' if len(hojas) > 1 else ''
+        response['Content-Disposition'] = f'attachment; filename="{nombre}{sufijo}.csv"'
+        return response
+
+    # El archivo temporal se borra solo al cerrarlo, cuando FileResponse termina de enviarlo
+    archivo = tempfile.TemporaryFile(suffix='.xlsx')
+    try:
+        _escribir_xlsx(hojas, archivo)
+    except Exception:
+        archivo.close()
+        raise
+    archivo.seek(0)
+    return FileResponse(archivo, as_attachment=True, filename=f'{nombre}.xlsx', content_type=CONTENT_TYPE_XLSX)
+
+
+def filas_de(queryset, *campos):
+    """
+    Itera las filas de `queryset` como tuplas de `campos`, por lotes desde el cursor.
+    """
+    return queryset.values_list(*campos).iterator(chunk_size=TAMANIO_LOTE_EXPORTACION)
+
+
+class ExportarMixin:
+    """
+    Agrega a un ViewSet la acción `export` (GET <recurso>/export/) que descarga el
+    queryset filtrado de la vista, sin paginar. Parámetros: `formato` (xlsx o csv) y
+    `hoja` (en CSV, qué hoja exportar si el archivo tiene varias).
+
+    La vista define `nombre_exportacion` y `hojas_exportacion(queryset)`.
+    """
+    nombre_exportacion = 'exportacion'
+
+    def hojas_exportacion(self, queryset):
+        raise NotImplementedError
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            return respuesta_exportacion(
+                self.hojas_exportacion(queryset),
+                self.nombre_exportacion,
+                formato=request.query_params.get('formato', 'xlsx'),
+                hoja=request.query_params.get('hoja'),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,79 @@
+"""
+Logging estructurado (una línea JSON por evento) con escritura asíncrona.
+
+Los módulos usan `logging.getLogger(__name__)` y registran eventos con un nombre
+corto como mensaje y los datos en `extra`:
+
+    logger.info('importacion.completada', extra={'trabajo': 3, 'creados': 120})
+
+ColaLogHandler solo encola el registro; un hilo (QueueListener) lo formatea como
+JSON y lo escribe. Así los bucles de importación y escaneo no esperan la E/S de
+los logs. Si la cola se llena los registros se descartan en lugar de bloquear.
+La configuración está en settings.LOGGING.
+"""
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Atributos propios de LogRecord; el resto proviene de `extra`
+_ATRIBUTOS_REGISTRO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class FormateadorJSON(logging.Formatter):
+
+    def format(self, record):
+        evento = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_REGISTRO and not clave.startswith('_'):
+                evento[clave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            evento['excepcion'] = record.exc_text
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+class ColaLogHandler(QueueHandler):
+    """
+    Handler que encola los registros para escribirlos en un hilo aparte, en
+    `archivo` o en la salida estándar.
+    """
+
+    def __init__(self, archivo=None, capacidad=10000):
+        super().__init__(queue.Queue(capacidad))
+        destino = logging.FileHandler(archivo, encoding='utf-8') if archivo else logging.StreamHandler(sys.stdout)
+        destino.setFormatter(FormateadorJSON())
+        self.descartados = 0
+        self.listener = QueueListener(self.queue, destino)
+        self.listener.start()
+
+    def prepare(self, record):
+        # El mensaje y la traza se resuelven acá porque args y exc_info pueden referenciar
+        # objetos que cambian después; el JSON lo arma el hilo del listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def close(self):
+        # logging.shutdown() cierra los handlers al salir: se vacía la cola antes de terminar
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
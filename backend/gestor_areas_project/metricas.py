@@ -0,0 +1,243 @@
+"""
+Métricas de rendimiento por solicitud, expuestas en formato de texto de Prometheus.
+
+MetricasMiddleware (ver gestor_areas_project.middleware) registra por vista y método:
+
+- latencia de la solicitud (histograma) y cantidad de solicitudes por código de estado,
+- cantidad de consultas SQL por solicitud (histograma) y tiempo total en SQL,
+- tiempo de serialización (serializadores con CamposDinamicosMixin),
+- bytes de respuesta (salvo respuestas en streaming).
+
+Las métricas viven en memoria del proceso: con varios procesos web cada uno expone
+las suyas y Prometheus las suma al agregarlas por instancia.
+
+Perfilado por muestreo: con METRICAS_PERFIL_MUESTREO > 0 esa fracción de las
+solicitudes se ejecuta bajo cProfile, y si tarda más de METRICAS_PERFIL_UMBRAL
+segundos el perfil se guarda en METRICAS_PERFIL_DIR (archivos .prof para pstats
+o snakeviz). Se perfila una solicitud a la vez por proceso.
+"""
+import cProfile
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+CONTENT_TYPE_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Acumuladores de la solicitud en curso (None fuera de una solicitud)
+_solicitud = ContextVar('metricas_solicitud', default=None)
+
+
+class MedicionSolicitud:
+    __slots__ = ('consultas', 'tiempo_sql', 'serializacion')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.serializacion = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper: cuenta y mide cada consulta
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo_sql += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+def iniciar_solicitud():
+    medicion = MedicionSolicitud()
+    return medicion, _solicitud.set(medicion)
+
+
+def terminar_solicitud(token):
+    _solicitud.reset(token)
+
+
+@contextmanager
+def medir_serializacion():
+    medicion = _solicitud.get()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.serializacion += time.perf_counter() - inicio
+
+
+class _Histograma:
+    __slots__ = ('buckets', 'conteos', 'suma', 'total')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * len(buckets)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.conteos[i] += 1
+                break
+        self.suma += valor
+        self.total += 1
+
+    def acumulados(self):
+        acumulado = 0
+        for limite, conteo in zip(self.buckets, self.conteos):
+            acumulado += conteo
+            yield limite, acumulado
+
+
+class _Vista:
+    __slots__ = ('latencia', 'consultas', 'tiempo_sql', 'serializacion', 'bytes', 'estados')
+
+    def __init__(self):
+        self.latencia = _Histograma(BUCKETS_LATENCIA)
+        self.consultas = _Histograma(BUCKETS_CONSULTAS)
+        self.tiempo_sql = 0.0
+        self.serializacion = 0.0
+        self.bytes = 0
+        self.estados = {}
+
+
+class RegistroMetricas:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vistas = {}
+
+    def registrar(self, vista, metodo, estado, duracion, medicion, bytes_respuesta=None):
+        with self._lock:
+            datos = self._vistas.get((vista, metodo))
+            if datos is None:
+                datos = self._vistas[(vista, metodo)] = _Vista()
+            datos.latencia.observar(duracion)
+            datos.consultas.observar(medicion.consultas)
+            datos.tiempo_sql += medicion.tiempo_sql
+            datos.serializacion += medicion.serializacion
+            if bytes_respuesta is not None:
+                datos.bytes += bytes_respuesta
+            datos.estados[estado] = datos.estados.get(estado, 0) + 1
+
+    def reiniciar(self):
+        with self._lock:
+            self._vistas.clear()
+
+    def exposicion(self):
+        """
+        Texto en formato de exposición de Prometheus.
+        """
+        with self._lock:
+            vistas = sorted(self._vistas.items())
+            lineas = []
+
+            def encabezado(nombre, tipo, ayuda):
+                lineas.append(f'# HELP {nombre} {ayuda}')
+                lineas.append(f'# TYPE {nombre} {tipo}')
+
+            def histograma(nombre, atributo):
+                for (vista, metodo), datos in vistas:
+                    h = getattr(datos, atributo)
+                    etiquetas = _etiquetas(vista=vista, metodo=metodo)
+                    for limite, acumulado in h.acumulados():
+                        lineas.append(f'{nombre}_bucket{{{etiquetas},le="{_numero(limite)}"}} {acumulado}')
+                    lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {h.total}')
+                    lineas.append(f'{nombre}_sum{{{etiquetas}}} {_numero(h.suma)}')
+                    lineas.append(f'{nombre}_count{{{etiquetas}}} {h.total}')
+
+            def contador(nombre, atributo):
+                for (vista, metodo), datos in vistas:
+                    lineas.append(f'{nombre}{{{_etiquetas(vista=vista, metodo=metodo)}}} {_numero(getattr(datos, atributo))}')
+
+            encabezado('http_solicitudes_total', 'counter', 'Solicitudes atendidas por vista, método y código de estado.')
+            for (vista, metodo), datos in vistas:
+                for estado, cantidad in sorted(datos.estados.items()):
+                    lineas.append(f'http_solicitudes_total{{{_etiquetas(vista=vista, metodo=metodo, estado=estado)}}} {cantidad}')
+
+            encabezado('http_solicitud_duracion_segundos', 'histogram', 'Latencia de las solicitudes por vista.')
+            histograma('http_solicitud_duracion_segundos', 'latencia')
+
+            encabezado('http_solicitud_consultas_sql', 'histogram', 'Consultas SQL por solicitud.')
+            histograma('http_solicitud_consultas_sql', 'consultas')
+
+            encabezado('http_sql_segundos_total', 'counter', 'Tiempo total de ejecución de consultas SQL.')
+            contador('http_sql_segundos_total', 'tiempo_sql')
+
+            encabezado('http_serializacion_segundos_total', 'counter', 'Tiempo total en serializadores.')
+            contador('http_serializacion_segundos_total', 'serializacion')
+
+            encabezado('http_respuesta_bytes_total', 'counter', 'Bytes de respuesta enviados (sin respuestas en streaming).')
+            contador('http_respuesta_bytes_total', 'bytes')
+
+        return '\n'.join(lineas) + '\n'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(**valores):
+    return ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in valores.items())
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+registro = RegistroMetricas()
+
+
+class Perfilador:
+    """
+    Perfila una fracción de las solicitudes y guarda los perfiles de las lentas.
+    """
+
+    def __init__(self):
+        self._ocupado = threading.Lock()
+
+    def iniciar(self):
+        muestreo = getattr(settings, 'METRICAS_PERFIL_MUESTREO', 0)
+        if not muestreo or random.random() >= muestreo:
+            return None
+        # cProfile no admite dos perfiles activos a la vez; si hay uno se omite esta solicitud
+        if not self._ocupado.acquire(blocking=False):
+            return None
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            self._ocupado.release()
+            return None
+        return perfil
+
+    def terminar(self, perfil, vista, duracion):
+        try:
+            perfil.disable()
+            if duracion >= getattr(settings, 'METRICAS_PERFIL_UMBRAL', 1.0):
+                directorio = Path(settings.METRICAS_PERFIL_DIR)
+                directorio.mkdir(parents=True, exist_ok=True)
+                marca = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+                nombre = ''.join(c if c.isalnum() or c in '-_' else '_' for c in vista)
+                perfil.dump_stats(directorio / f'{marca}_{nombre}_{int(duracion * 1000)}ms.prof')
+        finally:
+            self._ocupado.release()
+
+
+perfilador = Perfilador()
+
+
+def vista_metricas(request):
+    return HttpResponse(registro.exposicion(), content_type=CONTENT_TYPE_PROMETHEUS)
@@ -0,0 +1,109 @@
+"""
+Middlewares de rendimiento.
+
+MetricasMiddleware mide cada solicitud (latencia, consultas SQL, serialización y
+bytes) y la registra en gestor_areas_project.metricas, expuesto en /api/metrics/.
+
+PresupuestoConsultasMiddleware controla el presupuesto de consultas por endpoint.
+Cada vista declara cuántas consultas SQL puede hacer por solicitud con el atributo
+`presupuesto_consultas`: un entero para todas sus acciones o un diccionario por
+acción (ViewSets: 'list', 'retrieve', acciones extra) o por método HTTP en
+minúsculas (APIViews). Las acciones sin presupuesto no se controlan.
+
+`PresupuestoConsultasMiddleware` cuenta las consultas de cada solicitud y, si se
+excede el presupuesto, registra una advertencia o, con
+PRESUPUESTO_CONSULTAS_ESTRICTO (ver settings y pruebas.ConsultasConstantesMixin),
+lanza PresupuestoConsultasExcedido para que el test falle.
+
+Las respuestas en streaming (ej: exportaciones) consultan la BD después de salir
+del middleware y no se cuentan.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .metricas import iniciar_solicitud, perfilador, registro, terminar_solicitud
+
+logger = logging.getLogger(__name__)
+
+METODOS_HTTP = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class MetricasMiddleware:
+    """
+    Debe ir primero en MIDDLEWARE para que la latencia incluya a los demás middlewares.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inicio = time.perf_counter()
+        perfil = perfilador.iniciar()
+        medicion, token = iniciar_solicitud()
+        try:
+            with connection.execute_wrapper(medicion):
+                response = self.get_response(request)
+        finally:
+            terminar_solicitud(token)
+            duracion = time.perf_counter() - inicio
+            # Las rutas no resueltas se agrupan para no crear una serie por URL
+            coincidencia = request.resolver_match
+            vista = coincidencia.view_name if coincidencia else 'sin_ruta'
+            if perfil is not None:
+                perfilador.terminar(perfil, vista, duracion)
+
+        metodo = request.method if request.method in METODOS_HTTP else 'OTRO'
+        bytes_respuesta = None if response.streaming else len(response.content)
+        registro.registrar(vista, metodo, response.status_code, duracion, medicion, bytes_respuesta)
+        return response
+
+
+class PresupuestoConsultasExcedido(AssertionError):
+    pass
+
+
+def presupuesto_de_vista(view_func, metodo):
+    """
+    Presupuesto declarado por la vista para la solicitud, o None.
+    """
+    vista = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    presupuesto = getattr(vista, 'presupuesto_consultas', None)
+    if not isinstance(presupuesto, dict):
+        return presupuesto
+    acciones = getattr(view_func, 'actions', None)
+    clave = acciones.get(metodo) if acciones else metodo
+    return presupuesto.get(clave)
+
+
+class _Contador:
+    def __init__(self):
+        self.consultas = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.consultas += 1
+        return execute(sql, params, many, context)
+
+
+class PresupuestoConsultasMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = _Contador()
+        with connection.execute_wrapper(contador):
+            response = self.get_response(request)
+
+        presupuesto = getattr(request, '_presupuesto_consultas', None)
+        if presupuesto is not None and contador.consultas > presupuesto:
+            mensaje = f"{request.method} {request.path}: {contador.consultas} consultas, presupuesto {presupuesto}"
+            if getattr(settings, 'PRESUPUESTO_CONSULTAS_ESTRICTO', False):
+                raise PresupuestoConsultasExcedido(mensaje)
+            logger.warning(mensaje)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._presupuesto_consultas = presupuesto_de_vista(view_func, request.method.lower())
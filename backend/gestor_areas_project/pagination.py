@@ -0,0 +1,121 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+def _invertir_orden(ordering):
+    return tuple(campo[1:] if campo.startswith('-') else f'-{campo}' for campo in ordering)
+
+
+def _serializar_valor(valor):
+    # isoformat conserva microsegundos y zona horaria, a diferencia de DjangoJSONEncoder
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return str(valor)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre el orden natural de cada recurso.
+
+    A diferencia de CursorPagination, el cursor guarda la tupla completa de valores
+    del orden (más la clave primaria como desempate), de modo que cada página es
+    un escaneo de rango sobre el índice sin importar cuántas filas compartan el
+    primer campo del orden (ej: 'estado' en mantenimientos).
+
+    El orden se toma del OrderingFilter de la vista, luego de `view.ordering`
+    y por último del `Meta.ordering` del modelo.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        self.ordering = getattr(view, 'ordering', None) or queryset.model._meta.ordering or ('pk',)
+        ordering = super().get_ordering(request, queryset, view)
+        if not any(campo.lstrip('-') in ('pk', 'id') for campo in ordering):
+            ordering += ('-pk' if ordering[-1].startswith('-') else 'pk',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self._decodificar_posicion(self.cursor.position) if self.cursor else None
+
+        ordering = _invertir_orden(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is None:
+            # Se pide un elemento extra para saber si hay más resultados en esa dirección
+            results = list(queryset[:self.page_size + 1])
+        else:
+            # Un cursor bien formado pero alterado puede traer valores que no corresponden
+            # al tipo de cada campo: se responde 404, igual que CursorPagination
+            try:
+                results = list(queryset.filter(self._filtro_keyset(ordering, position))[:self.page_size + 1])
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+        hay_mas = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, hay_mas
+        else:
+            self.has_next, self.has_previous = hay_mas, position is not None
+
+        self.display_page_controls = self.has_previous or self.has_next
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        posicion = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=posicion))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        posicion = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=posicion))
+
+    def _get_position_from_instance(self, instance, ordering):
+        valores = []
+        for campo in ordering:
+            nombre = campo.lstrip('-')
+            valor = instance[nombre] if isinstance(instance, dict) else getattr(instance, nombre)
+            valores.append(_serializar_valor(valor))
+        return json.dumps(valores)
+
+    def _decodificar_posicion(self, posicion):
+        if posicion is None:
+            return None
+        try:
+            valores = json.loads(posicion)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(valores, list) or len(valores) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return valores
+
+    def _filtro_keyset(self, ordering, valores):
+        """
+        Construye (a > x) OR (a = x AND b > y) OR ... respetando la dirección de cada campo.
+        """
+        filtro = Q()
+        iguales = {}
+        for campo, valor in zip(ordering, valores):
+            nombre = campo.lstrip('-')
+            lookup = 'lt' if campo.startswith('-') else 'gt'
+            filtro |= Q(**iguales, **{f'{nombre}__{lookup}': valor})
+            iguales[nombre] = valor
+        return filtro
@@ -0,0 +1,105 @@
+"""
+Utilidades para los tests de rendimiento de los endpoints.
+
+`PlanesConsultaMixin` captura las consultas que hace un endpoint y verifica su
+plan de ejecución (EXPLAIN) en SQLite y PostgreSQL: que la consulta use el índice
+esperado y que no ordene en memoria.
+
+`ConsultasConstantesMixin` verifica que un listado haga las mismas consultas sin
+importar el tamaño de página (sin N+1). Además activa PRESUPUESTO_CONSULTAS_ESTRICTO:
+si una solicitud excede el presupuesto declarado por su vista,
+PresupuestoConsultasMiddleware hace fallar el test.
+"""
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+# Marcas de ordenamiento en memoria en el plan de cada motor
+ORDENAMIENTO_EN_PLAN = {
+    'sqlite': 'TEMP B-TREE',
+    'postgresql': 'Sort Key',
+}
+
+
+def analizar_tablas(*modelos):
+    """
+    Actualiza las estadísticas del planificador luego de sembrar datos en un test.
+    """
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    with connection.cursor() as cursor:
+        for modelo in modelos:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(modelo._meta.db_table)}')
+
+
+class PlanesConsultaMixin:
+    """
+    Mixin para TestCase. `consultas(url)` hace un GET y retorna el SQL ejecutado;
+    `sql_de(queryset)` hace lo mismo para un queryset y `assertUsaIndice(sql, indice)`
+    verifica el plan de esa consulta.
+    """
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor not in ORDENAMIENTO_EN_PLAN:
+            self.skipTest("Planes de consulta verificados solo en PostgreSQL y SQLite.")
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return [consulta['sql'] for consulta in contexto.captured_queries]
+
+    def consulta_de(self, url, tabla):
+        """
+        Primera consulta del endpoint que lee de `tabla` (FROM, no joins).
+        """
+        marca = f'FROM {connection.ops.quote_name(tabla)}'
+        for sql in self.consultas(url):
+            if marca in sql:
+                return sql
+        self.fail(f"{url} no consulta la tabla {tabla}")
+
+    def sql_de(self, queryset):
+        """
+        SQL ejecutable de un queryset (con los parámetros ya interpolados).
+        """
+        with CaptureQueriesContext(connection) as contexto:
+            list(queryset)
+        return contexto.captured_queries[-1]['sql']
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Aun con datos sembrados las tablas de test son chicas y el planificador
+                # podría preferir un seq scan; se desactiva para ver si hay plan indexado
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(str(fila[-1]) for fila in cursor.fetchall())
+
+    def assertUsaIndice(self, sql, indice, ordena=False):
+        plan = self.plan(sql)
+        self.assertIn(indice, plan, f"La consulta no usa {indice}:\n{sql}\n{plan}")
+        if not ordena:
+            self.assertNotIn(ORDENAMIENTO_EN_PLAN[connection.vendor], plan, f"La consulta ordena en memoria:\n{sql}\n{plan}")
+
+
+class ConsultasConstantesMixin:
+
+    def setUp(self):
+        super().setUp()
+        estricto = override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=True)
+        estricto.enable()
+        self.addCleanup(estricto.disable)
+
+    def assertConsultasConstantes(self, url, tamanios=(1, 50)):
+        separador = '&' if '?' in url else '?'
+        conteos = []
+        for tamanio in tamanios:
+            with CaptureQueriesContext(connection) as contexto:
+                response = self.client.get(f'{url}{separador}page_size={tamanio}')
+            self.assertEqual(response.status_code, 200, response.content[:500])
+            conteos.append(len(contexto.captured_queries))
+        self.assertEqual(len(set(conteos)), 1, f"{url}: las consultas dependen del tamaño de página {dict(zip(tamanios, conteos))}")
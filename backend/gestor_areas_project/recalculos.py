@@ -0,0 +1,74 @@
+"""
+Recálculos diferidos al confirmar la transacción, agrupados por transacción.
+
+Las señales de escritura (una por fila) programan el recálculo de las claves
+que afectan; `programar` reúne las de una misma transacción y ejecuta cada
+función una sola vez, con la unión de las claves, al confirmarla. Lo usan las
+tablas acumuladas de reportes y los grupos de duplicados de discos.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+
+class _Recalculos:
+    """
+    Recálculos pendientes de un nivel de la transacción, con las claves acumuladas
+    por función: un conjunto de claves, un Counter de variaciones o None (todas).
+    Se registra una sola vez con on_commit y ejecuta cada función una vez.
+    """
+
+    def __init__(self):
+        self.pendientes = {}
+        self.ejecutado = False
+
+    def agregar(self, funcion, claves, args):
+        clave = (funcion, args)
+        if claves is not None:
+            claves = Counter(claves) if isinstance(claves, dict) else set(claves)
+        if clave not in self.pendientes:
+            self.pendientes[clave] = claves
+        elif self.pendientes[clave] is not None:
+            if claves is None:
+                self.pendientes[clave] = None
+            else:
+                self.pendientes[clave].update(claves)
+
+    def __call__(self):
+        self.ejecutado = True
+        for (funcion, args), claves in self.pendientes.items():
+            _ejecutar(funcion, claves, args)
+
+
+def _ejecutar(funcion, claves, args):
+    if claves is None:
+        funcion(*args)
+    else:
+        funcion(claves, *args)
+
+
+def programar(funcion, claves=None, *args):
+    """
+    Ejecuta `funcion(claves, *args)` al confirmar la transacción en curso (o de
+    inmediato fuera de una). Las llamadas de una misma transacción se reúnen en una
+    sola ejecución con la unión de las claves; sin claves (None) se llama
+    `funcion(*args)`, que recalcula todo.
+    """
+    conexion = transaction.get_connection()
+    if not conexion.in_atomic_block:
+        _ejecutar(funcion, claves, args)
+        return
+    # Se reutiliza el registro del mismo nivel de savepoints: si ese nivel se revierte,
+    # Django descarta el callback y con él las claves de las escrituras revertidas
+    niveles = set(conexion.savepoint_ids)
+    recalculos = next(
+        (
+            callback for sids, callback, _ in conexion.run_on_commit
+            if isinstance(callback, _Recalculos) and not callback.ejecutado and sids == niveles
+        ),
+        None,
+    )
+    if recalculos is None:
+        recalculos = _Recalculos()
+        transaction.on_commit(recalculos)
+    recalculos.agregar(funcion, claves, args)
@@ -0,0 +1,69 @@
+from rest_framework.serializers import ListSerializer, ValidationError
+
+from .metricas import medir_serializacion
+
+
+class CamposDinamicosMixin:
+    """
+    Mixin para serializadores que permite respuestas parciales (sparse fieldsets).
+
+    - `?fields=id,nombre` limita la respuesta a los campos indicados.
+    - Los campos listados en `Meta.expandable_fields` (normalmente relaciones anidadas
+      costosas) se omiten en los listados salvo que se pidan con `?expand=campo`.
+      En el detalle de un recurso siempre se incluyen, y pedirlos en `fields`
+      equivale a expandirlos.
+
+    Los nombres desconocidos en `fields` o `expand` responden 400 en lugar de
+    devolver objetos vacíos o ignorarse en silencio.
+
+    También mide el tiempo de serialización de la solicitud (ver metricas).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+
+        solicitados = self._parametro_lista(request, 'fields')
+        expandidos = self._parametro_lista(request, 'expand')
+        view = self.context.get('view')
+
+        errores = {}
+        if solicitados - set(self.fields):
+            errores['fields'] = [f"Campos desconocidos: {', '.join(sorted(solicitados - set(self.fields)))}."]
+        expandibles = set(getattr(self.Meta, 'expandable_fields', ()))
+        if expandidos - expandibles:
+            errores['expand'] = [f"Campos no expandibles: {', '.join(sorted(expandidos - expandibles))}."]
+        if errores:
+            raise ValidationError(errores)
+
+        if getattr(view, 'action', None) == 'list':
+            for campo in getattr(self.Meta, 'expandable_fields', ()):
+                if campo not in expandidos and campo not in solicitados:
+                    self.fields.pop(campo, None)
+
+        if solicitados:
+            for campo in set(self.fields) - solicitados:
+                self.fields.pop(campo)
+
+    def to_representation(self, instance):
+        # Se mide solo el nivel superior (el objeto o cada fila del listado), no los anidados
+        if self.parent is None or (isinstance(self.parent, ListSerializer) and self.parent.parent is None):
+            with medir_serializacion():
+                return super().to_representation(instance)
+        return super().to_representation(instance)
+
+    @staticmethod
+    def _parametro_lista(request, nombre):
+        valor = request.query_params.get(nombre, '')
+        return {campo.strip() for campo in valor.split(',') if campo.strip()}
+
+    @classmethod
+    def campo_expandido(cls, request, campo):
+        """
+        Indica si un listado incluirá el campo expandible `campo`, útil para
+        decidir en la vista si vale la pena hacer prefetch de la relación.
+        """
+        solicitados = cls._parametro_lista(request, 'fields')
+        return campo in cls._parametro_lista(request, 'expand') or campo in solicitados
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,9 +48,12 @@ INSTALLED_APPS = [
     'reportes',
     'mantenimiento',
     'dashboard',
+    'importaciones',
+    'alertas',
 ]
 
 MIDDLEWARE = [
+    'gestor_areas_project.middleware.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -58,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'gestor_areas_project.middleware.PresupuestoConsultasMiddleware',
 ]
 
 ROOT_URLCONF = 'gestor_areas_project.urls'
@@ -132,10 +137,85 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Archivos subidos (ej: Excel pendientes de importar)
+MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = 'media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Django REST Framework
+# Los listados se paginan por cursor (keyset) sobre el orden natural de cada recurso.
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'gestor_areas_project.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
+# Importaciones en segundo plano: hilos del pool local que procesan los trabajos
+IMPORTACIONES_WORKERS = 2
+# Un trabajo EN_PROCESO sin avances durante este tiempo se da por abandonado (ej: el
+# proceso se reinició) y `procesar_importaciones` lo marca como FALLIDO
+IMPORTACIONES_TIMEOUT = 30 * 60  # segundos
+
+# Escaneo de directorios (DiscoScanView): límites por defecto del recorrido recursivo.
+# Se pueden ajustar por solicitud con ?max_profundidad= y ?max_archivos=
+ESCANEO_MAX_PROFUNDIDAD = 32
+ESCANEO_MAX_ARCHIVOS = 2_000_000
+ESCANEO_TIEMPO_MAX = 120  # segundos
+ESCANEO_WORKERS = 8
+# Archivos hasheados por reindexado desde la API; el resto sigue en el próximo reindexado
+ESCANEO_MAX_HASHES = 20_000
+
+# Programación de mantenimientos preventivos (comando programar_mantenimientos):
+# días hacia adelante que se generan en cada ejecución
+MANTENIMIENTO_HORIZONTE_DIAS = 365
+
+# Alertas (comando generar_alertas): días de anticipación para las garantías por vencer
+ALERTAS_DIAS_GARANTIA = 30
+
+# Caché local del proceso (estadísticas del dashboard). Con varios procesos web
+# conviene un backend compartido (ej: Redis) para que la invalidación llegue a todos.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+DASHBOARD_CACHE_TIMEOUT = 300  # segundos
+
+# Presupuesto de consultas por endpoint (ver gestor_areas_project.middleware): al
+# excederlo se registra una advertencia. En modo estricto se lanza una excepción;
+# lo activan los tests de ConsultasConstantesMixin, y con la variable de entorno
+# PRESUPUESTO_CONSULTAS_ESTRICTO=1 (ej: en CI) todas las solicitudes.
+PRESUPUESTO_CONSULTAS_ESTRICTO = os.environ.get('PRESUPUESTO_CONSULTAS_ESTRICTO') == '1'
+
+# Métricas por solicitud en /api/metrics/ (ver gestor_areas_project.metricas).
+# Perfilado: fracción de solicitudes ejecutadas con cProfile (0 lo desactiva); se
+# guardan los perfiles de las que tardan más que el umbral.
+METRICAS_PERFIL_MUESTREO = 0.0
+METRICAS_PERFIL_UMBRAL = 1.0  # segundos
+METRICAS_PERFIL_DIR = BASE_DIR / 'perfiles'
+
+# Logging: eventos JSON escritos por un hilo aparte (ver gestor_areas_project.logs).
+# LOG_NIVEL aplica a las apps del proyecto; en DEBUG se ven los eventos por lote y por ruta.
+LOG_NIVEL = 'INFO'
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'json': {
+            'class': 'gestor_areas_project.logs.ColaLogHandler',
+        },
+    },
+    'loggers': {
+        app: {'handlers': ['json'], 'level': LOG_NIVEL, 'propagate': False}
+        for app in ('gestor_areas_project', 'discos', 'inventario', 'mantenimiento', 'importaciones', 'reportes')
+    },
+}
+
+# Catálogos de archivos por disco (un archivo SQLite por disco, ver discos.catalogo)
+CATALOGOS_ROOT = BASE_DIR / 'catalogos'
+
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = True
@@ -7,10 +7,15 @@ The `urlpatterns` list routes URLs to views. For more information please see:
 from django.contrib import admin
 from django.urls import path, include
 
+from .metricas import vista_metricas
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/discos/', include('discos.urls')),
     path('api/inventario/', include('inventario.urls')),
     path('api/mantenimiento/', include('mantenimiento.urls')),
     path('api/dashboard/', include('dashboard.urls')),
+    path('api/reportes/', include('reportes.urls')),
+    path('api/alertas/', include('alertas.urls')),
+    path('api/metrics/', vista_metricas, name='metricas'),
 ]
\ No newline at end of file
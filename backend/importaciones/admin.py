@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import TrabajoImportacion
+
+@admin.register(TrabajoImportacion)
+class TrabajoImportacionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tipo', 'nombre_archivo', 'estado', 'filas_procesadas', 'total_filas', 'fecha_creacion')
+    list_filter = ('tipo', 'estado')
+    readonly_fields = ('errores',)
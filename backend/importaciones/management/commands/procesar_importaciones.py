@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from importaciones.models import TrabajoImportacion
+from importaciones.worker import ejecutar, marcar_abandonados
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa los trabajos de importación pendientes (útil tras un reinicio o como worker aparte) "
+        "y marca como fallidos los que quedaron en proceso sin avances."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Seguir esperando trabajos nuevos.")
+        parser.add_argument('--intervalo', type=float, default=2.0, help="Segundos entre consultas con --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            abandonados = marcar_abandonados()
+            if abandonados:
+                self.stdout.write(f"{abandonados} trabajo(s) en proceso sin avances marcados como FALLIDO.")
+            pendientes = TrabajoImportacion.objects.filter(estado='PENDIENTE').order_by('fecha_creacion')
+            for trabajo_id in pendientes.values_list('pk', flat=True):
+                trabajo = ejecutar(trabajo_id)
+                self.stdout.write(f"Trabajo {trabajo.pk} ({trabajo.tipo}): {trabajo.estado}")
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-01-14 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoImportacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('DISCOS', 'Discos'), ('INVENTARIO', 'Inventario')], max_length=20)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En Proceso'), ('COMPLETADO', 'Completado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20)),
+                ('archivo', models.FileField(blank=True, help_text='Archivo subido, se elimina al terminar', upload_to='importaciones/')),
+                ('nombre_archivo', models.CharField(max_length=255)),
+                ('total_filas', models.PositiveIntegerField(blank=True, help_text='Filas estimadas según la dimensión de las hojas', null=True)),
+                ('filas_procesadas', models.PositiveIntegerField(default=0)),
+                ('creados', models.PositiveIntegerField(default=0)),
+                ('actualizados', models.PositiveIntegerField(default=0)),
+                ('errores', models.JSONField(blank=True, default=list, help_text='Errores por fila con el formato de la importación')),
+                ('mensaje', models.TextField(blank=True, help_text='Motivo del fallo si el trabajo no pudo completarse')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Importación',
+                'verbose_name_plural': 'Trabajos de Importación',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
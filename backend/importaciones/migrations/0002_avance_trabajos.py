@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-01-31 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('importaciones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoimportacion',
+            name='fecha_avance',
+            field=models.DateTimeField(blank=True, help_text='Último avance registrado mientras está en proceso', null=True),
+        ),
+    ]
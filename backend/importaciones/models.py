@@ -0,0 +1,45 @@
+from django.db import models
+
+
+class TrabajoImportacion(models.Model):
+    """
+    Importación de un archivo Excel procesada en segundo plano.
+    Guarda el avance y el resultado para que el frontend pueda consultarlo.
+    """
+    TIPOS = [
+        ('DISCOS', 'Discos'),
+        ('INVENTARIO', 'Inventario'),
+    ]
+
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+
+    archivo = models.FileField(upload_to='importaciones/', blank=True, help_text="Archivo subido, se elimina al terminar")
+    nombre_archivo = models.CharField(max_length=255)
+
+    total_filas = models.PositiveIntegerField(blank=True, null=True, help_text="Filas estimadas según la dimensión de las hojas")
+    filas_procesadas = models.PositiveIntegerField(default=0)
+    creados = models.PositiveIntegerField(default=0)
+    actualizados = models.PositiveIntegerField(default=0)
+    errores = models.JSONField(default=list, blank=True, help_text="Errores por fila con el formato de la importación")
+    mensaje = models.TextField(blank=True, help_text="Motivo del fallo si el trabajo no pudo completarse")
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(blank=True, null=True)
+    fecha_avance = models.DateTimeField(blank=True, null=True, help_text="Último avance registrado mientras está en proceso")
+    fecha_fin = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.tipo} - {self.nombre_archivo} ({self.estado})"
+
+    class Meta:
+        ordering = ['-fecha_creacion']
+        verbose_name = "Trabajo de Importación"
+        verbose_name_plural = "Trabajos de Importación"
@@ -0,0 +1,33 @@
+from rest_framework import serializers
+from .models import TrabajoImportacion
+
+class TrabajoImportacionSerializer(serializers.ModelSerializer):
+    """
+    Estado de un trabajo de importación. Los campos del resultado conservan
+    los nombres que devolvía la importación síncrona (success, created, ...).
+    """
+    progreso = serializers.SerializerMethodField()
+    success = serializers.SerializerMethodField()
+    created = serializers.IntegerField(source='creados', read_only=True)
+    updated = serializers.IntegerField(source='actualizados', read_only=True)
+    total = serializers.IntegerField(source='filas_procesadas', read_only=True)
+    errors = serializers.JSONField(source='errores', read_only=True)
+
+    class Meta:
+        model = TrabajoImportacion
+        fields = [
+            'id', 'tipo', 'estado', 'nombre_archivo',
+            'total_filas', 'filas_procesadas', 'progreso',
+            'success', 'created', 'updated', 'total', 'errors', 'mensaje',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin'
+        ]
+
+    def get_progreso(self, obj):
+        if obj.estado == 'COMPLETADO':
+            return 100
+        if not obj.total_filas:
+            return 0
+        return min(round(obj.filas_procesadas * 100 / obj.total_filas, 1), 99.9)
+
+    def get_success(self, obj):
+        return obj.estado == 'COMPLETADO' and not obj.errores
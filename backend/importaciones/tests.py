@@ -0,0 +1,62 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import TrabajoImportacion
+from .worker import marcar_abandonados
+
+
+@override_settings(IMPORTACIONES_TIMEOUT=600)
+class TrabajosAbandonadosTests(TestCase):
+    """
+    Los trabajos que quedaron EN_PROCESO sin avances (el proceso que los ejecutaba
+    se detuvo) se marcan como FALLIDO en lugar de quedar en proceso para siempre.
+    """
+
+    def crear(self, estado, hace=None, avance=True):
+        fecha = timezone.now() - timedelta(seconds=hace) if hace is not None else None
+        trabajo = TrabajoImportacion.objects.create(
+            tipo='DISCOS', nombre_archivo='discos.xlsx', estado=estado,
+            fecha_inicio=fecha, fecha_avance=fecha if avance else None,
+        )
+        trabajo.archivo.save('discos.xlsx', ContentFile(b'datos'))
+        self.addCleanup(trabajo.archivo.storage.delete, trabajo.archivo.name)
+        return trabajo
+
+    def test_marca_solo_los_que_no_avanzan(self):
+        colgado = self.crear('EN_PROCESO', hace=3600)
+        # Creado antes de registrar avances: se usa la fecha de inicio
+        sin_avance = self.crear('EN_PROCESO', hace=3600, avance=False)
+        activo = self.crear('EN_PROCESO', hace=60)
+        pendiente = self.crear('PENDIENTE')
+        ruta = colgado.archivo.name
+
+        with self.assertLogs('importaciones.worker', 'WARNING') as logs:
+            self.assertEqual(marcar_abandonados(), 2)
+        self.assertEqual(len(logs.records), 2)
+
+        estados = dict(TrabajoImportacion.objects.values_list('pk', 'estado'))
+        self.assertEqual(
+            [estados[t.pk] for t in (colgado, sin_avance, activo, pendiente)],
+            ['FALLIDO', 'FALLIDO', 'EN_PROCESO', 'PENDIENTE'],
+        )
+        colgado.refresh_from_db()
+        self.assertIn("se interrumpió", colgado.mensaje)
+        self.assertIsNotNone(colgado.fecha_fin)
+        self.assertFalse(colgado.archivo)
+        self.assertFalse(colgado.archivo.storage.exists(ruta))
+
+        # Una segunda pasada no vuelve a tocarlos
+        self.assertEqual(marcar_abandonados(), 0)
+
+    def test_comando_marca_abandonados(self):
+        self.crear('EN_PROCESO', hace=3600)
+        salida = StringIO()
+        with self.assertLogs('importaciones.worker', 'WARNING'):
+            call_command('procesar_importaciones', stdout=salida)
+        self.assertIn("1 trabajo(s) en proceso sin avances", salida.getvalue())
+        self.assertFalse(TrabajoImportacion.objects.filter(estado='EN_PROCESO').exists())
@@ -0,0 +1,49 @@
+from rest_framework import generics, status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from .models import TrabajoImportacion
+from .serializers import TrabajoImportacionSerializer
+from .worker import encolar
+
+
+class CrearTrabajoImportacionView(APIView):
+    """
+    Recibe un archivo Excel y lo encola como trabajo de importación en segundo plano.
+    Las subclases definen `tipo` (ver TrabajoImportacion.TIPOS).
+    """
+    tipo = None
+
+    def post(self, request):
+        if 'file' not in request.FILES:
+            return Response(
+                {"error": "No se recibió ningún archivo"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        file = request.FILES['file']
+        
+        # Validar extensión
+        if not file.name.endswith('.xlsx'):
+            return Response(
+                {"error": "El archivo debe ser un Excel (.xlsx)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        trabajo = TrabajoImportacion.objects.create(tipo=self.tipo, archivo=file, nombre_archivo=file.name)
+        encolar(trabajo)
+
+        serializer = TrabajoImportacionSerializer(trabajo)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class TrabajoImportacionDetailView(generics.RetrieveAPIView):
+    """
+    Consulta del avance y resultado de un trabajo de importación.
+    """
+    presupuesto_consultas = {'get': 1}
+    serializer_class = TrabajoImportacionSerializer
+    tipo = None
+
+    def get_queryset(self):
+        return TrabajoImportacion.objects.filter(tipo=self.tipo)
@@ -0,0 +1,150 @@
+"""
+Ejecución de importaciones en segundo plano sin broker externo.
+
+Los trabajos se encolan en un pool de hilos local del proceso web. Si el
+proceso se reinicia, los trabajos pendientes pueden retomarse con el comando
+`procesar_importaciones`, que también sirve como worker en un proceso aparte.
+Los que quedaron EN_PROCESO no se retoman (pudieron escribir parte de los datos):
+sin avances durante IMPORTACIONES_TIMEOUT se marcan como FALLIDO.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import TrabajoImportacion
+
+logger = logging.getLogger(__name__)
+
+# Función de importación por tipo de trabajo, recibe (archivo, progress=...)
+MOTORES = {
+    'DISCOS': 'discos.utils.import_discos',
+    'INVENTARIO': 'inventario.utils.import_inventory',
+}
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMPORTACIONES_WORKERS', 2),
+            thread_name_prefix='importacion',
+        )
+    return _executor
+
+
+def encolar(trabajo):
+    """
+    Programa el trabajo en el pool una vez confirmada la transacción que lo creó.
+    """
+    transaction.on_commit(lambda: _get_executor().submit(_ejecutar_en_hilo, trabajo.pk))
+
+
+def _ejecutar_en_hilo(trabajo_id):
+    close_old_connections()
+    try:
+        ejecutar(trabajo_id)
+    finally:
+        close_old_connections()
+
+
+def ejecutar(trabajo_id):
+    """
+    Procesa un trabajo pendiente y guarda su resultado. Retorna el trabajo actualizado.
+    """
+    # Se toma el trabajo solo si sigue pendiente, evitando que dos workers lo procesen
+    ahora = timezone.now()
+    tomados = TrabajoImportacion.objects.filter(pk=trabajo_id, estado='PENDIENTE').update(
+        estado='EN_PROCESO', fecha_inicio=ahora, fecha_avance=ahora
+    )
+    trabajo = TrabajoImportacion.objects.get(pk=trabajo_id)
+    if not tomados:
+        return trabajo
+    logger.info('importacion.iniciada', extra={'trabajo': trabajo.pk, 'tipo': trabajo.tipo, 'archivo': trabajo.nombre_archivo})
+
+    def progress(procesadas, total):
+        TrabajoImportacion.objects.filter(pk=trabajo_id).update(
+            filas_procesadas=procesadas, total_filas=total, fecha_avance=timezone.now()
+        )
+
+    try:
+        importar = import_string(MOTORES[trabajo.tipo])
+        with trabajo.archivo.open('rb') as archivo:
+            result = importar(archivo, progress=progress)
+    except Exception as e:
+        if isinstance(e, ValueError):
+            logger.warning('importacion.fallida', extra={'trabajo': trabajo.pk, 'tipo': trabajo.tipo, 'error': str(e)})
+        else:
+            logger.exception('importacion.fallida', extra={'trabajo': trabajo.pk, 'tipo': trabajo.tipo})
+        trabajo.estado = 'FALLIDO'
+        trabajo.mensaje = str(e) if isinstance(e, ValueError) else f"Error al procesar archivo: {str(e)}"
+        campos = ['estado', 'mensaje']
+    else:
+        trabajo.estado = 'COMPLETADO'
+        # 'filas' cuenta todas las hojas (ej: discos + contenidos), 'total' solo la principal
+        trabajo.total_filas = trabajo.filas_procesadas = result.get('filas', result['total'])
+        trabajo.creados = result['created']
+        trabajo.actualizados = result.get('updated', 0)
+        trabajo.errores = result['errors']
+        campos = ['estado', 'total_filas', 'filas_procesadas', 'creados', 'actualizados', 'errores']
+    finally:
+        trabajo.archivo.delete(save=False)
+
+    trabajo.fecha_fin = timezone.now()
+    # Los contadores de avance los escribe `progress`, no se pisan en caso de fallo
+    trabajo.save(update_fields=campos + ['archivo', 'fecha_fin'])
+
+    if trabajo.estado == 'COMPLETADO':
+        duracion = (trabajo.fecha_fin - trabajo.fecha_inicio).total_seconds()
+        logger.info('importacion.completada', extra={
+            'trabajo': trabajo.pk,
+            'tipo': trabajo.tipo,
+            'filas': trabajo.filas_procesadas,
+            'creados': trabajo.creados,
+            'actualizados': trabajo.actualizados,
+            'errores': len(trabajo.errores),
+            'duracion_s': round(duracion, 3),
+            'filas_por_s': round(trabajo.filas_procesadas / duracion) if duracion else None,
+        })
+    return trabajo
+
+
+def marcar_abandonados(timeout=None):
+    """
+    Marca como FALLIDO los trabajos EN_PROCESO sin avances desde hace más de `timeout`
+    segundos (por defecto IMPORTACIONES_TIMEOUT) y elimina su archivo. Retorna la cantidad.
+    """
+    limite = timezone.now() - timedelta(seconds=settings.IMPORTACIONES_TIMEOUT if timeout is None else timeout)
+    abandonados = (
+        TrabajoImportacion.objects
+        .alias(ultimo_avance=Coalesce('fecha_avance', 'fecha_inicio'))
+        .filter(estado='EN_PROCESO', ultimo_avance__lt=limite)
+    )
+    marcados = 0
+    for trabajo in abandonados:
+        # Solo si no avanzó mientras tanto (el worker podría seguir vivo)
+        actualizados = TrabajoImportacion.objects.filter(
+            pk=trabajo.pk, estado='EN_PROCESO', fecha_avance=trabajo.fecha_avance,
+        ).update(
+            estado='FALLIDO',
+            mensaje="La importación se interrumpió sin terminar (el proceso que la ejecutaba se detuvo).",
+            archivo='',
+            fecha_fin=timezone.now(),
+        )
+        if not actualizados:
+            continue
+        trabajo.archivo.delete(save=False)
+        marcados += 1
+        logger.warning('importacion.abandonada', extra={
+            'trabajo': trabajo.pk, 'tipo': trabajo.tipo, 'filas': trabajo.filas_procesadas,
+            'ultimo_avance': (trabajo.fecha_avance or trabajo.fecha_inicio).isoformat(),
+        })
+    return marcados
+
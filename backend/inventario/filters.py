@@ -1,4 +1,5 @@
 import django_filters
+from .historico import CAMPOS_HISTORICOS, inventario_al
 from .models import Dispositivo
 
 class DispositivoFilter(django_filters.FilterSet):
@@ -7,7 +8,21 @@ class DispositivoFilter(django_filters.FilterSet):
     """
     ubicacion = django_filters.CharFilter(lookup_expr='icontains', help_text="Filtrar por ubicación (contiene).")
     responsable = django_filters.CharFilter(lookup_expr='icontains', help_text="Filtrar por responsable (contiene).")
+    as_of = django_filters.DateFilter(method='filtrar_as_of', help_text="Estado del inventario al final de esta fecha (YYYY-MM-DD).")
     
     class Meta:
         model = Dispositivo
         fields = ['categoria', 'estado', 'ubicacion', 'responsable']
+
+    def filter_queryset(self, queryset):
+        # Con as_of, la ubicación, el responsable y el estado se filtran por su valor a esa fecha
+        fecha = self.form.cleaned_data.get('as_of')
+        if fecha is not None:
+            queryset = inventario_al(queryset, fecha)
+            for campo, anotacion in CAMPOS_HISTORICOS.items():
+                self.filters[campo].field_name = anotacion
+        return super().filter_queryset(queryset)
+
+    def filtrar_as_of(self, queryset, name, value):
+        # Se aplica en filter_queryset, antes que los demás filtros
+        return queryset
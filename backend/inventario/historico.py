@@ -0,0 +1,78 @@
+"""
+Estado del inventario a una fecha pasada, reconstruido desde los movimientos.
+
+El dispositivo solo guarda su ubicación, responsable y estado actuales (cada
+movimiento los sobrescribe, ver Movimiento.cambios_dispositivo). Para una fecha
+dada, cada campo se toma del último movimiento hasta ese día que lo fija:
+
+- ubicación: el destino del último movimiento,
+- responsable: el último responsable indicado,
+- estado: el que corresponde al último movimiento que lo cambia (TRASLADO no).
+
+Si no hubo movimientos hasta esa fecha, la ubicación es el origen del primer
+movimiento posterior; el responsable y el estado son los actuales si ningún
+movimiento posterior los cambió, y si no se desconocen (None). Los dispositivos
+registrados después de la fecha y sin movimientos previos no se incluyen.
+
+Cada campo es una subconsulta correlacionada que lee una o pocas filas del índice
+movimiento_dispositivo_idx (dispositivo, -fecha_movimiento, -id), el equivalente
+portable de DISTINCT ON (dispositivo) ... ORDER BY fecha_movimiento DESC: el costo
+depende de los dispositivos consultados y no del largo del historial.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Movimiento
+
+# Campo del dispositivo -> anotación con su valor histórico
+CAMPOS_HISTORICOS = {
+    'ubicacion': 'ubicacion_historica',
+    'responsable': 'responsable_historico',
+    'estado': 'estado_historico',
+}
+
+
+def _limite(fecha):
+    # Los movimientos del día se incluyen: hasta la medianoche local del día siguiente
+    return timezone.make_aware(datetime.combine(fecha + timedelta(days=1), time.min))
+
+
+def inventario_al(dispositivos, fecha):
+    """
+    Anota `dispositivos` con su ubicación, responsable y estado al final del día
+    `fecha` (ver CAMPOS_HISTORICOS) y descarta los que aún no existían.
+    """
+    limite = _limite(fecha)
+    movimientos = Movimiento.objects.filter(dispositivo=OuterRef('pk'))
+    anteriores = movimientos.filter(fecha_movimiento__lt=limite).order_by('-fecha_movimiento', '-id')
+    posteriores = movimientos.filter(fecha_movimiento__gte=limite).order_by('fecha_movimiento', 'id')
+
+    con_responsable = Q(responsable__isnull=False) & ~Q(responsable='')
+    cambia_estado = Q(tipo_movimiento__in=list(Movimiento.ESTADO_POR_TIPO))
+    estado_por_tipo = Case(
+        *(When(tipo_movimiento=tipo, then=Value(estado)) for tipo, estado in Movimiento.ESTADO_POR_TIPO.items()),
+        output_field=CharField(),
+    )
+
+    return (
+        dispositivos
+        .filter(Q(fecha_registro__lt=limite) | Exists(anteriores))
+        .annotate(
+            ubicacion_historica=Coalesce(
+                Subquery(anteriores.exclude(destino='').values('destino')[:1]),
+                Subquery(posteriores.values('origen')[:1]),
+                F('ubicacion'),
+            ),
+            responsable_historico=Coalesce(
+                Subquery(anteriores.filter(con_responsable).values('responsable')[:1]),
+                Case(When(Exists(posteriores.filter(con_responsable)), then=Value(None)), default=F('responsable')),
+            ),
+            estado_historico=Coalesce(
+                Subquery(anteriores.filter(cambia_estado).annotate(estado=estado_por_tipo).values('estado')[:1]),
+                Case(When(Exists(posteriores.filter(cambia_estado)), then=Value(None)), default=F('estado')),
+            ),
+        )
+    )
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-01-27 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(fields=['destino', 'fecha_movimiento'], name='movimiento_destino_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(fields=['origen', 'fecha_movimiento'], name='movimiento_origen_idx'),
+        ),
+    ]
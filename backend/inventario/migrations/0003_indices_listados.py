@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-01-29 16:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# PostgreSQL: índices trigram sobre las mismas expresiones que genera icontains (UPPER(campo) LIKE ...)
+POSTGRES_CREAR = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS inventario_dispositivo_ubicacion_trgm ON inventario_dispositivo USING gin (UPPER(ubicacion) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS inventario_dispositivo_responsable_trgm ON inventario_dispositivo USING gin (UPPER(responsable) gin_trgm_ops)",
+]
+POSTGRES_ELIMINAR = [
+    "DROP INDEX IF EXISTS inventario_dispositivo_ubicacion_trgm",
+    "DROP INDEX IF EXISTS inventario_dispositivo_responsable_trgm",
+]
+
+
+def crear_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sentencia in POSTGRES_CREAR:
+            schema_editor.execute(sentencia)
+
+
+def eliminar_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sentencia in POSTGRES_ELIMINAR:
+            schema_editor.execute(sentencia)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0002_indices_movimiento_ubicacion'),
+    ]
+
+    # El índice del historial se crea antes de quitar el índice propio de la FK
+    operations = [
+        migrations.AddIndex(
+            model_name='dispositivo',
+            index=models.Index(fields=['-fecha_registro', '-id'], name='dispositivo_registro_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dispositivo',
+            index=models.Index(fields=['estado', '-fecha_registro', '-id'], name='dispositivo_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(fields=['dispositivo', '-fecha_movimiento', '-id'], name='movimiento_dispositivo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimiento',
+            index=models.Index(fields=['-fecha_movimiento', '-id'], name='movimiento_fecha_idx'),
+        ),
+        migrations.AlterField(
+            model_name='movimiento',
+            name='dispositivo',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='inventario.dispositivo'),
+        ),
+        migrations.RunPython(crear_indices_trigram, eliminar_indices_trigram),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-01-31 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_indices_listados'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dispositivo',
+            index=models.Index(fields=['garantia_hasta'], name='dispositivo_garantia_idx'),
+        ),
+    ]
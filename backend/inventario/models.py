@@ -48,11 +48,28 @@ class Dispositivo(models.Model):
     fecha_registro = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Se recuerda el estado original para ajustar el conteo por estado de los reportes
+        if 'estado' in instance.__dict__:
+            instance._estado_cargado = instance.estado
+        return instance
+
     def __str__(self):
         return f"{self.marca} {self.modelo} ({self.codigo_inventario})"
 
     class Meta:
         ordering = ['-fecha_registro']
+        indexes = [
+            # Listado por defecto y filtro por estado, en el orden de la paginación (fecha, pk)
+            models.Index(fields=['-fecha_registro', '-id'], name='dispositivo_registro_idx'),
+            models.Index(fields=['estado', '-fecha_registro', '-id'], name='dispositivo_estado_idx'),
+            # Garantías por vencer (alertas): búsqueda por rango de fechas
+            models.Index(fields=['garantia_hasta'], name='dispositivo_garantia_idx'),
+            # La búsqueda por ubicación y responsable (icontains) usa índices trigram en
+            # PostgreSQL, creados en la migración 0003
+        ]
 
 
 class Movimiento(models.Model):
@@ -67,7 +84,8 @@ class Movimiento(models.Model):
         ('BAJA', 'Dar de Baja'),
     ]
 
-    dispositivo = models.ForeignKey(Dispositivo, on_delete=models.CASCADE, related_name='movimientos')
+    # El índice del historial (dispositivo, fecha) también resuelve las búsquedas por dispositivo
+    dispositivo = models.ForeignKey(Dispositivo, on_delete=models.CASCADE, related_name='movimientos', db_index=False)
     tipo_movimiento = models.CharField(max_length=20, choices=TIPOS_MOVIMIENTO)
     
     origen = models.CharField(max_length=150, help_text="Ubicación anterior")
@@ -78,11 +96,82 @@ class Movimiento(models.Model):
     fecha_movimiento = models.DateTimeField(default=timezone.now)
     observacion = models.TextField(blank=True, null=True)
     
+    # Estado en que queda el dispositivo según el tipo de movimiento (TRASLADO no lo cambia)
+    ESTADO_POR_TIPO = {
+        'ASIGNACION': 'ACTIVO',
+        'DEVOLUCION': 'DISPONIBLE',
+        'REPARACION': 'EN_REPARACION',
+        'BAJA': 'BAJA',
+    }
+
     # Podríamos agregar un campo 'usuario_sistema' si tuviéramos tabla de usuarios autenticados
     # usuario_registro = models.ForeignKey(User, ...)
 
+    def cambios_dispositivo(self):
+        """
+        Campos del dispositivo que fija este movimiento: la ubicación (destino), el
+        responsable si se indicó y el estado según el tipo de movimiento.
+        """
+        cambios = {}
+        if self.destino:
+            cambios['ubicacion'] = self.destino
+        # En una devolución sin responsable se conserva el último registrado
+        if self.responsable:
+            cambios['responsable'] = self.responsable
+        if self.tipo_movimiento in self.ESTADO_POR_TIPO:
+            cambios['estado'] = self.ESTADO_POR_TIPO[self.tipo_movimiento]
+        return cambios
+
+    def cambios_vigentes(self, ultimas):
+        """
+        Cambios de este movimiento que siguen vigentes: un campo no se aplica si ya hay
+        registrado un movimiento posterior que lo fija (ej: al cargar historial antiguo).
+        `ultimas` es el resultado de ultimas_fechas para el dispositivo.
+        """
+        return {
+            campo: valor for campo, valor in self.cambios_dispositivo().items()
+            if ultimas.get(campo) is None or self.fecha_movimiento >= ultimas[campo]
+        }
+
+    @classmethod
+    def ultimas_fechas(cls, dispositivos_ids, excluir=None):
+        """
+        Fecha del último movimiento registrado que fija cada campo de los dispositivos
+        (criterio de cambios_dispositivo), en una consulta agrupada:
+        {dispositivo_id: {'ubicacion': fecha, 'responsable': fecha, 'estado': fecha}}.
+        """
+        movimientos = cls.objects.filter(dispositivo_id__in=dispositivos_ids)
+        if excluir is not None:
+            movimientos = movimientos.exclude(pk=excluir)
+        filas = (
+            movimientos
+            .values('dispositivo_id')
+            .annotate(
+                ubicacion=models.Max('fecha_movimiento', filter=~models.Q(destino='')),
+                responsable=models.Max('fecha_movimiento', filter=models.Q(responsable__isnull=False) & ~models.Q(responsable='')),
+                estado=models.Max('fecha_movimiento', filter=models.Q(tipo_movimiento__in=list(cls.ESTADO_POR_TIPO))),
+            )
+            .order_by()
+        )
+        return {fila.pop('dispositivo_id'): fila for fila in filas}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Se recuerdan las ubicaciones originales para actualizar los reportes si el movimiento se edita
+        instance._ubicaciones_cargadas = {instance.__dict__.get('origen'), instance.__dict__.get('destino')}
+        return instance
+
     def __str__(self):
         return f"{self.tipo_movimiento} - {self.dispositivo.codigo_inventario} - {self.fecha_movimiento.strftime('%Y-%m-%d')}"
 
     class Meta:
         ordering = ['-fecha_movimiento']
+        indexes = [
+            # Historial de un dispositivo y listado general, en el orden de la paginación
+            models.Index(fields=['dispositivo', '-fecha_movimiento', '-id'], name='movimiento_dispositivo_idx'),
+            models.Index(fields=['-fecha_movimiento', '-id'], name='movimiento_fecha_idx'),
+            # Conteo de movimientos por ubicación (ver reportes.acumulados)
+            models.Index(fields=['destino', 'fecha_movimiento'], name='movimiento_destino_idx'),
+            models.Index(fields=['origen', 'fecha_movimiento'], name='movimiento_origen_idx'),
+        ]
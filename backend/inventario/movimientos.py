@@ -0,0 +1,67 @@
+"""
+Registro de movimientos en bloque.
+
+A diferencia del alta individual (señal post_save que guarda el dispositivo por
+cada movimiento), aquí los movimientos se insertan con bulk_create y a cada
+dispositivo se le aplica solo el resultado final: los movimientos se recorren en
+orden cronológico acumulando los campos que fija cada uno (ver
+Movimiento.cambios_dispositivo), lo que equivale a haberlos registrado uno por
+uno en ese orden. Los dispositivos con los mismos cambios se actualizan con un
+único UPDATE.
+
+Igual que en el alta individual, un movimiento no cambia los campos que ya fija
+un movimiento posterior registrado (ver Movimiento.cambios_vigentes): el historial
+antiguo queda registrado sin pisar el estado actual, y el resultado no depende del
+orden en que se registren los movimientos.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from gestor_areas_project.excel import TAMANIO_LOTE, en_lotes
+
+from .models import Dispositivo, Movimiento
+from .signals import dispositivos_actualizados, movimientos_registrados
+
+
+def _ultimas_fechas(dispositivos_ids):
+    ultimas = {}
+    for lote in en_lotes(sorted(dispositivos_ids), TAMANIO_LOTE):
+        ultimas.update(Movimiento.ultimas_fechas(lote))
+    return ultimas
+
+
+def registrar_movimientos(movimientos):
+    """
+    Inserta los movimientos (instancias sin guardar) y actualiza sus dispositivos.
+    Retorna la cantidad de dispositivos actualizados.
+    """
+    if not movimientos:
+        return 0
+
+    ahora = timezone.now()
+    # El orden de la lista desempata movimientos con la misma fecha, como en altas sucesivas
+    ordenados = sorted(enumerate(movimientos), key=lambda item: (item[1].fecha_movimiento, item[0]))
+
+    with transaction.atomic():
+        ultimas = _ultimas_fechas({movimiento.dispositivo_id for movimiento in movimientos})
+        Movimiento.objects.bulk_create(movimientos, batch_size=TAMANIO_LOTE)
+
+        cambios = defaultdict(dict)
+        for _, movimiento in ordenados:
+            vigentes = movimiento.cambios_vigentes(ultimas.get(movimiento.dispositivo_id, {}))
+            if vigentes:
+                cambios[movimiento.dispositivo_id].update(vigentes)
+
+        grupos = defaultdict(list)
+        for pk, valores in cambios.items():
+            grupos[tuple(sorted(valores.items()))].append(pk)
+        for valores, pks in grupos.items():
+            for lote in en_lotes(pks, TAMANIO_LOTE):
+                Dispositivo.objects.filter(pk__in=lote).update(**dict(valores), fecha_actualizacion=ahora)
+
+        movimientos_registrados.send(sender=Movimiento, movimientos=movimientos)
+        if cambios:
+            dispositivos_actualizados.send(sender=Dispositivo, dispositivos_ids=list(cambios))
+    return len(cambios)
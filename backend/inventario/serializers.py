@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from gestor_areas_project.serializers import CamposDinamicosMixin
+from .historico import CAMPOS_HISTORICOS
 from .models import Categoria, Dispositivo, Movimiento
 
 class CategoriaSerializer(serializers.ModelSerializer):
@@ -6,7 +8,7 @@ class CategoriaSerializer(serializers.ModelSerializer):
         model = Categoria
         fields = '__all__'
 
-class DispositivoSerializer(serializers.ModelSerializer):
+class DispositivoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     # Campos calculados o anidados para lectura
     categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True)
 
@@ -20,7 +22,15 @@ class DispositivoSerializer(serializers.ModelSerializer):
             'fecha_registro', 'fecha_actualizacion'
         ]
 
-class MovimientoSerializer(serializers.ModelSerializer):
+    def to_representation(self, instance):
+        datos = super().to_representation(instance)
+        # En las consultas con as_of (ver inventario.historico) se muestran los valores a esa fecha
+        for campo, anotacion in CAMPOS_HISTORICOS.items():
+            if campo in datos and hasattr(instance, anotacion):
+                datos[campo] = getattr(instance, anotacion)
+        return datos
+
+class MovimientoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     dispositivo_codigo = serializers.CharField(source='dispositivo.codigo_inventario', read_only=True)
     dispositivo_modelo = serializers.CharField(source='dispositivo.modelo', read_only=True)
 
@@ -31,3 +41,24 @@ class MovimientoSerializer(serializers.ModelSerializer):
             'tipo_movimiento', 'origen', 'destino',
             'responsable', 'fecha_movimiento', 'observacion'
         ]
+
+
+class MovimientoBulkSerializer(serializers.ModelSerializer):
+    """
+    Movimiento para el registro en bloque. El dispositivo se indica por ID o por código
+    de inventario y se resuelve para todo el lote junto (ver MovimientoViewSet.bulk).
+    """
+    dispositivo = serializers.IntegerField(required=False)
+    dispositivo_codigo = serializers.CharField(required=False)
+
+    class Meta:
+        model = Movimiento
+        fields = [
+            'dispositivo', 'dispositivo_codigo', 'tipo_movimiento', 'origen', 'destino',
+            'responsable', 'fecha_movimiento', 'observacion'
+        ]
+
+    def validate(self, attrs):
+        if attrs.get('dispositivo') is None and not attrs.get('dispositivo_codigo'):
+            raise serializers.ValidationError("Se requiere 'dispositivo' o 'dispositivo_codigo'.")
+        return attrs
@@ -1,32 +1,26 @@
 from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.dispatch import Signal, receiver
 from .models import Movimiento
 
+# Escrituras masivas de dispositivos (importación) que no disparan post_save.
+# Argumentos: dispositivos_ids.
+dispositivos_actualizados = Signal()
+
+# Movimientos creados en bloque (bulk_create) que no disparan post_save.
+# Argumentos: movimientos (instancias creadas).
+movimientos_registrados = Signal()
+
 @receiver(post_save, sender=Movimiento)
 def actualizar_dispositivo_al_mover(sender, instance, created, **kwargs):
     if created:
+        # Mismo criterio que el registro en bloque (inventario.movimientos): cada campo
+        # queda con el valor del último movimiento que lo fija, aunque se registre antes
+        ultimas = Movimiento.ultimas_fechas([instance.dispositivo_id], excluir=instance.pk)
+        cambios = instance.cambios_vigentes(ultimas.get(instance.dispositivo_id, {}))
+        if not cambios:
+            return
         dispositivo = instance.dispositivo
-        
-        # Actualizar campos del dispositivo basados en el movimiento
-        if instance.destino:
-             dispositivo.ubicacion = instance.destino
-        
-        if instance.responsable:
-             dispositivo.responsable = instance.responsable
-        
-        # Lógica de estados según tipo de movimiento
-        # ('ASIGNACION', 'Asignación'), ('TRASLADO', 'Traslado'), ('DEVOLUCION', 'Devolución'), ('REPARACION', 'Reparación'), ('BAJA', 'Baja')
-        
-        if instance.tipo_movimiento == 'ASIGNACION':
-            dispositivo.estado = 'ACTIVO'
-        elif instance.tipo_movimiento == 'DEVOLUCION':
-            dispositivo.estado = 'DISPONIBLE'
-            # En devolución, quizás el responsable se limpia? 
-            # Depende de la lógica de negocio, asumiremos que se mantiene el registro del último o se limpia si se envía vacío.
-            # Para simplificar, si es devolución y no se envía responsable, podríamos limpiarlo, pero el modelo de movimiento tiene responsable obligatorio? No, es opcional.
-        elif instance.tipo_movimiento == 'REPARACION':
-            dispositivo.estado = 'EN_REPARACION'
-        elif instance.tipo_movimiento == 'BAJA':
-            dispositivo.estado = 'BAJA'
-            
-        dispositivo.save()
+        for campo, valor in cambios.items():
+            setattr(dispositivo, campo, valor)
+        # Solo se escriben las columnas que fija el movimiento (auto_now se incluye explícitamente)
+        dispositivo.save(update_fields=[*cambios, 'fecha_actualizacion'])
@@ -1,3 +1,427 @@
-from django.test import TestCase
+import random
+import re
+import tempfile
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from gestor_areas_project.metricas import registro
+from gestor_areas_project.middleware import PresupuestoConsultasExcedido
+from gestor_areas_project.pruebas import ConsultasConstantesMixin, PlanesConsultaMixin, analizar_tablas
+from mantenimiento.models import Mantenimiento
+
+from .models import Categoria, Dispositivo, Movimiento
+from .utils import INVENTORY_SHEET, import_inventory
+from .views import DispositivoViewSet
+
+
+class MovimientosBulkTests(TestCase):
+    """
+    El registro en bloque debe dejar los dispositivos igual que registrar los mismos
+    movimientos uno por uno (señal post_save) en orden cronológico.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        for grupo in ('UNO', 'BLOQUE'):
+            for i in range(10):
+                Dispositivo.objects.create(
+                    codigo_inventario=f"{grupo}-{i}", marca="Dell", modelo="Latitude",
+                    categoria=categoria, ubicacion="Bodega", responsable="Sistemas",
+                )
+
+    def estado_final(self, grupo):
+        return [
+            (codigo.split('-')[1], ubicacion, responsable, estado)
+            for codigo, ubicacion, responsable, estado in
+            Dispositivo.objects.filter(codigo_inventario__startswith=f"{grupo}-")
+            .order_by('codigo_inventario')
+            .values_list('codigo_inventario', 'ubicacion', 'responsable', 'estado')
+        ]
+
+    def test_equivale_a_registrar_uno_por_uno(self):
+        azar = random.Random(42)
+        inicio = timezone.now() - timedelta(days=100)
+        movimientos = [
+            {
+                'indice': azar.randrange(10),
+                'tipo_movimiento': azar.choice([tipo for tipo, _ in Movimiento.TIPOS_MOVIMIENTO]),
+                'origen': 'Bodega',
+                'destino': azar.choice(['Gerencia', 'Contabilidad', 'Taller']),
+                'responsable': azar.choice(['', 'Ana', 'Luis']),
+                'fecha_movimiento': inicio + timedelta(hours=azar.randrange(2000)),
+            }
+            for _ in range(60)
+        ]
+
+        for movimiento in sorted(movimientos, key=lambda m: m['fecha_movimiento']):
+            datos = {k: v for k, v in movimiento.items() if k != 'indice'}
+            Movimiento.objects.create(dispositivo=Dispositivo.objects.get(codigo_inventario=f"UNO-{movimiento['indice']}"), **datos)
+
+        payload = [
+            {**{k: v for k, v in movimiento.items() if k != 'indice'}, 'dispositivo_codigo': f"BLOQUE-{movimiento['indice']}"}
+            for movimiento in movimientos
+        ]
+        response = self.client.post('/api/inventario/movimientos/bulk/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['creados'], 60)
+        self.assertEqual(self.estado_final('BLOQUE'), self.estado_final('UNO'))
+
+    def test_historial_antiguo_no_pisa_el_estado_actual(self):
+        dispositivo = Dispositivo.objects.get(codigo_inventario="BLOQUE-0")
+        Movimiento.objects.create(dispositivo=dispositivo, tipo_movimiento='ASIGNACION', origen='Bodega', destino='Gerencia', responsable='Ana')
+
+        antiguo = (timezone.now() - timedelta(days=365)).isoformat()
+        response = self.client.post('/api/inventario/movimientos/bulk/', {'movimientos': [
+            {'dispositivo': dispositivo.pk, 'tipo_movimiento': 'BAJA', 'origen': 'Bodega', 'destino': 'Depósito', 'fecha_movimiento': antiguo},
+        ]}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['dispositivos_actualizados'], 0)
+        dispositivo.refresh_from_db()
+        self.assertEqual((dispositivo.ubicacion, dispositivo.estado), ('Gerencia', 'ACTIVO'))
+        self.assertEqual(dispositivo.movimientos.count(), 2)
+
+    def test_movimientos_con_fecha_anterior_en_ambos_caminos(self):
+        # Ya existe un traslado reciente; luego llegan movimientos antiguos y desordenados
+        azar = random.Random(7)
+        ahora = timezone.now()
+        for grupo in ('UNO', 'BLOQUE'):
+            for i in range(10):
+                Movimiento.objects.create(
+                    dispositivo=Dispositivo.objects.get(codigo_inventario=f"{grupo}-{i}"), tipo_movimiento='TRASLADO',
+                    origen='Bodega', destino='Sistemas', fecha_movimiento=ahora - timedelta(days=5),
+                )
+        movimientos = [
+            {
+                'indice': azar.randrange(10),
+                'tipo_movimiento': azar.choice([tipo for tipo, _ in Movimiento.TIPOS_MOVIMIENTO]),
+                'origen': 'Bodega',
+                'destino': azar.choice(['Gerencia', 'Contabilidad', 'Taller']),
+                'responsable': azar.choice(['', 'Ana', 'Luis']),
+                'fecha_movimiento': ahora - timedelta(days=azar.randrange(10), hours=i),
+            }
+            for i in range(60)
+        ]
+
+        # Uno por uno en el orden recibido (no cronológico) y en bloque
+        for movimiento in movimientos:
+            datos = {k: v for k, v in movimiento.items() if k != 'indice'}
+            Movimiento.objects.create(dispositivo=Dispositivo.objects.get(codigo_inventario=f"UNO-{movimiento['indice']}"), **datos)
+        payload = [
+            {**{k: v for k, v in movimiento.items() if k != 'indice'}, 'dispositivo_codigo': f"BLOQUE-{movimiento['indice']}"}
+            for movimiento in movimientos
+        ]
+        response = self.client.post('/api/inventario/movimientos/bulk/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.estado_final('BLOQUE'), self.estado_final('UNO'))
+        # Y coincide con lo que reconstruye el historial al día de hoy
+        historico = {
+            fila['codigo_inventario'].split('-')[1]: (fila['ubicacion'], fila['responsable'], fila['estado'])
+            for fila in self.client.get(f'/api/inventario/dispositivos/?as_of={timezone.localdate():%Y-%m-%d}&search=UNO-').json()['results']
+        }
+        self.assertEqual(historico, {indice: (ubicacion, responsable, estado) for indice, ubicacion, responsable, estado in self.estado_final('UNO')})
+
+    def test_consultas_constantes(self):
+        payload = [
+            {'dispositivo_codigo': f"BLOQUE-{i % 10}", 'tipo_movimiento': 'TRASLADO', 'origen': 'Bodega', 'destino': 'Taller'}
+            for i in range(200)
+        ]
+        # Código -> id, savepoint, últimos movimientos, 2 INSERT (lotes de 1000 filas en SQLite
+        # por su límite de variables), UPDATE y release; los reportes se recalculan en on_commit
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/inventario/movimientos/bulk/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Dispositivo.objects.filter(ubicacion='Taller').count(), 10)
+
+    def test_dispositivo_inexistente(self):
+        response = self.client.post('/api/inventario/movimientos/bulk/', [
+            {'dispositivo_codigo': 'NO-EXISTE', 'tipo_movimiento': 'TRASLADO', 'origen': 'Bodega', 'destino': 'Taller'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errores'][0]['indice'], 0)
+        self.assertFalse(Movimiento.objects.exists())
+
+
+class ImportarInventarioTests(TestCase):
+    """
+    Reimportar el inventario solo escribe las filas que cambian: los cambios repetidos
+    se agrupan en un UPDATE y los distintos van juntos en un bulk_update.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        for i in range(1, 6):
+            Dispositivo.objects.create(
+                codigo_inventario=f"LAP-{i}", marca="Dell", modelo="Latitude", categoria=categoria,
+                ubicacion="Bodega", serial=f"SN-{i}", fecha_compra=date(2025, 1, i),
+            )
+
+    def exportar(self):
+        return load_workbook(BytesIO(b''.join(self.client.get('/api/inventario/dispositivos/export/').streaming_content)))
+
+    def importar(self, libro):
+        archivo = BytesIO()
+        libro.save(archivo)
+        archivo.seek(0)
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = import_inventory(archivo)
+        self.assertEqual(resultado['errors'], [])
+        updates = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('UPDATE "inventario_dispositivo"')]
+        return resultado, updates
+
+    def test_reimportar_sin_cambios(self):
+        resultado, updates = self.importar(self.exportar())
+        self.assertEqual((resultado['created'], resultado['updated'], resultado['total']), (0, 0, 5))
+        self.assertEqual(updates, [])
+
+    def test_cambios_distintos_en_un_bulk_update(self):
+        antes = Dispositivo.objects.get(codigo_inventario="LAP-1").fecha_actualizacion
+        sin_cambios = Dispositivo.objects.get(codigo_inventario="LAP-5").fecha_actualizacion
+        libro = self.exportar()
+        hoja = libro[INVENTORY_SHEET]
+        columnas = {celda.value: celda.column for celda in hoja[1]}
+        cambios = {
+            "LAP-1": ('ubicacion', "Oficina 1"),
+            "LAP-2": ('ubicacion', "Oficina 2"),
+            "LAP-3": ('responsable', "Ana"),
+            "LAP-4": ('responsable', "Ana"),
+        }
+        for fila in hoja.iter_rows(min_row=2):
+            codigo = fila[columnas['codigo_inventario'] - 1].value
+            if codigo in cambios:
+                campo, valor = cambios[codigo]
+                fila[columnas[campo] - 1].value = valor
+
+        resultado, updates = self.importar(libro)
+        self.assertEqual((resultado['created'], resultado['updated']), (0, 4))
+        # LAP-3 y LAP-4 comparten el cambio; LAP-1 y LAP-2 van en el mismo bulk_update
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            dict(Dispositivo.objects.values_list('codigo_inventario', 'ubicacion')),
+            {"LAP-1": "Oficina 1", "LAP-2": "Oficina 2", "LAP-3": "Bodega", "LAP-4": "Bodega", "LAP-5": "Bodega"},
+        )
+        self.assertEqual(Dispositivo.objects.filter(responsable="Ana").count(), 2)
+        self.assertEqual(Dispositivo.objects.get(codigo_inventario="LAP-2").serial, "SN-2")
+        self.assertGreater(Dispositivo.objects.get(codigo_inventario="LAP-1").fecha_actualizacion, antes)
+        self.assertEqual(Dispositivo.objects.get(codigo_inventario="LAP-5").fecha_actualizacion, sin_cambios)
+
+
+class InventarioHistoricoTests(TestCase):
+    """
+    Con ?as_of= el listado muestra y filtra la ubicación, el responsable y el estado
+    que tenía cada dispositivo al final de ese día.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+
+        def dispositivo(codigo, **campos):
+            return Dispositivo.objects.create(codigo_inventario=codigo, marca="Dell", modelo="Latitude", categoria=categoria, **campos)
+
+        def mover(dispositivo, dia, tipo, origen, destino, responsable=None):
+            Movimiento.objects.create(
+                dispositivo=dispositivo, tipo_movimiento=tipo, origen=origen, destino=destino, responsable=responsable,
+                fecha_movimiento=timezone.make_aware(datetime(2025, 6, dia, 15)),
+            )
+
+        cls.movido = dispositivo("MOV-1", ubicacion="Bodega", responsable="Sistemas")
+        mover(cls.movido, 10, 'ASIGNACION', "Bodega", "Gerencia", "Ana")
+        mover(cls.movido, 20, 'TRASLADO', "Gerencia", "Contabilidad")
+        mover(cls.movido, 25, 'REPARACION', "Contabilidad", "Taller", "Proveedor")
+        # Sin movimientos hasta la fecha: ubicación de origen del primero posterior
+        cls.tardio = dispositivo("MOV-2", ubicacion="Bodega", responsable="Sistemas", estado='ACTIVO')
+        mover(cls.tardio, 28, 'TRASLADO', "Archivo", "Recepción")
+        Dispositivo.objects.update(fecha_registro=timezone.make_aware(datetime(2025, 1, 1)))
+        # Registrado después de la fecha y sin historial previo: no existía
+        dispositivo("NUEVO-1", ubicacion="Bodega")
+
+    def listado(self, consulta):
+        response = self.client.get(f'/api/inventario/dispositivos/?{consulta}')
+        self.assertEqual(response.status_code, 200)
+        return {fila['codigo_inventario']: (fila['ubicacion'], fila['responsable'], fila['estado']) for fila in response.json()['results']}
+
+    def test_estado_a_una_fecha(self):
+        self.assertEqual(self.listado('as_of=2025-06-20'), {
+            "MOV-1": ("Contabilidad", "Ana", 'ACTIVO'),
+            "MOV-2": ("Archivo", "Sistemas", 'ACTIVO'),
+        })
+        self.assertEqual(self.listado('as_of=2025-06-05')["MOV-1"], ("Bodega", None, None))
+        self.assertEqual(self.listado('as_of=2025-06-30')["MOV-1"], ("Taller", "Proveedor", 'EN_REPARACION'))
+        # Sin as_of, los valores actuales
+        self.assertEqual(self.listado('')["MOV-1"], ("Taller", "Proveedor", 'EN_REPARACION'))
+
+    def test_filtros_sobre_los_valores_historicos(self):
+        self.assertEqual(set(self.listado('as_of=2025-06-20&ubicacion=conta')), {"MOV-1"})
+        self.assertEqual(set(self.listado('as_of=2025-06-20&estado=ACTIVO')), {"MOV-1", "MOV-2"})
+        self.assertEqual(set(self.listado('as_of=2025-06-30&estado=ACTIVO')), {"MOV-2"})
+        self.assertEqual(set(self.listado('as_of=2025-06-20&responsable=sistemas')), {"MOV-2"})
+
+    def test_fecha_invalida(self):
+        self.assertEqual(self.client.get('/api/inventario/dispositivos/?as_of=30-06-2025').status_code, 400)
+
+
+class PlanesConsultaTests(PlanesConsultaMixin, TestCase):
+    """
+    Los listados de inventario deben resolverse con los índices de la migración 0003,
+    en el orden de la paginación y sin ordenar en memoria.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        estados = [estado for estado, _ in Dispositivo.ESTADOS]
+        Dispositivo.objects.bulk_create(
+            Dispositivo(
+                codigo_inventario=f"INV-{i:05d}", marca="Dell", modelo="Latitude", categoria=categoria,
+                ubicacion=f"Oficina {i % 50}", responsable=f"Persona {i % 300}", estado=estados[i % len(estados)],
+            )
+            for i in range(2000)
+        )
+        cls.dispositivo = Dispositivo.objects.order_by('pk').first()
+        ids = list(Dispositivo.objects.values_list('pk', flat=True))
+        inicio = timezone.now() - timedelta(days=365)
+        Movimiento.objects.bulk_create(
+            Movimiento(
+                dispositivo_id=ids[i % len(ids)], tipo_movimiento='TRASLADO', origen=f"Oficina {i % 50}",
+                destino=f"Oficina {(i + 1) % 50}", fecha_movimiento=inicio + timedelta(minutes=i),
+            )
+            for i in range(6000)
+        )
+        analizar_tablas(Dispositivo, Movimiento)
+
+    def test_listado_de_dispositivos(self):
+        sql = self.consulta_de('/api/inventario/dispositivos/', 'inventario_dispositivo')
+        self.assertUsaIndice(sql, 'dispositivo_registro_idx')
+
+    def test_dispositivos_por_estado(self):
+        sql = self.consulta_de('/api/inventario/dispositivos/?estado=ACTIVO', 'inventario_dispositivo')
+        self.assertUsaIndice(sql, 'dispositivo_estado_idx')
+
+    def test_busqueda_por_ubicacion_y_responsable(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest("Los índices trigram existen solo en PostgreSQL.")
+        for campo in ('ubicacion', 'responsable'):
+            with self.subTest(campo=campo):
+                sql = self.sql_de(Dispositivo.objects.filter(**{f'{campo}__icontains': 'na 12'}).order_by())
+                self.assertUsaIndice(sql, f'inventario_dispositivo_{campo}_trgm')
+
+    def test_listado_de_movimientos(self):
+        sql = self.consulta_de('/api/inventario/movimientos/', 'inventario_movimiento')
+        self.assertUsaIndice(sql, 'movimiento_fecha_idx')
+
+    def test_movimientos_de_un_dispositivo(self):
+        for url in (
+            f'/api/inventario/movimientos/?dispositivo={self.dispositivo.pk}',
+            f'/api/inventario/dispositivos/{self.dispositivo.pk}/historial/',
+        ):
+            with self.subTest(url=url):
+                self.assertUsaIndice(self.consulta_de(url, 'inventario_movimiento'), 'movimiento_dispositivo_idx')
+
+    def test_historial_en_consultas_constantes(self):
+        # Dispositivo y sus movimientos, sin importar cuántos tenga
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/inventario/dispositivos/{self.dispositivo.pk}/historial/')
+        self.assertEqual(len(response.json()), 3)
+
+    def test_inventario_a_una_fecha(self):
+        # Cada campo histórico es una búsqueda por rango en el historial del dispositivo
+        url = f'/api/inventario/dispositivos/?as_of={timezone.localdate() - timedelta(days=200):%Y-%m-%d}&estado=ACTIVO'
+        self.assertUsaIndice(self.consulta_de(url, 'inventario_dispositivo'), 'movimiento_dispositivo_idx')
+
+
+class PresupuestoConsultasTests(ConsultasConstantesMixin, TestCase):
+    """
+    Los listados cargan las relaciones que muestran (categoría, dispositivo) en la
+    misma consulta, sin una consulta extra por fila.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categorias = [Categoria.objects.create(nombre=nombre) for nombre in ("Portátil", "Monitor", "Impresora")]
+        for i in range(30):
+            dispositivo = Dispositivo.objects.create(
+                codigo_inventario=f"INV-{i:03d}", marca="Dell", modelo=f"Modelo {i}",
+                categoria=categorias[i % 3], ubicacion="Bodega",
+            )
+            Movimiento.objects.create(dispositivo=dispositivo, tipo_movimiento='TRASLADO', origen='Bodega', destino='Taller')
+            Mantenimiento.objects.create(dispositivo=dispositivo, costo=10)
+        cls.dispositivo = dispositivo
+
+    def test_listados_sin_n_mas_uno(self):
+        for url in (
+            '/api/inventario/dispositivos/',
+            f'/api/inventario/dispositivos/?categoria={self.dispositivo.categoria_id}',
+            '/api/inventario/movimientos/',
+            '/api/mantenimiento/mantenimientos/',
+            f'/api/mantenimiento/mantenimientos/?dispositivo={self.dispositivo.pk}',
+        ):
+            with self.subTest(url=url):
+                self.assertConsultasConstantes(url)
+
+    def test_presupuesto_excedido_falla_en_tests(self):
+        with mock.patch.object(DispositivoViewSet, 'presupuesto_consultas', {'list': 0}):
+            with self.assertRaises(PresupuestoConsultasExcedido):
+                self.client.get('/api/inventario/dispositivos/')
+
+    @override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=False)
+    def test_presupuesto_excedido_se_registra_en_produccion(self):
+        with mock.patch.object(DispositivoViewSet, 'presupuesto_consultas', {'list': 0}):
+            with self.assertLogs('gestor_areas_project.middleware', 'WARNING') as logs:
+                response = self.client.get('/api/inventario/dispositivos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/api/inventario/dispositivos/: 1 consultas, presupuesto 0', logs.output[0])
+
+
+class MetricasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        for i in range(5):
+            Dispositivo.objects.create(codigo_inventario=f"INV-{i}", marca="Dell", modelo="Latitude", categoria=categoria, ubicacion="Bodega")
+
+    def setUp(self):
+        registro.reiniciar()
+
+    def metrica(self, texto, nombre, **etiquetas):
+        filtro = ','.join(f'{clave}="{valor}"' for clave, valor in etiquetas.items())
+        coincidencia = re.search(rf'^{re.escape(nombre)}{{{re.escape(filtro)}}} (\S+)$', texto, re.MULTILINE)
+        self.assertIsNotNone(coincidencia, f"Falta {nombre}{{{filtro}}}")
+        return float(coincidencia.group(1))
+
+    def test_exposicion_prometheus(self):
+        for _ in range(2):
+            self.client.get('/api/inventario/dispositivos/')
+        self.client.get('/api/no-existe/')
+
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        texto = response.content.decode()
+
+        vista = {'vista': 'dispositivo-list', 'metodo': 'GET'}
+        self.assertEqual(self.metrica(texto, 'http_solicitudes_total', **vista, estado=200), 2)
+        self.assertEqual(self.metrica(texto, 'http_solicitudes_total', vista='sin_ruta', metodo='GET', estado=404), 1)
+        self.assertEqual(self.metrica(texto, 'http_solicitud_duracion_segundos_count', **vista), 2)
+        self.assertEqual(self.metrica(texto, 'http_solicitud_consultas_sql_sum', **vista), 2)
+        self.assertEqual(self.metrica(texto, 'http_solicitud_consultas_sql_bucket', **vista, le='1'), 2)
+        self.assertGreater(self.metrica(texto, 'http_sql_segundos_total', **vista), 0)
+        self.assertGreater(self.metrica(texto, 'http_serializacion_segundos_total', **vista), 0)
+        self.assertGreater(self.metrica(texto, 'http_respuesta_bytes_total', **vista), 0)
+
+    def test_perfil_de_solicitudes_lentas(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            with override_settings(METRICAS_PERFIL_MUESTREO=1, METRICAS_PERFIL_UMBRAL=0, METRICAS_PERFIL_DIR=directorio):
+                self.client.get('/api/inventario/dispositivos/')
+            perfiles = list(Path(directorio).glob('*dispositivo-list*.prof'))
+        self.assertEqual(len(perfiles), 1)
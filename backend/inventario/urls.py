@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoriaViewSet, DispositivoViewSet, MovimientoViewSet, ExportInventoryTemplateView, ImportInventoryDataView
+from .views import CategoriaViewSet, DispositivoViewSet, MovimientoViewSet, ExportInventoryTemplateView, ImportInventoryDataView, ImportInventoryJobView
 
 router = DefaultRouter()
 router.register(r'categorias', CategoriaViewSet)
@@ -11,4 +11,5 @@ urlpatterns = [
     path('', include(router.urls)),
     path('export-template/', ExportInventoryTemplateView.as_view(), name='inventory-export-template'),
     path('import/', ImportInventoryDataView.as_view(), name='inventory-import'),
+    path('import/<int:pk>/', ImportInventoryJobView.as_view(), name='inventory-import-job'),
 ]
@@ -1,8 +1,44 @@
-from openpyxl import Workbook, load_workbook
+import logging
+from collections import defaultdict
+
+from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill
-from datetime import datetime
 from io import BytesIO
 
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from gestor_areas_project.excel import TAMANIO_LOTE, abrir_libro, contar_filas, en_lotes, iterar_filas, limpiar_campos
+from gestor_areas_project.exportacion import Hoja, filas_de
+from .historico import CAMPOS_HISTORICOS
+from .models import Categoria, Dispositivo
+from .signals import dispositivos_actualizados
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_SHEET = "Inventario"
+
+VALID_STATES = ['ACTIVO', 'DISPONIBLE', 'EN_REPARACION', 'DAÑADO', 'BAJA']
+
+# Columnas de la plantilla que se copian directamente al dispositivo
+IMPORT_FIELDS = [
+    'codigo_inventario', 'marca', 'modelo', 'serial', 'ubicacion', 'responsable',
+    'estado', 'fecha_compra', 'garantia_hasta', 'especificaciones'
+]
+
+# Columnas de la plantilla de inventario, en orden
+TEMPLATE_HEADERS = [
+    'codigo_inventario', 'categoria', 'marca', 'modelo', 'serial',
+    'ubicacion', 'responsable', 'estado', 'fecha_compra',
+    'garantia_hasta', 'especificaciones'
+]
+
+MOVEMENT_HEADERS = [
+    'dispositivo_codigo', 'tipo_movimiento', 'origen', 'destino',
+    'responsable', 'fecha_movimiento', 'observacion'
+]
+
 def generate_inventory_template():
     """
     Genera un archivo Excel con plantilla para importar dispositivos de inventario.
@@ -13,13 +49,7 @@ def generate_inventory_template():
     ws.title = "Inventario"
     
     # Headers con estilo
-    headers = [
-        'codigo_inventario', 'categoria', 'marca', 'modelo', 'serial', 
-        'ubicacion', 'responsable', 'estado', 'fecha_compra', 
-        'garantia_hasta', 'especificaciones'
-    ]
-    
-    for col_num, header in enumerate(headers, 1):
+    for col_num, header in enumerate(TEMPLATE_HEADERS, 1):
         cell = ws.cell(row=1, column=col_num, value=header)
         cell.font = Font(bold=True, color="FFFFFF")
         cell.fill = PatternFill(start_color="3699FF", end_color="3699FF", fill_type="solid")
@@ -51,112 +81,239 @@ def generate_inventory_template():
     
     return excel_file
 
-def parse_inventory_import(file):
+def export_inventory_sheets(dispositivos):
     """
-    Lee un archivo Excel y extrae los datos de inventario.
-    Retorna una lista de diccionarios con la estructura validada.
+    Hoja para exportar los dispositivos del queryset con el formato de la plantilla
+    de importación (la categoría va por nombre). Si el queryset tiene los valores a
+    una fecha (as_of, ver inventario.historico) se exportan esos.
     """
-    try:
-        wb = load_workbook(file)
-    except Exception as e:
-        raise ValueError(f"Error al leer el archivo Excel: {str(e)}")
-    
-    # Verificar que exista la hoja requerida
-    sheet_name = "Inventario"
-    if sheet_name not in wb.sheetnames:
-        # Si no existe "Inventario", intentar usar la primera hoja
-        ws = wb.active
-    else:
-        ws = wb[sheet_name]
-    
-    devices_data = []
-    headers = [cell.value for cell in ws[1]]
-    
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if not any(row):  # Saltar filas vacías
-            continue
-        
-        device = dict(zip(headers, row))
-        
+    anotados = dispositivos.query.annotations
+    campos = [
+        'categoria__nombre' if header == 'categoria'
+        else CAMPOS_HISTORICOS[header] if CAMPOS_HISTORICOS.get(header) in anotados
+        else header
+        for header in TEMPLATE_HEADERS
+    ]
+    return [Hoja(INVENTORY_SHEET, TEMPLATE_HEADERS, lambda: filas_de(dispositivos, *campos), color="3699FF")]
+
+
+def export_movement_sheets(movimientos):
+    """
+    Hoja para exportar el historial de movimientos del queryset.
+    """
+    campos = ['dispositivo__codigo_inventario'] + MOVEMENT_HEADERS[1:]
+    return [Hoja('Movimientos', MOVEMENT_HEADERS, lambda: filas_de(movimientos, *campos), color="0BB783")]
+
+def iter_inventory_rows(wb):
+    """
+    Recorre en streaming la hoja de inventario y genera tuplas (fila, dispositivo normalizado).
+    """
+    # Si no existe "Inventario", se usa la primera hoja
+    ws = wb[INVENTORY_SHEET] if INVENTORY_SHEET in wb.sheetnames else wb.worksheets[0]
+
+    for idx, device in iterar_filas(ws):
         # Normalizar strings básicos
         for key in ['codigo_inventario', 'marca', 'modelo', 'serial', 'ubicacion', 'responsable', 'categoria']:
             if device.get(key):
                 device[key] = str(device[key]).strip()
-        
-        # Normalizar fechas
-        for date_field in ['fecha_compra', 'garantia_hasta']:
-            if device.get(date_field) and isinstance(device[date_field], datetime):
-                device[date_field] = device[date_field].date()
-        
+
+        # Un serial vacío se guarda como NULL para no chocar con la restricción unique
+        if 'serial' in device and not device['serial']:
+            device['serial'] = None
+
         # Normalizar estado (upper case)
         if device.get('estado'):
             device['estado'] = str(device['estado']).strip().upper()
         else:
             device['estado'] = 'DISPONIBLE' # Default fallback
-            
-        devices_data.append(device)
-    
-    return devices_data
 
-def validate_inventory_data(devices_data):
+        yield idx, device
+
+
+def validate_inventory_row(device, idx):
     """
-    Valida la estructura básica de los datos importados.
+    Valida la estructura básica de una fila importada.
     Retorna lista de errores si los hay.
     """
     errors = []
-    
-    if not devices_data:
+
+    # Validar campos obligatorios
+    for field, message in [
+        ('codigo_inventario', 'El código de inventario es obligatorio'),
+        ('categoria', 'La categoría es obligatoria'),
+        ('marca', 'La marca es obligatoria'),
+        ('modelo', 'El modelo es obligatorio'),
+    ]:
+        if not device.get(field):
+            errors.append({
+                'row': idx,
+                'sheet': 'Inventario',
+                'field': field,
+                'message': message
+            })
+
+    # Validar estado
+    if device.get('estado') and device['estado'] not in VALID_STATES:
         errors.append({
+            'row': idx,
+            'sheet': 'Inventario',
+            'field': 'estado',
+            'message': f'Estado inválido. Debe ser: {", ".join(VALID_STATES)}'
+        })
+
+    return errors
+
+
+def import_inventory(file, chunk_size=TAMANIO_LOTE, progress=None):
+    """
+    Importa dispositivos desde un archivo Excel leyendo la hoja en streaming.
+
+    Las filas se validan por lotes: por cada lote se resuelven con una sola consulta
+    los dispositivos existentes (por código de inventario) y los seriales en uso,
+    y luego se escriben dentro de una transacción: las altas con bulk_create y las
+    actualizaciones con un UPDATE por cada conjunto de cambios que comparten varias
+    filas; los cambios que no se repiten van juntos en un bulk_update. Las filas sin
+    cambios no se escriben ni se cuentan como actualizadas.
+    Si un código ya existe el dispositivo se actualiza con las columnas del archivo.
+
+    `progress(procesadas, total_estimado)` se invoca después de cada lote.
+
+    Retorna un diccionario con los contadores y los errores por fila.
+    """
+    result = {'created': 0, 'updated': 0, 'total': 0, 'errors': []}
+    categorias = {}
+
+    wb = abrir_libro(file)
+    try:
+        total_estimado = contar_filas(wb[INVENTORY_SHEET] if INVENTORY_SHEET in wb.sheetnames else wb.worksheets[0])
+        for lote in en_lotes(iter_inventory_rows(wb), chunk_size):
+            result['total'] += len(lote)
+            _import_inventory_chunk(lote, categorias, result)
+            logger.debug('importacion.lote', extra={
+                'hoja': INVENTORY_SHEET, 'procesadas': result['total'], 'creados': result['created'],
+                'actualizados': result['updated'], 'errores': len(result['errors'])
+            })
+            if progress:
+                progress(result['total'], total_estimado)
+    finally:
+        wb.close()
+
+    if result['total'] == 0:
+        result['errors'].append({
             'row': 2,
             'sheet': 'Inventario',
             'field': 'general',
             'message': 'No se encontraron datos para importar.'
         })
-        return errors
-        
-    valid_states = ['ACTIVO', 'DISPONIBLE', 'EN_REPARACION', 'DAÑADO', 'BAJA']
-    
-    for idx, device in enumerate(devices_data, start=2):
-        # Validar campos obligatorios
-        if not device.get('codigo_inventario'):
-            errors.append({
-                'row': idx,
-                'sheet': 'Inventario',
-                'field': 'codigo_inventario',
-                'message': 'El código de inventario es obligatorio'
-            })
-            
-        if not device.get('categoria'):
-             errors.append({
-                'row': idx,
-                'sheet': 'Inventario',
-                'field': 'categoria',
-                'message': 'La categoría es obligatoria'
-            })
-            
-        if not device.get('marca'):
-            errors.append({
-                'row': idx,
-                'sheet': 'Inventario',
-                'field': 'marca',
-                'message': 'La marca es obligatoria'
-            })
-            
-        if not device.get('modelo'):
-            errors.append({
-                'row': idx,
-                'sheet': 'Inventario',
-                'field': 'modelo',
-                'message': 'El modelo es obligatorio'
-            })
-            
-        # Validar estado
-        if device.get('estado') and device['estado'] not in valid_states:
-            errors.append({
+
+    return result
+
+
+def _resolve_categories(nombres, categorias):
+    """
+    Completa el mapa `categorias` (nombre en minúsculas -> Categoria) con los nombres del lote,
+    creando en bloque las que no existan.
+    """
+    faltantes = {nombre.lower(): nombre for nombre in nombres if nombre.lower() not in categorias}
+    if not faltantes:
+        return
+
+    existentes = Categoria.objects.annotate(nombre_lower=Lower('nombre')).filter(nombre_lower__in=faltantes)
+    for categoria in existentes:
+        categorias[categoria.nombre_lower] = categoria
+        faltantes.pop(categoria.nombre_lower, None)
+
+    if faltantes:
+        nuevas = Categoria.objects.bulk_create(Categoria(nombre=nombre) for nombre in faltantes.values())
+        for categoria in nuevas:
+            categorias[categoria.nombre.lower()] = categoria
+
+
+def _import_inventory_chunk(lote, categorias, result):
+    errors = result['errors']
+    validas = []
+    for idx, device in lote:
+        row_errors = validate_inventory_row(device, idx)
+        if row_errors:
+            errors.extend(row_errors)
+        else:
+            validas.append((idx, device))
+
+    _resolve_categories({device['categoria'] for _, device in validas}, categorias)
+
+    codigos = {device['codigo_inventario'] for _, device in validas}
+    existentes = Dispositivo.objects.in_bulk(codigos, field_name='codigo_inventario')
+    seriales = {device['serial'] for _, device in validas if device.get('serial')}
+    duenos_serial = dict(
+        Dispositivo.objects.filter(serial__in=seriales).values_list('serial', 'codigo_inventario')
+    )
+
+    nuevos = {}
+    actualizados = {}
+    cambios = defaultdict(dict)
+    for idx, device in validas:
+        codigo = device['codigo_inventario']
+        dispositivo = nuevos.get(codigo) or actualizados.get(codigo) or existentes.get(codigo)
+        if dispositivo is None:
+            # Un alta debe traer todos los campos obligatorios aunque falte la columna
+            device = {field: device.get(field) for field in IMPORT_FIELDS} | device
+            dispositivo = Dispositivo()
+
+        limpio, row_errors = limpiar_campos(Dispositivo, device, IMPORT_FIELDS, idx, 'Inventario')
+        serial = limpio.get('serial')
+        if serial and duenos_serial.get(serial, codigo) != codigo:
+            row_errors.append({
                 'row': idx,
                 'sheet': 'Inventario',
-                'field': 'estado',
-                'message': f'Estado inválido. Debe ser: {", ".join(valid_states)}'
+                'field': 'serial',
+                'message': 'Ya existe un dispositivo con este serial.'
             })
-            
-    return errors
+        if row_errors:
+            errors.extend(row_errors)
+            continue
+
+        if serial:
+            duenos_serial[serial] = codigo
+        limpio['categoria_id'] = categorias[device['categoria'].lower()].pk
+
+        if dispositivo.pk is None:
+            for field, value in limpio.items():
+                setattr(dispositivo, field, value)
+            nuevos[codigo] = dispositivo
+            continue
+
+        # En una actualización solo se escriben las columnas que realmente cambian
+        for field, value in limpio.items():
+            if getattr(dispositivo, field) != value:
+                setattr(dispositivo, field, value)
+                cambios[dispositivo.pk][field] = value
+        actualizados[codigo] = dispositivo
+
+    # Las filas con el mismo conjunto de cambios se actualizan con un único UPDATE
+    grupos = defaultdict(list)
+    for pk, valores in cambios.items():
+        grupos[tuple(sorted(valores.items()))].append(pk)
+    unicos = [pks[0] for pks in grupos.values() if len(pks) == 1]
+    por_pk = {dispositivo.pk: dispositivo for dispositivo in actualizados.values()}
+
+    with transaction.atomic():
+        Dispositivo.objects.bulk_create(nuevos.values())
+        ahora = timezone.now()
+        for valores, pks in grupos.items():
+            if len(pks) > 1:
+                Dispositivo.objects.filter(pk__in=pks).update(**dict(valores), fecha_actualizacion=ahora)
+        if unicos:
+            # bulk_update no aplica auto_now: la fecha se asigna a mano
+            campos = sorted({field for pk in unicos for field in cambios[pk]}) + ['fecha_actualizacion']
+            for pk in unicos:
+                por_pk[pk].fecha_actualizacion = ahora
+            Dispositivo.objects.bulk_update([por_pk[pk] for pk in unicos], campos, batch_size=TAMANIO_LOTE)
+
+    if nuevos or cambios:
+        dispositivos_actualizados.send(
+            sender=Dispositivo,
+            dispositivos_ids=[d.pk for d in nuevos.values()] + list(cambios),
+        )
+
+    result['created'] += len(nuevos)
+    result['updated'] += len(cambios)
@@ -3,21 +3,35 @@ from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from gestor_areas_project.exportacion import ExportarMixin
+from importaciones.views import CrearTrabajoImportacionView, TrabajoImportacionDetailView
 from .models import Categoria, Dispositivo, Movimiento
-from .serializers import CategoriaSerializer, DispositivoSerializer, MovimientoSerializer
+from .serializers import CategoriaSerializer, DispositivoSerializer, MovimientoBulkSerializer, MovimientoSerializer
+from .movimientos import registrar_movimientos
 from .filters import DispositivoFilter
+from .utils import export_inventory_sheets, export_movement_sheets
 
 class CategoriaViewSet(viewsets.ModelViewSet):
     queryset = Categoria.objects.all()
     serializer_class = CategoriaSerializer
+    # Tabla pequeña usada para poblar selectores, se devuelve completa
+    pagination_class = None
+    presupuesto_consultas = {'list': 1, 'retrieve': 1}
 
-class DispositivoViewSet(viewsets.ModelViewSet):
-    queryset = Dispositivo.objects.all()
+class DispositivoViewSet(ExportarMixin, viewsets.ModelViewSet):
+    queryset = Dispositivo.objects.select_related('categoria')
     serializer_class = DispositivoSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = DispositivoFilter
     search_fields = ['codigo_inventario', 'serial', 'marca', 'modelo', 'responsable', 'ubicacion']
     ordering_fields = ['fecha_registro', 'marca']
+    ordering = ['-fecha_registro']
+    nombre_exportacion = 'inventario'
+    # El filtro por categoría valida el ID con una consulta extra
+    presupuesto_consultas = {'list': 2, 'retrieve': 1, 'historial': 2}
+
+    def hojas_exportacion(self, queryset):
+        return export_inventory_sheets(queryset)
 
     @action(detail=True, methods=['get'])
     def historial(self, request, pk=None):
@@ -30,12 +44,70 @@ class DispositivoViewSet(viewsets.ModelViewSet):
         serializer = MovimientoSerializer(movimientos, many=True)
         return Response(serializer.data)
 
-class MovimientoViewSet(viewsets.ModelViewSet):
-    queryset = Movimiento.objects.all().order_by('-fecha_movimiento')
+class MovimientoViewSet(ExportarMixin, viewsets.ModelViewSet):
+    queryset = Movimiento.objects.select_related('dispositivo').order_by('-fecha_movimiento')
     serializer_class = MovimientoSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['tipo_movimiento', 'dispositivo']
     search_fields = ['dispositivo__codigo_inventario', 'responsable', 'origen', 'destino']
+    ordering = ['-fecha_movimiento']
+    nombre_exportacion = 'movimientos'
+    # El filtro por dispositivo valida el ID con una consulta extra
+    presupuesto_consultas = {'list': 2, 'retrieve': 1}
+
+    def hojas_exportacion(self, queryset):
+        return export_movement_sheets(queryset)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Registra una lista de movimientos en bloque (ej: carga de historial).
+        Cada dispositivo queda como si los movimientos se hubieran registrado uno por
+        uno en orden cronológico, con un UPDATE por grupo de cambios en lugar de un
+        guardado por movimiento (ver inventario.movimientos).
+        URL: /api/inventario/movimientos/bulk/
+        """
+        datos = request.data.get('movimientos') if isinstance(request.data, dict) else request.data
+        if not isinstance(datos, list) or not datos:
+            return Response(
+                {"error": "Se requiere una lista de movimientos (o un objeto con 'movimientos')."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = MovimientoBulkSerializer(data=datos, many=True)
+        if not serializer.is_valid():
+            errores = [{'indice': i, **error} for i, error in enumerate(serializer.errors) if error]
+            return Response({"error": "Hay movimientos inválidos.", "errores": errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Los dispositivos del lote se resuelven con una consulta por ID y otra por código
+        filas = serializer.validated_data
+        ids = {fila['dispositivo'] for fila in filas if fila.get('dispositivo') is not None}
+        codigos = {fila['dispositivo_codigo'] for fila in filas if fila.get('dispositivo') is None}
+        existentes = set(Dispositivo.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+        por_codigo = dict(Dispositivo.objects.filter(codigo_inventario__in=codigos).values_list('codigo_inventario', 'pk')) if codigos else {}
+
+        movimientos = []
+        errores = []
+        for i, fila in enumerate(filas):
+            dispositivo_id = fila.pop('dispositivo', None)
+            codigo = fila.pop('dispositivo_codigo', None)
+            if dispositivo_id is not None:
+                valido = dispositivo_id in existentes
+            else:
+                dispositivo_id = por_codigo.get(codigo)
+                valido = dispositivo_id is not None
+            if not valido:
+                errores.append({'indice': i, 'dispositivo': [f"No existe el dispositivo '{dispositivo_id or codigo}'."]})
+                continue
+            movimientos.append(Movimiento(dispositivo_id=dispositivo_id, **fila))
+        if errores:
+            return Response({"error": "Hay movimientos inválidos.", "errores": errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        actualizados = registrar_movimientos(movimientos)
+        return Response(
+            {"creados": len(movimientos), "dispositivos_actualizados": actualizados},
+            status=status.HTTP_201_CREATED
+        )
 
 
 class ExportInventoryTemplateView(APIView):
@@ -63,119 +135,16 @@ class ExportInventoryTemplateView(APIView):
             )
 
 
-class ImportInventoryDataView(APIView):
+class ImportInventoryDataView(CrearTrabajoImportacionView):
     """
     Vista para importar datos de inventario desde archivo Excel.
+    El archivo se procesa en segundo plano; el avance se consulta en ImportInventoryJobView.
     """
-    def post(self, request):
-        from .utils import parse_inventory_import, validate_inventory_data
-        from .models import Dispositivo, Categoria
-        from .serializers import DispositivoSerializer
-        
-        if 'file' not in request.FILES:
-            return Response(
-                {"error": "No se recibió ningún archivo"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        file = request.FILES['file']
-        
-        # Validar extensión
-        if not file.name.endswith('.xlsx'):
-            return Response(
-                {"error": "El archivo debe ser un Excel (.xlsx)"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        try:
-            # Parsear archivo
-            devices_data = parse_inventory_import(file)
-            
-            # Validar estructura básica
-            validation_errors = validate_inventory_data(devices_data)
-            if validation_errors:
-                return Response({
-                    "success": False,
-                    "created": 0,
-                    "updated": 0,
-                    "errors": validation_errors
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Procesar cada dispositivo
-            created_count = 0
-            updated_count = 0
-            errors = []
-            
-            for idx, device_data in enumerate(devices_data, start=2):
-                try:
-                    # Resolver categoría por nombre
-                    categoria_nombre = device_data.pop('categoria', None)
-                    if not categoria_nombre:
-                        errors.append({
-                            'row': idx,
-                            'sheet': 'Inventario',
-                            'field': 'categoria',
-                            'message': 'Categoría no especificada'
-                        })
-                        continue
-                        
-                    # Buscar o crear categoría
-                    categoria, _ = Categoria.objects.get_or_create(
-                        nombre__iexact=categoria_nombre,
-                        defaults={'nombre': categoria_nombre}
-                    )
-                    
-                    device_data['categoria'] = categoria.id
-                    
-                    # Verificar si existe por código de inventario
-                    codigo = device_data.get('codigo_inventario')
-                    existing_device = Dispositivo.objects.filter(codigo_inventario=codigo).first()
-                    
-                    if existing_device:
-                        serializer = DispositivoSerializer(existing_device, data=device_data, partial=True)
-                        action = 'updated'
-                    else:
-                        serializer = DispositivoSerializer(data=device_data)
-                        action = 'created'
-                    
-                    if serializer.is_valid():
-                        serializer.save()
-                        if action == 'created':
-                            created_count += 1
-                        else:
-                            updated_count += 1
-                    else:
-                        for field, messages in serializer.errors.items():
-                            errors.append({
-                                'row': idx,
-                                'sheet': 'Inventario',
-                                'field': field,
-                                'message': ' '.join(messages) if isinstance(messages, list) else str(messages)
-                            })
-                            
-                except Exception as e:
-                    errors.append({
-                        'row': idx,
-                        'sheet': 'Inventario',
-                        'field': 'general',
-                        'message': str(e)
-                    })
-            
-            return Response({
-                "success": len(errors) == 0,
-                "created": created_count,
-                "updated": updated_count,
-                "total": len(devices_data),
-                "errors": errors
-            }, status=status.HTTP_200_OK if len(errors) == 0 else status.HTTP_207_MULTI_STATUS)
-            
-        except ValueError as e:
-            return Response(
-                {"error": str(e)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        except Exception as e:
-            return Response(
-                {"error": f"Error al procesar archivo: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    tipo = 'INVENTARIO'
+
+
+class ImportInventoryJobView(TrabajoImportacionDetailView):
+    """
+    Vista para consultar el avance de una importación de inventario.
+    """
+    tipo = 'INVENTARIO'
\ No newline at end of file
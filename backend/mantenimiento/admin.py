@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Mantenimiento
+from .models import Mantenimiento, ReglaRecurrencia
 
 @admin.register(Mantenimiento)
 class MantenimientoAdmin(admin.ModelAdmin):
@@ -11,3 +11,10 @@ class MantenimientoAdmin(admin.ModelAdmin):
     def dispositivo_info(self, obj):
         return f"{obj.dispositivo.codigo_inventario} - {obj.dispositivo.marca}"
     dispositivo_info.short_description = "Dispositivo"
+
+
+@admin.register(ReglaRecurrencia)
+class ReglaRecurrenciaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'categoria', 'dispositivo', 'intervalo_dias', 'prioridad', 'activa')
+    list_filter = ('activa', 'prioridad', 'categoria')
+    raw_id_fields = ('dispositivo',)
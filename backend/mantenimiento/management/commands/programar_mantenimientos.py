@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from mantenimiento.programacion import programar_mantenimientos
+
+
+class Command(BaseCommand):
+    help = "Genera los mantenimientos preventivos de las reglas de recurrencia hasta el horizonte (pensado para ejecutarse cada noche)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizonte', type=int, default=settings.MANTENIMIENTO_HORIZONTE_DIAS, help="Días hacia adelante a programar.")
+        parser.add_argument('--fecha', type=date.fromisoformat, help="Fecha de referencia AAAA-MM-DD (por defecto hoy).")
+
+    def handle(self, *args, **options):
+        mantenimientos, dispositivos = programar_mantenimientos(options['horizonte'], hoy=options['fecha'])
+        self.stdout.write(self.style.SUCCESS(f"{mantenimientos} mantenimiento(s) programado(s) para {dispositivos} dispositivo(s)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-01-29 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_indices_listados'),
+        ('mantenimiento', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mantenimiento',
+            index=models.Index(fields=['estado', 'fecha_programada', 'id'], name='mantenimiento_estado_idx'),
+        ),
+    ]
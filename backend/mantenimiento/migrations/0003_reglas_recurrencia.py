@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-01-30 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_indices_listados'),
+        ('mantenimiento', '0002_indice_estado_fecha'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReglaRecurrencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('intervalo_dias', models.PositiveIntegerField(help_text='Días entre un mantenimiento preventivo y el siguiente')),
+                ('prioridad', models.CharField(choices=[('BAJA', 'Baja'), ('MEDIA', 'Media'), ('ALTA', 'Alta')], default='MEDIA', max_length=10)),
+                ('tareas', models.TextField(blank=True, help_text='Tareas a realizar, se copian a cada mantenimiento generado', null=True)),
+                ('fecha_inicio', models.DateField(blank=True, help_text='Primera fecha a programar si el dispositivo no tiene preventivos', null=True)),
+                ('activa', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('categoria', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reglas_mantenimiento', to='inventario.categoria')),
+                ('dispositivo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reglas_mantenimiento', to='inventario.dispositivo')),
+            ],
+            options={
+                'verbose_name': 'Regla de Recurrencia',
+                'verbose_name_plural': 'Reglas de Recurrencia',
+            },
+        ),
+        migrations.AddField(
+            model_name='mantenimiento',
+            name='regla',
+            field=models.ForeignKey(blank=True, help_text='Regla que generó el mantenimiento (vacío si se cargó a mano)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mantenimientos', to='mantenimiento.reglarecurrencia'),
+        ),
+        migrations.AddConstraint(
+            model_name='mantenimiento',
+            constraint=models.UniqueConstraint(condition=models.Q(('regla__isnull', False)), fields=('dispositivo', 'fecha_programada'), name='mantenimiento_programado_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='reglarecurrencia',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('categoria__isnull', False), ('dispositivo__isnull', True)), models.Q(('categoria__isnull', True), ('dispositivo__isnull', False)), _connector='OR'), name='regla_categoria_o_dispositivo'),
+        ),
+        migrations.AddConstraint(
+            model_name='reglarecurrencia',
+            constraint=models.UniqueConstraint(fields=('categoria',), name='regla_categoria_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='reglarecurrencia',
+            constraint=models.UniqueConstraint(fields=('dispositivo',), name='regla_dispositivo_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='reglarecurrencia',
+            constraint=models.CheckConstraint(condition=models.Q(('intervalo_dias__gt', 0)), name='regla_intervalo_positivo'),
+        ),
+    ]
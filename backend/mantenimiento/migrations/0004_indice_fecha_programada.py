@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-01-30 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_indices_listados'),
+        ('mantenimiento', '0003_reglas_recurrencia'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mantenimiento',
+            index=models.Index(fields=['fecha_programada', 'estado', 'costo'], name='mantenimiento_fecha_idx'),
+        ),
+    ]
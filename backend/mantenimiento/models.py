@@ -1,7 +1,8 @@
 from django.db import models
-from inventario.models import Dispositivo
+from inventario.models import Categoria, Dispositivo
 from django.utils import timezone
 
+
 class Mantenimiento(models.Model):
     TIPOS = [
         ('PREVENTIVO', 'Preventivo'),
@@ -33,10 +34,22 @@ class Mantenimiento(models.Model):
     acciones_realizadas = models.TextField(blank=True, null=True, help_text="Reporte técnico de lo realizado")
     
     costo = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Costo total del servicio/repuestos")
+
+    regla = models.ForeignKey(
+        'ReglaRecurrencia', on_delete=models.SET_NULL, related_name='mantenimientos', blank=True, null=True,
+        help_text="Regla que generó el mantenimiento (vacío si se cargó a mano)",
+    )
     
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Se recuerda el dispositivo original para actualizar los reportes si el mantenimiento se reasigna
+        instance._dispositivo_id_cargado = instance.__dict__.get('dispositivo_id')
+        return instance
+
     def __str__(self):
         return f"{self.tipo} - {self.dispositivo.codigo_inventario} - {self.fecha_programada}"
 
@@ -44,3 +57,54 @@ class Mantenimiento(models.Model):
         ordering = ['-fecha_programada']
         verbose_name = "Mantenimiento"
         verbose_name_plural = "Mantenimientos"
+        indexes = [
+            # Orden del listado (estado, fecha programada, pk) y filtro por estado
+            models.Index(fields=['estado', 'fecha_programada', 'id'], name='mantenimiento_estado_idx'),
+            # Rango de fechas del calendario; estado y costo completan las columnas que agrega
+            models.Index(fields=['fecha_programada', 'estado', 'costo'], name='mantenimiento_fecha_idx'),
+        ]
+        constraints = [
+            # Clave de idempotencia del programador: un preventivo generado por día y dispositivo
+            models.UniqueConstraint(
+                fields=['dispositivo', 'fecha_programada'],
+                condition=models.Q(regla__isnull=False),
+                name='mantenimiento_programado_unico',
+            ),
+        ]
+
+
+class ReglaRecurrencia(models.Model):
+    """
+    Mantenimiento preventivo periódico de una categoría o de un dispositivo puntual
+    (ej: portátiles cada 180 días). La regla del dispositivo reemplaza a la de su
+    categoría. El comando `programar_mantenimientos` expande las reglas activas en
+    mantenimientos PENDIENTE, ver mantenimiento.programacion.
+    """
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='reglas_mantenimiento', blank=True, null=True)
+    dispositivo = models.ForeignKey(Dispositivo, on_delete=models.CASCADE, related_name='reglas_mantenimiento', blank=True, null=True)
+    intervalo_dias = models.PositiveIntegerField(help_text="Días entre un mantenimiento preventivo y el siguiente")
+    prioridad = models.CharField(max_length=10, choices=Mantenimiento.PRIORIDADES, default='MEDIA')
+    tareas = models.TextField(blank=True, null=True, help_text="Tareas a realizar, se copian a cada mantenimiento generado")
+    fecha_inicio = models.DateField(blank=True, null=True, help_text="Primera fecha a programar si el dispositivo no tiene preventivos")
+    activa = models.BooleanField(default=True)
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        objetivo = self.dispositivo.codigo_inventario if self.dispositivo_id else self.categoria.nombre
+        return f"{objetivo} cada {self.intervalo_dias} días"
+
+    class Meta:
+        verbose_name = "Regla de Recurrencia"
+        verbose_name_plural = "Reglas de Recurrencia"
+        constraints = [
+            # Se aplica a una categoría o a un dispositivo, no a ambos
+            models.CheckConstraint(
+                condition=models.Q(categoria__isnull=False, dispositivo__isnull=True) | models.Q(categoria__isnull=True, dispositivo__isnull=False),
+                name='regla_categoria_o_dispositivo',
+            ),
+            models.UniqueConstraint(fields=['categoria'], name='regla_categoria_unica'),
+            models.UniqueConstraint(fields=['dispositivo'], name='regla_dispositivo_unica'),
+            models.CheckConstraint(condition=models.Q(intervalo_dias__gt=0), name='regla_intervalo_positivo'),
+        ]
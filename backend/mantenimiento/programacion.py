@@ -0,0 +1,136 @@
+"""
+Programación de mantenimientos preventivos a partir de las reglas de recurrencia.
+
+Para cada dispositivo alcanzado por una regla activa (la del dispositivo o, si no
+tiene, la de su categoría; los dados de baja se omiten) se toma como referencia
+su último preventivo programado y se generan las fechas siguientes cada
+`intervalo_dias` hasta el horizonte (hoy + N días). Si el dispositivo no tiene
+preventivos la serie arranca en `fecha_inicio` de la regla, o un intervalo después
+de la fecha de compra, o hoy. Las fechas vencidas se programan para hoy.
+
+Todo se resuelve con tres consultas (reglas, dispositivos, último preventivo por
+dispositivo) y los mantenimientos se insertan con bulk_create. Volver a ejecutar
+es seguro: la referencia pasa a ser el último preventivo generado, y la restricción
+única (dispositivo, fecha_programada) de los mantenimientos generados descarta los
+duplicados de dos ejecuciones simultáneas (ignore_conflicts). Como bulk_create no
+informa qué filas descartó, el total se toma del rowcount de cada INSERT.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from gestor_areas_project.excel import TAMANIO_LOTE, en_lotes
+from inventario.models import Dispositivo
+
+from .models import Mantenimiento, ReglaRecurrencia
+from .signals import mantenimientos_programados
+
+
+class _FilasInsertadas:
+    """
+    execute_wrapper que suma las filas que realmente insertan los INSERT en `tabla`
+    (sin las descartadas por ignore_conflicts).
+    """
+
+    def __init__(self, tabla):
+        # 'INSERT INTO' en PostgreSQL, 'INSERT OR IGNORE INTO' en SQLite
+        self.marca = f'INTO {connection.ops.quote_name(tabla)}'
+        self.filas = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        resultado = execute(sql, params, many, context)
+        if sql.startswith('INSERT') and self.marca in sql and context['cursor'].rowcount > 0:
+            self.filas += context['cursor'].rowcount
+        return resultado
+
+
+def fechas_programadas(regla, ultima, fecha_compra, desde, hasta):
+    """
+    Fechas de la serie de `regla` dentro de [desde, hasta].
+    """
+    intervalo = timedelta(days=regla.intervalo_dias)
+    if ultima is not None:
+        siguiente = ultima + intervalo
+    elif regla.fecha_inicio is not None:
+        siguiente = regla.fecha_inicio
+    elif fecha_compra is not None:
+        siguiente = fecha_compra + intervalo
+    else:
+        siguiente = desde
+    siguiente = max(siguiente, desde)
+    while siguiente <= hasta:
+        yield siguiente
+        siguiente += intervalo
+
+
+def _reglas_por_dispositivo():
+    """
+    Dispositivos alcanzados por alguna regla activa, con su regla efectiva:
+    lista de (dispositivo_id, fecha_compra, regla).
+    """
+    reglas = list(ReglaRecurrencia.objects.filter(activa=True))
+    if not reglas:
+        return []
+    por_categoria = {regla.categoria_id: regla for regla in reglas if regla.categoria_id}
+    por_dispositivo = {regla.dispositivo_id: regla for regla in reglas if regla.dispositivo_id}
+
+    dispositivos = (
+        Dispositivo.objects
+        .filter(Q(categoria_id__in=list(por_categoria)) | Q(pk__in=list(por_dispositivo)))
+        .exclude(estado='BAJA')
+        .order_by('pk')
+    )
+    return [
+        (pk, fecha_compra, por_dispositivo.get(pk) or por_categoria.get(categoria_id))
+        for pk, categoria_id, fecha_compra in dispositivos.values_list('pk', 'categoria_id', 'fecha_compra').iterator(chunk_size=TAMANIO_LOTE * 5)
+    ]
+
+
+def programar_mantenimientos(horizonte_dias=None, hoy=None):
+    """
+    Genera los preventivos pendientes hasta hoy + `horizonte_dias` (por defecto
+    settings.MANTENIMIENTO_HORIZONTE_DIAS). Retorna (mantenimientos insertados,
+    dispositivos con fechas nuevas en su serie); los mantenimientos que otra ejecución
+    ya había insertado no se cuentan.
+    """
+    if horizonte_dias is None:
+        horizonte_dias = settings.MANTENIMIENTO_HORIZONTE_DIAS
+    desde = hoy or timezone.localdate()
+    hasta = desde + timedelta(days=horizonte_dias)
+
+    objetivos = _reglas_por_dispositivo()
+    if not objetivos:
+        return 0, 0
+
+    # Último preventivo de cada dispositivo en una sola consulta agregada
+    ultimos = dict(
+        Mantenimiento.objects
+        .filter(tipo='PREVENTIVO')
+        .values('dispositivo_id')
+        .annotate(ultima=Max('fecha_programada'))
+        .order_by()
+        .values_list('dispositivo_id', 'ultima')
+    )
+
+    dispositivos_ids = set()
+
+    def nuevos():
+        for pk, fecha_compra, regla in objetivos:
+            for fecha in fechas_programadas(regla, ultimos.get(pk), fecha_compra, desde, hasta):
+                dispositivos_ids.add(pk)
+                yield Mantenimiento(
+                    dispositivo_id=pk, regla_id=regla.pk, tipo='PREVENTIVO', estado='PENDIENTE',
+                    prioridad=regla.prioridad, fecha_programada=fecha, descripcion_falla=regla.tareas,
+                )
+
+    insertadas = _FilasInsertadas(Mantenimiento._meta.db_table)
+    with transaction.atomic():
+        with connection.execute_wrapper(insertadas):
+            for lote in en_lotes(nuevos(), TAMANIO_LOTE):
+                Mantenimiento.objects.bulk_create(lote, ignore_conflicts=True)
+        if dispositivos_ids:
+            mantenimientos_programados.send(sender=Mantenimiento, dispositivos_ids=sorted(dispositivos_ids), desde=desde)
+    return insertadas.filas, len(dispositivos_ids)
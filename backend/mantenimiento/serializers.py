@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from .models import Mantenimiento
+from gestor_areas_project.serializers import CamposDinamicosMixin
+from .models import Mantenimiento, ReglaRecurrencia
 
-class MantenimientoSerializer(serializers.ModelSerializer):
+class MantenimientoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     dispositivo_codigo = serializers.CharField(source='dispositivo.codigo_inventario', read_only=True)
     dispositivo_modelo = serializers.CharField(source='dispositivo.modelo', read_only=True)
     dispositivo_categoria = serializers.CharField(source='dispositivo.categoria.nombre', read_only=True)
@@ -14,5 +15,26 @@ class MantenimientoSerializer(serializers.ModelSerializer):
             'tipo', 'estado', 'prioridad', 
             'fecha_programada', 'fecha_realizacion', 
             'descripcion_falla', 'acciones_realizadas', 
-            'costo', 'fecha_creacion', 'fecha_actualizacion'
+            'costo', 'regla', 'fecha_creacion', 'fecha_actualizacion'
         ]
+        read_only_fields = ['regla']
+
+
+class ReglaRecurrenciaSerializer(serializers.ModelSerializer):
+    categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True, default=None)
+    dispositivo_codigo = serializers.CharField(source='dispositivo.codigo_inventario', read_only=True, default=None)
+
+    class Meta:
+        model = ReglaRecurrencia
+        fields = [
+            'id', 'categoria', 'categoria_nombre', 'dispositivo', 'dispositivo_codigo',
+            'intervalo_dias', 'prioridad', 'tareas', 'fecha_inicio', 'activa',
+            'fecha_creacion', 'fecha_actualizacion'
+        ]
+
+    def validate(self, data):
+        categoria = data.get('categoria', getattr(self.instance, 'categoria', None))
+        dispositivo = data.get('dispositivo', getattr(self.instance, 'dispositivo', None))
+        if (categoria is None) == (dispositivo is None):
+            raise serializers.ValidationError("La regla debe aplicarse a una categoría o a un dispositivo (solo uno).")
+        return data
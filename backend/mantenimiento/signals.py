@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Mantenimientos creados en bloque por el programador (bulk_create), que no disparan
+# post_save. Argumentos: dispositivos_ids, desde (fecha de referencia: no se generan
+# mantenimientos anteriores).
+mantenimientos_programados = Signal()
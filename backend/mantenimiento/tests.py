@@ -1,3 +1,259 @@
+import base64
+import json
+from datetime import date, timedelta
+from io import StringIO
+from urllib.parse import urlencode
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from gestor_areas_project.pruebas import PlanesConsultaMixin, analizar_tablas
+from inventario.models import Categoria, Dispositivo
+from reportes.acumulados import recalcular_todo
+from reportes.models import CostoMantenimientoMensual
+
+from .models import Mantenimiento, ReglaRecurrencia
+from .programacion import programar_mantenimientos
+
+
+class PlanesConsultaTests(PlanesConsultaMixin, TestCase):
+    """
+    El listado de mantenimientos (ordenado por estado y fecha programada) debe
+    recorrer mantenimiento_estado_idx sin ordenar en memoria.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        Dispositivo.objects.bulk_create(
+            Dispositivo(codigo_inventario=f"INV-{i:04d}", marca="HP", modelo="ProBook", categoria=categoria, ubicacion="Bodega")
+            for i in range(200)
+        )
+        ids = list(Dispositivo.objects.values_list('pk', flat=True))
+        estados = [estado for estado, _ in Mantenimiento.ESTADOS]
+        inicio = date(2025, 1, 1)
+        Mantenimiento.objects.bulk_create(
+            Mantenimiento(
+                dispositivo_id=ids[i % len(ids)], estado=estados[i % len(estados)],
+                fecha_programada=inicio + timedelta(days=i % 365), costo=i % 500,
+            )
+            for i in range(4000)
+        )
+        analizar_tablas(Dispositivo, Mantenimiento)
+
+    def test_listado(self):
+        for url in ('/api/mantenimiento/mantenimientos/', '/api/mantenimiento/mantenimientos/?estado=PENDIENTE'):
+            with self.subTest(url=url):
+                sql = self.consulta_de(url, 'mantenimiento_mantenimiento')
+                self.assertUsaIndice(sql, 'mantenimiento_estado_idx')
+
+    def test_calendario(self):
+        # El rango de fechas recorre el índice de fecha (el GROUP BY por semana puede ordenar)
+        sql = self.consulta_de('/api/mantenimiento/calendario/?desde=2025-03-01&hasta=2025-06-30&granularidad=week', 'mantenimiento_mantenimiento')
+        self.assertUsaIndice(sql, 'mantenimiento_fecha_idx', ordena=True)
+
+    def test_pagina_siguiente(self):
+        # El cursor keyset continúa el recorrido del índice desde la última fila
+        siguiente = self.client.get('/api/mantenimiento/mantenimientos/?estado=PENDIENTE').json()['next']
+        sql = self.consulta_de(siguiente, 'mantenimiento_mantenimiento')
+        self.assertUsaIndice(sql, 'mantenimiento_estado_idx')
+
+
+class PaginacionKeysetTests(TestCase):
+    """
+    El cursor guarda la tupla completa del orden más la clave primaria: recorrer las
+    páginas en ambos sentidos no repite ni saltea filas aunque muchas empaten.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        dispositivo = Dispositivo.objects.create(codigo_inventario="INV-0001", marca="HP", modelo="ProBook", categoria=categoria, ubicacion="Bodega")
+        # 17 empates exactos en (estado, fecha_programada) entre otras filas
+        fechas = [date(2025, 3, 1)] * 17 + [date(2025, 1, 1) + timedelta(days=i) for i in range(8)]
+        Mantenimiento.objects.bulk_create(
+            Mantenimiento(dispositivo=dispositivo, estado=estado, fecha_programada=fecha)
+            for estado in ('PENDIENTE', 'COMPLETADO') for fecha in fechas
+        )
+
+    def recorrer(self, url, clave):
+        ids, paginas = [], []
+        while url:
+            datos = self.client.get(url).json()
+            paginas.append([fila['id'] for fila in datos['results']])
+            ids += paginas[-1]
+            url = datos[clave]
+        return ids, paginas, datos
+
+    def test_empates_hacia_adelante_y_atras(self):
+        esperado = list(Mantenimiento.objects.order_by('estado', 'fecha_programada', 'pk').values_list('pk', flat=True))
+        ids, paginas, ultima = self.recorrer('/api/mantenimiento/mantenimientos/?page_size=4', 'next')
+        self.assertEqual(ids, esperado)
+        self.assertEqual(len(paginas), 13)
+
+        # Desde la última página, 'previous' devuelve las mismas páginas en orden inverso
+        _, anteriores, _ = self.recorrer(ultima['previous'], 'previous')
+        self.assertEqual(anteriores, paginas[-2::-1])
+
+    def test_empates_en_orden_descendente(self):
+        # Con ?ordering= descendente el desempate también es descendente (-pk)
+        esperado = list(
+            Mantenimiento.objects.filter(estado='PENDIENTE').order_by('-fecha_programada', '-pk').values_list('pk', flat=True)
+        )
+        ids, _, _ = self.recorrer('/api/mantenimiento/mantenimientos/?estado=PENDIENTE&ordering=-fecha_programada&page_size=5', 'next')
+        self.assertEqual(ids, esperado)
+
+    def test_cursor_alterado(self):
+        # Cursores bien codificados cuyos valores no corresponden a (estado, fecha_programada, id)
+        for posicion in (["x", "y", "1"], ["PENDIENTE", "2025-03-01", "abc"], [None, None, None], ["PENDIENTE", "2025-03-01"]):
+            cursor = base64.b64encode(urlencode({'p': json.dumps(posicion)}).encode()).decode()
+            response = self.client.get('/api/mantenimiento/mantenimientos/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, posicion)
+
+
+class CalendarioMantenimientoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Portátil")
+        cls.dispositivo = Dispositivo.objects.create(codigo_inventario="LAP-1", marca="Dell", modelo="Latitude", categoria=categoria, ubicacion="Bodega")
+        otro = Dispositivo.objects.create(codigo_inventario="LAP-2", marca="Dell", modelo="Latitude", categoria=categoria, ubicacion="Bodega")
+        for dispositivo, fecha, estado, costo in [
+            (cls.dispositivo, date(2025, 3, 3), 'FINALIZADO', 100),   # lunes
+            (cls.dispositivo, date(2025, 3, 9), 'PENDIENTE', 0),      # domingo, misma semana
+            (otro, date(2025, 3, 10), 'CANCELADO', 500),
+            (otro, date(2025, 4, 1), 'PENDIENTE', 40),
+            (otro, date(2025, 7, 1), 'PENDIENTE', 10),                # fuera del rango
+        ]:
+            Mantenimiento.objects.create(dispositivo=dispositivo, fecha_programada=fecha, estado=estado, costo=costo)
+
+    def calendario(self, **parametros):
+        parametros = {'desde': '2025-03-01', 'hasta': '2025-06-30', **parametros}
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/mantenimiento/calendario/', parametros)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_por_mes(self):
+        datos = self.calendario()
+        self.assertEqual(datos['mantenimientos'], 4)
+        self.assertEqual([(p['periodo'], p['mantenimientos'], p['costo']) for p in datos['periodos']], [
+            ('2025-03-01', 3, 100),   # el cancelado no suma costo
+            ('2025-04-01', 1, 40),
+        ])
+        self.assertEqual(datos['periodos'][0]['estados'], {'PENDIENTE': 1, 'EN_PROCESO': 0, 'FINALIZADO': 1, 'CANCELADO': 1})
+
+    def test_por_semana_y_dia(self):
+        semanas = self.calendario(granularidad='week')['periodos']
+        self.assertEqual([(p['periodo'], p['mantenimientos']) for p in semanas], [('2025-03-03', 2), ('2025-03-10', 1), ('2025-03-31', 1)])
+        dias = self.calendario(granularidad='day', hasta='2025-03-31')['periodos']
+        self.assertEqual([p['periodo'] for p in dias], ['2025-03-03', '2025-03-09', '2025-03-10'])
+
+    def test_filtros(self):
+        datos = self.calendario(dispositivo=self.dispositivo.pk, estado='PENDIENTE')
+        self.assertEqual([(p['periodo'], p['mantenimientos']) for p in datos['periodos']], [('2025-03-01', 1)])
+
+    def test_parametros_invalidos(self):
+        for parametros in (
+            {'granularidad': 'year'},
+            {'desde': '01/03/2025'},
+            {'desde': '2025-06-01', 'hasta': '2025-01-01'},
+            {'granularidad': 'day', 'desde': '2024-01-01', 'hasta': '2025-06-30'},
+            {'dispositivo': 'abc'},
+        ):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get('/api/mantenimiento/calendario/', parametros).status_code, 400)
+
+
+class ProgramacionMantenimientosTests(TestCase):
+    """
+    El programador expande las reglas en preventivos PENDIENTE hasta el horizonte,
+    sin consultas por dispositivo y sin duplicar al volver a ejecutarse.
+    """
+    hoy = date(2026, 3, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.portatil = Categoria.objects.create(nombre="Portátil")
+        cls.monitor = Categoria.objects.create(nombre="Monitor")
+        cls.laptops = [
+            Dispositivo.objects.create(codigo_inventario=f"LAP-{i}", marca="Dell", modelo="Latitude", categoria=cls.portatil, ubicacion="Bodega")
+            for i in range(3)
+        ]
+        cls.monitor_1 = Dispositivo.objects.create(codigo_inventario="MON-1", marca="LG", modelo="24MK", categoria=cls.monitor, ubicacion="Bodega")
+        ReglaRecurrencia.objects.create(categoria=cls.portatil, intervalo_dias=180, prioridad='ALTA', tareas="Limpieza y revisión")
+
+    def fechas(self, dispositivo):
+        return list(Mantenimiento.objects.filter(dispositivo=dispositivo).order_by('fecha_programada').values_list('fecha_programada', flat=True))
+
+    def test_serie_desde_el_ultimo_preventivo(self):
+        Mantenimiento.objects.create(dispositivo=self.laptops[0], tipo='PREVENTIVO', estado='FINALIZADO', fecha_programada=date(2026, 1, 10))
+        self.assertEqual(programar_mantenimientos(200, hoy=self.hoy), (5, 3))
+
+        self.assertEqual(self.fechas(self.laptops[0]), [date(2026, 1, 10), date(2026, 7, 9)])
+        # Sin preventivos previos la serie empieza hoy
+        self.assertEqual(self.fechas(self.laptops[1]), [self.hoy, self.hoy + timedelta(days=180)])
+        self.assertEqual(self.fechas(self.monitor_1), [])
+        generado = Mantenimiento.objects.filter(regla__isnull=False).first()
+        self.assertEqual((generado.estado, generado.prioridad, generado.descripcion_falla), ('PENDIENTE', 'ALTA', "Limpieza y revisión"))
+
+    def test_idempotente(self):
+        programar_mantenimientos(365, hoy=self.hoy)
+        total = Mantenimiento.objects.count()
+        self.assertEqual(programar_mantenimientos(365, hoy=self.hoy), (0, 0))
+        self.assertEqual(programar_mantenimientos(365, hoy=self.hoy + timedelta(days=1)), (0, 0))
+        self.assertEqual(Mantenimiento.objects.count(), total)
+
+    def test_cuenta_solo_los_insertados(self):
+        # Un preventivo generado por otra ejecución ocupa la primera fecha de LAP-1
+        regla = ReglaRecurrencia.objects.get(categoria=self.portatil)
+        Mantenimiento.objects.create(dispositivo=self.laptops[1], regla=regla, tipo='CORRECTIVO', fecha_programada=self.hoy)
+        self.assertEqual(programar_mantenimientos(200, hoy=self.hoy), (5, 3))
+        self.assertEqual(Mantenimiento.objects.count(), 6)
+
+    def test_regla_del_dispositivo_y_bajas(self):
+        ReglaRecurrencia.objects.create(dispositivo=self.laptops[0], intervalo_dias=30, fecha_inicio=date(2026, 3, 15))
+        Dispositivo.objects.filter(pk=self.laptops[2].pk).update(estado='BAJA')
+        programar_mantenimientos(60, hoy=self.hoy)
+
+        self.assertEqual(self.fechas(self.laptops[0]), [date(2026, 3, 15), date(2026, 4, 14)])
+        self.assertEqual(self.fechas(self.laptops[1]), [self.hoy])
+        self.assertEqual(self.fechas(self.laptops[2]), [])
+
+    def test_consultas_independientes_de_los_dispositivos(self):
+        def consultas():
+            Mantenimiento.objects.all().delete()
+            with CaptureQueriesContext(connection) as contexto:
+                programar_mantenimientos(30, hoy=self.hoy)
+            return len(contexto.captured_queries)
+
+        antes = consultas()
+        Dispositivo.objects.bulk_create(
+            Dispositivo(codigo_inventario=f"LAP-X{i}", marca="Dell", modelo="Latitude", categoria=self.portatil, ubicacion="Bodega")
+            for i in range(30)
+        )
+        self.assertEqual(consultas(), antes)
+
+    def test_actualiza_reportes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            programar_mantenimientos(365, hoy=self.hoy)
+        self.assertEqual(CostoMantenimientoMensual.objects.get(dispositivo=self.laptops[0], mes=date(2026, 3, 1)).cantidad, 1)
+        incremental = sorted(CostoMantenimientoMensual.objects.values_list('dispositivo_id', 'mes', 'cantidad', 'costo_total'))
+        recalcular_todo()
+        self.assertEqual(incremental, sorted(CostoMantenimientoMensual.objects.values_list('dispositivo_id', 'mes', 'cantidad', 'costo_total')))
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command('programar_mantenimientos', '--horizonte', '10', '--fecha', '2026-03-01', stdout=salida)
+        self.assertIn("3 mantenimiento(s) programado(s) para 3 dispositivo(s)", salida.getvalue())
 
-# Create your tests here.
+    def test_api_valida_objetivo_de_la_regla(self):
+        response = self.client.post('/api/mantenimiento/reglas/', {'intervalo_dias': 90}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            '/api/mantenimiento/reglas/', {'dispositivo': self.monitor_1.pk, 'intervalo_dias': 90}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['dispositivo_codigo'], "MON-1")
@@ -1,10 +1,12 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from .views import MantenimientoViewSet
+from .views import CalendarioMantenimientoView, MantenimientoViewSet, ReglaRecurrenciaViewSet
 
 router = DefaultRouter()
 router.register(r'mantenimientos', MantenimientoViewSet)
+router.register(r'reglas', ReglaRecurrenciaViewSet)
 
 urlpatterns = [
+    path('calendario/', CalendarioMantenimientoView.as_view(), name='mantenimiento-calendario'),
     path('', include(router.urls)),
 ]
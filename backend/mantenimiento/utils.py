@@ -0,0 +1,14 @@
+from gestor_areas_project.exportacion import Hoja, filas_de
+
+MAINTENANCE_HEADERS = [
+    'dispositivo_codigo', 'tipo', 'estado', 'prioridad', 'fecha_programada',
+    'fecha_realizacion', 'descripcion_falla', 'acciones_realizadas', 'costo'
+]
+
+
+def export_maintenance_sheets(mantenimientos):
+    """
+    Hoja para exportar el historial de mantenimientos del queryset.
+    """
+    campos = ['dispositivo__codigo_inventario'] + MAINTENANCE_HEADERS[1:]
+    return [Hoja('Mantenimientos', MAINTENANCE_HEADERS, lambda: filas_de(mantenimientos, *campos), color="3699FF")]
@@ -1,12 +1,148 @@
-from rest_framework import viewsets, filters
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework import viewsets, filters, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Mantenimiento
-from .serializers import MantenimientoSerializer
+from gestor_areas_project.exportacion import ExportarMixin
+from .models import Mantenimiento, ReglaRecurrencia
+from .serializers import MantenimientoSerializer, ReglaRecurrenciaSerializer
+from .utils import export_maintenance_sheets
 
-class MantenimientoViewSet(viewsets.ModelViewSet):
-    queryset = Mantenimiento.objects.all().order_by('estado', 'fecha_programada')
+class MantenimientoViewSet(ExportarMixin, viewsets.ModelViewSet):
+    # La categoría se trae aparte: con el join a dos tablas el planificador puede
+    # dejar de recorrer mantenimiento_estado_idx y ordenar toda la tabla
+    queryset = Mantenimiento.objects.select_related('dispositivo').prefetch_related('dispositivo__categoria').order_by('estado', 'fecha_programada')
     serializer_class = MantenimientoSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['estado', 'tipo', 'prioridad', 'dispositivo']
+    filterset_fields = ['estado', 'tipo', 'prioridad', 'dispositivo', 'regla']
     search_fields = ['dispositivo__codigo_inventario', 'descripcion_falla', 'acciones_realizadas']
     ordering_fields = ['fecha_programada', 'prioridad', 'costo']
+    ordering = ['estado', 'fecha_programada']
+    nombre_exportacion = 'mantenimientos'
+    # Mantenimientos y categorías; el filtro por dispositivo valida el ID con una consulta extra
+    presupuesto_consultas = {'list': 3, 'retrieve': 2}
+
+    def hojas_exportacion(self, queryset):
+        return export_maintenance_sheets(queryset)
+
+
+class ReglaRecurrenciaViewSet(viewsets.ModelViewSet):
+    queryset = ReglaRecurrencia.objects.select_related('categoria', 'dispositivo')
+    serializer_class = ReglaRecurrenciaSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['categoria', 'dispositivo', 'activa']
+    ordering = ['-id']
+    presupuesto_consultas = {'list': 1, 'retrieve': 1}
+
+
+class ParametroInvalido(ValueError):
+    pass
+
+
+def _parametro_fecha(request, nombre, defecto):
+    valor = request.query_params.get(nombre)
+    if not valor:
+        return defecto
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise ParametroInvalido(f"'{nombre}' debe tener el formato 2025-06-30.")
+
+
+class CalendarioMantenimientoView(APIView):
+    """
+    Cantidad y costo de los mantenimientos por día, semana o mes de la fecha programada.
+
+    Parámetros: `desde` y `hasta` (YYYY-MM-DD, inclusivos; por defecto un año desde
+    el inicio del mes actual), `granularidad` (day | week | month, por defecto month;
+    las semanas empiezan el lunes) y los filtros opcionales `estado`, `tipo`,
+    `prioridad`, `dispositivo` y `categoria`. Solo se devuelven los períodos con
+    mantenimientos. El costo excluye los cancelados, como en los reportes.
+
+    Se resuelve con un GROUP BY sobre mantenimiento_fecha_idx, que cubre las
+    columnas agregadas.
+    """
+    presupuesto_consultas = {'get': 1}
+
+    GRANULARIDADES = {
+        'day': None,
+        'week': TruncWeek,
+        'month': TruncMonth,
+    }
+    FILTROS = {
+        'estado': 'estado',
+        'tipo': 'tipo',
+        'prioridad': 'prioridad',
+        'dispositivo': 'dispositivo_id',
+        'categoria': 'dispositivo__categoria_id',
+    }
+    # Límite del rango por día, para acotar el tamaño de la respuesta
+    MAX_DIAS_POR_DIA = 366
+
+    def get(self, request):
+        granularidad = request.query_params.get('granularidad', 'month')
+        if granularidad not in self.GRANULARIDADES:
+            return Response(
+                {"error": f"'granularidad' debe ser uno de: {', '.join(self.GRANULARIDADES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            desde = _parametro_fecha(request, 'desde', timezone.localdate().replace(day=1))
+            hasta = _parametro_fecha(request, 'hasta', desde + timedelta(days=364))
+        except ParametroInvalido as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if hasta < desde:
+            return Response({"error": "'hasta' debe ser posterior a 'desde'."}, status=status.HTTP_400_BAD_REQUEST)
+        if granularidad == 'day' and (hasta - desde).days >= self.MAX_DIAS_POR_DIA:
+            return Response(
+                {"error": f"Con granularidad 'day' el rango no puede superar {self.MAX_DIAS_POR_DIA} días."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        mantenimientos = Mantenimiento.objects.filter(fecha_programada__gte=desde, fecha_programada__lte=hasta)
+        try:
+            for parametro, campo in self.FILTROS.items():
+                valor = request.query_params.get(parametro)
+                if valor:
+                    mantenimientos = mantenimientos.filter(**{campo: valor})
+        except ValueError:
+            # ID de dispositivo o categoría no numérico
+            return Response({"error": "'dispositivo' y 'categoria' deben ser IDs."}, status=status.HTTP_400_BAD_REQUEST)
+
+        truncar = self.GRANULARIDADES[granularidad]
+        # fecha_programada ya es una fecha: por día se agrupa por la columna tal cual
+        periodo = truncar('fecha_programada') if truncar else F('fecha_programada')
+        filas = (
+            mantenimientos
+            .annotate(periodo=periodo)
+            .values('periodo')
+            .annotate(
+                mantenimientos=Count('pk'),
+                costo=Sum('costo', filter=~Q(estado='CANCELADO'), default=Decimal('0.00')),
+                **{estado: Count('pk', filter=Q(estado=estado)) for estado, _ in Mantenimiento.ESTADOS}
+            )
+            .order_by('periodo')
+        )
+
+        periodos = [
+            {
+                'periodo': fila['periodo'],
+                'mantenimientos': fila['mantenimientos'],
+                'costo': fila['costo'],
+                'estados': {estado: fila[estado] for estado, _ in Mantenimiento.ESTADOS},
+            }
+            for fila in filas
+        ]
+        return Response({
+            'desde': desde,
+            'hasta': hasta,
+            'granularidad': granularidad,
+            'mantenimientos': sum(p['mantenimientos'] for p in periodos),
+            'costo_total': sum((p['costo'] for p in periodos), Decimal('0.00')),
+            'periodos': periodos,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,245 @@
+"""
+Tablas acumuladas de los reportes.
+
+Cada tabla se recalcula por clave: dispositivos (costos de mantenimiento, que
+a su vez actualizan los totales por categoría de los meses afectados),
+estados (conteo diario de dispositivos), ubicaciones (movimientos) o la
+distribución completa de ocupación de discos, que sale de los agregados ya
+persistidos en Disco. Las señales de reportes.signals programan el recálculo de
+las claves afectadas al confirmar la transacción, así una escritura solo relee
+las filas de hechos de esas claves (por índice) y los endpoints leen tablas
+pequeñas. Las claves se acumulan durante la transacción y cada recálculo se
+ejecuta una sola vez con todas ellas. El conteo por estado se ajusta con las
+variaciones (+1/-1) de cada escritura, sin recontar los dispositivos. Sin claves
+(None) se reconstruye la tabla completa, ver el comando `recalcular_reportes`.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, DecimalField, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, Floor, Least, TruncMonth
+from django.utils import timezone
+
+from discos.models import Disco
+from gestor_areas_project.excel import en_lotes
+from inventario.models import Dispositivo, Movimiento
+from mantenimiento.models import Mantenimiento
+
+from .models import CostoCategoriaMensual, CostoMantenimientoMensual, DispositivosPorEstado, MovimientosPorUbicacion, OcupacionDiscos
+
+# Claves que se recalculan juntas (límite de parámetros de SQLite)
+TAMANIO_LOTE_CLAVES = 500
+
+# Rango de ocupación de los discos llenos (100% o más)
+RANGO_LLENO = 10
+
+
+def _lotes_de_claves(claves):
+    if claves is None:
+        return [None]
+    return en_lotes(sorted(set(claves) - {None, ''}), TAMANIO_LOTE_CLAVES)
+
+
+def recalcular_costos(dispositivos_ids=None, desde=None):
+    """
+    Recalcula los costos mensuales de mantenimiento de los dispositivos indicados y
+    los totales por categoría de los meses que cambiaron. Con `desde` solo se
+    recalculan los meses a partir de esa fecha (ej: mantenimientos programados a futuro).
+    """
+    for lote in _lotes_de_claves(dispositivos_ids):
+        mantenimientos = Mantenimiento.objects.exclude(estado='CANCELADO')
+        acumulados = CostoMantenimientoMensual.objects.all()
+        if lote is not None:
+            mantenimientos = mantenimientos.filter(dispositivo_id__in=lote)
+            acumulados = acumulados.filter(dispositivo_id__in=lote)
+        if desde is not None:
+            mantenimientos = mantenimientos.filter(fecha_programada__gte=desde.replace(day=1))
+            acumulados = acumulados.filter(mes__gte=desde.replace(day=1))
+
+        filas = (
+            mantenimientos
+            .annotate(mes=TruncMonth('fecha_programada'))
+            .values('dispositivo_id', 'dispositivo__categoria_id', 'mes')
+            .annotate(cantidad=Count('pk'), costo_total=Sum('costo'))
+            .order_by()
+        )
+        nuevos = [
+            CostoMantenimientoMensual(
+                dispositivo_id=fila['dispositivo_id'],
+                categoria_id=fila['dispositivo__categoria_id'],
+                mes=fila['mes'],
+                cantidad=fila['cantidad'],
+                costo_total=fila['costo_total'],
+            )
+            for fila in filas.iterator()
+        ]
+        with transaction.atomic():
+            if lote is None:
+                afectados = None
+            else:
+                afectados = set(acumulados.values_list('categoria_id', 'mes'))
+                afectados.update((costo.categoria_id, costo.mes) for costo in nuevos)
+            acumulados.delete()
+            CostoMantenimientoMensual.objects.bulk_create(nuevos, batch_size=TAMANIO_LOTE_CLAVES)
+            _recalcular_costos_categoria(afectados)
+
+
+def _recalcular_costos_categoria(afectados):
+    """
+    Recalcula CostoCategoriaMensual para los pares (categoría, mes) indicados, o todos con None.
+    """
+    if afectados is not None and not afectados:
+        return
+    costos = CostoMantenimientoMensual.objects.all()
+    acumulados = CostoCategoriaMensual.objects.all()
+    if afectados is not None:
+        # Se recalcula el producto categorías x meses, que incluye a los pares afectados
+        filtro = Q(categoria_id__in={categoria for categoria, _ in afectados}, mes__in={mes for _, mes in afectados})
+        costos = costos.filter(filtro)
+        acumulados = acumulados.filter(filtro)
+
+    filas = (
+        costos
+        .values('categoria_id', 'mes')
+        .annotate(total_cantidad=Sum('cantidad'), total_costo=Sum('costo_total'))
+        .order_by()
+    )
+    acumulados.delete()
+    CostoCategoriaMensual.objects.bulk_create(
+        (
+            CostoCategoriaMensual(
+                categoria_id=fila['categoria_id'],
+                mes=fila['mes'],
+                cantidad=fila['total_cantidad'],
+                costo_total=fila['total_costo'],
+            )
+            for fila in filas
+        ),
+        batch_size=TAMANIO_LOTE_CLAVES,
+    )
+
+
+def recalcular_estados(estados=None):
+    """
+    Actualiza la fila del día de los estados indicados con la cantidad actual de dispositivos.
+    """
+    estados = [estado for estado, _ in Dispositivo.ESTADOS if estados is None or estado in estados]
+    if not estados:
+        return
+    conteos = dict(
+        Dispositivo.objects
+        .filter(estado__in=estados)
+        .values_list('estado')
+        .annotate(cantidad=Count('pk'))
+        .order_by()
+    )
+    hoy = timezone.localdate()
+    DispositivosPorEstado.objects.bulk_create(
+        [DispositivosPorEstado(fecha=hoy, estado=estado, cantidad=conteos.get(estado, 0)) for estado in estados],
+        update_conflicts=True,
+        unique_fields=['fecha', 'estado'],
+        update_fields=['cantidad'],
+    )
+
+
+def ajustar_estados(variaciones=None):
+    """
+    Suma a la fila del día de cada estado su variación de dispositivos ({estado: n}).
+    Si el estado aún no tiene fila del día se parte de su último conteo; si nunca se
+    contó, o sin variaciones (None), se recuenta.
+    """
+    if variaciones is None:
+        recalcular_estados()
+        return
+    hoy = timezone.localdate()
+    sin_conteo = []
+    for estado, variacion in variaciones.items():
+        if not variacion:
+            continue
+        filas = DispositivosPorEstado.objects.filter(estado=estado)
+        if filas.filter(fecha=hoy).update(cantidad=F('cantidad') + variacion):
+            continue
+        anterior = filas.filter(fecha__lt=hoy).order_by('-fecha').values_list('cantidad', flat=True).first()
+        if anterior is None:
+            sin_conteo.append(estado)
+            continue
+        try:
+            with transaction.atomic():
+                DispositivosPorEstado.objects.create(fecha=hoy, estado=estado, cantidad=anterior + variacion)
+        except IntegrityError:
+            # Otra transacción creó la fila del día mientras tanto
+            filas.filter(fecha=hoy).update(cantidad=F('cantidad') + variacion)
+    # El recuento se hace después de confirmar, ya incluye los cambios
+    recalcular_estados(sin_conteo)
+
+
+def recalcular_movimientos(ubicaciones=None):
+    """
+    Recalcula las entradas y salidas mensuales de las ubicaciones indicadas.
+    """
+    for lote in _lotes_de_claves(ubicaciones):
+        por_mes = defaultdict(lambda: [0, 0])
+        for campo, posicion in (('destino', 0), ('origen', 1)):
+            movimientos = Movimiento.objects.all()
+            if lote is not None:
+                movimientos = movimientos.filter(**{f'{campo}__in': lote})
+            filas = (
+                movimientos
+                .annotate(mes=TruncMonth('fecha_movimiento', output_field=DateField()))
+                .values_list(campo, 'mes')
+                .annotate(cantidad=Count('pk'))
+                .order_by()
+            )
+            for ubicacion, mes, cantidad in filas:
+                if ubicacion:
+                    por_mes[(ubicacion, mes)][posicion] += cantidad
+
+        acumulados = MovimientosPorUbicacion.objects.all()
+        if lote is not None:
+            acumulados = acumulados.filter(ubicacion__in=lote)
+        with transaction.atomic():
+            acumulados.delete()
+            MovimientosPorUbicacion.objects.bulk_create(
+                (
+                    MovimientosPorUbicacion(ubicacion=ubicacion, mes=mes, entradas=entradas, salidas=salidas)
+                    for (ubicacion, mes), (entradas, salidas) in por_mes.items()
+                ),
+                batch_size=TAMANIO_LOTE_CLAVES,
+            )
+
+
+def recalcular_ocupacion():
+    """
+    Recalcula la distribución de ocupación a partir de los agregados de cada disco.
+    """
+    decimal = DecimalField(max_digits=14, decimal_places=2)
+    filas = (
+        Disco.objects
+        .filter(tamanio_gb__gt=0)
+        .annotate(rango=Least(
+            Floor(F('espacio_usado_gb') * 10 / F('tamanio_gb')),
+            Value(RANGO_LLENO),
+            output_field=IntegerField(),
+        ))
+        .values('rango')
+        .annotate(
+            discos=Count('pk'),
+            tamanio=Coalesce(Sum('tamanio_gb'), Value(Decimal('0.00')), output_field=decimal),
+            usado=Coalesce(Sum('espacio_usado_gb'), Value(Decimal('0.00')), output_field=decimal),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        OcupacionDiscos.objects.all().delete()
+        OcupacionDiscos.objects.bulk_create(
+            OcupacionDiscos(rango=int(fila['rango']), discos=fila['discos'], tamanio_gb=fila['tamanio'], usado_gb=fila['usado'])
+            for fila in filas
+        )
+
+
+def recalcular_todo():
+    recalcular_costos()
+    recalcular_estados()
+    recalcular_movimientos()
+    recalcular_ocupacion()
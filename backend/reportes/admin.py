@@ -1,3 +1,14 @@
 from django.contrib import admin
+from .models import (
+    CostoCategoriaMensual, CostoMantenimientoMensual, CostoTotalDispositivo, DispositivosPorEstado, MarcaAgua,
+    MovimientosPorUbicacion, OcupacionDiscos,
+)
 
-# Register your models here.
+# Tablas acumuladas: se recalculan desde reportes.acumulados, no se editan a mano
+admin.site.register(CostoMantenimientoMensual)
+admin.site.register(CostoCategoriaMensual)
+admin.site.register(DispositivosPorEstado)
+admin.site.register(MovimientosPorUbicacion)
+admin.site.register(OcupacionDiscos)
+admin.site.register(CostoTotalDispositivo)
+admin.site.register(MarcaAgua)
@@ -0,0 +1,144 @@
+"""
+Costo total de propiedad (TCO) por dispositivo, calculado en forma incremental.
+
+`actualizar_costo_total()` recalcula CostoTotalDispositivo solo para los
+dispositivos con cambios desde la marca de agua de la ejecución anterior:
+
+- mantenimientos creados o editados (fecha_actualizacion),
+- movimientos nuevos (ID mayor al último procesado),
+- dispositivos editados (garantía, categoría; registrar un movimiento también
+  actualiza su fecha_actualizacion),
+- y los que siguen en reparación, cuyo tiempo en EN_REPARACION crece con los días.
+
+Los borrados no dejan rastro en las tablas de hechos: los de dispositivos se
+propagan en cascada y, para los de mantenimientos o movimientos, el comando
+`calcular_costo_total --completo` reconstruye la tabla.
+
+Cada lote de dispositivos se resuelve con tres consultas (costos, movimientos que
+cambian el estado, datos del dispositivo) y se reescribe con bulk_create.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from gestor_areas_project.excel import en_lotes
+from inventario.models import Dispositivo, Movimiento
+from mantenimiento.models import Mantenimiento
+
+from .acumulados import TAMANIO_LOTE_CLAVES
+from .models import CostoTotalDispositivo, MarcaAgua
+
+PROCESO = 'costo_total'
+
+SEGUNDOS_POR_DIA = Decimal(86400)
+
+
+def dispositivos_con_cambios(marca):
+    """
+    IDs de los dispositivos a recalcular desde `marca` (todos si no hay marca).
+    """
+    if marca is None:
+        return set(Dispositivo.objects.values_list('pk', flat=True))
+    ids = set(Mantenimiento.objects.filter(fecha_actualizacion__gte=marca.fecha).values_list('dispositivo_id', flat=True))
+    ids.update(Movimiento.objects.filter(pk__gt=marca.ultimo_id).values_list('dispositivo_id', flat=True))
+    ids.update(Dispositivo.objects.filter(fecha_actualizacion__gte=marca.fecha).values_list('pk', flat=True))
+    ids.update(CostoTotalDispositivo.objects.filter(en_reparacion_desde__isnull=False).values_list('dispositivo_id', flat=True))
+    return ids
+
+
+def tiempo_en_reparacion(movimientos, ahora):
+    """
+    A partir de los movimientos que cambian el estado de un dispositivo, en orden
+    cronológico, retorna (segundos en EN_REPARACION, inicio de la reparación en curso).
+    """
+    segundos = 0.0
+    desde = None
+    for tipo, fecha in movimientos:
+        if desde is not None:
+            segundos += (fecha - desde).total_seconds()
+            desde = None
+        if tipo == 'REPARACION':
+            desde = fecha
+    if desde is not None:
+        segundos += max((ahora - desde).total_seconds(), 0)
+    return segundos, desde
+
+
+def _calcular_lote(lote, ahora):
+    decimal = DecimalField(max_digits=14, decimal_places=2)
+    costos = {
+        fila['dispositivo_id']: fila
+        for fila in (
+            Mantenimiento.objects
+            .filter(dispositivo_id__in=lote)
+            .exclude(estado='CANCELADO')
+            .values('dispositivo_id')
+            .annotate(
+                cantidad=Count('pk'),
+                costo_total=Coalesce(Sum('costo'), Value(Decimal('0.00')), output_field=decimal),
+                costo_garantia=Coalesce(
+                    Sum('costo', filter=Q(fecha_programada__lte=F('dispositivo__garantia_hasta'))),
+                    Value(Decimal('0.00')), output_field=decimal,
+                ),
+            )
+            .order_by()
+        )
+    }
+
+    # Solo los tipos que fijan un estado abren o cierran una reparación (TRASLADO no)
+    historial = defaultdict(list)
+    reparaciones = defaultdict(int)
+    movimientos = (
+        Movimiento.objects
+        .filter(dispositivo_id__in=lote, tipo_movimiento__in=list(Movimiento.ESTADO_POR_TIPO))
+        .order_by('dispositivo_id', 'fecha_movimiento', 'id')
+        .values_list('dispositivo_id', 'tipo_movimiento', 'fecha_movimiento')
+    )
+    for dispositivo_id, tipo, fecha in movimientos:
+        historial[dispositivo_id].append((tipo, fecha))
+        if tipo == 'REPARACION':
+            reparaciones[dispositivo_id] += 1
+
+    filas = []
+    for pk, categoria_id, garantia_hasta in Dispositivo.objects.filter(pk__in=lote).values_list('pk', 'categoria_id', 'garantia_hasta'):
+        costo = costos.get(pk, {})
+        segundos, en_reparacion_desde = tiempo_en_reparacion(historial.get(pk, ()), ahora)
+        filas.append(CostoTotalDispositivo(
+            dispositivo_id=pk,
+            categoria_id=categoria_id,
+            mantenimientos=costo.get('cantidad', 0),
+            costo_mantenimiento=costo.get('costo_total', Decimal('0.00')),
+            costo_en_garantia=costo.get('costo_garantia', Decimal('0.00')),
+            reparaciones=reparaciones.get(pk, 0),
+            dias_en_reparacion=(Decimal(segundos) / SEGUNDOS_POR_DIA).quantize(Decimal('0.01')),
+            en_reparacion_desde=en_reparacion_desde,
+            garantia_hasta=garantia_hasta,
+            fecha_calculo=ahora,
+        ))
+
+    with transaction.atomic():
+        CostoTotalDispositivo.objects.filter(dispositivo_id__in=lote).delete()
+        CostoTotalDispositivo.objects.bulk_create(filas, batch_size=TAMANIO_LOTE_CLAVES)
+
+
+def actualizar_costo_total(completo=False):
+    """
+    Recalcula el TCO de los dispositivos con cambios desde la última ejecución, o
+    de todos con `completo`. Retorna la cantidad de dispositivos procesados.
+    """
+    # La marca nueva se toma antes de leer: lo que cambie durante el cálculo se
+    # vuelve a procesar en la próxima ejecución
+    ahora = timezone.now()
+    ultimo_id = Movimiento.objects.aggregate(ultimo=Max('pk'))['ultimo'] or 0
+    marca = None if completo else MarcaAgua.objects.filter(proceso=PROCESO).first()
+
+    ids = dispositivos_con_cambios(marca)
+    for lote in en_lotes(sorted(ids), TAMANIO_LOTE_CLAVES):
+        _calcular_lote(lote, ahora)
+
+    MarcaAgua.objects.update_or_create(proceso=PROCESO, defaults={'fecha': ahora, 'ultimo_id': ultimo_id})
+    return len(ids)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reportes.ciclo_vida import actualizar_costo_total
+
+
+class Command(BaseCommand):
+    help = "Actualiza el costo total de propiedad de los dispositivos con cambios desde la última ejecución (pensado para ejecutarse periódicamente)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--completo', action='store_true', help="Recalcula todos los dispositivos, ignorando la marca de agua.")
+
+    def handle(self, *args, **options):
+        procesados = actualizar_costo_total(completo=options['completo'])
+        self.stdout.write(self.style.SUCCESS(f"Costo total actualizado para {procesados} dispositivo(s)."))
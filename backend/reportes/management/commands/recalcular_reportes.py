@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reportes.acumulados import recalcular_todo
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero las tablas acumuladas de los reportes (ej: luego de instalar la app o cargar datos con SQL)."
+
+    def handle(self, *args, **options):
+        recalcular_todo()
+        self.stdout.write(self.style.SUCCESS("Reportes recalculados."))
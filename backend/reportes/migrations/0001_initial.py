@@ -0,0 +1,97 @@
+# Generated by Django 5.2.8 on 2026-01-27 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventario', '0002_indices_movimiento_ubicacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OcupacionDiscos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rango', models.PositiveSmallIntegerField(help_text='Decena del porcentaje de ocupación (0 = 0-9%)', unique=True)),
+                ('discos', models.PositiveIntegerField(default=0)),
+                ('tamanio_gb', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('usado_gb', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Ocupación de Discos',
+                'verbose_name_plural': 'Ocupación de Discos',
+                'ordering': ['rango'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DispositivosPorEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('estado', models.CharField(choices=[('ACTIVO', 'Activo'), ('DISPONIBLE', 'Disponible'), ('EN_REPARACION', 'En Reparación'), ('DAÑADO', 'Dañado'), ('BAJA', 'De Baja')], max_length=20)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Dispositivos por Estado',
+                'verbose_name_plural': 'Dispositivos por Estado',
+                'ordering': ['-fecha', 'estado'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'estado'), name='estado_diario_fecha_estado_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MovimientosPorUbicacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ubicacion', models.CharField(max_length=150)),
+                ('mes', models.DateField(help_text='Primer día del mes')),
+                ('entradas', models.PositiveIntegerField(default=0)),
+                ('salidas', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Movimientos por Ubicación',
+                'verbose_name_plural': 'Movimientos por Ubicación',
+                'ordering': ['-mes', 'ubicacion'],
+                'indexes': [models.Index(fields=['mes'], name='movimientos_ubicacion_mes_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ubicacion', 'mes'), name='movimientos_ubicacion_mes_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CostoCategoriaMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primer día del mes')),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('costo_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario.categoria')),
+            ],
+            options={
+                'verbose_name': 'Costo de Mantenimiento por Categoría',
+                'verbose_name_plural': 'Costos de Mantenimiento por Categoría',
+                'ordering': ['-mes'],
+                'constraints': [models.UniqueConstraint(fields=('categoria', 'mes'), name='costo_categoria_categoria_mes_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CostoMantenimientoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primer día del mes')),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('costo_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario.categoria')),
+                ('dispositivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario.dispositivo')),
+            ],
+            options={
+                'verbose_name': 'Costo de Mantenimiento Mensual',
+                'verbose_name_plural': 'Costos de Mantenimiento Mensuales',
+                'ordering': ['-mes'],
+                'indexes': [models.Index(fields=['mes', 'categoria'], name='costo_mensual_mes_cat_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dispositivo', 'mes'), name='costo_mensual_dispositivo_mes_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-01-30 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_indices_listados'),
+        ('reportes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaAgua',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('proceso', models.CharField(max_length=50, unique=True)),
+                ('fecha', models.DateTimeField()),
+                ('ultimo_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Marca de Agua',
+                'verbose_name_plural': 'Marcas de Agua',
+            },
+        ),
+        migrations.CreateModel(
+            name='CostoTotalDispositivo',
+            fields=[
+                ('dispositivo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='inventario.dispositivo')),
+                ('mantenimientos', models.PositiveIntegerField(default=0)),
+                ('costo_mantenimiento', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('costo_en_garantia', models.DecimalField(decimal_places=2, default=0, help_text='Costo de los mantenimientos programados hasta el fin de la garantía', max_digits=14)),
+                ('reparaciones', models.PositiveIntegerField(default=0, help_text='Movimientos de envío a reparación')),
+                ('dias_en_reparacion', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('en_reparacion_desde', models.DateTimeField(blank=True, help_text='Inicio de la reparación en curso', null=True)),
+                ('garantia_hasta', models.DateField(blank=True, null=True)),
+                ('fecha_calculo', models.DateTimeField()),
+                ('categoria', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario.categoria')),
+            ],
+            options={
+                'verbose_name': 'Costo Total de Dispositivo',
+                'verbose_name_plural': 'Costos Totales de Dispositivos',
+                'ordering': ['-costo_mantenimiento', '-dispositivo'],
+                'indexes': [models.Index(fields=['-costo_mantenimiento', '-dispositivo'], name='costo_total_costo_idx'), models.Index(fields=['-reparaciones', '-dispositivo'], name='costo_total_reparaciones_idx'), models.Index(fields=['-dias_en_reparacion', '-dispositivo'], name='costo_total_dias_idx'), models.Index(fields=['categoria', '-costo_mantenimiento', '-dispositivo'], name='costo_total_categoria_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,168 @@
 from django.db import models
 
-# Create your models here.
+from inventario.models import Categoria, Dispositivo
+
+
+class CostoMantenimientoMensual(models.Model):
+    """
+    Acumulado de mantenimientos (excepto cancelados) por dispositivo y mes de
+    la fecha programada. La categoría se copia del dispositivo para agrupar sin joins.
+    """
+    dispositivo = models.ForeignKey(Dispositivo, on_delete=models.CASCADE, related_name='+')
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='+')
+    mes = models.DateField(help_text="Primer día del mes")
+    cantidad = models.PositiveIntegerField(default=0)
+    costo_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.dispositivo_id} - {self.mes:%Y-%m}: {self.costo_total}"
+
+    class Meta:
+        verbose_name = "Costo de Mantenimiento Mensual"
+        verbose_name_plural = "Costos de Mantenimiento Mensuales"
+        ordering = ['-mes']
+        constraints = [
+            models.UniqueConstraint(fields=['dispositivo', 'mes'], name='costo_mensual_dispositivo_mes_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['mes', 'categoria'], name='costo_mensual_mes_cat_idx'),
+        ]
+
+
+class CostoCategoriaMensual(models.Model):
+    """
+    Acumulado de CostoMantenimientoMensual por categoría y mes, para los reportes
+    por mes o por categoría sin recorrer las filas de cada dispositivo.
+    """
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='+')
+    mes = models.DateField(help_text="Primer día del mes")
+    cantidad = models.PositiveIntegerField(default=0)
+    costo_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.categoria_id} - {self.mes:%Y-%m}: {self.costo_total}"
+
+    class Meta:
+        verbose_name = "Costo de Mantenimiento por Categoría"
+        verbose_name_plural = "Costos de Mantenimiento por Categoría"
+        ordering = ['-mes']
+        constraints = [
+            models.UniqueConstraint(fields=['categoria', 'mes'], name='costo_categoria_categoria_mes_unico'),
+        ]
+
+
+class DispositivosPorEstado(models.Model):
+    """
+    Cantidad de dispositivos en cada estado al final de cada día con cambios.
+    Los días sin fila conservan la cantidad del último día registrado.
+    """
+    fecha = models.DateField()
+    estado = models.CharField(max_length=20, choices=Dispositivo.ESTADOS)
+    cantidad = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.fecha} - {self.estado}: {self.cantidad}"
+
+    class Meta:
+        verbose_name = "Dispositivos por Estado"
+        verbose_name_plural = "Dispositivos por Estado"
+        ordering = ['-fecha', 'estado']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'estado'], name='estado_diario_fecha_estado_unico'),
+        ]
+
+
+class MovimientosPorUbicacion(models.Model):
+    """
+    Movimientos por ubicación y mes: entradas (la ubicación es el destino) y
+    salidas (la ubicación es el origen).
+    """
+    ubicacion = models.CharField(max_length=150)
+    mes = models.DateField(help_text="Primer día del mes")
+    entradas = models.PositiveIntegerField(default=0)
+    salidas = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.ubicacion} - {self.mes:%Y-%m}: +{self.entradas} / -{self.salidas}"
+
+    class Meta:
+        verbose_name = "Movimientos por Ubicación"
+        verbose_name_plural = "Movimientos por Ubicación"
+        ordering = ['-mes', 'ubicacion']
+        constraints = [
+            models.UniqueConstraint(fields=['ubicacion', 'mes'], name='movimientos_ubicacion_mes_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['mes'], name='movimientos_ubicacion_mes_idx'),
+        ]
+
+
+class OcupacionDiscos(models.Model):
+    """
+    Distribución de los discos por porcentaje de ocupación, en rangos de 10%.
+    El rango 10 agrupa los discos llenos (100% o más).
+    """
+    rango = models.PositiveSmallIntegerField(unique=True, help_text="Decena del porcentaje de ocupación (0 = 0-9%)")
+    discos = models.PositiveIntegerField(default=0)
+    tamanio_gb = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    usado_gb = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.rango * 10}%: {self.discos} discos"
+
+    class Meta:
+        verbose_name = "Ocupación de Discos"
+        verbose_name_plural = "Ocupación de Discos"
+        ordering = ['rango']
+
+
+class CostoTotalDispositivo(models.Model):
+    """
+    Costo total de propiedad (TCO) de cada dispositivo: mantenimientos (excepto
+    cancelados), cuánto de ese costo cayó dentro de la garantía, envíos a reparación
+    y tiempo en EN_REPARACION según el historial de movimientos. Lo mantiene el
+    comando `calcular_costo_total`, ver reportes.ciclo_vida.
+    """
+    dispositivo = models.OneToOneField(Dispositivo, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    # El índice del ranking por categoría también resuelve las búsquedas por categoría
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='+', db_index=False)
+    mantenimientos = models.PositiveIntegerField(default=0)
+    costo_mantenimiento = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    costo_en_garantia = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Costo de los mantenimientos programados hasta el fin de la garantía")
+    reparaciones = models.PositiveIntegerField(default=0, help_text="Movimientos de envío a reparación")
+    dias_en_reparacion = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    en_reparacion_desde = models.DateTimeField(blank=True, null=True, help_text="Inicio de la reparación en curso")
+    garantia_hasta = models.DateField(blank=True, null=True)
+    fecha_calculo = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.dispositivo_id}: {self.costo_mantenimiento}"
+
+    class Meta:
+        verbose_name = "Costo Total de Dispositivo"
+        verbose_name_plural = "Costos Totales de Dispositivos"
+        ordering = ['-costo_mantenimiento', '-dispositivo']
+        indexes = [
+            # Rankings del endpoint costo-total (los N primeros se leen del índice)
+            models.Index(fields=['-costo_mantenimiento', '-dispositivo'], name='costo_total_costo_idx'),
+            models.Index(fields=['-reparaciones', '-dispositivo'], name='costo_total_reparaciones_idx'),
+            models.Index(fields=['-dias_en_reparacion', '-dispositivo'], name='costo_total_dias_idx'),
+            models.Index(fields=['categoria', '-costo_mantenimiento', '-dispositivo'], name='costo_total_categoria_idx'),
+        ]
+
+
+class MarcaAgua(models.Model):
+    """
+    Hasta dónde procesó un cálculo incremental: inicio de la última ejecución y
+    último ID de las filas de solo inserción (movimientos) ya considerado.
+    """
+    proceso = models.CharField(max_length=50, unique=True)
+    fecha = models.DateTimeField()
+    ultimo_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.proceso}: {self.fecha:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        verbose_name = "Marca de Agua"
+        verbose_name_plural = "Marcas de Agua"
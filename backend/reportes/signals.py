@@ -0,0 +1,81 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from discos.models import Disco, ContenidoDisco
+from discos.signals import discos_actualizados
+from gestor_areas_project.recalculos import programar
+from inventario.models import Dispositivo, Movimiento
+from inventario.signals import dispositivos_actualizados, movimientos_registrados
+from mantenimiento.models import Mantenimiento
+from mantenimiento.signals import mantenimientos_programados
+
+from .acumulados import ajustar_estados, recalcular_costos, recalcular_movimientos, recalcular_ocupacion
+
+
+@receiver(post_save, sender=Mantenimiento)
+@receiver(post_delete, sender=Mantenimiento)
+def actualizar_costos(sender, instance, **kwargs):
+    # Si el mantenimiento cambió de dispositivo se recalculan ambos
+    dispositivos = {instance.dispositivo_id, getattr(instance, '_dispositivo_id_cargado', None)}
+    programar(recalcular_costos, dispositivos)
+    instance._dispositivo_id_cargado = instance.dispositivo_id
+
+
+@receiver(post_save, sender=Movimiento)
+@receiver(post_delete, sender=Movimiento)
+def actualizar_movimientos(sender, instance, **kwargs):
+    ubicaciones = {instance.origen, instance.destino} | getattr(instance, '_ubicaciones_cargadas', set())
+    programar(recalcular_movimientos, ubicaciones)
+    instance._ubicaciones_cargadas = {instance.origen, instance.destino}
+
+
+@receiver(mantenimientos_programados)
+def actualizar_costos_programados(sender, dispositivos_ids, desde, **kwargs):
+    # Los mantenimientos generados son futuros: solo cambian los meses desde la fecha de referencia
+    programar(recalcular_costos, dispositivos_ids, desde)
+
+
+@receiver(movimientos_registrados)
+def actualizar_movimientos_masivo(sender, movimientos, **kwargs):
+    ubicaciones = {movimiento.origen for movimiento in movimientos} | {movimiento.destino for movimiento in movimientos}
+    programar(recalcular_movimientos, ubicaciones)
+
+
+@receiver(post_save, sender=Dispositivo)
+def actualizar_dispositivo(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        programar(ajustar_estados, {instance.estado: 1})
+    elif update_fields is None or 'estado' in update_fields:
+        anterior = getattr(instance, '_estado_cargado', None)
+        if anterior is None:
+            # Instancia armada a mano o con el estado diferido: no se conoce el estado anterior
+            programar(ajustar_estados)
+        elif anterior != instance.estado:
+            programar(ajustar_estados, {anterior: -1, instance.estado: 1})
+    instance._estado_cargado = instance.estado
+    # La categoría está copiada en los costos del dispositivo
+    if not created and (update_fields is None or 'categoria' in update_fields):
+        programar(recalcular_costos, [instance.pk])
+
+
+@receiver(post_delete, sender=Dispositivo)
+def actualizar_estados_al_eliminar(sender, instance, **kwargs):
+    programar(ajustar_estados, {getattr(instance, '_estado_cargado', instance.estado): -1})
+
+
+@receiver(dispositivos_actualizados)
+def actualizar_dispositivos_masivo(sender, dispositivos_ids, **kwargs):
+    programar(ajustar_estados)
+    programar(recalcular_costos, dispositivos_ids)
+
+
+@receiver(post_save, sender=Disco)
+@receiver(post_delete, sender=Disco)
+@receiver(post_save, sender=ContenidoDisco)
+@receiver(post_delete, sender=ContenidoDisco)
+@receiver(discos_actualizados)
+def actualizar_ocupacion(sender, origin=None, **kwargs):
+    # Los contenidos borrados en cascada con su disco ya se cubren con el borrado del disco
+    if sender is ContenidoDisco and (isinstance(origin, Disco) or getattr(origin, 'model', None) is Disco):
+        return
+    programar(recalcular_ocupacion)
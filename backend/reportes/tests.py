@@ -1,3 +1,243 @@
+from datetime import date, datetime, timedelta, timezone as tz
+from decimal import Decimal
+
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from discos.models import ContenidoDisco, Disco
+from inventario.models import Categoria, Dispositivo, Movimiento
+from mantenimiento.models import Mantenimiento
+
+from .acumulados import recalcular_estados, recalcular_todo
+from .ciclo_vida import actualizar_costo_total, tiempo_en_reparacion
+from .models import (
+    CostoCategoriaMensual, CostoMantenimientoMensual, CostoTotalDispositivo, DispositivosPorEstado, MovimientosPorUbicacion,
+    OcupacionDiscos,
+)
+
+
+class AcumuladosIncrementalesTests(TestCase):
+    """
+    Las tablas acumuladas que mantienen las señales deben coincidir con una
+    reconstrucción completa desde las tablas de hechos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.portatil = Categoria.objects.create(nombre="Portátil")
+        cls.monitor = Categoria.objects.create(nombre="Monitor")
+        cls.dispositivos = [
+            Dispositivo.objects.create(
+                codigo_inventario=f"EQ-{i}", marca="HP", modelo="X", ubicacion="Bodega",
+                categoria=cls.portatil if i % 2 else cls.monitor,
+            )
+            for i in range(4)
+        ]
+
+    def foto(self):
+        return (
+            sorted(CostoMantenimientoMensual.objects.values_list('dispositivo_id', 'categoria_id', 'mes', 'cantidad', 'costo_total')),
+            sorted(CostoCategoriaMensual.objects.values_list('categoria_id', 'mes', 'cantidad', 'costo_total')),
+            sorted(MovimientosPorUbicacion.objects.values_list('ubicacion', 'mes', 'entradas', 'salidas')),
+        )
+
+    def assertIgualAReconstruccion(self):
+        incremental = self.foto()
+        recalcular_todo()
+        self.assertEqual(incremental, self.foto())
+
+    def test_costos_de_mantenimiento(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            mantenimiento = Mantenimiento.objects.create(
+                dispositivo=self.dispositivos[0], fecha_programada=date(2025, 3, 10), costo=Decimal('100.00')
+            )
+            Mantenimiento.objects.create(dispositivo=self.dispositivos[1], fecha_programada=date(2025, 3, 20), costo=Decimal('50.00'))
+            Mantenimiento.objects.create(
+                dispositivo=self.dispositivos[1], fecha_programada=date(2025, 4, 1), costo=Decimal('70.00'), estado='CANCELADO'
+            )
+        self.assertEqual(
+            CostoCategoriaMensual.objects.get(categoria=self.monitor, mes=date(2025, 3, 1)).costo_total, Decimal('100.00')
+        )
+        self.assertFalse(CostoCategoriaMensual.objects.filter(mes=date(2025, 4, 1)).exists())
+
+        # Reasignar el mantenimiento a otro dispositivo y categoría mueve su costo
+        mantenimiento = Mantenimiento.objects.get(pk=mantenimiento.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            mantenimiento.dispositivo = self.dispositivos[3]
+            mantenimiento.save()
+        self.assertFalse(CostoCategoriaMensual.objects.filter(categoria=self.monitor).exists())
+        self.assertEqual(
+            CostoCategoriaMensual.objects.get(categoria=self.portatil, mes=date(2025, 3, 1)).costo_total, Decimal('150.00')
+        )
+        self.assertIgualAReconstruccion()
+
+    def test_cambio_de_categoria_del_dispositivo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Mantenimiento.objects.create(dispositivo=self.dispositivos[0], fecha_programada=date(2025, 5, 1), costo=Decimal('30.00'))
+        dispositivo = self.dispositivos[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            dispositivo.categoria = self.portatil
+            dispositivo.save()
+        self.assertEqual(CostoCategoriaMensual.objects.get().categoria, self.portatil)
+        self.assertIgualAReconstruccion()
+
+    def test_movimientos_por_ubicacion(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            movimiento = Movimiento.objects.create(dispositivo=self.dispositivos[0], tipo_movimiento='TRASLADO', origen="Bodega", destino="Gerencia")
+            Movimiento.objects.create(dispositivo=self.dispositivos[1], tipo_movimiento='TRASLADO', origen="Bodega", destino="Gerencia")
+        self.assertEqual(MovimientosPorUbicacion.objects.get(ubicacion="Gerencia").entradas, 2)
+
+        movimiento = Movimiento.objects.get(pk=movimiento.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            movimiento.destino = "Sistemas"
+            movimiento.save()
+        self.assertEqual(MovimientosPorUbicacion.objects.get(ubicacion="Gerencia").entradas, 1)
+        self.assertEqual(MovimientosPorUbicacion.objects.get(ubicacion="Sistemas").entradas, 1)
+        self.assertEqual(MovimientosPorUbicacion.objects.get(ubicacion="Bodega").salidas, 2)
+        self.assertIgualAReconstruccion()
+
+
+class RecalculosPorTransaccionTests(TestCase):
+    """
+    Las escrituras de una transacción se reúnen en un solo recálculo por tabla y el
+    conteo por estado se ajusta con variaciones, sin recontar los dispositivos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nombre="Portátil")
+
+    def conteos(self):
+        return dict(DispositivosPorEstado.objects.filter(fecha=timezone.localdate()).values_list('estado', 'cantidad'))
+
+    def consultas_de_commit(self, escritura):
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True):
+                escritura()
+        return [consulta['sql'] for consulta in consultas.captured_queries]
+
+    def test_borrar_un_disco_recalcula_la_ocupacion_una_vez(self):
+        disco = Disco.objects.create(nombre="Respaldo", tamanio_gb=Decimal('100.00'))
+        ContenidoDisco.objects.bulk_create(
+            ContenidoDisco(disco=disco, nombre=f"Carpeta {i}", peso_gb=Decimal('0.10'), fecha_modificacion=date(2025, 1, 1))
+            for i in range(300)
+        )
+        Disco.objects.create(nombre="Otro", tamanio_gb=Decimal('100.00'))
+
+        consultas = self.consultas_de_commit(disco.delete)
+        self.assertEqual(sum('DELETE FROM "reportes_ocupaciondiscos"' in sql for sql in consultas), 1)
+        self.assertLess(len(consultas), 20)
+        self.assertEqual(list(OcupacionDiscos.objects.values_list('rango', 'discos')), [(0, 1)])
+
+    def test_conteo_por_estado_con_variaciones(self):
+        # Con los estados ya contados una vez, las escrituras solo ajustan la fila del día
+        recalcular_estados()
+        consultas = self.consultas_de_commit(lambda: [
+            Dispositivo.objects.create(codigo_inventario=f"EQ-{i}", marca="HP", modelo="X", categoria=self.categoria, ubicacion="Bodega")
+            for i in range(3)
+        ])
+        self.assertEqual(self.conteos()['DISPONIBLE'], 3)
+        self.assertFalse([sql for sql in consultas if 'COUNT' in sql and 'FROM "inventario_dispositivo"' in sql])
+
+        dispositivo = Dispositivo.objects.get(codigo_inventario="EQ-0")
+
+        def mover_y_eliminar():
+            Movimiento.objects.create(dispositivo=dispositivo, tipo_movimiento='ASIGNACION', origen="Bodega", destino="Gerencia", responsable="Ana")
+            Dispositivo.objects.get(codigo_inventario="EQ-1").delete()
+
+        consultas = self.consultas_de_commit(mover_y_eliminar)
+        self.assertFalse([sql for sql in consultas if 'COUNT' in sql and 'FROM "inventario_dispositivo"' in sql])
+        self.assertEqual({estado: cantidad for estado, cantidad in self.conteos().items() if cantidad}, {'DISPONIBLE': 1, 'ACTIVO': 1})
+
+        incremental = self.conteos()
+        recalcular_estados()
+        self.assertEqual(self.conteos(), incremental)
+
+    def test_escrituras_revertidas_no_cuentan(self):
+        def crear_y_revertir():
+            Dispositivo.objects.create(codigo_inventario="EQ-1", marca="HP", modelo="X", categoria=self.categoria, ubicacion="Bodega")
+            try:
+                with transaction.atomic():
+                    Dispositivo.objects.create(codigo_inventario="EQ-2", marca="HP", modelo="X", categoria=self.categoria, ubicacion="Bodega")
+                    raise ValueError
+            except ValueError:
+                pass
+
+        recalcular_estados()
+        self.consultas_de_commit(crear_y_revertir)
+        self.assertEqual(self.conteos()['DISPONIBLE'], 1)
+
+
+class CostoTotalTests(TestCase):
+    """
+    El TCO por dispositivo se recalcula solo para los dispositivos con cambios
+    desde la marca de agua y el endpoint lee la tabla resumen.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.portatil = Categoria.objects.create(nombre="Portátil")
+        cls.monitor = Categoria.objects.create(nombre="Monitor")
+        cls.laptop = Dispositivo.objects.create(
+            codigo_inventario="LAP-1", marca="Dell", modelo="Latitude", categoria=cls.portatil, ubicacion="Bodega",
+            garantia_hasta=date(2025, 6, 30),
+        )
+        cls.pantalla = Dispositivo.objects.create(codigo_inventario="MON-1", marca="LG", modelo="24MK", categoria=cls.monitor, ubicacion="Bodega")
+        for fecha, costo, estado in [(date(2025, 3, 1), 100, 'FINALIZADO'), (date(2025, 9, 1), 40, 'FINALIZADO'), (date(2025, 10, 1), 500, 'CANCELADO')]:
+            Mantenimiento.objects.create(dispositivo=cls.laptop, fecha_programada=fecha, costo=costo, estado=estado)
+        Mantenimiento.objects.create(dispositivo=cls.pantalla, fecha_programada=date(2025, 3, 1), costo=60, estado='FINALIZADO')
+
+        inicio = datetime(2025, 1, 1, tzinfo=tz.utc)
+        for dias, tipo in [(0, 'REPARACION'), (2, 'TRASLADO'), (3, 'ASIGNACION'), (10, 'REPARACION'), (14, 'DEVOLUCION')]:
+            Movimiento.objects.create(
+                dispositivo=cls.laptop, tipo_movimiento=tipo, origen="Bodega", destino="Taller",
+                fecha_movimiento=inicio + timedelta(days=dias),
+            )
+
+    def test_tiempo_en_reparacion(self):
+        inicio = datetime(2025, 1, 1, tzinfo=tz.utc)
+        ahora = inicio + timedelta(days=30)
+        movimientos = [('REPARACION', inicio), ('ASIGNACION', inicio + timedelta(days=3)), ('REPARACION', inicio + timedelta(days=20))]
+        self.assertEqual(tiempo_en_reparacion(movimientos, ahora), (13 * 86400, inicio + timedelta(days=20)))
+        # Dos envíos seguidos: el segundo cierra el primero y abre otro
+        self.assertEqual(tiempo_en_reparacion([('REPARACION', inicio), ('REPARACION', inicio + timedelta(days=1))], inicio + timedelta(days=2))[0], 2 * 86400)
+
+    def test_calculo(self):
+        self.assertEqual(actualizar_costo_total(), 2)
+        costo = CostoTotalDispositivo.objects.get(dispositivo=self.laptop)
+        self.assertEqual(
+            (costo.mantenimientos, costo.costo_mantenimiento, costo.costo_en_garantia, costo.reparaciones, costo.dias_en_reparacion),
+            (2, Decimal('140.00'), Decimal('100.00'), 2, Decimal('7.00')),
+        )
+        self.assertIsNone(costo.en_reparacion_desde)
+
+    def test_incremental(self):
+        actualizar_costo_total()
+        self.assertEqual(actualizar_costo_total(), 0)
+
+        Mantenimiento.objects.create(dispositivo=self.pantalla, fecha_programada=date(2025, 4, 1), costo=15, estado='FINALIZADO')
+        self.assertEqual(actualizar_costo_total(), 1)
+        self.assertEqual(CostoTotalDispositivo.objects.get(dispositivo=self.pantalla).costo_mantenimiento, Decimal('75.00'))
+
+        # Mientras siga en reparación el dispositivo se vuelve a procesar en cada ejecución
+        Movimiento.objects.create(dispositivo=self.pantalla, tipo_movimiento='REPARACION', origen="Bodega", destino="Taller",
+                                  fecha_movimiento=timezone.now() - timedelta(days=2))
+        self.assertEqual(actualizar_costo_total(), 1)
+        self.assertEqual(actualizar_costo_total(), 1)
+        self.assertGreaterEqual(CostoTotalDispositivo.objects.get(dispositivo=self.pantalla).dias_en_reparacion, Decimal('2.00'))
+
+    def test_endpoint(self):
+        actualizar_costo_total()
+        with self.assertNumQueries(2):
+            datos = self.client.get('/api/reportes/costo-total/?limit=1').json()
+        self.assertEqual([fila['dispositivo__codigo_inventario'] for fila in datos['resultados']], ["LAP-1"])
+        self.assertIsNotNone(datos['actualizado'])
+
+        datos = self.client.get('/api/reportes/costo-total/?agrupar=categoria&ordenar=reparaciones').json()
+        self.assertEqual([(fila['categoria__nombre'], fila['reparaciones']) for fila in datos['resultados']], [("Portátil", 2), ("Monitor", 0)])
 
-# Create your tests here.
+        for parametros in ('?agrupar=ubicacion', '?ordenar=marca', '?categoria=x'):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get(f'/api/reportes/costo-total/{parametros}').status_code, 400)
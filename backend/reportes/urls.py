@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import CostosMantenimientoView, CostoTotalView, DispositivosPorEstadoView, MovimientosPorUbicacionView, OcupacionDiscosView
+
+urlpatterns = [
+    path('costos-mantenimiento/', CostosMantenimientoView.as_view(), name='reporte-costos-mantenimiento'),
+    path('costo-total/', CostoTotalView.as_view(), name='reporte-costo-total'),
+    path('dispositivos-por-estado/', DispositivosPorEstadoView.as_view(), name='reporte-dispositivos-por-estado'),
+    path('movimientos-por-ubicacion/', MovimientosPorUbicacionView.as_view(), name='reporte-movimientos-por-ubicacion'),
+    path('ocupacion-discos/', OcupacionDiscosView.as_view(), name='reporte-ocupacion-discos'),
+]
@@ -1,3 +1,281 @@
-from django.shortcuts import render
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
-# Create your views here.
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from inventario.models import Dispositivo
+
+from .acumulados import RANGO_LLENO
+from .ciclo_vida import PROCESO as PROCESO_COSTO_TOTAL
+from .models import (
+    CostoCategoriaMensual, CostoMantenimientoMensual, CostoTotalDispositivo, DispositivosPorEstado, MarcaAgua,
+    MovimientosPorUbicacion, OcupacionDiscos,
+)
+
+# Días de historial de estados que se devuelven si no se indica 'desde'
+DIAS_ESTADOS_POR_DEFECTO = 90
+
+
+class ParametroInvalido(ValueError):
+    pass
+
+
+def _parametro_entero(request, nombre, defecto):
+    """
+    Lee un parámetro entero positivo de la query string; si falta o es inválido usa el valor por defecto.
+    """
+    try:
+        valor = int(request.query_params.get(nombre, defecto))
+    except (TypeError, ValueError):
+        return defecto
+    return valor if valor > 0 else defecto
+
+
+def _parametro_fecha(request, nombre, formato='%Y-%m-%d'):
+    """
+    Lee una fecha de la query string (None si no se indica). Con formato '%Y-%m' retorna el primer día del mes.
+    """
+    valor = request.query_params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, formato).date()
+    except ValueError:
+        ejemplo = date(2025, 6, 30).strftime(formato)
+        raise ParametroInvalido(f"'{nombre}' debe tener el formato {ejemplo}.")
+
+
+def _rango_meses(request):
+    return _parametro_fecha(request, 'desde', '%Y-%m'), _parametro_fecha(request, 'hasta', '%Y-%m')
+
+
+def _filtrar_meses(queryset, desde, hasta):
+    if desde:
+        queryset = queryset.filter(mes__gte=desde)
+    if hasta:
+        queryset = queryset.filter(mes__lte=hasta)
+    return queryset
+
+
+class CostosMantenimientoView(APIView):
+    """
+    Costo de mantenimiento agrupado por mes, categoría o dispositivo.
+
+    Parámetros: `agrupar` (mes | categoria | dispositivo, por defecto mes), `desde` y
+    `hasta` (YYYY-MM, inclusivos), `categoria` (ID) y `limit` (solo al agrupar por
+    dispositivo: los N dispositivos más costosos, por defecto 50).
+    """
+    presupuesto_consultas = {'get': 1}
+
+    AGRUPACIONES = {
+        'mes': ['mes'],
+        'categoria': ['categoria_id', 'categoria__nombre'],
+        'dispositivo': ['dispositivo_id', 'dispositivo__codigo_inventario', 'dispositivo__marca', 'dispositivo__modelo'],
+    }
+
+    def get(self, request):
+        agrupar = request.query_params.get('agrupar', 'mes')
+        if agrupar not in self.AGRUPACIONES:
+            return Response(
+                {"error": f"'agrupar' debe ser uno de: {', '.join(self.AGRUPACIONES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            desde, hasta = _rango_meses(request)
+        except ParametroInvalido as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Por mes o categoría alcanza con los totales por categoría, mucho más chicos
+        modelo = CostoMantenimientoMensual if agrupar == 'dispositivo' else CostoCategoriaMensual
+        acumulados = _filtrar_meses(modelo.objects.all(), desde, hasta)
+        if request.query_params.get('categoria'):
+            try:
+                acumulados = acumulados.filter(categoria_id=int(request.query_params['categoria']))
+            except ValueError:
+                return Response({"error": "'categoria' debe ser un ID."}, status=status.HTTP_400_BAD_REQUEST)
+
+        filas = (
+            acumulados
+            .values(*self.AGRUPACIONES[agrupar])
+            .annotate(mantenimientos=Sum('cantidad'), costo=Sum('costo_total'))
+        )
+        if agrupar == 'mes':
+            filas = filas.order_by('mes')
+        else:
+            filas = filas.order_by('-costo')
+        if agrupar == 'dispositivo':
+            filas = filas[:_parametro_entero(request, 'limit', 50)]
+
+        resultados = list(filas)
+        return Response({
+            'agrupar': agrupar,
+            'costo_total': sum((fila['costo'] for fila in resultados), Decimal('0.00')),
+            'resultados': resultados,
+        }, status=status.HTTP_200_OK)
+
+
+class DispositivosPorEstadoView(APIView):
+    """
+    Evolución de la cantidad de dispositivos por estado.
+
+    Parámetros: `desde` y `hasta` (YYYY-MM-DD; por defecto los últimos 90 días).
+    La serie tiene un punto por cada día con cambios, con la cantidad de todos los
+    estados; el primer punto es el estado vigente al inicio del rango.
+    """
+    presupuesto_consultas = {'get': 2}
+
+    def get(self, request):
+        try:
+            hasta = _parametro_fecha(request, 'hasta') or timezone.localdate()
+            desde = _parametro_fecha(request, 'desde') or hasta - timedelta(days=DIAS_ESTADOS_POR_DEFECTO)
+        except ParametroInvalido as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Último valor de cada estado antes del rango, para arrancar la serie
+        ultima_fecha = (
+            DispositivosPorEstado.objects
+            .filter(estado=OuterRef('estado'), fecha__lt=desde)
+            .order_by('-fecha')
+            .values('fecha')[:1]
+        )
+        anteriores = DispositivosPorEstado.objects.filter(fecha=Subquery(ultima_fecha))
+        vigentes = {estado: 0 for estado, _ in Dispositivo.ESTADOS}
+        vigentes.update(anteriores.values_list('estado', 'cantidad'))
+
+        serie = [{'fecha': desde, 'estados': dict(vigentes)}]
+        filas = (
+            DispositivosPorEstado.objects
+            .filter(fecha__gte=desde, fecha__lte=hasta)
+            .order_by('fecha')
+            .values_list('fecha', 'estado', 'cantidad')
+        )
+        for fecha, estado, cantidad in filas:
+            vigentes[estado] = cantidad
+            if serie[-1]['fecha'] == fecha:
+                serie[-1]['estados'][estado] = cantidad
+            else:
+                serie.append({'fecha': fecha, 'estados': dict(vigentes)})
+
+        return Response({'desde': desde, 'hasta': hasta, 'serie': serie}, status=status.HTTP_200_OK)
+
+
+class MovimientosPorUbicacionView(APIView):
+    """
+    Entradas y salidas de dispositivos por ubicación.
+
+    Parámetros: `desde` y `hasta` (YYYY-MM, inclusivos) y `limit` (por defecto 20).
+    Con `ubicacion` se devuelve la serie mensual de esa ubicación.
+    """
+    presupuesto_consultas = {'get': 1}
+
+    def get(self, request):
+        try:
+            desde, hasta = _rango_meses(request)
+        except ParametroInvalido as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        acumulados = _filtrar_meses(MovimientosPorUbicacion.objects.all(), desde, hasta)
+        ubicacion = request.query_params.get('ubicacion')
+        if ubicacion:
+            serie = acumulados.filter(ubicacion=ubicacion).order_by('mes').values('mes', 'entradas', 'salidas')
+            return Response({'ubicacion': ubicacion, 'serie': list(serie)}, status=status.HTTP_200_OK)
+
+        filas = (
+            acumulados
+            .values('ubicacion')
+            .annotate(total_entradas=Sum('entradas'), total_salidas=Sum('salidas'))
+            .annotate(total=F('total_entradas') + F('total_salidas'))
+            .order_by('-total', 'ubicacion')
+        )
+        return Response({
+            'resultados': list(filas[:_parametro_entero(request, 'limit', 20)]),
+        }, status=status.HTTP_200_OK)
+
+
+class OcupacionDiscosView(APIView):
+    """
+    Distribución de los discos por porcentaje de ocupación, en rangos de 10%.
+    """
+    presupuesto_consultas = {'get': 1}
+
+    def get(self, request):
+        por_rango = {fila.rango: fila for fila in OcupacionDiscos.objects.all()}
+        rangos = []
+        for rango in range(RANGO_LLENO + 1):
+            fila = por_rango.get(rango)
+            rangos.append({
+                'rango': '100%+' if rango == RANGO_LLENO else f'{rango * 10}-{rango * 10 + 9}%',
+                'discos': fila.discos if fila else 0,
+                'tamanio_gb': fila.tamanio_gb if fila else Decimal('0.00'),
+                'usado_gb': fila.usado_gb if fila else Decimal('0.00'),
+            })
+        return Response({
+            'total_discos': sum(rango['discos'] for rango in rangos),
+            'rangos': rangos,
+        }, status=status.HTTP_200_OK)
+
+
+class CostoTotalView(APIView):
+    """
+    Costo total de propiedad por dispositivo o por categoría (tabla que mantiene el
+    comando `calcular_costo_total`).
+
+    Parámetros: `agrupar` (dispositivo | categoria, por defecto dispositivo),
+    `ordenar` (costo_mantenimiento | costo_en_garantia | reparaciones |
+    dias_en_reparacion, siempre de mayor a menor), `categoria` (ID) y `limit`
+    (por defecto 50). Por dispositivo los primeros N se leen del índice del orden.
+    `actualizado` es la fecha del último cálculo.
+    """
+    presupuesto_consultas = {'get': 2}
+
+    ORDENES = ['costo_mantenimiento', 'costo_en_garantia', 'reparaciones', 'dias_en_reparacion']
+    CAMPOS_DISPOSITIVO = [
+        'dispositivo_id', 'dispositivo__codigo_inventario', 'dispositivo__marca', 'dispositivo__modelo',
+        'categoria_id', 'categoria__nombre', 'mantenimientos', 'costo_mantenimiento', 'costo_en_garantia',
+        'reparaciones', 'dias_en_reparacion', 'en_reparacion_desde', 'garantia_hasta',
+    ]
+
+    def get(self, request):
+        agrupar = request.query_params.get('agrupar', 'dispositivo')
+        ordenar = request.query_params.get('ordenar', 'costo_mantenimiento')
+        if agrupar not in ('dispositivo', 'categoria'):
+            return Response({"error": "'agrupar' debe ser uno de: dispositivo, categoria."}, status=status.HTTP_400_BAD_REQUEST)
+        if ordenar not in self.ORDENES:
+            return Response({"error": f"'ordenar' debe ser uno de: {', '.join(self.ORDENES)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        costos = CostoTotalDispositivo.objects.all()
+        if request.query_params.get('categoria'):
+            try:
+                costos = costos.filter(categoria_id=int(request.query_params['categoria']))
+            except ValueError:
+                return Response({"error": "'categoria' debe ser un ID."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if agrupar == 'dispositivo':
+            filas = costos.order_by(f'-{ordenar}', '-dispositivo_id').values(*self.CAMPOS_DISPOSITIVO)
+        else:
+            # Pocas categorías: se agrega la tabla resumen, sin tocar las tablas de hechos
+            filas = (
+                costos
+                .values('categoria_id', 'categoria__nombre')
+                .annotate(
+                    dispositivos=Count('pk'),
+                    mantenimientos=Sum('mantenimientos'),
+                    costo_mantenimiento=Sum('costo_mantenimiento'),
+                    costo_en_garantia=Sum('costo_en_garantia'),
+                    reparaciones=Sum('reparaciones'),
+                    dias_en_reparacion=Sum('dias_en_reparacion'),
+                )
+                .order_by(f'-{ordenar}', 'categoria_id')
+            )
+
+        marca = MarcaAgua.objects.filter(proceso=PROCESO_COSTO_TOTAL).values_list('fecha', flat=True).first()
+        return Response({
+            'agrupar': agrupar,
+            'ordenar': ordenar,
+            'actualizado': marca,
+            'resultados': list(filas[:_parametro_entero(request, 'limit', 50)]),
+        }, status=status.HTTP_200_OK)
@@ -6,7 +6,7 @@ import DiscosDashboardPage from './modules/discos/DiscosDashboardPage';
 // Placeholders
 import { InventarioProvider } from './modules/inventario/InventarioContext';
 import InventarioDashboardPage from './modules/inventario/InventarioDashboardPage';
-import ReportesPlaceholder from './modules/reportes/ReportesPlaceholder';
+import ReportesPage from './modules/reportes/ReportesPage';
 import { MantenimientoProvider } from './modules/mantenimiento/MantenimientoContext';
 import MantenimientoDashboardPage from './modules/mantenimiento/MantenimientoDashboardPage';
 
@@ -27,7 +27,8 @@ function App() {
               <InventarioDashboardPage />
             </InventarioProvider>
           } />
-          <Route path="reportes" element={<ReportesPlaceholder />} />
+          {/* Módulo de Reportes */}
+          <Route path="reportes" element={<ReportesPage />} />
           {/* Módulo de Mantenimiento */}
           <Route path="mantenimiento" element={
             <InventarioProvider> {/* Nested InventarioProvider because Form needs devices */}
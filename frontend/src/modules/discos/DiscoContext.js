@@ -14,10 +14,11 @@ export const DiscoProvider = ({ children }) => {
     setError(null);
     try {
       const data = await getDiscos(url);
+      const results = data.results || data || [];
       if (isNewQuery) {
-        setDiscos(data || []);
+        setDiscos(results);
       } else {
-        setDiscos(prevDiscos => [...prevDiscos, ...(data || [])]);
+        setDiscos(prevDiscos => [...prevDiscos, ...results]);
       }
       setNextPage(data.next);
     } catch (error) {
@@ -25,6 +25,8 @@ const DiscosDashboardPage = () => {
 
   const applyFilters = useCallback((isNewQuery = true) => {
     const params = new URLSearchParams();
+    // Las tarjetas muestran una vista previa de los contenidos
+    params.append('expand', 'contenidos');
     if (filters.nombre) params.append('nombre', filters.nombre);
     if (filters.contenido_nombre) params.append('contenido_nombre', filters.contenido_nombre);
     if (filters.tipo) params.append('tipo', filters.tipo);
@@ -64,7 +66,7 @@ const DiscosDashboardPage = () => {
       espacio_libre_min: '',
     });
     // Reset to default
-    const url = `${API_BASE_URL}/discos/`;
+    const url = `${API_BASE_URL}/discos/?expand=contenidos`;
     fetchDiscos(url, true);
   };
 
@@ -1,17 +1,23 @@
 import React, { useState } from 'react';
 import * as XLSX from 'xlsx';
-import { API_BASE_URL } from '../../services/api';
+import { API_BASE_URL, waitForImportJob } from '../../services/api';
 import './Discos.css';
 
 const ExcelImportExport = ({ onImportSuccess }) => {
     const [importing, setImporting] = useState(false);
     const [importResult, setImportResult] = useState(null);
+    const [progress, setProgress] = useState(0);
 
     const handleExportTemplate = () => {
         // Descargar plantilla desde el backend
         window.open(`${API_BASE_URL}/discos/export-template/`, '_blank');
     };
 
+    const handleExportData = () => {
+        // Exportación completa en el mismo formato de la plantilla (se puede volver a importar)
+        window.open(`${API_BASE_URL}/discos/export/`, '_blank');
+    };
+
     const handleFileSelect = async (e) => {
         const file = e.target.files[0];
         if (!file) return;
@@ -24,6 +30,7 @@ const ExcelImportExport = ({ onImportSuccess }) => {
 
         setImporting(true);
         setImportResult(null);
+        setProgress(0);
 
         try {
             // Crear FormData para enviar el archivo
@@ -37,10 +44,23 @@ const ExcelImportExport = ({ onImportSuccess }) => {
 
             const data = await response.json();
 
-            if (response.ok || response.status === 207) {
-                setImportResult(data);
-                if (data.success && onImportSuccess) {
-                    onImportSuccess();
+            if (response.status === 202) {
+                // El archivo se procesa en segundo plano, se consulta el avance del trabajo
+                const job = await waitForImportJob(
+                    `${API_BASE_URL}/discos/import/${data.id}/`,
+                    (current) => setProgress(current.progreso)
+                );
+                if (job.estado === 'FALLIDO') {
+                    setImportResult({
+                        success: false,
+                        created: 0,
+                        errors: [{ message: job.mensaje || 'Error al procesar el archivo' }]
+                    });
+                } else {
+                    setImportResult(job);
+                    if (job.success && onImportSuccess) {
+                        onImportSuccess();
+                    }
                 }
             } else {
                 setImportResult({
@@ -77,6 +97,15 @@ const ExcelImportExport = ({ onImportSuccess }) => {
                 📥 Exportar Plantilla
             </button>
 
+            <button
+                onClick={handleExportData}
+                className="btn-secondary"
+                style={{ marginRight: '10px' }}
+                title="Descargar todos los discos y sus contenidos en Excel"
+            >
+                📥 Exportar Datos
+            </button>
+
             <label className="btn-secondary" style={{ cursor: 'pointer', margin: 0 }}>
                 📤 Importar Datos
                 <input
@@ -90,7 +119,7 @@ const ExcelImportExport = ({ onImportSuccess }) => {
 
             {importing && (
                 <span style={{ marginLeft: '10px', color: '#3699ff' }}>
-                    Procesando archivo...
+                    Procesando archivo... {progress}%
                 </span>
             )}
 
@@ -1,16 +1,22 @@
 import React, { useState } from 'react';
-import { API_BASE_URL } from '../../services/api';
+import { API_BASE_URL, waitForImportJob } from '../../services/api';
 import './Inventario.css';
 
 const InventarioExcelImport = ({ onImportSuccess }) => {
     const [importing, setImporting] = useState(false);
     const [importResult, setImportResult] = useState(null);
+    const [progress, setProgress] = useState(0);
 
     const handleExportTemplate = () => {
         // Descargar plantilla desde el backend
         window.open(`${API_BASE_URL}/inventario/export-template/`, '_blank');
     };
 
+    const handleExportData = () => {
+        // Exportación completa en el mismo formato de la plantilla (se puede volver a importar)
+        window.open(`${API_BASE_URL}/inventario/dispositivos/export/`, '_blank');
+    };
+
     const handleFileSelect = async (e) => {
         const file = e.target.files[0];
         if (!file) return;
@@ -23,6 +29,7 @@ const InventarioExcelImport = ({ onImportSuccess }) => {
 
         setImporting(true);
         setImportResult(null);
+        setProgress(0);
 
         try {
             // Crear FormData para enviar el archivo
@@ -37,10 +44,24 @@ const InventarioExcelImport = ({ onImportSuccess }) => {
 
             const data = await response.json();
 
-            if (response.ok || response.status === 207) {
-                setImportResult(data);
-                if (data.success && onImportSuccess) {
-                    onImportSuccess();
+            if (response.status === 202) {
+                // El archivo se procesa en segundo plano, se consulta el avance del trabajo
+                const job = await waitForImportJob(
+                    `${API_BASE_URL}/inventario/import/${data.id}/`,
+                    (current) => setProgress(current.progreso)
+                );
+                if (job.estado === 'FALLIDO') {
+                    setImportResult({
+                        success: false,
+                        created: 0,
+                        updated: 0,
+                        errors: [{ message: job.mensaje || 'Error al procesar el archivo' }]
+                    });
+                } else {
+                    setImportResult(job);
+                    if (job.success && onImportSuccess) {
+                        onImportSuccess();
+                    }
                 }
             } else {
                 setImportResult({
@@ -79,6 +100,15 @@ const InventarioExcelImport = ({ onImportSuccess }) => {
                 📥 Exportar Plantilla
             </button>
 
+            <button
+                onClick={handleExportData}
+                className="btn-secondary"
+                style={{ marginRight: '10px' }}
+                title="Descargar todo el inventario en Excel"
+            >
+                📥 Exportar Datos
+            </button>
+
             <label className="btn-secondary" style={{ cursor: 'pointer', margin: 0 }}>
                 📤 Importar Datos
                 <input
@@ -92,7 +122,7 @@ const InventarioExcelImport = ({ onImportSuccess }) => {
 
             {importing && (
                 <span className="processing-indicator">
-                    Procesando archivo...
+                    Procesando archivo... {progress}%
                 </span>
             )}
 
@@ -0,0 +1,170 @@
+import React, { useEffect, useState } from 'react';
+import { getReporte } from '../../services/api';
+
+const AGRUPACIONES_COSTO = [
+    { value: 'mes', label: 'Por mes' },
+    { value: 'categoria', label: 'Por categoría' },
+    { value: 'dispositivo', label: 'Top dispositivos' },
+];
+
+const formatoMoneda = (valor) => Number(valor || 0).toLocaleString('es', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+
+const etiquetaCosto = (fila, agrupar) => {
+    if (agrupar === 'mes') return fila.mes.slice(0, 7);
+    if (agrupar === 'categoria') return fila.categoria__nombre;
+    return `${fila.dispositivo__codigo_inventario} - ${fila.dispositivo__marca} ${fila.dispositivo__modelo}`;
+};
+
+const ReportesPage = () => {
+    const [agrupar, setAgrupar] = useState('mes');
+    const [costos, setCostos] = useState(null);
+    const [estados, setEstados] = useState(null);
+    const [movimientos, setMovimientos] = useState(null);
+    const [ocupacion, setOcupacion] = useState(null);
+    const [error, setError] = useState(null);
+
+    useEffect(() => {
+        getReporte('costos-mantenimiento', { agrupar, limit: 20 })
+            .then(setCostos)
+            .catch(err => setError(err.message));
+    }, [agrupar]);
+
+    useEffect(() => {
+        // Los reportes leen tablas precalculadas, se piden en paralelo
+        Promise.all([
+            getReporte('dispositivos-por-estado'),
+            getReporte('movimientos-por-ubicacion', { limit: 10 }),
+            getReporte('ocupacion-discos'),
+        ])
+            .then(([estadosData, movimientosData, ocupacionData]) => {
+                setEstados(estadosData);
+                setMovimientos(movimientosData);
+                setOcupacion(ocupacionData);
+            })
+            .catch(err => setError(err.message));
+    }, []);
+
+    const cardStyle = {
+        background: '#fff',
+        borderRadius: '8px',
+        padding: '24px',
+        boxShadow: '0 0 20px 0 rgba(76, 87, 125, 0.02)',
+        marginTop: '24px'
+    };
+    const titleStyle = { fontSize: '1.1rem', color: '#181c32', margin: '0 0 16px 0' };
+    const cellStyle = { padding: '10px 15px' };
+
+    const estadoActual = estados && estados.serie.length > 0 ? estados.serie[estados.serie.length - 1] : null;
+    const maxDiscos = ocupacion ? Math.max(1, ...ocupacion.rangos.map(r => r.discos)) : 1;
+
+    return (
+        <div className="reportes-page">
+            <h1 style={{ fontSize: '1.5rem', fontWeight: '600', color: '#3f4254', marginBottom: '8px' }}>Reportes</h1>
+            <p style={{ color: '#b5b5c3' }}>Indicadores de mantenimiento, inventario y almacenamiento.</p>
+            {error && <div style={{ color: '#f64e60', marginTop: '16px' }}>{error}</div>}
+
+            {/* COSTOS DE MANTENIMIENTO */}
+            <div style={cardStyle}>
+                <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
+                    <h3 style={titleStyle}>Costo de Mantenimiento</h3>
+                    <select value={agrupar} onChange={e => setAgrupar(e.target.value)}>
+                        {AGRUPACIONES_COSTO.map(opcion => (
+                            <option key={opcion.value} value={opcion.value}>{opcion.label}</option>
+                        ))}
+                    </select>
+                </div>
+                {costos && costos.agrupar === agrupar ? (
+                    <table className="content-table" style={{ margin: 0 }}>
+                        <thead style={{ background: '#f3f6f9' }}>
+                            <tr>
+                                <th style={cellStyle}>{AGRUPACIONES_COSTO.find(o => o.value === agrupar).label}</th>
+                                <th style={cellStyle}>Mantenimientos</th>
+                                <th style={cellStyle}>Costo</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {costos.resultados.map((fila, index) => (
+                                <tr key={index} style={{ borderBottom: '1px solid #ebedf3' }}>
+                                    <td style={cellStyle}>{etiquetaCosto(fila, agrupar)}</td>
+                                    <td style={cellStyle}>{fila.mantenimientos}</td>
+                                    <td style={cellStyle}>{formatoMoneda(fila.costo)}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                ) : (
+                    <div style={{ color: '#b5b5c3' }}>Cargando...</div>
+                )}
+            </div>
+
+            <div style={{ display: 'flex', gap: '24px', flexWrap: 'wrap' }}>
+                {/* DISPOSITIVOS POR ESTADO */}
+                <div style={{ ...cardStyle, flex: '1', minWidth: '280px' }}>
+                    <h3 style={titleStyle}>Dispositivos por Estado</h3>
+                    {estadoActual ? (
+                        <>
+                            {Object.entries(estadoActual.estados).map(([estado, cantidad]) => (
+                                <div key={estado} style={{ display: 'flex', justifyContent: 'space-between', padding: '6px 0' }}>
+                                    <span>{estado.replace('_', ' ')}</span>
+                                    <strong>{cantidad}</strong>
+                                </div>
+                            ))}
+                            <p style={{ color: '#b5b5c3', fontSize: '0.85rem' }}>
+                                {estados.serie.length - 1} días con cambios desde {estados.desde}
+                            </p>
+                        </>
+                    ) : (
+                        <div style={{ color: '#b5b5c3' }}>Cargando...</div>
+                    )}
+                </div>
+
+                {/* MOVIMIENTOS POR UBICACIÓN */}
+                <div style={{ ...cardStyle, flex: '1', minWidth: '280px' }}>
+                    <h3 style={titleStyle}>Ubicaciones con más Movimientos</h3>
+                    {movimientos ? (
+                        <table className="content-table" style={{ margin: 0 }}>
+                            <thead style={{ background: '#f3f6f9' }}>
+                                <tr>
+                                    <th style={cellStyle}>Ubicación</th>
+                                    <th style={cellStyle}>Entradas</th>
+                                    <th style={cellStyle}>Salidas</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                                {movimientos.resultados.map(fila => (
+                                    <tr key={fila.ubicacion} style={{ borderBottom: '1px solid #ebedf3' }}>
+                                        <td style={cellStyle}>{fila.ubicacion}</td>
+                                        <td style={cellStyle}>{fila.total_entradas}</td>
+                                        <td style={cellStyle}>{fila.total_salidas}</td>
+                                    </tr>
+                                ))}
+                            </tbody>
+                        </table>
+                    ) : (
+                        <div style={{ color: '#b5b5c3' }}>Cargando...</div>
+                    )}
+                </div>
+
+                {/* OCUPACIÓN DE DISCOS */}
+                <div style={{ ...cardStyle, flex: '1', minWidth: '280px' }}>
+                    <h3 style={titleStyle}>Ocupación de Discos</h3>
+                    {ocupacion ? (
+                        ocupacion.rangos.map(rango => (
+                            <div key={rango.rango} style={{ display: 'flex', alignItems: 'center', gap: '10px', padding: '3px 0' }}>
+                                <span style={{ width: '70px', fontSize: '0.85rem' }}>{rango.rango}</span>
+                                <div style={{ flex: 1, background: '#f3f6f9', borderRadius: '4px', height: '12px' }}>
+                                    <div style={{ width: `${(rango.discos / maxDiscos) * 100}%`, background: '#3699ff', borderRadius: '4px', height: '100%' }} />
+                                </div>
+                                <span style={{ width: '30px', textAlign: 'right' }}>{rango.discos}</span>
+                            </div>
+                        ))
+                    ) : (
+                        <div style={{ color: '#b5b5c3' }}>Cargando...</div>
+                    )}
+                </div>
+            </div>
+        </div>
+    );
+};
+
+export default ReportesPage;
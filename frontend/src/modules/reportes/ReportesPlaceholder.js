@@ -1,14 +0,0 @@
-import React from 'react';
-
-const ReportesPlaceholder = () => {
-    return (
-        <div className="module-placeholder">
-            <div className="placeholder-content" style={{ textAlign: 'center', marginTop: '50px' }}>
-                <h2 style={{ fontSize: '2rem', color: '#e1e3ea' }}>Módulo de Reportes</h2>
-                <p style={{ color: '#a1a5b7', marginTop: '10px' }}>Próximamente disponible.</p>
-            </div>
-        </div>
-    );
-};
-
-export default ReportesPlaceholder;
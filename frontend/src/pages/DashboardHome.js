@@ -1,6 +1,8 @@
 import React, { useEffect, useState } from 'react';
 import { getDashboardStats } from '../services/api';
 
+const STATS_POLL_INTERVAL_MS = 30000;
+
 const DashboardHome = () => {
     const [stats, setStats] = useState(null);
     const [loading, setLoading] = useState(true);
@@ -17,6 +19,9 @@ const DashboardHome = () => {
             }
         };
         fetchStats();
+        // El backend responde 304 (vía ETag) mientras no haya cambios, el navegador reutiliza su copia
+        const interval = setInterval(fetchStats, STATS_POLL_INTERVAL_MS);
+        return () => clearInterval(interval);
     }, []);
 
     // Styles
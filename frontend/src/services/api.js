@@ -131,3 +131,24 @@ export const updateMantenimiento = (id, data) => {
 export const getDashboardStats = () => {
   return request(`${API_BASE_URL}/dashboard/stats/`);
 };
+
+// Reportes: `nombre` es el endpoint (ej: 'costos-mantenimiento') y `params` la query string
+export const getReporte = (nombre, params = {}) => {
+  const url = new URL(`${API_BASE_URL}/reportes/${nombre}/`);
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') url.searchParams.append(key, value);
+  });
+  return request(url.toString());
+};
+
+// Importaciones en segundo plano: consulta el trabajo hasta que termine
+export const waitForImportJob = async (jobUrl, onProgress, intervalMs = 1000) => {
+  for (;;) {
+    const job = await request(jobUrl);
+    if (onProgress) onProgress(job);
+    if (job.estado === 'COMPLETADO' || job.estado === 'FALLIDO') {
+      return job;
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+};